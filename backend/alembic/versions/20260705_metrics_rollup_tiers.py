@@ -0,0 +1,99 @@
+"""gateway_metrics_daily / gateway_metrics_monthly + 分层水位
+
+Revision ID: 20260705_mrt
+Revises: 20260704_lim
+Create Date: 2026-07-05
+
+长时间窗（90 天 / 12 个月）看板与用量统计此前只能扫 ``gateway_metrics_hourly``。新增日 / 月级
+聚合表，由 rollup job 从下一级按 UTC 自然日 / 自然月整段重建；``gateway_rollup_state`` 增加
+``daily_rolled_at`` / ``monthly_rolled_at`` 水位。水位为 NULL 时读路径只用 hourly，
+首次 rollup 运行时自动从 hourly 最早桶所在月回填。
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from alembic import op
+
+revision: str = "20260705_mrt"
+down_revision: str | None = "20260704_lim"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+_TIER_TABLES = ("gateway_metrics_daily", "gateway_metrics_monthly")
+
+
+def _counter(name: str, comment: str | None = None) -> sa.Column:
+    return sa.Column(name, sa.BigInteger(), server_default="0", nullable=False, comment=comment)
+
+
+def _create_tier_table(table: str) -> None:
+    op.create_table(
+        table,
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("bucket_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("tenant_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("resource_owner_user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("vkey_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("credential_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("entitlement_plan_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("provider_plan_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("provider", sa.String(length=50), nullable=True),
+        sa.Column("real_model", sa.String(length=200), nullable=True),
+        sa.Column("model_key", sa.String(length=200), nullable=False),
+        sa.Column("capability", sa.String(length=40), nullable=True),
+        _counter("requests"),
+        _counter("success_count"),
+        _counter("error_count"),
+        _counter("input_tokens"),
+        _counter("output_tokens"),
+        _counter("cached_tokens"),
+        _counter("cache_creation_tokens"),
+        sa.Column(
+            "cost_usd", sa.Numeric(precision=18, scale=6), server_default="0", nullable=False
+        ),
+        sa.Column(
+            "revenue_usd", sa.Numeric(precision=18, scale=6), server_default="0", nullable=False
+        ),
+        _counter("total_latency_ms", "累计 latency_ms，用于计算平均"),
+        _counter("ttfb_total_ms", "累计 ttfb_ms，用于计算平均"),
+        _counter("cache_hit_count"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    suffix = table.removeprefix("gateway_metrics_")
+    op.create_index(f"ix_gateway_metrics_{suffix}_bucket", table, ["bucket_at"])
+    op.create_index(f"ix_gateway_metrics_{suffix}_tenant_bucket", table, ["tenant_id", "bucket_at"])
+
+
+def upgrade() -> None:
+    for table in _TIER_TABLES:
+        _create_tier_table(table)
+    op.add_column(
+        "gateway_rollup_state",
+        sa.Column("daily_rolled_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.add_column(
+        "gateway_rollup_state",
+        sa.Column("monthly_rolled_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("gateway_rollup_state", "monthly_rolled_at")
+    op.drop_column("gateway_rollup_state", "daily_rolled_at")
+    for table in reversed(_TIER_TABLES):
+        op.drop_table(table)
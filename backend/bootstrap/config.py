@@ -83,6 +83,16 @@ class Settings(BaseSettings):
     # workers × 总数 不超过 PostgreSQL max_connections。
     database_background_pool_size: int = 16
     database_background_max_overflow: int = 8
+    # LangGraph checkpointer 专用 psycopg 池（写回批量落库 + 历史读），同样计入上面的连接总数
+    database_checkpoint_pool_min_size: int = 1
+    database_checkpoint_pool_max_size: int = 8
+    # 只读副本（流复制备库）：未配置时所有读走主库。仅在代码显式声明延迟容忍度
+    # （``replica_reads``）的只读查询才会路由到副本，副本连接池独立计数，不占主库连接。
+    database_replica_url: str | None = None
+    database_replica_pool_size: int = 8
+    database_replica_max_overflow: int = 4
+    # 副本复制延迟探测间隔（秒）；超过 3 个间隔未成功探测视为延迟未知，读回退主库
+    database_replica_lag_check_interval_seconds: float = Field(default=2.0, gt=0)
 
     # ========================================================================
     # Redis 配置
@@ -287,12 +297,29 @@ class Settings(BaseSettings):
     sandbox_network_mode: str = "none"
     work_dir: str = "/tmp/workspace"  # 临时工作目录，仅在 Local 模式下使用
 
+    # ========================================================================
+    # 网络搜索工具配置
+    # ========================================================================
+    # DuckDuckGo Instant Answer API 地址（测试可指向本地 stub）
+    web_search_duckduckgo_url: str = "https://api.duckduckgo.com/"
+    # 每个搜索 provider 的长连接池大小
+    web_search_max_connections: int = Field(default=20, ge=1)
+    # 每个搜索 provider 同时进行的最多请求数；超出的调用排队，避免触发上游限流
+    web_search_max_concurrency: int = Field(default=4, ge=1)
+    # 规范化查询结果的进程内缓存秒数（0 关闭）
+    web_search_cache_ttl_seconds: int = Field(default=60, ge=0)
+
     # ========================================================================
     # Agent 执行配置
     # ========================================================================
     agent_max_iterations: int = 20
     agent_max_tokens: int = 100000
     agent_timeout_seconds: int = 600
+    # 对话响应结束后的助手消息批量写入窗口（秒）：窗口内多会话的消息合并为一个事务落库；
+    # 0 = 在请求会话内同步写入并提交
+    chat_message_write_batch_interval_seconds: float = Field(default=0.1, ge=0)
+    # 待写消息所属会话数超阈立即补刷
+    chat_message_write_batch_max_pending: int = Field(default=64, ge=1)
 
     # Human-in-the-Loop 配置
     hitl_enabled: bool = True
@@ -307,8 +334,18 @@ class Settings(BaseSettings):
     # 检查点配置
     # ========================================================================
     checkpoint_enabled: bool = True
+    # redis：最新检查点存 Redis（跨 worker 恢复），中间步骤写回（write-behind）批量落 PG；
+    # postgres：每步同步写 PG。两者均使用 ``database_checkpoint_pool_*`` 共享连接池。
     checkpoint_storage: Literal["redis", "postgres"] = "redis"
     checkpoint_ttl_days: int = 7
+    # 写回窗口（秒）：窗口内的检查点按线程批量落 PG；0 = 关闭写回，逐步同步落库
+    checkpoint_write_behind_interval_seconds: float = Field(default=1.0, ge=0)
+    # 待落库线程数超阈立即补刷
+    checkpoint_write_behind_max_pending: int = Field(default=200, ge=1)
+    # 追加型 channel（messages 等）存增量，每 N 步一次完整快照；0 = 关闭增量，每步存完整值
+    checkpoint_delta_snapshot_interval: int = Field(default=16, ge=0)
+    # 检查点 blob 的 zstd 压缩级别；0 = 不压缩（历史压缩数据仍可读）
+    checkpoint_zstd_level: int = Field(default=3, ge=0, le=22)
 
     # ========================================================================
     # Token 优化配置
@@ -358,6 +395,8 @@ class Settings(BaseSettings):
     # 监控配置
     # ========================================================================
     metrics_enabled: bool = True
+    # 多 worker 指标聚合：各 worker 向 Redis 发布快照的间隔（秒），/metrics 合并同主机快照
+    metrics_publish_interval_seconds: float = Field(default=15.0, gt=0)
     tracing_enabled: bool = False
     jaeger_endpoint: str | None = None
 
@@ -433,6 +472,19 @@ class Settings(BaseSettings):
     gateway_quota_cooldown_max_seconds: int = Field(default=300, ge=0)
     # 跨进程 cooldown / TPM-RPM 共享 Redis URL（默认复用主 redis）
     gateway_router_redis_url: str | None = None
+    # Router 冷启动快照：全量装配成功后把 Router 构造参数加密写入共享存储，新 worker 启动时
+    # 直接加载（免去全量查库 + 凭据解密），再在后台按重载版本号与 DB 对账；关闭则每次从 DB 装配。
+    gateway_router_snapshot_enabled: bool = True
+    # 快照存储："redis"（多 worker / 多 Pod 共享）或 "file"（单机多 worker，路径见下）
+    gateway_router_snapshot_backend: Literal["redis", "file"] = "redis"
+    gateway_router_snapshot_path: str = "./data/router_snapshot.bin"
+    # 快照版本与当前一致时，年龄超过该值（秒）仍在后台与 DB 对账（覆盖未广播的价目 / 直接改库）
+    gateway_router_snapshot_max_age_seconds: int = Field(default=300, ge=0)
+    # Prompt Cache 亲和选路：同一可缓存前缀 / 会话头优先落到组内同一 deployment
+    # （仅作用于 simple-shuffle / weighted-pick 路由与直连模型；默认关闭）
+    gateway_prompt_cache_affinity_enabled: bool = False
+    # 亲和有界负载系数：首选 deployment 近期分配数超过组平均 × 该系数时顺延到下一个
+    gateway_prompt_cache_affinity_load_factor: float = Field(default=1.25, ge=1.0)
     # 热路径：``resolve_model_or_route`` 进程内 LRU+TTL（管理面写路径会失效）
     gateway_resolve_model_cache_enabled: bool = True
     # 路由即可共享模型：个人路由经 grant 委派发布给团队（关闭时解析与 Router 装配均跳过 grant）
@@ -462,14 +514,44 @@ class Settings(BaseSettings):
     gateway_deferred_task_max_queue: int = Field(default=5000, ge=1)
     # 队列满时 submit 的阻塞等待上限（毫秒）；超时仍满则当场 inline await 执行，保证不丢结算。
     gateway_deferred_task_submit_block_timeout_ms: int = Field(default=500, ge=0)
+    # 延迟结算预写日志：入队前落本地 segment，进程崩溃 / OOM 后由下次启动重放（防预扣泄漏、少记账）
+    gateway_deferred_task_journal_enabled: bool = True
+    # journal 目录：多 worker 共享同一目录（各进程独占 segment）；容器部署应挂载持久卷
+    gateway_deferred_task_journal_dir: str = "./data/deferred_journal"
+    # 每条记录 fsync：默认仅 flush 到页缓存（覆盖进程崩溃）；开启后额外覆盖主机掉电
+    gateway_deferred_task_journal_fsync: bool = False
+    # 用量看板 / 请求日志 / 小时汇总读的副本延迟容忍度（秒）：副本延迟不超过该值时走只读副本；
+    # 0 = 始终读主库。
+    gateway_usage_read_max_staleness_seconds: float = Field(default=15.0, ge=0.0)
     # rollup 任务间隔（秒）
     gateway_rollup_interval_seconds: int = 300
     # 告警检查间隔（秒）
     gateway_alert_interval_seconds: int = 60
+    # 告警 webhook 投递：并发上限 / 单次超时（秒）/ 最大尝试次数 / 指数退避基数（秒）
+    gateway_alert_webhook_concurrency: int = Field(default=8, ge=1)
+    gateway_alert_webhook_timeout_seconds: float = Field(default=10.0, gt=0)
+    gateway_alert_webhook_max_attempts: int = Field(default=3, ge=1)
+    gateway_alert_webhook_retry_backoff_seconds: float = Field(default=0.5, ge=0.0)
     # 月分区维护间隔（秒）
     gateway_partition_interval_seconds: int = 86400
     # 请求明细表按月分区：保留最近 N 天以外的整月分区将自动 DROP；None=不自动删除
     gateway_request_log_retention_days: int | None = 30
+    # 过期分区先归档为 zstd Parquet（每分区一份 manifest），校验通过后才 DETACH + DROP；
+    # 归档月份可经日志列表 ``archived_month`` 只读查询。关闭时行为与此前一致（直接 DROP）
+    gateway_request_log_archive_enabled: bool = False
+    gateway_request_log_archive_backend: Literal["local", "s3"] = "local"
+    gateway_request_log_archive_local_path: str = "./data/archive"
+    gateway_request_log_archive_s3_bucket: str | None = None
+    gateway_request_log_archive_s3_region: str | None = None
+    gateway_request_log_archive_s3_endpoint_url: str | None = None
+    gateway_request_log_archive_s3_access_key: str | None = None
+    gateway_request_log_archive_s3_secret_key: SecretStr | None = None
+    # 对象 key 前缀（同一 bucket 多环境隔离）
+    gateway_request_log_archive_key_prefix: str = "gateway_request_logs"
+    # 单个 Parquet 文件行数上限 / 服务端游标每批拉取行数 / zstd 压缩级别
+    gateway_request_log_archive_rows_per_file: int = Field(default=200_000, ge=1000)
+    gateway_request_log_archive_fetch_size: int = Field(default=5000, ge=100, le=100_000)
+    gateway_request_log_archive_zstd_level: int = Field(default=6, ge=1, le=22)
     # Dashboard/Statistics 读路径：历史段走 gateway_metrics_hourly，热尾走明细表
     gateway_metrics_hybrid_read_enabled: bool = True
     # hybrid 热尾窗口（小时）：与 rollup 延迟对齐，默认 2h
@@ -479,6 +561,14 @@ class Settings(BaseSettings):
     gateway_metrics_repair_interval_seconds: int = 86400
     # 跨热尾边界 statistics 内存合并：冷/热分组数之和超过此值则整窗 fallback 明细表
     gateway_metrics_hybrid_merge_max_groups: int = Field(default=2000, ge=1, le=100_000)
+    # Dashboard 分片（tile）：各聚合分片各自取池化会话并发执行，结果按 (团队, 筛选, 时间段) 缓存
+    gateway_dashboard_tiles_enabled: bool = True
+    # 单个 dashboard 请求内并发执行的分片上限（每片占一个主池连接）
+    gateway_dashboard_tile_concurrency: int = Field(default=4, ge=1, le=32)
+    # 已完成分片（时间段止于 rollup 水位之前）的缓存 TTL；repair 重算后整体失效
+    gateway_dashboard_tile_completed_ttl_seconds: int = Field(default=86400, ge=60)
+    # 未完成分片（含当前小时 / 热尾）的缓存 TTL；键内时间按该粒度取整
+    gateway_dashboard_tile_open_ttl_seconds: int = Field(default=15, ge=1, le=300)
     # 过期分区清理任务间隔（秒）
     gateway_request_log_retention_interval_seconds: int = 86400
     # 成功请求写入明细的采样率 0.0~1.0（1.0=全量）；低于 1 时 ``gateway_metrics_hourly`` 与基于日志的告警可能低估成功量
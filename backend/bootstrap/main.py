@@ -29,7 +29,7 @@ from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from starlette.responses import RedirectResponse
+from starlette.responses import PlainTextResponse, RedirectResponse
 
 from bootstrap.config import settings
 from domains.agent.application.listing_studio_local_image_for_gateway import (
@@ -85,7 +85,11 @@ from libs.api.problem_details import (
     problem_response_from_request_validation,
     problem_response_internal,
 )
-from libs.background_tasks import init_background_tasks, shutdown_app_background_tasks
+from libs.background_tasks import (
+    init_background_tasks,
+    register_app_background_task,
+    shutdown_app_background_tasks,
+)
 from libs.db.database import init_db
 from libs.db.redis import close_redis, init_redis
 from libs.exceptions import (
@@ -104,6 +108,8 @@ from libs.exceptions import (
 )
 from libs.exceptions.codes import INTERNAL_ERROR
 from libs.middleware.permission import PermissionContextASGIMiddleware
+from libs.observability.metrics_store import metrics_publish_loop, render_aggregated_metrics
+from libs.storage.s3_client_pool import close_s3_clients
 from utils.logging import get_logger, setup_logging
 
 # pylint: enable=wrong-import-position
@@ -166,6 +172,11 @@ async def lifespan(_fastapi_app: FastAPI) -> AsyncGenerator[None, None]:  # pyli
         logger.warning("Failed to init upstream httpx client: %s", e)
 
     init_background_tasks(_fastapi_app)
+    if settings.metrics_enabled:
+        register_app_background_task(
+            _fastapi_app,
+            asyncio.create_task(metrics_publish_loop(settings.metrics_publish_interval_seconds)),
+        )
 
     async with agent_streamable_http_lifespan():
         yield
@@ -189,6 +200,7 @@ async def lifespan(_fastapi_app: FastAPI) -> AsyncGenerator[None, None]:  # pyli
         logger.warning("Error closing LiteLLM async clients: %s", e)
 
     await close_redis()
+    await close_s3_clients()
 
     # 关闭上游直连 httpx client（先尽量等待活跃请求完成）
     try:
@@ -527,6 +539,17 @@ async def health() -> dict[str, str]:
     return {"status": "healthy"}
 
 
+if settings.metrics_enabled:
+
+    @app.get(service_path("metrics"), include_in_schema=False)
+    async def prometheus_metrics() -> PlainTextResponse:
+        """Prometheus 抓取端点（同主机各 worker 指标经 Redis 合并）"""
+        return PlainTextResponse(
+            await render_aggregated_metrics(),
+            media_type="text/plain; version=0.0.4; charset=utf-8",
+        )
+
+
 # Docker 本地探针：ROOT_PATH 非空时保留根级 /health
 if settings.root_path.strip("/"):
 
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
@@ -13,6 +14,7 @@ if TYPE_CHECKING:
 import uuid
 
 from bootstrap.config import settings
+from domains.agent.application.chat_message_writer import get_chat_message_writer
 from domains.agent.domain.sandbox_runtime_policy import (
     should_pre_create_persistent_sandbox,
     wants_persistent_docker_sandbox,
@@ -40,21 +42,25 @@ if TYPE_CHECKING:
 logger = get_logger(__name__)
 
 
+@dataclass(frozen=True)
+class ResolvedAgentEngineConfig:
+    """本轮解析出的 Agent 配置、执行配置与对话模型。"""
+
+    agent_config: AgentConfig
+    execution_config: Any
+    model: str
+
+
 class ChatAgentRunMixin:
     """Agent 对话执行：引擎准备、事件队列执行、沙箱与 MCP 工具加载。"""
 
-    async def _prepare_agent_engine(
+    async def _resolve_agent_engine_config(
         self: ChatUseCase,
         agent_id: str | None,
-        session_id: str,
-        user_id: str,
         session: object,
         request_model_ref: str | None,
-        *,
-        request_temperature: float | None = None,
-        thinking_enabled: bool | None = None,
-    ) -> tuple[LangGraphAgentEngine, AgentEvent | None, str | None]:
-        """准备 Agent 引擎"""
+    ) -> ResolvedAgentEngineConfig:
+        """解析本轮 Agent 配置与对话模型（仅 DB 读取，属于本轮前置工作单元）"""
         billing = await self._resolve_billing_context()
         allowed = await self._requestable_text_model_ids(billing)
         picked = await self._pick_chat_model_ref(request_model_ref, session, agent_id, billing)
@@ -98,8 +104,23 @@ class ChatAgentRunMixin:
         agent_config = agent_config.model_copy(update={"model": resolved.model})
 
         execution_config = self.config_service.load_for_agent(agent_id=agent_id or "default")
-        await self._commit_before_external_wait()
+        return ResolvedAgentEngineConfig(
+            agent_config=agent_config,
+            execution_config=execution_config,
+            model=resolved.model,
+        )
 
+    async def _build_agent_engine(
+        self: ChatUseCase,
+        resolved: ResolvedAgentEngineConfig,
+        session_id: str,
+        user_id: str,
+        *,
+        request_temperature: float | None = None,
+        thinking_enabled: bool | None = None,
+    ) -> tuple[LangGraphAgentEngine, AgentEvent | None]:
+        """构建 Agent 引擎（沙箱预创建、MCP 工具加载；须在本轮前置事务提交后调用）"""
+        execution_config = resolved.execution_config
         session_recreated_event = None
         if should_pre_create_persistent_sandbox(
             execution_config,
@@ -132,7 +153,7 @@ class ChatAgentRunMixin:
             )
 
         engine = LangGraphAgentEngine(
-            config=agent_config,
+            config=resolved.agent_config,
             llm_gateway=self.llm_gateway,
             memory_store=self.memory_store,
             tool_registry=configured_tool_registry,
@@ -141,7 +162,7 @@ class ChatAgentRunMixin:
             invocation_overrides=invocation_overrides,
         )
 
-        return engine, session_recreated_event, resolved.model
+        return engine, session_recreated_event
 
     async def _execute_agent_with_event_queue(
         self: ChatUseCase,
@@ -258,15 +279,28 @@ class ChatAgentRunMixin:
         metadata: dict[str, object] | None = None,
         token_count: int | None = None,
     ) -> None:
-        """保存助手消息并提取记忆"""
-        await self.session_use_case.add_message(
-            session_id=session_id,
-            role=MessageRole.ASSISTANT,
-            content=final_content,
-            metadata=metadata,
-            token_count=token_count,
-        )
-        await self.db.commit()
+        """保存助手消息并提取记忆
+
+        默认经 ``ChatMessageWriter`` 按窗口批量落库（不占用本请求的事务与连接）；
+        ``chat_message_write_batch_interval_seconds=0`` 时在请求会话内同步写入并提交。
+        """
+        if float(settings.chat_message_write_batch_interval_seconds) > 0:
+            get_chat_message_writer(self._session_use_case_factory).enqueue(
+                session_id,
+                role=MessageRole.ASSISTANT.value,
+                content=final_content,
+                metadata=metadata,
+                token_count=token_count,
+            )
+        else:
+            await self.session_use_case.add_message(
+                session_id=session_id,
+                role=MessageRole.ASSISTANT,
+                content=final_content,
+                metadata=metadata,
+                token_count=token_count,
+            )
+            await self.db.commit()
 
         if self.simplemem and session:
             conversation_messages = [
@@ -0,0 +1,155 @@
+"""对话助手消息批量写入：响应结束后的落库合并为按窗口的批量事务。
+
+每轮对话结束都要写一条助手消息并累加会话计数，原先在请求会话内 ``INSERT`` + ``UPDATE`` +
+``COMMIT``（一次 WAL 刷盘 + 连接池往返），SSE 流要等它结束才能关闭。本模块改为：
+
+- 入队时固定 ``created_at``（消息顺序以入队时刻为准，与下一轮用户消息的先后不受落库延迟影响）；
+- 由通用 ``CoalescingFlusher`` 按会话合并，窗口内全部会话的消息在一个后台事务里多行 ``INSERT``
+  + 每会话一条计数 ``UPDATE`` 后提交；失败整体回滚后逐会话拆开重刷，失败会话按指数退避重试，
+  连续失败 ``_MAX_FLUSH_ATTEMPTS`` 次后逐条写入、记录并丢弃仍失败的消息（坏数据不阻塞其他会话）；
+- 关停时 :func:`shutdown_chat_message_writer` 取消 flusher（其 ``finally`` 排空）。
+
+``chat_message_write_batch_interval_seconds=0`` 时调用方在请求会话内同步写入（安全降级）。
+会话访问权限已由本轮请求校验，批量写入不再做租户过滤。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, Any
+import uuid
+
+from bootstrap.config import settings
+from domains.agent.domain.interfaces.message_repository import NewMessage
+from libs.concurrency import CoalescingFlusher
+from libs.db.database import get_session_context, prefer_background_pool
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from domains.session.application.ports import SessionApplicationPort
+
+logger = get_logger(__name__)
+
+_MAX_FLUSH_ATTEMPTS = 5
+_RETRY_BACKOFF_SECONDS = 1.0
+
+
+class ChatMessageWriter:
+    """按窗口批量落库的对话消息写入器（进程内单例，见 :func:`get_chat_message_writer`）。"""
+
+    def __init__(
+        self,
+        session_use_case_factory: Callable[[AsyncSession], SessionApplicationPort],
+        *,
+        interval_seconds: Callable[[], float],
+        max_pending: Callable[[], int],
+        max_attempts: int = _MAX_FLUSH_ATTEMPTS,
+        retry_backoff_seconds: float = _RETRY_BACKOFF_SECONDS,
+    ) -> None:
+        self._session_use_case_factory = session_use_case_factory
+        self._tasks: set[asyncio.Task[Any]] = set()
+        self._flusher: CoalescingFlusher[uuid.UUID, list[NewMessage]] = CoalescingFlusher(
+            name="chat-messages",
+            merge=lambda older, newer: [*older, *newer],
+            flush=self._flush_batch,
+            interval_seconds=interval_seconds,
+            max_pending=max_pending,
+            register_task=self._register_task,
+            max_attempts=max_attempts,
+            retry_backoff_seconds=retry_backoff_seconds,
+            on_give_up=self._write_one_by_one,
+        )
+
+    def _register_task(self, task: asyncio.Task[Any]) -> None:
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def enqueue(
+        self,
+        session_id: str,
+        *,
+        role: str,
+        content: str | None,
+        metadata: dict[str, Any] | None = None,
+        token_count: int | None = None,
+    ) -> None:
+        """登记一条待写消息（不阻塞调用方）。"""
+        session_uuid = uuid.UUID(session_id)
+        message = NewMessage(
+            session_id=session_uuid,
+            role=role,
+            content=content,
+            metadata=metadata,
+            token_count=token_count,
+            created_at=datetime.now(UTC),
+        )
+        self._flusher.add(session_uuid, [message])
+
+    async def _append(self, messages: list[NewMessage]) -> None:
+        with prefer_background_pool():
+            async with get_session_context() as db:
+                await self._session_use_case_factory(db).append_messages(messages)
+
+    async def _flush_batch(self, entries: list[tuple[uuid.UUID, list[NewMessage]]]) -> None:
+        messages = [m for _sid, batch in entries for m in batch]
+        await self._append(messages)
+        logger.debug("Flushed %d chat messages for %d sessions", len(messages), len(entries))
+
+    async def _write_one_by_one(self, session_id: uuid.UUID, messages: list[NewMessage]) -> None:
+        """会话重试耗尽：逐条各自事务写入，仍失败的消息记录后丢弃。"""
+        for message in messages:
+            try:
+                await self._append([message])
+            except Exception:
+                logger.exception(
+                    "Dropping chat message session_id=%s role=%s created_at=%s",
+                    session_id,
+                    message.role,
+                    message.created_at,
+                )
+
+    async def flush_now(self) -> None:
+        """立即落库全部待写消息并等待完成。"""
+        await self._flusher.flush_now()
+
+    async def aclose(self) -> None:
+        """取消 flusher 与一次性刷写任务（flusher 的 ``finally`` 排空），再兜底刷写一次。"""
+        pending = [t for t in self._tasks if not t.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await self.flush_now()
+
+
+_writer: ChatMessageWriter | None = None
+
+
+def get_chat_message_writer(
+    session_use_case_factory: Callable[[AsyncSession], SessionApplicationPort],
+) -> ChatMessageWriter:
+    """进程内单例；首个调用方的会话用例工厂即组合根注入的工厂。"""
+    global _writer
+    if _writer is None:
+        _writer = ChatMessageWriter(
+            session_use_case_factory,
+            interval_seconds=lambda: float(settings.chat_message_write_batch_interval_seconds),
+            max_pending=lambda: int(settings.chat_message_write_batch_max_pending),
+        )
+    return _writer
+
+
+async def shutdown_chat_message_writer() -> None:
+    """关停时排空待写消息。"""
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        await writer.aclose()
+
+
+__all__ = ["ChatMessageWriter", "get_chat_message_writer", "shutdown_chat_message_writer"]
@@ -7,11 +7,15 @@ Chat Use Case - 对话用例
 from __future__ import annotations
 
 import asyncio
+import time
 from typing import TYPE_CHECKING, Any
 
 from bootstrap.config import settings
 from domains.agent.application.agent_use_case import AgentUseCase
-from domains.agent.application.chat_agent_run import ChatAgentRunMixin
+from domains.agent.application.chat_agent_run import (
+    ChatAgentRunMixin,
+    ResolvedAgentEngineConfig,
+)
 from domains.agent.application.chat_engine import LangGraphAgentEngine
 from domains.agent.application.chat_image_gen import ChatImageGenMixin
 from domains.agent.application.chat_model_resolution_use_case import ChatModelResolutionUseCase
@@ -40,6 +44,7 @@ from domains.gateway.application.bridge.gateway_internal_log_context import (
 from libs.config import get_execution_config_service
 from libs.db.database import get_session_context
 from libs.exceptions import NotFoundError, ValidationError
+from libs.observability.metrics import get_metrics_collector
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -54,7 +59,13 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
-_CHAT_MODEL_REF_PENDING = object()
+_TURN_START_METRIC = "chat_turn_start_db_ms"
+
+_metrics = get_metrics_collector()
+_metrics.describe(
+    _TURN_START_METRIC,
+    "Chat turn pre-LLM unit of work (session, user message, model resolution, one commit) in ms",
+)
 
 # Re-export for tests that patch ``chat_use_case.LangGraphAgentEngine`` / ``get_session_context``.
 __all__ = ["ChatUseCase", "LangGraphAgentEngine", "get_session_context"]
@@ -167,25 +178,51 @@ class ChatUseCase(ChatImageGenMixin, ChatAgentRunMixin):
 
         ref_urls = self._normalize_reference_image_urls(reference_image_urls or [])
 
+        # 本轮前置工作单元：会话、用户消息、MCP 配置、模型解析与模型引用在同一事务内，
+        # 首 token 前只提交一次（见 _commit_turn_start）
+        turn_started = time.perf_counter()
         session, session_id, is_new_session = await self._get_or_create_session(
             session_id, user_id, agent_id
         )
+        prior_message_count = int(getattr(session, "message_count", 0) or 0)
 
-        user_metadata = self._build_user_message_metadata(mode, ref_urls)
-
-        if is_new_session:
-            await self.session_use_case.add_message(
-                session_id=session_id,
-                role=MessageRole.USER,
-                content=message,
-                metadata=user_metadata,
+        await self.session_use_case.add_message(
+            session_id=session_id,
+            role=MessageRole.USER,
+            content=message,
+            metadata=self._build_user_message_metadata(mode, ref_urls),
+        )
+        if is_new_session and mcp_config and mcp_config.get("enabled_servers"):
+            await self.session_use_case.update_session_mcp_config(
+                session_id, mcp_config["enabled_servers"], flush=False
             )
-            await self.db.commit()
-            if mcp_config and mcp_config.get("enabled_servers"):
-                await self.session_use_case.update_session_mcp_config(
-                    session_id, mcp_config["enabled_servers"]
+
+        human_multimodal: list[dict[str, Any]] | None = None
+        resolved_engine_config: ResolvedAgentEngineConfig | None = None
+        turn_error: str | None = None
+        if mode == "chat":
+            try:
+                if ref_urls:
+                    human_multimodal = await self._build_vision_user_content(
+                        message=message,
+                        reference_image_urls=ref_urls,
+                        request_model_ref=model_ref,
+                        session=session,
+                        agent_id=agent_id,
+                    )
+                resolved_engine_config = await self._resolve_agent_engine_config(
+                    agent_id, session, model_ref
                 )
+                await self._persist_picked_chat_model_ref(session_id, resolved_engine_config.model)
+            except ValidationError as e:
+                turn_error = e.message
+
+        await self._commit_turn_start(turn_started)
+        if is_new_session:
             yield AgentEvent.session_created(session_id)
+        if turn_error is not None:
+            yield AgentEvent.error(error=turn_error, session_id=session_id)
+            return
 
         event_queue: asyncio.Queue[AgentEvent | None] = asyncio.Queue()
         self._event_queues[session_id] = event_queue
@@ -203,19 +240,11 @@ class ChatUseCase(ChatImageGenMixin, ChatAgentRunMixin):
         if log_override is not None:
             log_token = set_internal_store_full_override(log_override)
 
-        picked_chat_model_for_persist: object = _CHAT_MODEL_REF_PENDING
-
         try:
-            await self._handle_title_generation(session, session_id, message, user_id)
-
-            if not is_new_session:
-                await self.session_use_case.add_message(
-                    session_id=session_id,
-                    role=MessageRole.USER,
-                    content=message,
-                    metadata=user_metadata,
-                )
-                await self.db.commit()
+            # 标题生成走独立 DB 会话，须在本轮事务提交（会话与首条消息可见）之后排程
+            self._handle_title_generation(
+                session, session_id, message, user_id, prior_message_count
+            )
 
             if mode == "image_gen":
                 async for evt in self._run_image_gen_mode(
@@ -230,40 +259,14 @@ class ChatUseCase(ChatImageGenMixin, ChatAgentRunMixin):
                     yield evt
                 return
 
-            human_multimodal: list[dict[str, Any]] | None = None
-            if mode == "chat" and ref_urls:
-                try:
-                    human_multimodal = await self._build_vision_user_content(
-                        message=message,
-                        reference_image_urls=ref_urls,
-                        request_model_ref=model_ref,
-                        session=session,
-                        agent_id=agent_id,
-                    )
-                except ValidationError as e:
-                    yield AgentEvent.error(error=e.message, session_id=session_id)
-                    return
-
-            try:
-                (
-                    engine,
-                    session_recreated_event,
-                    picked_chat_model_for_persist,
-                ) = await self._prepare_agent_engine(
-                    agent_id,
-                    session_id,
-                    user_id,
-                    session,
-                    model_ref,
-                    request_temperature=temperature,
-                    thinking_enabled=thinking_enabled,
-                )
-            except ValidationError as e:
-                yield AgentEvent.error(error=e.message, session_id=session_id)
-                return
-
-            await self._persist_picked_chat_model_ref(session_id, picked_chat_model_for_persist)
-            await self._commit_before_external_wait()
+            assert resolved_engine_config is not None
+            engine, session_recreated_event = await self._build_agent_engine(
+                resolved_engine_config,
+                session_id,
+                user_id,
+                request_temperature=temperature,
+                thinking_enabled=thinking_enabled,
+            )
 
             if session_recreated_event:
                 yield session_recreated_event
@@ -322,26 +325,27 @@ class ChatUseCase(ChatImageGenMixin, ChatAgentRunMixin):
         except Exception:
             raise NotFoundError("Session", session_id or "") from None
 
-        resolved_session_id = str(session.id)
-        if is_new:
-            await self.db.flush()
-            await self.db.refresh(session)
-            await self.db.commit()
-        return session, resolved_session_id, is_new
+        # 新会话已由仓储 flush（主键与默认值均在 Python 侧生成），随本轮前置事务一并提交
+        return session, str(session.id), is_new
 
-    async def _handle_title_generation(
+    async def _commit_turn_start(self, started: float) -> None:
+        """提交本轮前置工作单元（首 token 前唯一一次提交）并记录其耗时。"""
+        await self._commit_before_external_wait()
+        _metrics.record_timer(_TURN_START_METRIC, (time.perf_counter() - started) * 1000)
+
+    def _handle_title_generation(
         self,
         session: object | None,
         session_id: str,
         message: str,
         user_id: str,
+        prior_message_count: int,
     ) -> None:
-        """处理标题生成"""
+        """处理标题生成（``prior_message_count`` 为本轮用户消息写入前的会话消息数）"""
         if not session or session.title:
             return
 
-        message_count = await self.session_use_case.count_messages(session_id)
-        if message_count <= 1:
+        if prior_message_count <= 1:
             task = asyncio.create_task(
                 self._generate_title_background(session_id, message, user_id)
             )
@@ -487,25 +491,17 @@ class ChatUseCase(ChatImageGenMixin, ChatAgentRunMixin):
             return str(agent_uuid)
         return None
 
-    async def _persist_picked_chat_model_ref(self, session_id: str, picked: object) -> None:
-        """将本次解析到的对话模型引用写入会话（在流式输出前调用，避免前端 GET 竞态）。"""
-        if picked is _CHAT_MODEL_REF_PENDING:
-            return
-        if not isinstance(picked, str | type(None)):
-            logger.warning(
-                "Unexpected picked_chat_model_for_persist type, skip persist (session %s)",
-                session_id[:8],
-            )
-            return
+    async def _persist_picked_chat_model_ref(self, session_id: str, picked: str | None) -> None:
+        """将本次解析到的对话模型引用写入会话（在流式输出前提交，避免前端 GET 竞态）。"""
         try:
+            # 只改内存中的会话配置，随本轮前置事务一并提交（不单独 flush / 回滚，
+            # 回滚会连同本轮会话与用户消息一起丢弃）
             await self.session_use_case.update_session_chat_model_ref(
                 session_id,
                 picked,
                 flush=False,
             )
-            await self.db.flush()
         except Exception:
-            await self.db.rollback()
             logger.warning(
                 "Failed to persist chat_model_ref for session %s",
                 session_id[:8],
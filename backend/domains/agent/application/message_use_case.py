@@ -7,11 +7,12 @@ from typing import TYPE_CHECKING, Any
 from domains.agent.infrastructure.repositories.message_repository import MessageRepository
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     from uuid import UUID
 
     from sqlalchemy.ext.asyncio import AsyncSession
 
-    from domains.agent.domain.interfaces.message_repository import MessageEntity
+    from domains.agent.domain.interfaces.message_repository import MessageEntity, NewMessage
 
 
 class MessageUseCase:
@@ -45,6 +46,9 @@ class MessageUseCase:
             token_count=token_count,
         )
 
+    async def create_many(self, messages: Sequence[NewMessage]) -> None:
+        await self._repo.create_many(messages)
+
     async def find_by_session(
         self,
         session_id: UUID,
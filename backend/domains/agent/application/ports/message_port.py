@@ -5,9 +5,10 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Protocol
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     import uuid
 
-    from domains.agent.domain.interfaces.message_repository import MessageEntity
+    from domains.agent.domain.interfaces.message_repository import MessageEntity, NewMessage
 
 
 class MessageApplicationPort(Protocol):
@@ -26,6 +27,10 @@ class MessageApplicationPort(Protocol):
         """创建消息"""
         ...
 
+    async def create_many(self, messages: Sequence[NewMessage]) -> None:
+        """批量创建消息"""
+        ...
+
     async def find_by_session(
         self,
         session_id: uuid.UUID,
@@ -10,12 +10,14 @@ from fastapi import FastAPI  # noqa: TC002
 if TYPE_CHECKING:
     from collections.abc import AsyncGenerator
 
+from bootstrap.config import settings
 from domains.agent.domain.sandbox_runtime_policy import wants_persistent_docker_sandbox
 from domains.agent.infrastructure.engine.langgraph_checkpointer import LangGraphCheckpointer
 from domains.agent.infrastructure.sandbox import SandboxManager, SandboxPolicy
 from domains.agent.infrastructure.sandbox.docker_availability import docker_cli_available
+from domains.agent.infrastructure.tools.web_search_client import close_web_search_clients
 from libs.config import get_execution_config_service
-from libs.db.database import get_session_factory
+from libs.db.database import close_checkpoint_pool, get_session_factory
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -24,7 +26,7 @@ logger = get_logger(__name__)
 async def run_agent_startup(app: FastAPI) -> None:
     """Checkpointer, sandbox manager, and default MCP servers."""
     try:
-        global_checkpointer = LangGraphCheckpointer(storage_type="postgres")
+        global_checkpointer = LangGraphCheckpointer(storage_type=settings.checkpoint_storage)
         await global_checkpointer.setup()
         app.state.checkpointer = global_checkpointer
         logger.info("Global checkpointer initialized and setup completed")
@@ -84,7 +86,14 @@ async def run_agent_startup(app: FastAPI) -> None:
 
 
 async def run_agent_shutdown(app: FastAPI) -> None:
-    """Sandbox manager and checkpointer teardown."""
+    """Web search clients, sandbox manager and checkpointer teardown."""
+    from domains.agent.application.chat_message_writer import shutdown_chat_message_writer
+
+    # 待写的助手消息先落库（依赖 DB 连接池，须在关池前）
+    await shutdown_chat_message_writer()
+
+    await close_web_search_clients()
+
     if hasattr(app.state, "sandbox_manager"):
         await app.state.sandbox_manager.stop()
         logger.info("SandboxManager stopped")
@@ -94,6 +103,8 @@ async def run_agent_shutdown(app: FastAPI) -> None:
             await app.state.checkpointer.cleanup()
         except Exception as e:
             logger.warning("Error cleaning up checkpointer: %s", e)
+    # 写回排空后再关池
+    await close_checkpoint_pool()
 
 
 @asynccontextmanager
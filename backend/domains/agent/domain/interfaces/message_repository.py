@@ -5,6 +5,9 @@ Message Repository Interface - 消息仓储接口
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
+from dataclasses import dataclass
+from datetime import datetime
 from typing import Any, Protocol
 import uuid
 
@@ -22,6 +25,18 @@ class MessageEntity(Protocol):
     token_count: int | None
 
 
+@dataclass(frozen=True)
+class NewMessage:
+    """批量写入的一条消息（``created_at`` 取入队时刻，批量延后落库时消息顺序不变）。"""
+
+    session_id: uuid.UUID
+    role: str
+    content: str | None = None
+    metadata: dict[str, Any] | None = None
+    token_count: int | None = None
+    created_at: datetime | None = None
+
+
 class MessageRepository(ABC):
     """消息仓储接口"""
 
@@ -52,6 +67,15 @@ class MessageRepository(ABC):
         """
         ...
 
+    @abstractmethod
+    async def create_many(self, messages: Sequence[NewMessage]) -> None:
+        """批量创建消息（一次 flush，多行 INSERT）
+
+        Args:
+            messages: 待写入消息
+        """
+        ...
+
     @abstractmethod
     async def find_by_session(
         self,
@@ -63,6 +63,7 @@ class EventType(str, Enum):
     TEXT = "text"
     TOOL_CALL = "tool_call"
     TOOL_RESULT = "tool_result"
+    TOOL_PROGRESS = "tool_progress"
     INTERRUPT = "interrupt"
     DONE = "done"
     ERROR = "error"
@@ -146,6 +147,17 @@ class ToolResultEventData(BaseModel):
     duration_ms: int | None = None
 
 
+class ToolProgressEventData(BaseModel):
+    """工具进度事件数据（如沙箱执行的 stdout/stderr 分块）"""
+
+    model_config = ConfigDict(frozen=True)
+
+    tool_call_id: str
+    tool_name: str
+    stream: str
+    content: str
+
+
 class SessionEventData(BaseModel):
     """会话事件数据"""
 
@@ -293,6 +305,17 @@ class AgentEvent(BaseModel):
             ).model_dump(),
         )
 
+    @classmethod
+    def tool_progress(
+        cls, tool_call_id: str, tool_name: str, stream: str, content: str
+    ) -> AgentEvent:
+        return cls(
+            type=EventType.TOOL_PROGRESS,
+            data=ToolProgressEventData(
+                tool_call_id=tool_call_id, tool_name=tool_name, stream=stream, content=content
+            ).model_dump(),
+        )
+
     # 数据访问方法
     def get_final_message(self) -> FinalMessage | None:
         if self.type != EventType.DONE:
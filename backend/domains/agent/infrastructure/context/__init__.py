@@ -39,6 +39,7 @@ from domains.agent.infrastructure.context.smart_manager import (
     SmartContextManager,
     get_smart_context_manager,
 )
+from domains.agent.infrastructure.context.text_analysis import TextAnalyzer, get_text_analyzer
 
 __all__ = [
     "CompressionConfig",
@@ -59,6 +60,8 @@ __all__ = [
     "TaskPlan",
     "TaskStatus",
     "TaskType",
+    "TextAnalyzer",
     "get_key_detector",
     "get_smart_context_manager",
+    "get_text_analyzer",
 ]
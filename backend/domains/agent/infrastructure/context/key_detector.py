@@ -13,13 +13,13 @@ Key Message Detector - 关键消息检测器
 
 from dataclasses import dataclass, field
 from enum import Enum
-import re
 from typing import Any
 
 from domains.agent.domain.types import (
     Message,
     MessageRole,
 )
+from domains.agent.infrastructure.context.text_analysis import TextFeatures, get_text_analyzer
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -182,6 +182,15 @@ class KeyMessageDetector:
 
     def __init__(self, config: KeyMessageDetectorConfig | None = None) -> None:
         self.config = config or KeyMessageDetectorConfig()
+        # 关键词与消息内容同样按小写匹配
+        self._analyzer = get_text_analyzer(
+            {
+                "key.task": [k.lower() for k in self.config.task_keywords],
+                "key.constraint": [k.lower() for k in self.config.constraint_keywords],
+                "key.decision": [k.lower() for k in self.config.decision_keywords],
+                "key.code": [k.lower() for k in self.config.code_keywords],
+            }
+        )
 
     def detect(
         self,
@@ -208,14 +217,19 @@ class KeyMessageDetector:
 
         content = message.content or ""
         content_lower = content.lower()
+        features = self._analyzer.features(message).text
 
         # 执行各项检测
         confidence += self._detect_position(message, index, types, reasons)
-        confidence += self._detect_task_keywords(message, content_lower, types, reasons)
-        confidence += self._detect_constraints_preferences(content, content_lower, types, reasons)
-        confidence += self._detect_decision_points(message, content_lower, types, reasons)
-        confidence += self._detect_code_context(context, content, content_lower, types, reasons)
-        confidence += self._detect_content_features(content, reasons)
+        confidence += self._detect_task_keywords(message, features, types, reasons)
+        confidence += self._detect_constraints_preferences(
+            content, content_lower, features, types, reasons
+        )
+        confidence += self._detect_decision_points(message, features, types, reasons)
+        confidence += self._detect_code_context(
+            context, content, content_lower, features, types, reasons
+        )
+        confidence += self._detect_content_features(features, reasons)
 
         # 长度惩罚
         if len(content) < self.config.min_content_length:
@@ -256,12 +270,14 @@ class KeyMessageDetector:
     def _detect_task_keywords(
         self,
         message: Message,
-        content_lower: str,
+        features: TextFeatures,
         types: list[KeyMessageType],
         reasons: list[str],
     ) -> float:
         """检测任务定义关键词"""
-        task_matches = self._count_keyword_matches(content_lower, self.config.task_keywords)
+        task_matches = self._count_keyword_matches(
+            features.hits("key.task"), self.config.task_keywords
+        )
         if task_matches > 0 and message.role == MessageRole.USER:
             types.append(KeyMessageType.TASK_DEFINITION)
             reasons.append(f"包含任务关键词（{task_matches} 个）")
@@ -272,12 +288,13 @@ class KeyMessageDetector:
         self,
         content: str,
         content_lower: str,
+        features: TextFeatures,
         types: list[KeyMessageType],
         reasons: list[str],
     ) -> float:
         """检测约束/偏好"""
         constraint_matches = self._count_keyword_matches(
-            content_lower, self.config.constraint_keywords
+            features.hits("key.constraint"), self.config.constraint_keywords
         )
         if constraint_matches > 0:
             if "不" in content or "必须" in content or "don't" in content_lower:
@@ -292,12 +309,14 @@ class KeyMessageDetector:
     def _detect_decision_points(
         self,
         message: Message,
-        content_lower: str,
+        features: TextFeatures,
         types: list[KeyMessageType],
         reasons: list[str],
     ) -> float:
         """检测决策点"""
-        decision_matches = self._count_keyword_matches(content_lower, self.config.decision_keywords)
+        decision_matches = self._count_keyword_matches(
+            features.hits("key.decision"), self.config.decision_keywords
+        )
         if decision_matches > 0 and message.role == MessageRole.ASSISTANT:
             types.append(KeyMessageType.DECISION_POINT)
             reasons.append("包含决策/结论")
@@ -309,6 +328,7 @@ class KeyMessageDetector:
         context: dict[str, Any] | None,
         content: str,
         content_lower: str,
+        features: TextFeatures,
         types: list[KeyMessageType],
         reasons: list[str],
     ) -> float:
@@ -316,7 +336,9 @@ class KeyMessageDetector:
         if not context or context.get("task_type") != "code":
             return 0.0
 
-        code_matches = self._count_keyword_matches(content_lower, self.config.code_keywords)
+        code_matches = self._count_keyword_matches(
+            features.hits("key.code"), self.config.code_keywords
+        )
         if code_matches == 0:
             return 0.0
 
@@ -333,24 +355,20 @@ class KeyMessageDetector:
 
         return min(0.2, code_matches * 0.05)
 
-    def _detect_content_features(self, content: str, reasons: list[str]) -> float:
+    def _detect_content_features(self, features: TextFeatures, reasons: list[str]) -> float:
         """检测内容特征（代码块、列表等）"""
         score = 0.0
-        if "```" in content:
+        if features.has_code_block:
             score += 0.15
             reasons.append("包含代码块")
-        if re.search(r"^\s*[-*\d]+[.)]\s", content, re.MULTILINE):
+        if features.has_list:
             score += 0.1
             reasons.append("包含列表")
         return score
 
-    def _count_keyword_matches(self, content: str, keywords: list[str]) -> int:
-        """计算关键词匹配数"""
-        count = 0
-        for keyword in keywords:
-            if keyword.lower() in content:
-                count += 1
-        return count
+    def _count_keyword_matches(self, hits: frozenset[str], keywords: list[str]) -> int:
+        """计算关键词匹配数（命中集合来自自动机单次扫描；列表内重复的关键词按原逻辑重复计数）"""
+        return sum(1 for keyword in keywords if keyword.lower() in hits)
 
     def detect_batch(
         self,
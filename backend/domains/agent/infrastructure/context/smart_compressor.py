@@ -23,17 +23,19 @@ Smart Context Compressor - 智能上下文压缩器
 
 from dataclasses import dataclass, field
 from enum import Enum
-import re
 from typing import TYPE_CHECKING, Any
 
 from domains.agent.domain.types import (
     Message,
     MessageRole,
 )
-from domains.agent.infrastructure.llm.message_formatter import (
-    estimate_message_tokens,
-    format_tool_calls,
+from domains.agent.infrastructure.context.text_analysis import (
+    MinHashLSH,
+    TextFeatures,
+    get_text_analyzer,
+    jaccard,
 )
+from domains.agent.infrastructure.llm.message_formatter import format_tool_calls
 from utils.logging import get_logger
 from utils.tokens import count_tokens
 
@@ -168,6 +170,13 @@ class SmartContextCompressor:
         self.llm_gateway = llm_gateway
         self.config = config or CompressionConfig()
         self._summary_cache: dict[str, str] = {}  # 摘要缓存
+        # 消息特征（Token、关键词命中、词集合）按消息缓存，历史消息跨轮复用
+        self._analyzer = get_text_analyzer(
+            {
+                "compress.critical": self.config.critical_keywords,
+                "compress.high": self.config.high_importance_keywords,
+            }
+        )
 
     async def compress(
         self,
@@ -271,13 +280,18 @@ class SmartContextCompressor:
         """
         scored = []
         total = len(messages)
+        memory_index = (
+            self._build_memory_index(recalled_memories)
+            if recalled_memories and self.config.enable_memory_dedup
+            else None
+        )
 
         for i, msg in enumerate(messages):
             importance, score, reasons = self._calculate_importance(msg, i, total)
 
             # SimpleMem 协同：如果消息内容与召回记忆高度重叠，降低优先级
-            if recalled_memories and self.config.enable_memory_dedup and msg.content:
-                overlap = self._calculate_memory_overlap(msg.content, recalled_memories)
+            if memory_index is not None and msg.content:
+                overlap = self._memory_overlap(self._analyzer.features(msg).text, memory_index)
                 if overlap > 0.5:  # 超过 50% 重叠
                     penalty = self.config.memory_overlap_penalty * overlap
                     score -= penalty
@@ -304,6 +318,31 @@ class SmartContextCompressor:
 
         return scored
 
+    def _build_memory_index(self, memories: list[str]) -> tuple[MinHashLSH, list[TextFeatures]]:
+        """召回记忆按 MinHash 签名入 LSH 桶"""
+        lsh = MinHashLSH()
+        features: list[TextFeatures] = []
+        for memory in memories:
+            mem = self._analyzer.text_features(memory)
+            if not mem.words:
+                continue
+            lsh.insert(len(features), mem.signature)
+            features.append(mem)
+        return lsh, features
+
+    @staticmethod
+    def _memory_overlap(
+        content: TextFeatures, memory_index: tuple[MinHashLSH, list[TextFeatures]]
+    ) -> float:
+        """与同桶候选记忆的最高 Jaccard（太短的内容不做去重）"""
+        if len(content.words) < 3:
+            return 0.0
+        lsh, memories = memory_index
+        return max(
+            (jaccard(content.words, memories[i].words) for i in lsh.query(content.signature)),
+            default=0.0,
+        )
+
     def _calculate_memory_overlap(
         self,
         content: str,
@@ -312,8 +351,8 @@ class SmartContextCompressor:
         """
         计算消息内容与记忆的重叠度
 
-        使用简单的词袋模型计算 Jaccard 相似度。
-        如果需要更精确，可以使用向量相似度，但会增加计算成本。
+        使用词袋模型的 Jaccard 相似度；候选记忆由 MinHash LSH 分桶筛出，
+        不再逐对比较。如果需要更精确，可以使用向量相似度，但会增加计算成本。
 
         Args:
             content: 消息内容
@@ -324,26 +363,9 @@ class SmartContextCompressor:
         """
         if not content or not memories:
             return 0.0
-
-        # 简化处理：使用词袋模型
-        content_words = set(content.lower().split())
-        if len(content_words) < 3:  # 太短的内容不做去重
-            return 0.0
-
-        max_overlap = 0.0
-        for memory in memories:
-            memory_words = set(memory.lower().split())
-            if not memory_words:
-                continue
-
-            # Jaccard 相似度
-            intersection = len(content_words & memory_words)
-            union = len(content_words | memory_words)
-            if union > 0:
-                overlap = intersection / union
-                max_overlap = max(max_overlap, overlap)
-
-        return max_overlap
+        return self._memory_overlap(
+            self._analyzer.text_features(content), self._build_memory_index(memories)
+        )
 
     def _calculate_importance(
         self, message: Message, index: int, total: int
@@ -357,16 +379,16 @@ class SmartContextCompressor:
         score = 0.0
         reasons = []
         content = message.content or ""
-        content_lower = content.lower()
+        features = self._analyzer.features(message).text
 
         # 1. 位置权重
         score += self._calculate_position_score(index, total, reasons)
         # 2. 角色和工具权重
         score += self._calculate_role_and_tool_score(message, reasons)
         # 3. 关键词匹配
-        score += self._calculate_keyword_score(content_lower, reasons)
+        score += self._calculate_keyword_score(features, reasons)
         # 4. 内容特征
-        score += self._calculate_content_features_score(content, reasons)
+        score += self._calculate_content_features_score(content, features, reasons)
         # 5. 长度调整
         score += self._calculate_length_score(content, reasons)
         # 6. 确定重要性等级
@@ -401,28 +423,32 @@ class SmartContextCompressor:
             reasons.append("工具执行结果")
         return score
 
-    def _calculate_keyword_score(self, content_lower: str, reasons: list[str]) -> float:
-        """计算关键词匹配分数"""
+    def _calculate_keyword_score(self, features: TextFeatures, reasons: list[str]) -> float:
+        """计算关键词匹配分数（每组按配置顺序取第一个命中词）"""
         score = 0.0
+        critical = features.hits("compress.critical")
         for keyword in self.config.critical_keywords:
-            if keyword in content_lower:
+            if keyword in critical:
                 score += 15
                 reasons.append(f"关键词:{keyword}")
                 break
+        high = features.hits("compress.high")
         for keyword in self.config.high_importance_keywords:
-            if keyword in content_lower:
+            if keyword in high:
                 score += 8
                 reasons.append(f"重要词:{keyword}")
                 break
         return score
 
-    def _calculate_content_features_score(self, content: str, reasons: list[str]) -> float:
+    def _calculate_content_features_score(
+        self, content: str, features: TextFeatures, reasons: list[str]
+    ) -> float:
         """计算内容特征分数"""
         score = 0.0
-        if "```" in content:
+        if features.has_code_block:
             score += 12
             reasons.append("包含代码")
-        if re.search(r"^\s*[-*\d]+[.)]\s", content, re.MULTILINE):
+        if features.has_list:
             score += 8
             reasons.append("包含列表")
         if "?" in content or "？" in content:
@@ -604,8 +630,8 @@ class SmartContextCompressor:
         return final_messages, dropped_count
 
     def _estimate_tokens(self, message: Message) -> int:
-        """估算消息 Token 数（复用公共函数）"""
-        return estimate_message_tokens(message)
+        """估算消息 Token 数（复用公共函数，结果随消息特征缓存）"""
+        return self._analyzer.features(message).tokens
 
     def build_compressed_context(
         self,
@@ -0,0 +1,287 @@
+"""
+Text Analysis - 上下文消息文本分析（关键词自动机 + 消息特征缓存 + MinHash LSH）
+
+KeyMessageDetector 与 SmartContextCompressor 每轮都要扫描整段历史：
+1. 关键词匹配：所有关键词组编译进同一个 Aho-Corasick 自动机，单次扫描得到全部命中
+2. 消息特征缓存：Token 估算、关键词命中、词集合、MinHash 签名按消息标识缓存，
+   历史消息在后续轮次直接复用，每轮只需分析新增消息
+3. 近似重复检测：MinHash 签名分段（LSH bands）入桶，只对同桶候选计算精确 Jaccard
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+import hashlib
+import random
+import re
+from typing import TYPE_CHECKING
+
+from domains.agent.infrastructure.llm.message_formatter import estimate_message_tokens
+
+if TYPE_CHECKING:
+    from collections.abc import Hashable, Iterable, Mapping, Sequence
+    from datetime import datetime
+
+    from domains.agent.domain.types import Message
+
+_LIST_PATTERN = re.compile(r"^\s*[-*\d]+[.)]\s", re.MULTILINE)
+
+# MinHash 参数：32 个哈希分 16 段、每段 2 行，Jaccard 0.5 时进入同桶的概率约 99%
+MINHASH_NUM_PERM = 32
+LSH_BANDS = 16
+_MERSENNE_PRIME = (1 << 61) - 1
+_rng = random.Random(0x5EED)
+_PERMUTATIONS = tuple(
+    (_rng.randrange(1, _MERSENNE_PRIME), _rng.randrange(0, _MERSENNE_PRIME))
+    for _ in range(MINHASH_NUM_PERM)
+)
+
+# 特征缓存上限（条）
+FEATURE_CACHE_SIZE = 4096
+
+
+class KeywordAutomaton:
+    """多组关键词的 Aho-Corasick 自动机；``scan`` 一次返回每组命中的关键词集合。"""
+
+    def __init__(self, groups: Mapping[str, Iterable[str]]) -> None:
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[tuple[str, str], ...]] = [()]
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                if keyword:
+                    self._add(group, keyword)
+        self._build_failure_links()
+
+    def _add(self, group: str, keyword: str) -> None:
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = nxt
+        if (group, keyword) not in self._out[state]:
+            self._out[state] = (*self._out[state], (group, keyword))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def scan(self, text: str) -> dict[str, frozenset[str]]:
+        """扫描文本，返回 {组名: 命中的关键词}（含重叠命中）。"""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits: set[tuple[str, str]] = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                hits.update(out[state])
+        grouped: dict[str, set[str]] = {}
+        for group, keyword in hits:
+            grouped.setdefault(group, set()).add(keyword)
+        return {group: frozenset(words) for group, words in grouped.items()}
+
+
+def minhash_signature(words: Iterable[str]) -> tuple[int, ...]:
+    """词集合的 MinHash 签名；空集合返回空元组。"""
+    base = [
+        int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=8).digest(), "big")
+        for w in set(words)
+    ]
+    if not base:
+        return ()
+    return tuple(min((a * h + b) % _MERSENNE_PRIME for h in base) for a, b in _PERMUTATIONS)
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    union = len(a | b)
+    return len(a & b) / union if union else 0.0
+
+
+class MinHashLSH:
+    """MinHash 签名分段入桶；同一段完全相同的条目互为候选。"""
+
+    def __init__(self, bands: int = LSH_BANDS, num_perm: int = MINHASH_NUM_PERM) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self._bands = bands
+        self._rows = num_perm // bands
+        self._buckets: list[dict[tuple[int, ...], list[Hashable]]] = [{} for _ in range(bands)]
+
+    def _band_keys(self, signature: Sequence[int]) -> Iterable[tuple[int, tuple[int, ...]]]:
+        for band in range(self._bands):
+            yield band, tuple(signature[band * self._rows : (band + 1) * self._rows])
+
+    def insert(self, key: Hashable, signature: Sequence[int]) -> None:
+        if not signature:
+            return
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+    def query(self, signature: Sequence[int]) -> set[Hashable]:
+        candidates: set[Hashable] = set()
+        if not signature:
+            return candidates
+        for band, band_key in self._band_keys(signature):
+            candidates.update(self._buckets[band].get(band_key, ()))
+        return candidates
+
+
+@dataclass
+class TextFeatures:
+    """单段文本（消息内容或记忆）的分析结果。"""
+
+    keyword_hits: dict[str, frozenset[str]]
+    words: frozenset[str]
+    has_code_block: bool
+    has_list: bool
+    _signature: tuple[int, ...] | None = field(default=None, repr=False)
+
+    def hits(self, group: str) -> frozenset[str]:
+        return self.keyword_hits.get(group, frozenset())
+
+    @property
+    def signature(self) -> tuple[int, ...]:
+        # 仅在近似重复检测时需要，按需计算
+        if self._signature is None:
+            self._signature = minhash_signature(self.words)
+        return self._signature
+
+
+@dataclass
+class MessageFeatures:
+    """消息特征：文本特征 + Token 估算。"""
+
+    text: TextFeatures
+    tokens: int
+
+
+MessageKey = tuple[str, str | None, str | None, "datetime", int]
+
+
+def message_key(message: Message) -> MessageKey:
+    """消息标识：Message 无持久 id，以（角色, 内容, 工具调用 id, 时间戳, 工具调用数）区分。"""
+    return (
+        message.role.value,
+        message.content,
+        message.tool_call_id,
+        message.timestamp,
+        len(message.tool_calls or ()),
+    )
+
+
+class TextAnalyzer:
+    """共享文本分析器：一个关键词自动机 + 按消息标识缓存的特征。"""
+
+    def __init__(
+        self,
+        groups: Mapping[str, Sequence[str]] | None = None,
+        cache_size: int = FEATURE_CACHE_SIZE,
+    ) -> None:
+        self._groups: dict[str, tuple[str, ...]] = {}
+        self._automaton = KeywordAutomaton({})
+        self._cache_size = cache_size
+        self._messages: OrderedDict[MessageKey, MessageFeatures] = OrderedDict()
+        self._texts: OrderedDict[str, TextFeatures] = OrderedDict()
+        if groups:
+            self.register_groups(groups)
+
+    def covers(self, groups: Mapping[str, Sequence[str]]) -> bool:
+        """同名组已注册且关键词一致。"""
+        return all(self._groups.get(name) == tuple(words) for name, words in groups.items())
+
+    def conflicts(self, groups: Mapping[str, Sequence[str]]) -> bool:
+        """存在同名但关键词不同的组。"""
+        return any(
+            name in self._groups and self._groups[name] != tuple(words)
+            for name, words in groups.items()
+        )
+
+    def register_groups(self, groups: Mapping[str, Sequence[str]]) -> None:
+        """注册关键词组并重建自动机（已缓存的特征随之失效）。"""
+        if self.covers(groups):
+            return
+        self._groups.update({name: tuple(words) for name, words in groups.items()})
+        self._automaton = KeywordAutomaton(self._groups)
+        self._messages.clear()
+        self._texts.clear()
+
+    def _analyze(self, content: str) -> TextFeatures:
+        content_lower = content.lower()
+        return TextFeatures(
+            keyword_hits=self._automaton.scan(content_lower),
+            words=frozenset(content_lower.split()),
+            has_code_block="```" in content,
+            has_list=_LIST_PATTERN.search(content) is not None,
+        )
+
+    def text_features(self, content: str) -> TextFeatures:
+        """任意文本（如召回记忆）的特征，按内容缓存。"""
+        cached = self._texts.get(content)
+        if cached is not None:
+            self._texts.move_to_end(content)
+            return cached
+        features = self._analyze(content)
+        self._texts[content] = features
+        if len(self._texts) > self._cache_size:
+            self._texts.popitem(last=False)
+        return features
+
+    def features(self, message: Message) -> MessageFeatures:
+        """消息特征，按消息标识缓存。"""
+        key = message_key(message)
+        cached = self._messages.get(key)
+        if cached is not None:
+            self._messages.move_to_end(key)
+            return cached
+        features = MessageFeatures(
+            text=self._analyze(message.content or ""),
+            tokens=estimate_message_tokens(message),
+        )
+        self._messages[key] = features
+        if len(self._messages) > self._cache_size:
+            self._messages.popitem(last=False)
+        return features
+
+
+# 全局共享分析器；关键词组不冲突的组件共用同一个自动机与特征缓存
+_shared_analyzer: TextAnalyzer | None = None
+
+
+def get_text_analyzer(groups: Mapping[str, Sequence[str]]) -> TextAnalyzer:
+    """获取包含 ``groups`` 的分析器：能并入全局实例则复用，同名组关键词不同则单独创建。"""
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        _shared_analyzer = TextAnalyzer()
+    if _shared_analyzer.conflicts(groups):
+        return TextAnalyzer(groups)
+    _shared_analyzer.register_groups(groups)
+    return _shared_analyzer
+
+
+__all__ = [
+    "KeywordAutomaton",
+    "MessageFeatures",
+    "MinHashLSH",
+    "TextAnalyzer",
+    "TextFeatures",
+    "get_text_analyzer",
+    "jaccard",
+    "message_key",
+    "minhash_signature",
+]
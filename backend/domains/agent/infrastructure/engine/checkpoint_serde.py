@@ -0,0 +1,59 @@
+"""LangGraph 检查点序列化：在 ``JsonPlusSerializer`` 外层做 zstd 压缩。
+
+压缩后的类型标记追加 ``+zstd`` 后缀（与 LangGraph ``EncryptedSerializer`` 的 ``+aes`` 同一约定），
+读取时按后缀解压，未压缩的历史数据原样可读。小于 ``min_size`` 的值不压缩（帧头开销大于收益）。
+``zstandard`` 不可用时退化为不压缩。
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None  # type: ignore[assignment]
+
+ZSTD_SUFFIX = "+zstd"
+_DEFAULT_MIN_SIZE = 512
+
+
+class ZstdCompressedSerializer(SerializerProtocol):
+    """包装任意 ``SerializerProtocol``，对较大的值做 zstd 压缩。"""
+
+    def __init__(
+        self,
+        serde: SerializerProtocol | None = None,
+        *,
+        level: int = 3,
+        min_size: int = _DEFAULT_MIN_SIZE,
+    ) -> None:
+        self.serde = serde or JsonPlusSerializer()
+        self._level = level
+        self._min_size = min_size
+
+    @property
+    def enabled(self) -> bool:
+        return zstandard is not None and self._level > 0
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if not self.enabled or len(data) < self._min_size:
+            return type_, data
+        # ZstdCompressor 非线程安全：按次构建（构建开销远小于压缩本身）
+        return type_ + ZSTD_SUFFIX, zstandard.ZstdCompressor(level=self._level).compress(data)
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_.endswith(ZSTD_SUFFIX):
+            if zstandard is None:
+                raise RuntimeError("zstandard is required to read compressed checkpoints")
+            type_ = type_[: -len(ZSTD_SUFFIX)]
+            payload = zstandard.ZstdDecompressor().decompress(payload)
+        return self.serde.loads_typed((type_, payload))
+
+
+__all__ = ["ZSTD_SUFFIX", "ZstdCompressedSerializer"]
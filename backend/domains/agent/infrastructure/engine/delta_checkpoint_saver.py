@@ -0,0 +1,264 @@
+"""追加型 channel 增量存储的 LangGraph Checkpointer 包装层。
+
+长会话里 ``messages`` 等追加型 channel 每个 super-step 只多几条，但底层 saver 会把整段列表
+重新序列化写一份 blob，单线程总写入量随轮数平方增长。本包装层：
+
+- **写**：``new_versions`` 中的 ``list`` 值若以父检查点的同名值为前缀，只存增量标记
+  ``{"__lg_delta__": 1, "base": 父检查点 ID, "n": 前缀长度, "tail": 新增元素, "d": 链深}``；
+  链深达到 ``snapshot_every`` / 前缀不成立（如摘要改写了历史）/ 父值不在本进程缓存时存完整快照；
+- **读**：``aget_tuple`` / ``alist`` 遇到增量标记时沿 ``base`` 递归取基准检查点并拼接，调用方
+  看到的始终是完整状态；展开结果进 LRU，连续步骤的写入与历史遍历都不必重复回源；
+- **依赖**：增量依赖祖先检查点存在，只能整线程删除（``adelete_thread``，同时清掉本层缓存）。
+
+增量只能在 saver 层做：序列化器看不到父检查点。blob 压缩见 ``checkpoint_serde``。
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from langgraph.checkpoint.base import (
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable, Sequence
+
+    from langchain_core.runnables import RunnableConfig
+
+logger = get_logger(__name__)
+
+DELTA_MARKER = "__lg_delta__"
+_DEFAULT_SNAPSHOT_EVERY = 16
+_MAX_THREADS = 256
+_MAX_CHECKPOINTS_PER_THREAD = 32
+
+_ThreadKey = tuple[str, str]
+# channel -> (值快照, 距最近完整快照的链深)
+_ChannelState = dict[str, tuple[tuple[Any, ...], int]]
+
+
+def _is_marker(value: Any) -> bool:
+    return isinstance(value, dict) and value.get(DELTA_MARKER) == 1
+
+
+def _has_prefix(value: list[Any], prefix: tuple[Any, ...]) -> bool:
+    if len(prefix) > len(value):
+        return False
+    return all(a is b or a == b for a, b in zip(prefix, value, strict=False))
+
+
+def _thread_key(config: RunnableConfig) -> _ThreadKey:
+    configurable = config["configurable"]
+    return str(configurable["thread_id"]), str(configurable.get("checkpoint_ns", ""))
+
+
+class DeltaCheckpointSaver(BaseCheckpointSaver):
+    """包装任意 ``BaseCheckpointSaver``，追加型 list channel 存增量 + 周期完整快照。"""
+
+    def __init__(
+        self,
+        inner: BaseCheckpointSaver,
+        *,
+        snapshot_every: Callable[[], int] | int = _DEFAULT_SNAPSHOT_EVERY,
+    ) -> None:
+        super().__init__(serde=inner.serde)
+        self._inner = inner
+        self._snapshot_every = (
+            snapshot_every if callable(snapshot_every) else (lambda: snapshot_every)
+        )
+        # (thread_id, ns) -> checkpoint_id -> 各 list channel 的完整值；两级 LRU
+        self._states: OrderedDict[_ThreadKey, OrderedDict[str, _ChannelState]] = OrderedDict()
+
+    @property
+    def inner(self) -> BaseCheckpointSaver:
+        return self._inner
+
+    # ------------------------------------------------------------------
+    # 状态缓存
+    # ------------------------------------------------------------------
+
+    def _cached(self, key: _ThreadKey, checkpoint_id: str | None) -> _ChannelState | None:
+        if checkpoint_id is None:
+            return None
+        thread = self._states.get(key)
+        if thread is None:
+            return None
+        state = thread.get(checkpoint_id)
+        if state is not None:
+            thread.move_to_end(checkpoint_id)
+            self._states.move_to_end(key)
+        return state
+
+    def _remember(self, key: _ThreadKey, checkpoint_id: str, state: _ChannelState) -> None:
+        thread = self._states.get(key)
+        if thread is None:
+            thread = self._states[key] = OrderedDict()
+        thread[checkpoint_id] = state
+        thread.move_to_end(checkpoint_id)
+        self._states.move_to_end(key)
+        while len(thread) > _MAX_CHECKPOINTS_PER_THREAD:
+            thread.popitem(last=False)
+        while len(self._states) > _MAX_THREADS:
+            self._states.popitem(last=False)
+
+    def _forget_thread(self, thread_id: str) -> None:
+        for key in [k for k in self._states if k[0] == thread_id]:
+            del self._states[key]
+
+    # ------------------------------------------------------------------
+    # 写
+    # ------------------------------------------------------------------
+
+    def _encode(
+        self,
+        key: _ThreadKey,
+        parent_id: str | None,
+        checkpoint: Checkpoint,
+        new_versions: ChannelVersions,
+    ) -> tuple[dict[str, Any], _ChannelState]:
+        snapshot_every = max(0, int(self._snapshot_every()))
+        parent = self._cached(key, parent_id) or {}
+        values = dict(checkpoint["channel_values"])
+        state: _ChannelState = {}
+        for channel, value in checkpoint["channel_values"].items():
+            if type(value) is not list:
+                continue
+            prev = parent.get(channel)
+            if channel not in new_versions:
+                # 沿用父检查点的 blob：链深继承；未知时视为已满，下次变更强制快照
+                state[channel] = (tuple(value), prev[1] if prev else snapshot_every)
+                continue
+            if (
+                prev is not None
+                and parent_id is not None
+                and prev[1] + 1 < snapshot_every
+                and _has_prefix(value, prev[0])
+            ):
+                base_len = len(prev[0])
+                depth = prev[1] + 1
+                values[channel] = {
+                    DELTA_MARKER: 1,
+                    "base": parent_id,
+                    "n": base_len,
+                    "tail": value[base_len:],
+                    "d": depth,
+                }
+            else:
+                depth = 0
+            state[channel] = (tuple(value), depth)
+        return values, state
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        key = _thread_key(config)
+        parent_id = config["configurable"].get("checkpoint_id")
+        values, state = self._encode(key, parent_id, checkpoint, new_versions)
+        stored: Checkpoint = {**checkpoint, "channel_values": values}
+        result = await self._inner.aput(config, stored, metadata, new_versions)
+        self._remember(key, checkpoint["id"], state)
+        return result
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        await self._inner.aput_writes(config, writes, task_id, task_path)
+
+    def get_next_version(self, current: Any, channel: None) -> Any:
+        return self._inner.get_next_version(current, channel)
+
+    # ------------------------------------------------------------------
+    # 读
+    # ------------------------------------------------------------------
+
+    async def _base_value(self, key: _ThreadKey, base_id: str, channel: str) -> tuple[Any, ...]:
+        state = self._cached(key, base_id)
+        if state is None or channel not in state:
+            base_config: RunnableConfig = {
+                "configurable": {
+                    "thread_id": key[0],
+                    "checkpoint_ns": key[1],
+                    "checkpoint_id": base_id,
+                }
+            }
+            # 经自身 aget_tuple 展开（递归至最近完整快照）并写入缓存
+            if await self.aget_tuple(base_config) is None:
+                raise LookupError(f"delta base checkpoint {base_id} missing for thread {key[0]}")
+            state = self._cached(key, base_id) or {}
+        if channel not in state:
+            raise LookupError(f"delta base checkpoint {base_id} has no list channel {channel!r}")
+        return state[channel][0]
+
+    async def _expand(self, tup: CheckpointTuple) -> CheckpointTuple:
+        key = _thread_key(tup.config)
+        checkpoint_id = tup.checkpoint["id"]
+        cached = self._cached(key, checkpoint_id)
+        raw = tup.checkpoint["channel_values"]
+        if cached is None and not any(_is_marker(v) for v in raw.values()):
+            self._remember(
+                key,
+                checkpoint_id,
+                {ch: (tuple(v), 0) for ch, v in raw.items() if type(v) is list},
+            )
+            return tup
+        values = dict(raw)
+        state: _ChannelState = {}
+        for channel, value in raw.items():
+            if cached is not None and channel in cached:
+                full, depth = cached[channel]
+            elif _is_marker(value):
+                base = await self._base_value(key, value["base"], channel)
+                full, depth = (*base[: value["n"]], *value["tail"]), int(value.get("d", 0))
+            elif type(value) is list:
+                full, depth = tuple(value), 0
+            else:
+                continue
+            values[channel] = list(full)
+            state[channel] = (full, depth)
+        if cached is None:
+            self._remember(key, checkpoint_id, state)
+        return tup._replace(checkpoint={**tup.checkpoint, "channel_values": values})
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        tup = await self._inner.aget_tuple(config)
+        if tup is None:
+            return None
+        return await self._expand(tup)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        async for tup in self._inner.alist(config, filter=filter, before=before, limit=limit):
+            yield await self._expand(tup)
+
+    # ------------------------------------------------------------------
+    # 删除
+    # ------------------------------------------------------------------
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        self._forget_thread(str(thread_id))
+        await self._inner.adelete_thread(thread_id)
+
+
+__all__ = ["DELTA_MARKER", "DeltaCheckpointSaver"]
@@ -20,6 +20,7 @@ if TYPE_CHECKING:
     from domains.gateway.application.ports import InvocationOverrides
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langgraph.config import get_stream_writer
 from langgraph.graph import END, START, StateGraph
 
 from domains.agent.domain.types import (
@@ -34,7 +35,13 @@ from domains.agent.infrastructure.llm.agent_llm_facade import AgentLlmFacade
 from domains.agent.infrastructure.llm.langchain_messages import convert_langchain_messages
 from domains.agent.infrastructure.memory.extractor import MemoryExtractor
 from domains.agent.infrastructure.memory.langgraph_store import LongTermMemoryStore
+from domains.agent.infrastructure.tools.progress import (
+    ToolProgressReporter,
+    set_tool_progress_reporter,
+    tool_progress_var,
+)
 from domains.agent.infrastructure.tools.registry import ToolRegistry
+from domains.agent.infrastructure.tools.result_cache import get_tool_result_cache
 from libs.config import ExecutionConfig
 from utils.logging import get_logger
 
@@ -454,6 +461,7 @@ class LangGraphAgentEngine:
 
         对所有待处理的工具调用并行执行，显著提升多工具场景的响应速度。
         使用 asyncio.gather 实现并行，return_exceptions=True 确保单个失败不影响其他工具。
+        声明可缓存的工具经 ToolResultCache 执行：命中直接返回，同轮重复调用只执行一次。
         """
         view = StateView(state)
         if not view.has_pending_tools:
@@ -476,7 +484,10 @@ class LangGraphAgentEngine:
         # 并行执行所有工具（单个失败不影响其他工具）
         logger.info("Executing %d tools in parallel", len(tool_calls))
         results = await asyncio.gather(
-            *[self._execute_single_tool(tc) for tc in tool_calls],
+            *[
+                self._execute_single_tool(tc, user_id=view.user_id, session_id=view.session_id)
+                for tc in tool_calls
+            ],
             return_exceptions=True,
         )
 
@@ -531,11 +542,48 @@ class LangGraphAgentEngine:
             "tool_results": tool_results,
         }
 
-    async def _execute_single_tool(self, tool_call: ToolCall) -> ToolResult:
-        """执行单个工具"""
+    @staticmethod
+    def _progress_reporter(tool_call: ToolCall) -> ToolProgressReporter | None:
+        """工具进度回调：经 LangGraph custom 流模式推送到 run() 的事件流"""
+        try:
+            writer = get_stream_writer()
+        except RuntimeError:  # 不在图执行上下文中（如直接调用节点）
+            return None
+
+        def report(stream: str, content: str) -> None:
+            writer(
+                {
+                    "tool_call_id": tool_call.id,
+                    "tool_name": tool_call.name,
+                    "stream": stream,
+                    "content": content,
+                }
+            )
+
+        return report
+
+    async def _execute_single_tool(
+        self,
+        tool_call: ToolCall,
+        *,
+        user_id: str = "",
+        session_id: str = "",
+    ) -> ToolResult:
+        """执行单个工具
+
+        gather 为每个调用创建独立 Task（各自复制上下文），进度回调互不串扰。
+        user_id / session_id 决定缓存作用域，缺失时对应作用域的工具不走缓存。
+        """
         start_time = time.time()
+        progress_token = set_tool_progress_reporter(self._progress_reporter(tool_call))
         try:
-            result = await self.tools.execute(tool_call.name, **tool_call.arguments)
+            result = await get_tool_result_cache().run(
+                self.tools.get(tool_call.name),
+                tool_call.arguments,
+                lambda: self.tools.execute(tool_call.name, **tool_call.arguments),
+                user_id=user_id,
+                session_id=session_id,
+            )
             duration_ms = int((time.time() - start_time) * 1000)
             return result.model_copy(
                 update={
@@ -552,6 +600,8 @@ class LangGraphAgentEngine:
                 error=str(e),
                 duration_ms=int((time.time() - start_time) * 1000),
             )
+        finally:
+            tool_progress_var.reset(progress_token)
 
     async def _extract_memory(self, state: AgentState) -> dict[str, Any]:
         """提取并存储长期记忆
@@ -694,9 +744,10 @@ class LangGraphAgentEngine:
         业界最佳实践的事件流设计：
         1. thinking 事件 - 包含状态和推理内容（如果模型支持）
         2. tool_call 事件 - 包含工具名和参数
-        3. tool_result 事件 - 包含结果或错误详情
-        4. text 事件 - 最终回复内容
-        5. done 事件 - 统计信息
+        3. tool_progress 事件 - 工具执行中的输出分块（如沙箱 stdout/stderr）
+        4. tool_result 事件 - 包含结果或错误详情
+        5. text 事件 - 最终回复内容
+        6. done 事件 - 统计信息
 
         Args:
             session_id: 会话 ID（作为 LangGraph 的 thread_id，也用于记忆隔离）
@@ -742,8 +793,11 @@ class LangGraphAgentEngine:
             start_time = time.time()
             current_iteration = 0
 
-            # 使用 astream 来获取中间状态，以便发送工具调用事件
-            async for event in self.graph.astream(initial_state, config=config):
+            # 使用 astream 来获取中间状态，以便发送工具调用事件；
+            # custom 模式携带工具执行过程中推送的进度分块
+            async for mode, event in self.graph.astream(
+                initial_state, config=config, stream_mode=["updates", "custom"]
+            ):
                 # 检查是否超时
                 elapsed = time.time() - start_time
                 if elapsed > self.timeout_seconds:
@@ -751,6 +805,10 @@ class LangGraphAgentEngine:
                     yield AgentEvent.error(f"执行超时（{self.timeout_seconds}秒）")
                     return
 
+                if mode == "custom":
+                    yield AgentEvent.tool_progress(**event)
+                    continue
+
                 # event 是一个字典，key 是节点名，value 是节点返回的状态更新
                 for node_name, node_output in event.items():
                     if node_name == "call_llm":
@@ -5,21 +5,29 @@ LangGraph Checkpointer Wrapper - 使用 LangGraph 的检查点实现
 保持向后兼容
 
 重要：使用 AsyncPostgresSaver（而非同步的 PostgresSaver）以支持异步方法如 aget_tuple。
-AsyncPostgresSaver.from_conn_string() 返回一个 async context manager。
 
 设计说明：
-使用 AsyncExitStack 来管理 context manager 的生命周期，避免直接调用 __aenter__/__aexit__。
-这是 Python 标准库推荐的方式，用于在对象生命周期内管理需要跨方法使用的 context manager。
+- PostgreSQL saver 构建在 ``libs.db.database.get_checkpoint_pool()`` 的共享有界连接池上，
+  不再各自 ``from_conn_string`` 持有独立连接（并发 run 共用一条连接会互相串行）；
+- ``redis``：在 PG saver 外包一层 ``RedisWriteBehindCheckpointer``——最新检查点存 Redis
+  （多 worker 均可恢复），中间步骤按窗口批量写回 PG，去掉每步同步 PG 往返；
+- PG 之上统一包 ``DeltaCheckpointSaver``（追加型 channel 存增量 + 周期快照），blob 经
+  ``ZstdCompressedSerializer`` 压缩，长会话的检查点写入量由平方增长降为近线性。
 """
 
 import asyncio
-from contextlib import AsyncExitStack
 from typing import Any
 
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
 
 from bootstrap.config import settings
+from domains.agent.infrastructure.engine.checkpoint_serde import ZstdCompressedSerializer
+from domains.agent.infrastructure.engine.delta_checkpoint_saver import DeltaCheckpointSaver
+from domains.agent.infrastructure.engine.redis_write_behind_checkpointer import (
+    RedisWriteBehindCheckpointer,
+)
+from libs.db.database import get_checkpoint_pool
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -30,12 +38,11 @@ class LangGraphCheckpointer:
     使用 LangGraph 的检查点实现
 
     支持：
-    - PostgreSQL: 生产环境，持久化存储
-    - Redis: 高性能场景，快速存储
+    - PostgreSQL: 生产环境，持久化存储（每步同步落库）
+    - Redis: Redis 热缓存最新检查点 + PostgreSQL 写回持久化
     - Memory: 开发测试，内存存储
 
-    注意：PostgresSaver 需要作为 context manager 使用，在应用启动时初始化。
-    使用 AsyncExitStack 来正确管理 context manager 的生命周期。
+    注意：PostgreSQL / Redis 两种存储需在应用启动时调用 ``setup()`` 初始化（建表 + 取连接池）。
     """
 
     def __init__(
@@ -51,53 +58,49 @@ class LangGraphCheckpointer:
             checkpointer_instance: 已初始化的 checkpointer 实例（可选，用于共享单例）
         """
         self.storage_type = storage_type
-        self._exit_stack: AsyncExitStack | None = None
-        self._checkpointer_factory: Any = None
 
         if checkpointer_instance is not None:
             # 使用提供的实例（通常是全局单例）
             self.checkpointer = checkpointer_instance
             logger.info("Using provided checkpointer instance")
-        elif storage_type == "postgres":
-            # AsyncPostgresSaver.from_conn_string() 返回 async context manager
-            # 保存工厂函数，在 setup() 中通过 AsyncExitStack 管理
-            db_url = settings.database_url.replace("+asyncpg", "")
-            self._checkpointer_factory = AsyncPostgresSaver.from_conn_string(db_url)
+        elif storage_type in ("postgres", "redis"):
+            # 连接池与表结构在 setup() 中异步初始化
             self.checkpointer = None
-            logger.info("AsyncPostgresSaver factory created, will be initialized in setup()")
-        elif storage_type == "redis":
-            # 注意：RedisSaver 需要特定的 Redis 客户端类型
-            # 暂时使用 MemorySaver 作为后备，后续可以完善 Redis 支持
-            logger.warning("RedisSaver not fully implemented, using MemorySaver as fallback")
-            self.checkpointer = MemorySaver()
+            logger.info("%s checkpointer will be initialized in setup()", storage_type)
         else:
             self.checkpointer = MemorySaver()
             logger.info("Using LangGraph MemorySaver for checkpoints (development mode)")
 
     async def setup(self) -> None:
         """初始化检查点存储（如果需要）"""
-        if self.checkpointer is None and self._checkpointer_factory is not None:
-            # 使用 AsyncExitStack 来管理 context manager 的生命周期
-            # AsyncExitStack 可以直接使用 enter_async_context()，无需先调用 __aenter__
-            # 在 cleanup() 中通过 aclose() 统一关闭所有注册的 context managers
+        if self.checkpointer is None and self.storage_type in ("postgres", "redis"):
             try:
-                self._exit_stack = AsyncExitStack()
-
-                # 通过 exit_stack 进入 context manager，获取实际实例
-                self.checkpointer = await self._exit_stack.enter_async_context(
-                    self._checkpointer_factory
+                postgres_saver = AsyncPostgresSaver(
+                    conn=await get_checkpoint_pool(),
+                    serde=ZstdCompressedSerializer(level=settings.checkpoint_zstd_level),
                 )
-
                 # 调用 setup 初始化表结构
-                await self._call_setup_if_available(self.checkpointer)
-                logger.info("AsyncPostgresSaver initialized and setup completed")
+                await self._call_setup_if_available(postgres_saver)
             except Exception as e:
-                # 如果初始化失败，清理 exit_stack
-                if self._exit_stack is not None:
-                    await self._exit_stack.aclose()
-                    self._exit_stack = None
                 logger.error("Failed to initialize AsyncPostgresSaver: %s", e, exc_info=True)
                 raise
+            delta_saver = DeltaCheckpointSaver(
+                postgres_saver,
+                snapshot_every=lambda: int(settings.checkpoint_delta_snapshot_interval),
+            )
+            if self.storage_type == "redis":
+                self.checkpointer = RedisWriteBehindCheckpointer(
+                    delta_saver,
+                    ttl_seconds=settings.checkpoint_ttl_days * 86400,
+                    interval_seconds=lambda: float(
+                        settings.checkpoint_write_behind_interval_seconds
+                    ),
+                    max_pending=lambda: int(settings.checkpoint_write_behind_max_pending),
+                )
+                logger.info("Redis write-behind checkpointer initialized over AsyncPostgresSaver")
+            else:
+                self.checkpointer = delta_saver
+                logger.info("Delta checkpointer initialized over AsyncPostgresSaver")
         elif self.checkpointer is not None and hasattr(self.checkpointer, "setup"):
             # 如果已经有实例，直接调用 setup
             try:
@@ -118,15 +121,13 @@ class LangGraphCheckpointer:
         # 如果不是协程（同步方法返回 None），则不需要 await
 
     async def cleanup(self) -> None:
-        """清理资源（关闭 context manager）"""
-        if self._exit_stack is not None:
+        """清理资源：排空写回中的检查点（连接池由 ``close_checkpoint_pool`` 统一关闭）"""
+        if isinstance(self.checkpointer, RedisWriteBehindCheckpointer):
             try:
-                await self._exit_stack.aclose()
-                logger.info("Checkpointer context manager closed via AsyncExitStack")
+                await self.checkpointer.aclose()
+                logger.info("Checkpointer write-behind queue drained")
             except Exception as e:
-                logger.warning("Error closing checkpointer context manager: %s", e)
-            finally:
-                self._exit_stack = None
+                logger.warning("Error draining checkpointer write-behind queue: %s", e)
 
     def get_config(self, thread_id: str) -> dict[str, Any]:
         """
@@ -0,0 +1,422 @@
+"""Redis 热缓存 + PostgreSQL 写回（write-behind）的 LangGraph Checkpointer。
+
+多工具轮次里每个 super-step 都会 ``aput`` / ``aput_writes`` 一次；直接用 ``AsyncPostgresSaver``
+时每步至少一次同步 PG 往返，是除 LLM 外的主要延迟来源。本实现：
+
+- **写**：每线程（``thread_id`` + ``checkpoint_ns``）的最新检查点与其 pending writes 写入
+  Redis（一次 pipeline 往返）即返回；同一操作按顺序进入 ``CoalescingFlusher``，按窗口
+  批量回放到 PG saver（保留完整历史，供时间旅行与 ``alist``）；
+- **读**：``aget_tuple`` 读最新检查点（未指定 ``checkpoint_id`` 或恰为最新）直接由 Redis
+  提供，跨 worker 恢复一致；历史检查点 / ``alist`` / 删除等先排空本进程待写再委托 PG；
+- **降级**：Redis 不可用时先排空该线程待写，再同步写穿到 PG（与未启用写回时行为一致）；
+- **取舍**：进程崩溃会丢失窗口内尚未落 PG 的中间步骤（Redis 仍保有最新检查点，恢复不受
+  影响）；关停时 :meth:`aclose` 排空。写回回放对 PG 为 upsert，失败重试幂等。
+
+检查点与写入值用 saver 的 ``serde`` 预先序列化：Redis 与回放共用同一份字节，回放时再
+反序列化，避免持有调用方后续可能原地修改的对象。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+from dataclasses import dataclass, field
+import itertools
+import json
+from typing import TYPE_CHECKING, Any
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_serializable_checkpoint_metadata,
+)
+
+from libs.concurrency import CoalescingFlusher
+from libs.db.redis import get_redis_client
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator, Callable, Sequence
+
+    from langchain_core.runnables import RunnableConfig
+
+logger = get_logger(__name__)
+
+_KEY_PREFIX = "agent:lgcp:"
+_DEFAULT_TTL_SECONDS = 86400 * 7
+
+_ThreadKey = tuple[str, str]
+_Typed = tuple[str, bytes]
+
+
+@dataclass
+class _PendingOp:
+    """一次待回放到 PG 的 ``aput`` / ``aput_writes``（``seq`` 保证同线程回放顺序）。"""
+
+    seq: int
+    config: RunnableConfig
+    checkpoint: _Typed | None = None
+    metadata: CheckpointMetadata | None = None
+    new_versions: ChannelVersions | None = None
+    writes: list[tuple[str, _Typed]] = field(default_factory=list)
+    task_id: str = ""
+    task_path: str = ""
+
+
+def _merge_ops(older: list[_PendingOp], newer: list[_PendingOp]) -> list[_PendingOp]:
+    # 失败并回时 older / newer 次序会颠倒，按 seq 重排
+    return sorted(older + newer, key=lambda op: op.seq)
+
+
+def _writes_sort_key(row: Sequence[Any]) -> tuple[str, str, int]:
+    # 与实时执行一致：同一 super-step 的写入按 (task_path, task_id, idx) 应用
+    _checkpoint_id, task_path, task_id, idx = row[:4]
+    return (task_path, task_id, idx)
+
+
+def _encode_typed(typed: _Typed) -> list[str]:
+    return [typed[0], base64.b64encode(typed[1]).decode("ascii")]
+
+
+def _decode_typed(raw: Sequence[str]) -> _Typed:
+    return raw[0], base64.b64decode(raw[1])
+
+
+def _thread_key(config: RunnableConfig) -> _ThreadKey:
+    configurable = config["configurable"]
+    return str(configurable["thread_id"]), str(configurable.get("checkpoint_ns", ""))
+
+
+def _latest_key(key: _ThreadKey) -> str:
+    return f"{_KEY_PREFIX}{key[0]}:{key[1]}"
+
+
+def _writes_key(key: _ThreadKey) -> str:
+    return f"{_KEY_PREFIX}{key[0]}:{key[1]}:w"
+
+
+def _checkpoint_config(key: _ThreadKey, checkpoint_id: str) -> RunnableConfig:
+    return {
+        "configurable": {
+            "thread_id": key[0],
+            "checkpoint_ns": key[1],
+            "checkpoint_id": checkpoint_id,
+        }
+    }
+
+
+def _parent_config(key: _ThreadKey, parent_id: str | None) -> RunnableConfig:
+    if parent_id:
+        return _checkpoint_config(key, parent_id)
+    return {"configurable": {"thread_id": key[0], "checkpoint_ns": key[1]}}
+
+
+class RedisWriteBehindCheckpointer(BaseCheckpointSaver[Any]):
+    """包装一个持久化 saver（通常为共享连接池上的 ``AsyncPostgresSaver``）。"""
+
+    def __init__(
+        self,
+        inner: BaseCheckpointSaver[Any],
+        *,
+        ttl_seconds: int = _DEFAULT_TTL_SECONDS,
+        interval_seconds: Callable[[], float] = lambda: 1.0,
+        max_pending: Callable[[], int] = lambda: 200,
+        redis_client_factory: Any = get_redis_client,
+    ) -> None:
+        super().__init__(serde=inner.serde)
+        self._inner = inner
+        self._ttl_seconds = ttl_seconds
+        self._interval_seconds = interval_seconds
+        self._redis_client_factory = redis_client_factory
+        self._seq = itertools.count()
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._inflight: dict[_ThreadKey, asyncio.Future[None]] = {}
+        self._flusher: CoalescingFlusher[_ThreadKey, list[_PendingOp]] = CoalescingFlusher(
+            name="langgraph-checkpoint",
+            merge=_merge_ops,
+            flush=self._flush_batch,
+            interval_seconds=interval_seconds,
+            max_pending=max_pending,
+            register_task=self._register_task,
+        )
+
+    @property
+    def inner(self) -> BaseCheckpointSaver[Any]:
+        return self._inner
+
+    def get_next_version(self, current: Any, channel: None) -> Any:
+        return self._inner.get_next_version(current, channel)
+
+    def _register_task(self, task: asyncio.Task[None]) -> None:
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # ------------------------------------------------------------------
+    # 写回
+    # ------------------------------------------------------------------
+
+    def _write_behind_enabled(self) -> bool:
+        return float(self._interval_seconds()) > 0
+
+    async def _replay(self, op: _PendingOp) -> None:
+        if op.checkpoint is not None:
+            checkpoint = self.serde.loads_typed(op.checkpoint)
+            await self._inner.aput(op.config, checkpoint, op.metadata or {}, op.new_versions or {})
+        else:
+            writes = [(channel, self.serde.loads_typed(value)) for channel, value in op.writes]
+            await self._inner.aput_writes(op.config, writes, op.task_id, op.task_path)
+
+    async def _flush_thread(self, ops: list[_PendingOp]) -> None:
+        for op in ops:
+            await self._replay(op)
+
+    async def _flush_batch(self, entries: list[tuple[_ThreadKey, list[_PendingOp]]]) -> None:
+        loop = asyncio.get_running_loop()
+        # 同步登记在途（gather 前）：换出快照后、回放开始前的读也能等到本批落库
+        inflight = {key: loop.create_future() for key, _ops in entries}
+        self._inflight.update(inflight)
+        try:
+            results = await asyncio.gather(
+                *(self._flush_thread(ops) for _key, ops in entries), return_exceptions=True
+            )
+        finally:
+            for key, done in inflight.items():
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                done.set_result(None)
+        failed = [r for r in results if isinstance(r, BaseException)]
+        if failed:
+            # 整批并回重试：PG 侧为 upsert，已成功的线程重放幂等
+            raise failed[0]
+
+    async def _drain(self, key: _ThreadKey | None = None) -> None:
+        """排空本进程待写（读己之写）；``key`` 非空时额外等待该线程在途回放结束。"""
+        await self._flusher.flush_now()
+        pending = [self._inflight[key]] if key in self._inflight else []
+        if key is None:
+            pending = list(self._inflight.values())
+        if pending:
+            await asyncio.gather(*pending)
+
+    def _enqueue(self, key: _ThreadKey, op: _PendingOp) -> None:
+        self._flusher.add(key, [op])
+
+    async def aclose(self) -> None:
+        """关停：排空待写并停止 flusher。"""
+        await self._drain()
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    # ------------------------------------------------------------------
+    # Redis 最新检查点
+    # ------------------------------------------------------------------
+
+    async def _store_latest(
+        self,
+        key: _ThreadKey,
+        *,
+        checkpoint_id: str,
+        parent_id: str | None,
+        checkpoint: _Typed,
+        metadata: CheckpointMetadata,
+    ) -> bool:
+        record = {
+            "id": checkpoint_id,
+            "parent_id": parent_id,
+            "checkpoint": _encode_typed(checkpoint),
+            "metadata": _encode_typed(self.serde.dumps_typed(metadata)),
+        }
+        try:
+            client = await self._redis_client_factory()
+            pipe = client.pipeline(transaction=True)
+            pipe.set(_latest_key(key), json.dumps(record), ex=self._ttl_seconds)
+            # 新检查点的 pending writes 从空开始；旧检查点的写入已随上一轮回放落 PG
+            pipe.delete(_writes_key(key))
+            await pipe.execute()
+        except Exception:
+            logger.warning("Checkpoint cache write failed thread=%s", key[0], exc_info=True)
+            await self._evict_latest(key)
+            return False
+        return True
+
+    async def _evict_latest(self, key: _ThreadKey) -> None:
+        """缓存写失败后删除旧的最新检查点，避免 ``aget_tuple`` 之后返回过期数据"""
+        try:
+            client = await self._redis_client_factory()
+            await client.delete(_latest_key(key), _writes_key(key))
+        except Exception:
+            logger.warning("Checkpoint cache evict failed thread=%s", key[0], exc_info=True)
+
+    async def _store_writes(
+        self,
+        key: _ThreadKey,
+        checkpoint_id: str,
+        task_id: str,
+        task_path: str,
+        writes: list[tuple[int, str, _Typed]],
+    ) -> bool:
+        fields = {
+            f"{checkpoint_id}|{task_id}|{idx}": json.dumps(
+                [checkpoint_id, task_path, task_id, idx, channel, _encode_typed(value)]
+            )
+            for idx, channel, value in writes
+        }
+        try:
+            client = await self._redis_client_factory()
+            pipe = client.pipeline(transaction=False)
+            pipe.hset(_writes_key(key), mapping=fields)
+            pipe.expire(_writes_key(key), self._ttl_seconds)
+            await pipe.execute()
+        except Exception:
+            logger.warning("Checkpoint writes cache failed thread=%s", key[0], exc_info=True)
+            return False
+        return True
+
+    async def _load_latest(self, key: _ThreadKey) -> CheckpointTuple | None:
+        try:
+            client = await self._redis_client_factory()
+            pipe = client.pipeline(transaction=False)
+            pipe.get(_latest_key(key))
+            pipe.hgetall(_writes_key(key))
+            raw, raw_writes = await pipe.execute()
+        except Exception:
+            logger.warning("Checkpoint cache read failed thread=%s", key[0], exc_info=True)
+            return None
+        if not raw:
+            return None
+        record = json.loads(raw)
+        checkpoint_id = record["id"]
+        rows = [json.loads(v) for v in (raw_writes or {}).values()]
+        rows = [r for r in rows if r[0] == checkpoint_id]
+        rows.sort(key=_writes_sort_key)
+        parent_id = record.get("parent_id")
+        return CheckpointTuple(
+            config=_checkpoint_config(key, checkpoint_id),
+            checkpoint=self.serde.loads_typed(_decode_typed(record["checkpoint"])),
+            metadata=self.serde.loads_typed(_decode_typed(record["metadata"])),
+            parent_config=_checkpoint_config(key, parent_id) if parent_id else None,
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed(_decode_typed(value)))
+                for _cid, _path, task_id, _idx, channel, value in rows
+            ],
+        )
+
+    async def _forget_thread(self, thread_id: str) -> None:
+        try:
+            client = await self._redis_client_factory()
+            keys = [k async for k in client.scan_iter(match=f"{_KEY_PREFIX}{thread_id}:*")]
+            if keys:
+                await client.delete(*keys)
+        except Exception:
+            logger.warning("Checkpoint cache delete failed thread=%s", thread_id, exc_info=True)
+
+    # ------------------------------------------------------------------
+    # BaseCheckpointSaver 异步接口
+    # ------------------------------------------------------------------
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        key = _thread_key(config)
+        parent_id = get_checkpoint_id(config)
+        next_config = _checkpoint_config(key, checkpoint["id"])
+        serializable_metadata = get_serializable_checkpoint_metadata(config, metadata)
+        typed = self.serde.dumps_typed(checkpoint)
+        cached = await self._store_latest(
+            key,
+            checkpoint_id=checkpoint["id"],
+            parent_id=parent_id,
+            checkpoint=typed,
+            metadata=serializable_metadata,
+        )
+        if not cached or not self._write_behind_enabled():
+            await self._drain(key)
+            await self._inner.aput(config, checkpoint, metadata, new_versions)
+            return next_config
+        self._enqueue(
+            key,
+            _PendingOp(
+                seq=next(self._seq),
+                config=_parent_config(key, parent_id),
+                checkpoint=typed,
+                metadata=serializable_metadata,
+                new_versions=dict(new_versions),
+            ),
+        )
+        return next_config
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        key = _thread_key(config)
+        checkpoint_id = str(config["configurable"]["checkpoint_id"])
+        typed = [(channel, self.serde.dumps_typed(value)) for channel, value in writes]
+        cached = await self._store_writes(
+            key,
+            checkpoint_id,
+            task_id,
+            task_path,
+            [
+                (WRITES_IDX_MAP.get(channel, idx), channel, value)
+                for idx, (channel, value) in enumerate(typed)
+            ],
+        )
+        if not cached or not self._write_behind_enabled():
+            await self._drain(key)
+            await self._inner.aput_writes(config, writes, task_id, task_path)
+            return
+        self._enqueue(
+            key,
+            _PendingOp(
+                seq=next(self._seq),
+                config=_checkpoint_config(key, checkpoint_id),
+                writes=typed,
+                task_id=task_id,
+                task_path=task_path,
+            ),
+        )
+
+    async def aget_tuple(self, config: RunnableConfig) -> CheckpointTuple | None:
+        key = _thread_key(config)
+        wanted = get_checkpoint_id(config)
+        latest = await self._load_latest(key)
+        if latest is not None and wanted in (None, latest.config["configurable"]["checkpoint_id"]):
+            return latest
+        await self._drain(key)
+        return await self._inner.aget_tuple(config)
+
+    async def alist(
+        self,
+        config: RunnableConfig | None,
+        *,
+        filter: dict[str, Any] | None = None,
+        before: RunnableConfig | None = None,
+        limit: int | None = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        await self._drain(_thread_key(config) if config else None)
+        async for item in self._inner.alist(config, filter=filter, before=before, limit=limit):
+            yield item
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await self._drain()
+        await self._forget_thread(thread_id)
+        await self._inner.adelete_thread(thread_id)
+
+
+__all__ = ["RedisWriteBehindCheckpointer"]
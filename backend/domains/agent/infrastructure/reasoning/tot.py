@@ -2,10 +2,177 @@
 Tree-of-Thought (ToT) 推理模式
 
 思维树多路径探索模式，适用于创意生成、策略规划
+
+配置了 LLM 时执行束搜索（beam search）：
+1. 扩展 - 束内每个节点并发生成 branch_count 个候选思路（信号量限制并发）
+2. 评估 - 同一深度的候选分批交给评估器打分，每批一次 LLM 调用
+3. 剪枝 - 按分数保留 beam_width 个节点进入下一层
+4. 终止 - 评估器判定某分支已得出答案（或分数达到阈值）时提前结束
+Token 预算与总耗时对整棵树生效，超限时返回当前最优路径。
 """
 
-from domains.agent.domain.types import AgentState, Message
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import json
+import re
+import time
+from typing import TYPE_CHECKING, Any, TypeVar
+
+from domains.agent.domain.types import AgentState, Message, MessageRole
 from domains.agent.infrastructure.reasoning.base import BaseReasoningMode, ReasoningResult
+from utils.logging import get_logger
+from utils.tokens import count_tokens
+
+if TYPE_CHECKING:
+    from collections.abc import Coroutine
+
+    from domains.agent.infrastructure.llm.agent_llm_facade import AgentLlmFacade
+
+logger = get_logger(__name__)
+
+_T = TypeVar("_T")
+
+_NUMBERED_LINE = re.compile(r"^\s*(?:[-*]|\d+[.)、]|路径\s*\d+[:：])\s*(.+)$")
+
+EXPAND_PROMPT = """问题：
+{problem}
+
+已有思路：
+{path}
+
+请给出 {count} 个不同的下一步思路，每个思路一句话，彼此不要重复。
+只输出 JSON 字符串数组，例如 ["思路A", "思路B"]。"""
+
+EVALUATE_PROMPT = """问题：
+{problem}
+
+以下是 {count} 条候选推理路径：
+{candidates}
+
+请评估每条路径解决问题的前景，score 取 0~1；若某条路径已经得出完整答案，terminal 为 true。
+只输出 JSON 数组，按编号顺序，例如 [{{"score": 0.6, "terminal": false}}]。"""
+
+
+@dataclass
+class ThoughtNode:
+    """思维树节点：从根到该节点的思路序列"""
+
+    path: list[str]
+    score: float = 0.0
+    terminal: bool = False
+
+    @property
+    def depth(self) -> int:
+        return len(self.path)
+
+
+@dataclass
+class TreeSearchResult:
+    """束搜索结果"""
+
+    best: ThoughtNode
+    stop_reason: str  # "terminal" / "max_depth" / "token_budget" / "time_limit" / "no_candidates"
+    tokens_used: int
+    expansions: int
+    evaluations: int
+    depth_reached: int
+    beams: list[list[ThoughtNode]] = field(default_factory=list)
+
+
+class _BudgetExceededError(Exception):
+    """Token 预算耗尽"""
+
+
+class _TokenBudget:
+    """整棵树共享的 Token 预算；发起调用前预占 ``max_tokens``，调用后按 usage 结算。
+
+    并发扩展各自预占额度，预占之和不超过剩余预算，避免同时通过检查后集体超支。
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.used = 0
+        self.reserved = 0
+
+    @property
+    def remaining(self) -> int:
+        return max(0, self.limit - self.used - self.reserved)
+
+    def reserve(self, max_tokens: int) -> int:
+        """预占至多 ``max_tokens``，返回实际预占量；预算已被用完或预占完时抛出。"""
+        granted = min(max_tokens, self.remaining)
+        if granted <= 0:
+            raise _BudgetExceededError
+        self.reserved += granted
+        return granted
+
+    def release(self, reserved: int) -> None:
+        self.reserved -= reserved
+
+    def settle(self, reserved: int, prompt: str, response: Any) -> None:
+        self.release(reserved)
+        usage = getattr(response, "usage", None) or {}
+        total = usage.get("total_tokens")
+        if total is None:
+            total = count_tokens(prompt) + count_tokens(getattr(response, "content", None) or "")
+        self.used += int(total)
+
+
+def _parse_json_block(content: str) -> Any:
+    if "```" in content:
+        content = content.split("```")[1].removeprefix("json")
+    start = min((i for i in (content.find("["), content.find("{")) if i >= 0), default=-1)
+    if start < 0:
+        raise ValueError("no JSON in response")
+    return json.loads(content[start : content.rfind("]") + 1 or None])
+
+
+def _parse_thoughts(content: str, count: int) -> list[str]:
+    """解析候选思路：优先 JSON 数组，其次编号 / 列表行"""
+    try:
+        data = _parse_json_block(content)
+        thoughts = [str(t).strip() for t in data if str(t).strip()]
+    except (ValueError, TypeError):
+        thoughts = [
+            m.group(1).strip() for line in content.splitlines() if (m := _NUMBERED_LINE.match(line))
+        ]
+    seen: set[str] = set()
+    unique = [t for t in thoughts if not (t in seen or seen.add(t))]
+    return unique[:count]
+
+
+def _parse_scores(content: str, count: int) -> list[tuple[float, bool]]:
+    """解析评估结果；缺失或无法解析的条目记 0 分"""
+    try:
+        data = _parse_json_block(content)
+    except (ValueError, TypeError):
+        data = []
+    scores: list[tuple[float, bool]] = []
+    for i in range(count):
+        item = data[i] if isinstance(data, list) and i < len(data) else {}
+        if isinstance(item, dict):
+            try:
+                score = float(item.get("score", 0.0))
+            except (TypeError, ValueError):
+                score = 0.0
+            scores.append((min(1.0, max(0.0, score)), bool(item.get("terminal", False))))
+        elif isinstance(item, int | float):
+            scores.append((min(1.0, max(0.0, float(item))), False))
+        else:
+            scores.append((0.0, False))
+    return scores
+
+
+async def _run_all(coros: list[Coroutine[Any, Any, _T]]) -> list[_T]:
+    """并发执行；任一失败（如预算耗尽）即取消并等待其余调用，返回 / 抛出时没有进行中的 LLM 调用"""
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(coro) for coro in coros]
+    except BaseExceptionGroup as errors:
+        raise errors.exceptions[0] from None
+    return [task.result() for task in tasks]
 
 
 class TreeOfThoughtMode(BaseReasoningMode):
@@ -17,12 +184,27 @@ class TreeOfThoughtMode(BaseReasoningMode):
     - 评估不同方案的优劣
     - 选择最佳路径
     - 适合需要创意的任务
+
+    配置项：branch_count、max_depth、beam_width、max_concurrency、eval_batch_size、
+    max_tokens（整棵树）、time_limit_seconds（整棵树）、terminal_score、model
     """
 
-    def __init__(self, config: dict | None = None) -> None:
+    def __init__(
+        self,
+        config: dict | None = None,
+        llm_gateway: AgentLlmFacade | None = None,
+    ) -> None:
         super().__init__(config)
+        self.llm_gateway = llm_gateway
         self.branch_count = self.config.get("branch_count", 3)
         self.max_depth = self.config.get("max_depth", 3)
+        self.beam_width = self.config.get("beam_width", 2)
+        self.max_concurrency = self.config.get("max_concurrency", 4)
+        self.eval_batch_size = self.config.get("eval_batch_size", 8)
+        self.max_tokens = self.config.get("max_tokens", 20000)
+        self.time_limit_seconds = self.config.get("time_limit_seconds", 60.0)
+        self.terminal_score = self.config.get("terminal_score", 0.95)
+        self.model: str | None = self.config.get("model")
 
     def get_system_prompt(self) -> str:
         return f"""你是一个智能助手，使用 Tree-of-Thought 模式解决问题。
@@ -50,9 +232,147 @@ class TreeOfThoughtMode(BaseReasoningMode):
         available_tools: list[str],
     ) -> ReasoningResult:
         """ToT 推理逻辑"""
-        thought = f"探索多个思考路径，评估并选择最佳方案（生成{self.branch_count}个分支）。"
+        problem = next(
+            (m.content for m in reversed(context) if m.role == MessageRole.USER and m.content),
+            None,
+        )
+        if self.llm_gateway is None or not problem:
+            thought = f"探索多个思考路径，评估并选择最佳方案（生成{self.branch_count}个分支）。"
+            return ReasoningResult(
+                thought=thought,
+                confidence=0.75,  # ToT 不确定性较高
+            )
 
+        result = await self.search(problem)
+        state.total_tokens += result.tokens_used
+        thought = (
+            f"思维树搜索（深度 {result.depth_reached}，扩展 {result.expansions} 次，"
+            f"停止原因 {result.stop_reason}）选出的最佳路径：\n"
+            + "\n".join(f"{i}. {t}" for i, t in enumerate(result.best.path, start=1))
+        )
         return ReasoningResult(
             thought=thought,
-            confidence=0.75,  # ToT 不确定性较高
+            plan=list(result.best.path),
+            confidence=result.best.score if result.best.path else 0.75,
+        )
+
+    async def _call(self, budget: _TokenBudget, prompt: str, max_tokens: int) -> str:
+        assert self.llm_gateway is not None
+        reserved = budget.reserve(max_tokens)
+        try:
+            response = await self.llm_gateway.chat(
+                messages=[{"role": "user", "content": prompt}],
+                model=self.model,
+                max_tokens=reserved,
+            )
+        except BaseException:
+            budget.release(reserved)
+            raise
+        budget.settle(reserved, prompt, response)
+        return getattr(response, "content", None) or ""
+
+    async def _expand(
+        self,
+        problem: str,
+        node: ThoughtNode,
+        budget: _TokenBudget,
+        semaphore: asyncio.Semaphore,
+    ) -> list[ThoughtNode]:
+        prompt = EXPAND_PROMPT.format(
+            problem=problem,
+            path="\n".join(f"{i}. {t}" for i, t in enumerate(node.path, start=1)) or "（无）",
+            count=self.branch_count,
+        )
+        async with semaphore:
+            content = await self._call(budget, prompt, max_tokens=512)
+        return [
+            ThoughtNode(path=[*node.path, t]) for t in _parse_thoughts(content, self.branch_count)
+        ]
+
+    async def _evaluate(
+        self,
+        problem: str,
+        batch: list[ThoughtNode],
+        budget: _TokenBudget,
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        candidates = "\n\n".join(
+            f"[{i}] " + " -> ".join(node.path) for i, node in enumerate(batch, start=1)
         )
+        prompt = EVALUATE_PROMPT.format(problem=problem, count=len(batch), candidates=candidates)
+        async with semaphore:
+            content = await self._call(budget, prompt, max_tokens=64 + 24 * len(batch))
+        for node, (score, terminal) in zip(batch, _parse_scores(content, len(batch)), strict=True):
+            node.score = score
+            node.terminal = terminal or score >= self.terminal_score
+
+    async def search(self, problem: str) -> TreeSearchResult:
+        """束搜索：逐层并发扩展、分批评估、剪枝到束宽"""
+        if self.llm_gateway is None:
+            raise ValueError("TreeOfThoughtMode.search requires an llm_gateway")
+
+        budget = _TokenBudget(self.max_tokens)
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        root = ThoughtNode(path=[])
+        result = TreeSearchResult(
+            best=root,
+            stop_reason="max_depth",
+            tokens_used=0,
+            expansions=0,
+            evaluations=0,
+            depth_reached=0,
+        )
+        beam = [root]
+        started = time.monotonic()
+
+        async def run_depth(frontier: list[ThoughtNode]) -> list[ThoughtNode]:
+            expanded = await _run_all(
+                [self._expand(problem, node, budget, semaphore) for node in frontier]
+            )
+            result.expansions += len(frontier)
+            candidates = [c for group in expanded for c in group]
+            batches = [
+                candidates[i : i + self.eval_batch_size]
+                for i in range(0, len(candidates), self.eval_batch_size)
+            ]
+            await _run_all([self._evaluate(problem, b, budget, semaphore) for b in batches])
+            result.evaluations += len(batches)
+            return candidates
+
+        try:
+            async with asyncio.timeout(self.time_limit_seconds):
+                for depth in range(1, self.max_depth + 1):
+                    candidates = await run_depth(beam)
+                    if not candidates:
+                        result.stop_reason = "no_candidates"
+                        break
+                    candidates.sort(key=lambda n: n.score, reverse=True)
+                    beam = candidates[: self.beam_width]
+                    result.beams.append(beam)
+                    result.depth_reached = depth
+                    if beam[0].score >= result.best.score or not result.best.path:
+                        result.best = beam[0]
+                    # 已得出答案的分支即使未进束也直接采用
+                    terminal = [n for n in candidates if n.terminal]
+                    if terminal:
+                        result.best = terminal[0]
+                        result.stop_reason = "terminal"
+                        break
+        except _BudgetExceededError:
+            result.stop_reason = "token_budget"
+        except TimeoutError:
+            result.stop_reason = "time_limit"
+
+        result.tokens_used = budget.used
+        logger.info(
+            "ToT search finished: reason=%s depth=%d expansions=%d tokens=%d elapsed=%.2fs",
+            result.stop_reason,
+            result.depth_reached,
+            result.expansions,
+            result.tokens_used,
+            time.monotonic() - started,
+        )
+        return result
+
+
+__all__ = ["ThoughtNode", "TreeOfThoughtMode", "TreeSearchResult"]
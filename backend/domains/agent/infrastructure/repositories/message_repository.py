@@ -4,6 +4,7 @@ Message Repository - 消息仓储实现
 实现消息数据访问。
 """
 
+from collections.abc import Sequence
 from typing import Any
 import uuid
 
@@ -13,6 +14,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from domains.agent.domain.interfaces.message_repository import (
     MessageRepository as MessageRepositoryInterface,
 )
+from domains.agent.domain.interfaces.message_repository import (
+    NewMessage,
+)
 from domains.agent.infrastructure.models.message import Message
 
 
@@ -39,14 +43,34 @@ class MessageRepository(MessageRepositoryInterface):
             content=content,
             tool_calls=tool_calls,
             tool_call_id=tool_call_id,
-            metadata=metadata or {},
+            extra_data=metadata or {},
             token_count=token_count,
         )
         self.db.add(message)
+        # 主键与时间戳均为 Python 侧默认值，flush 后即完整，无需 refresh 回读
         await self.db.flush()
-        await self.db.refresh(message)
         return message
 
+    async def create_many(self, messages: Sequence[NewMessage]) -> None:
+        """批量创建消息"""
+        if not messages:
+            return
+        rows = []
+        for item in messages:
+            row = Message(
+                session_id=item.session_id,
+                role=item.role,
+                content=item.content,
+                extra_data=item.metadata or {},
+                token_count=item.token_count,
+            )
+            if item.created_at is not None:
+                row.created_at = item.created_at
+                row.updated_at = item.created_at
+            rows.append(row)
+        self.db.add_all(rows)
+        await self.db.flush()
+
     async def find_by_session(
         self,
         session_id: uuid.UUID,
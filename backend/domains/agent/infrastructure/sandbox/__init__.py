@@ -5,6 +5,7 @@ Sandbox - 沙箱执行系统
 - DockerExecutor: Docker 容器隔离执行（无状态，每次新容器）
 - PersistentDockerExecutor: 持久化 Docker 执行器（状态保持，支持持久化卷）
 - LocalExecutor: 本地直接执行（仅开发环境）
+- OutputBuffer: 头尾截断的有界输出缓冲（流式执行）
 - ExecutorFactory: 根据配置创建正确的执行器
 - SandboxManager: 沙箱生命周期管理
 - SandboxExecutorFactory: 沙箱执行器工厂协议（依赖注入）
@@ -17,6 +18,8 @@ from domains.agent.infrastructure.sandbox.executor import (
     DockerExecutor,
     ExecutionResult,
     LocalExecutor,
+    OutputBuffer,
+    OutputCallback,
     PersistentDockerExecutor,
     SandboxConfig,
     SandboxExecutor,
@@ -48,6 +51,8 @@ __all__ = [
     "ExecutorFactory",
     "LocalExecutor",
     "MockSandboxExecutorFactory",
+    "OutputBuffer",
+    "OutputCallback",
     "PersistentDockerExecutor",
     "SandboxConfig",
     "SandboxContext",
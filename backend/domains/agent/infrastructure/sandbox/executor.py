@@ -5,15 +5,23 @@ Sandbox Executor - 沙箱执行器
 - Docker 隔离
 - 资源限制
 - 超时控制
+- 流式输出（stdout/stderr 分块回调，头尾截断的有界缓冲）
 """
 
 from abc import ABC, abstractmethod
 import asyncio
+import codecs
+from collections import deque
+from collections.abc import Awaitable, Callable
 import contextlib
+import os
 from pathlib import Path
+import signal
 import subprocess
 import tempfile
+import threading
 import time
+from typing import IO
 import uuid
 
 from pydantic import BaseModel
@@ -22,6 +30,184 @@ from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
+# 流式输出回调：(stream, text)，stream 为 "stdout" 或 "stderr"
+OutputCallback = Callable[[str, str], None]
+
+# 单个输出流的缓冲上限（字符）；超出时保留头尾、截断中间
+DEFAULT_MAX_OUTPUT_CHARS = 64_000
+_READ_CHUNK_BYTES = 64 * 1024
+# 进程被终止后等待其退出的时间（秒）
+_KILL_WAIT_SECONDS = 5
+
+# docker exec 注入的执行标识；取消时据此找到并终止容器内整棵进程树
+_EXEC_ID_ENV = "SANDBOX_EXEC_ID"
+
+
+class OutputBuffer:
+    """有界输出缓冲：保留前一半与后一半字符，中间部分丢弃并计数"""
+
+    def __init__(self, max_chars: int = DEFAULT_MAX_OUTPUT_CHARS) -> None:
+        self.head_chars = max_chars // 2
+        self.tail_chars = max_chars - self.head_chars
+        self._head: list[str] = []
+        self._head_len = 0
+        self._tail: deque[str] = deque()
+        self._tail_len = 0
+        self.dropped = 0
+
+    def append(self, text: str) -> None:
+        room = self.head_chars - self._head_len
+        if room > 0:
+            head = text[:room]
+            self._head.append(head)
+            self._head_len += len(head)
+            text = text[room:]
+        if not text:
+            return
+        self._tail.append(text)
+        self._tail_len += len(text)
+        excess = self._tail_len - self.tail_chars
+        while excess > 0:
+            first = self._tail[0]
+            if len(first) <= excess:
+                self._tail.popleft()
+                cut = len(first)
+            else:
+                self._tail[0] = first[excess:]
+                cut = excess
+            self._tail_len -= cut
+            self.dropped += cut
+            excess -= cut
+
+    def getvalue(self) -> str:
+        head = "".join(self._head)
+        tail = "".join(self._tail)
+        if not self.dropped:
+            return head + tail
+        return f"{head}\n... [已截断 {self.dropped} 个字符] ...\n{tail}"
+
+
+def _format_error(e: Exception) -> str:
+    return f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
+
+
+def _kill_process_tree(proc: subprocess.Popen[bytes]) -> None:
+    """终止子进程；POSIX 下子进程独占进程组，整组终止"""
+    with contextlib.suppress(ProcessLookupError, PermissionError, OSError):
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+
+
+async def _terminate(
+    proc: subprocess.Popen[bytes],
+    abort: Callable[[], Awaitable[None]] | None,
+) -> None:
+    _kill_process_tree(proc)
+    if abort is not None:
+        try:
+            await abort()
+        except Exception:
+            logger.warning("Sandbox abort hook failed", exc_info=True)
+    with contextlib.suppress(subprocess.TimeoutExpired):
+        await asyncio.to_thread(proc.wait, _KILL_WAIT_SECONDS)
+
+
+async def stream_subprocess(
+    cmd: str | list[str],
+    *,
+    timeout: int,
+    on_output: OutputCallback | None = None,
+    max_output_chars: int = DEFAULT_MAX_OUTPUT_CHARS,
+    shell: bool = False,
+    cwd: str | None = None,
+    env: dict[str, str] | None = None,
+    abort: Callable[[], Awaitable[None]] | None = None,
+) -> tuple[int, str, str, str | None]:
+    """
+    运行子进程并流式读取输出
+
+    读取在线程中进行（与 subprocess.run + to_thread 一样兼容 Windows 事件循环），
+    每个分块先写入有界缓冲，再交给 on_output；实时转发的总量同样以 max_output_chars 为上限。
+    超时或任务被取消时终止进程（并调用 abort 清理容器侧进程），取消会继续向上传播。
+
+    Returns:
+        (returncode, stdout, stderr, error)
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[tuple[str, str | None]] = asyncio.Queue()
+    buffers = {"stdout": OutputBuffer(max_output_chars), "stderr": OutputBuffer(max_output_chars)}
+
+    try:
+        proc = subprocess.Popen(  # pylint: disable=consider-using-with
+            cmd,
+            shell=shell,
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=os.name == "posix",
+        )
+    except Exception as e:
+        return (-1, "", "", _format_error(e))
+
+    def pump(name: str, pipe: IO[bytes]) -> None:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        try:
+            with pipe:
+                while chunk := pipe.read1(_READ_CHUNK_BYTES):  # type: ignore[attr-defined]
+                    if text := decoder.decode(chunk):
+                        loop.call_soon_threadsafe(queue.put_nowait, (name, text))
+            if text := decoder.decode(b"", final=True):
+                loop.call_soon_threadsafe(queue.put_nowait, (name, text))
+        except (OSError, ValueError):
+            pass
+        finally:
+            with contextlib.suppress(RuntimeError):  # 事件循环已关闭
+                loop.call_soon_threadsafe(queue.put_nowait, (name, None))
+
+    for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr)):
+        threading.Thread(target=pump, args=(name, pipe), daemon=True).start()
+
+    streamed = 0
+
+    def forward(name: str, text: str) -> None:
+        nonlocal streamed
+        if on_output is None or streamed >= max_output_chars:
+            return
+        piece = text[: max_output_chars - streamed]
+        streamed += len(piece)
+        if streamed >= max_output_chars:
+            piece += "\n... [输出过长，后续实时输出已省略] ...\n"
+        try:
+            on_output(name, piece)
+        except Exception:
+            logger.warning("Sandbox output callback failed", exc_info=True)
+
+    error: str | None = None
+    try:
+        async with asyncio.timeout(timeout):
+            open_streams = 2
+            while open_streams:
+                name, text = await queue.get()
+                if text is None:
+                    open_streams -= 1
+                    continue
+                buffers[name].append(text)
+                forward(name, text)
+            returncode = await asyncio.to_thread(proc.wait)
+    except TimeoutError:
+        await _terminate(proc, abort)
+        returncode = -1
+        error = f"Execution timed out after {timeout} seconds"
+    except asyncio.CancelledError:
+        await asyncio.shield(_terminate(proc, abort))
+        raise
+
+    return (returncode, buffers["stdout"].getvalue(), buffers["stderr"].getvalue(), error)
+
 
 class ExecutionResult(BaseModel):
     """执行结果"""
@@ -42,6 +228,7 @@ class SandboxConfig(BaseModel):
     cpu_limit: float = 1.0
     network_enabled: bool = False
     read_only_root: bool = True
+    max_output_chars: int = DEFAULT_MAX_OUTPUT_CHARS
 
 
 class SandboxExecutor(ABC):
@@ -52,8 +239,9 @@ class SandboxExecutor(ABC):
         self,
         code: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
-        """执行 Python 代码"""
+        """执行 Python 代码；on_output 在 stdout/stderr 分块到达时被调用"""
         ...
 
     @abstractmethod
@@ -61,8 +249,9 @@ class SandboxExecutor(ABC):
         self,
         command: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
-        """执行 Shell 命令"""
+        """执行 Shell 命令；on_output 在 stdout/stderr 分块到达时被调用"""
         ...
 
 
@@ -85,6 +274,7 @@ class DockerExecutor(SandboxExecutor):
         self,
         code: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
         """
         在 Docker 容器中执行 Python 代码
@@ -92,6 +282,7 @@ class DockerExecutor(SandboxExecutor):
         Args:
             code: Python 代码
             config: 沙箱配置
+            on_output: 流式输出回调
 
         Returns:
             ExecutionResult: 执行结果
@@ -119,7 +310,7 @@ class DockerExecutor(SandboxExecutor):
                 config=config,
             )
 
-            return await self._run_container(cmd, config.timeout_seconds)
+            return await self._run_container(cmd, config, on_output)
 
         finally:
             # 清理临时文件
@@ -129,6 +320,7 @@ class DockerExecutor(SandboxExecutor):
         self,
         command: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
         """
         在 Docker 容器中执行 Shell 命令
@@ -136,6 +328,7 @@ class DockerExecutor(SandboxExecutor):
         Args:
             command: Shell 命令
             config: 沙箱配置
+            on_output: 流式输出回调
 
         Returns:
             ExecutionResult: 执行结果
@@ -151,7 +344,7 @@ class DockerExecutor(SandboxExecutor):
         )
 
         logger.debug("Docker shell command: %s", " ".join(cmd))
-        return await self._run_container(cmd, config.timeout_seconds)
+        return await self._run_container(cmd, config, on_output)
 
     def _build_docker_command(
         self,
@@ -176,6 +369,8 @@ class DockerExecutor(SandboxExecutor):
         # 设置 UTF-8 环境变量，确保容器内输出正确的编码
         cmd.extend(["-e", "LANG=C.UTF-8"])
         cmd.extend(["-e", "LC_ALL=C.UTF-8"])
+        # 关闭 Python 输出缓冲，stdout 才能流式送达
+        cmd.extend(["-e", "PYTHONUNBUFFERED=1"])
 
         # 网络隔离
         if not config.network_enabled:
@@ -200,33 +395,32 @@ class DockerExecutor(SandboxExecutor):
     async def _run_container(
         self,
         cmd: list[str],
-        timeout: int,
+        config: SandboxConfig,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
         """运行 Docker 容器
 
-        使用 subprocess.run 在线程池中执行，以兼容 Windows 平台
+        流式读取输出；超时或取消时 ``docker rm -f`` 移除容器（仅杀 docker CLI 不会停止容器）
         """
         start_time = time.time()
+        container_name = cmd[cmd.index("--name") + 1]
 
-        def run() -> tuple[int, str, str, str | None]:
-            try:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    timeout=timeout,
-                    text=True,
-                    encoding="utf-8",
-                    errors="replace",  # 替换无法解码的字符，避免崩溃
-                    check=False,
-                )
-                return (result.returncode, result.stdout, result.stderr, None)
-            except subprocess.TimeoutExpired:
-                return (-1, "", "", f"Execution timed out after {timeout} seconds")
-            except Exception as e:
-                error_msg = f"{type(e).__name__}: {e}" if str(e) else type(e).__name__
-                return (-1, "", "", error_msg)
-
-        returncode, stdout, stderr, error = await asyncio.to_thread(run)
+        async def remove_container() -> None:
+            await asyncio.to_thread(
+                subprocess.run,
+                ["docker", "rm", "-f", container_name],
+                capture_output=True,
+                check=False,
+                timeout=PersistentDockerExecutor.DOCKER_RM_TIMEOUT_SECONDS,
+            )
+
+        returncode, stdout, stderr, error = await stream_subprocess(
+            cmd,
+            timeout=config.timeout_seconds,
+            on_output=on_output,
+            max_output_chars=config.max_output_chars,
+            abort=remove_container,
+        )
         duration_ms = int((time.time() - start_time) * 1000)
 
         return ExecutionResult(
@@ -560,6 +754,7 @@ class PersistentDockerExecutor(SandboxExecutor):
         self,
         code: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
         """在沙箱容器中执行 Python 代码"""
         if not self._container_id:
@@ -571,31 +766,53 @@ class PersistentDockerExecutor(SandboxExecutor):
         await self._exec_in_container(write_cmd, config)
 
         # 执行代码
-        return await self._exec_in_container("python /tmp/script.py", config)
+        return await self._exec_in_container("python /tmp/script.py", config, on_output)
 
     async def execute_shell(
         self,
         command: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
         """在沙箱容器中执行 Shell 命令"""
         if not self._container_id:
             await self.start(config)
 
-        return await self._exec_in_container(command, config)
+        return await self._exec_in_container(command, config, on_output)
+
+    async def _kill_exec(self, container_name: str, exec_id: str) -> None:
+        """终止容器内带有该执行标识的全部进程（环境变量会被子进程继承）"""
+        script = (
+            "for p in /proc/[0-9]*; do "
+            f'grep -qs "{_EXEC_ID_ENV}={exec_id}" "$p/environ" && kill -KILL "${{p#/proc/}}"; '
+            "done; true"
+        )
+        await asyncio.to_thread(
+            subprocess.run,
+            ["docker", "exec", container_name, "sh", "-c", script],
+            capture_output=True,
+            check=False,
+            timeout=self.DOCKER_RM_TIMEOUT_SECONDS,
+        )
 
     async def _exec_in_container(
         self,
         command: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
-        """在运行中的容器内执行命令"""
+        """在运行中的容器内执行命令
+
+        流式读取输出；超时或取消时除了终止 docker exec 客户端，还会按执行标识
+        终止容器内的进程树，避免命令在容器里继续运行。
+        """
         config = config or SandboxConfig()
         container_name = f"sandbox-{self._sandbox_id}"
 
         # 更新最后活动时间
         self._last_activity = time.time()
 
+        exec_id = uuid.uuid4().hex
         cmd = [
             "docker",
             "exec",
@@ -605,6 +822,10 @@ class PersistentDockerExecutor(SandboxExecutor):
             "LANG=C.UTF-8",
             "-e",
             "LC_ALL=C.UTF-8",
+            "-e",
+            "PYTHONUNBUFFERED=1",
+            "-e",
+            f"{_EXEC_ID_ENV}={exec_id}",
             container_name,
             "sh",
             "-c",
@@ -613,24 +834,13 @@ class PersistentDockerExecutor(SandboxExecutor):
 
         start_time = time.time()
 
-        def run() -> tuple[int, str, str, str | None]:
-            try:
-                result = subprocess.run(
-                    cmd,
-                    capture_output=True,
-                    timeout=config.timeout_seconds,
-                    text=True,
-                    encoding="utf-8",
-                    errors="replace",  # 替换无法解码的字符，避免崩溃
-                    check=False,
-                )
-                return (result.returncode, result.stdout, result.stderr, None)
-            except subprocess.TimeoutExpired:
-                return (-1, "", "", f"Execution timed out after {config.timeout_seconds} seconds")
-            except Exception as e:
-                return (-1, "", "", str(e))
-
-        returncode, stdout, stderr, error = await asyncio.to_thread(run)
+        returncode, stdout, stderr, error = await stream_subprocess(
+            cmd,
+            timeout=config.timeout_seconds,
+            on_output=on_output,
+            max_output_chars=config.max_output_chars,
+            abort=lambda: self._kill_exec(container_name, exec_id),
+        )
         duration_ms = int((time.time() - start_time) * 1000)
 
         return ExecutionResult(
@@ -686,6 +896,7 @@ class LocalExecutor(SandboxExecutor):
         self,
         code: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
         """执行 Python 代码 (本地)"""
         config = config or SandboxConfig()
@@ -703,12 +914,12 @@ class LocalExecutor(SandboxExecutor):
         code_file = await asyncio.to_thread(create_temp_file)
 
         try:
-            # 使用同步方式执行以兼容 Windows
-            result = await self._run_subprocess_sync(
+            return await self._run_subprocess(
                 ["python", code_file],
-                config.timeout_seconds,
+                config,
+                on_output,
+                env={**os.environ, "PYTHONUNBUFFERED": "1"},
             )
-            return result
 
         finally:
             Path(code_file).unlink(missing_ok=True)
@@ -717,49 +928,37 @@ class LocalExecutor(SandboxExecutor):
         self,
         command: str,
         config: SandboxConfig | None = None,
+        on_output: OutputCallback | None = None,
     ) -> ExecutionResult:
         """执行 Shell 命令 (本地)"""
         config = config or SandboxConfig()
-        return await self._run_subprocess_sync(
-            command,
-            config.timeout_seconds,
-            shell=True,
-        )
+        return await self._run_subprocess(command, config, on_output, shell=True)
 
-    async def _run_subprocess_sync(
+    async def _run_subprocess(
         self,
         cmd: str | list[str],
-        timeout: int,
+        config: SandboxConfig,
+        on_output: OutputCallback | None = None,
         *,
         shell: bool = False,
+        env: dict[str, str] | None = None,
     ) -> ExecutionResult:
         """
-        在线程池中运行同步子进程
+        运行子进程并流式读取输出
 
-        这种方式在所有平台上都能工作，包括 Windows
+        读取在线程中进行，在所有平台上都能工作，包括 Windows
         """
         start_time = time.time()
 
-        def run() -> tuple[int, str, str, str | None]:
-            try:
-                result = subprocess.run(
-                    cmd,
-                    shell=shell,
-                    capture_output=True,
-                    timeout=timeout,
-                    cwd=self.work_dir,
-                    text=True,
-                    encoding="utf-8",
-                    errors="replace",  # 替换无法解码的字符，避免崩溃
-                    check=False,
-                )
-                return (result.returncode, result.stdout, result.stderr, None)
-            except subprocess.TimeoutExpired:
-                return (-1, "", "", f"Execution timed out after {timeout} seconds")
-            except Exception as e:
-                return (-1, "", "", str(e))
-
-        returncode, stdout, stderr, error = await asyncio.to_thread(run)
+        returncode, stdout, stderr, error = await stream_subprocess(
+            cmd,
+            timeout=config.timeout_seconds,
+            on_output=on_output,
+            max_output_chars=config.max_output_chars,
+            shell=shell,
+            cwd=self.work_dir,
+            env=env,
+        )
         duration_ms = int((time.time() - start_time) * 1000)
 
         return ExecutionResult(
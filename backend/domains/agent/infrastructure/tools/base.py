@@ -10,6 +10,7 @@ from typing import Any, ClassVar
 from pydantic import BaseModel
 
 from domains.agent.domain.types import ToolCategory, ToolResult
+from domains.agent.infrastructure.tools.result_cache import ToolCacheScope
 
 
 class ToolParameters(BaseModel):
@@ -31,6 +32,11 @@ class BaseTool(ABC):
     category: ClassVar[ToolCategory] = ToolCategory.SYSTEM
     requires_confirmation: ClassVar[bool] = False
 
+    # 结果缓存 (仅幂等、无副作用的工具可开启；见 result_cache)
+    cacheable: ClassVar[bool] = False
+    cache_scope: ClassVar[ToolCacheScope] = ToolCacheScope.SESSION
+    cache_ttl_seconds: ClassVar[int] = 0
+
     # 参数模型 (可选)
     parameters_model: ClassVar[type[ToolParameters] | None] = None
 
@@ -17,6 +17,7 @@ from domains.agent.domain.types import ToolCategory, ToolResult
 from domains.agent.infrastructure.sandbox.executor import SandboxConfig as SandboxExecConfig
 from domains.agent.infrastructure.sandbox.factory import ExecutorFactory
 from domains.agent.infrastructure.tools.base import BaseTool, ToolParameters, register_tool
+from domains.agent.infrastructure.tools.progress import get_tool_progress_reporter
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -94,10 +95,11 @@ class RunShellTool(BaseTool):
                 params.command[:100],
             )
 
-            # 在沙箱中执行
+            # 在沙箱中执行（输出分块经进度回调实时推送）
             result = await executor.execute_shell(
                 command=params.command,
                 config=sandbox_config,
+                on_output=get_tool_progress_reporter(),
             )
 
             # 转换为 ToolResult
@@ -192,10 +194,11 @@ class RunPythonTool(BaseTool):
                 self.execution_config.sandbox.mode if self.execution_config else "local",
             )
 
-            # 在沙箱中执行
+            # 在沙箱中执行（输出分块经进度回调实时推送）
             result = await executor.execute_python(
                 code=params.code,
                 config=sandbox_config,
+                on_output=get_tool_progress_reporter(),
             )
 
             # 转换为 ToolResult
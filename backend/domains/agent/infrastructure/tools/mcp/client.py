@@ -153,6 +153,11 @@ class MCPClient:
                 tool_info["inputSchema"] = tool.args_schema.model_json_schema()
             else:
                 tool_info["inputSchema"] = {"type": "object", "properties": {}}
+            # 工具注解（readOnlyHint 等），langchain-mcp-adapters 放在 metadata 中
+            if isinstance(tool.metadata, dict):
+                tool_info["annotations"] = {
+                    k: v for k, v in tool.metadata.items() if k.endswith("Hint")
+                }
             tools_info.append(tool_info)
 
         return tools_info
@@ -429,6 +434,11 @@ async def test_mcp_connection(
                 tool_info["inputSchema"] = tool.args_schema.model_json_schema()
             else:
                 tool_info["inputSchema"] = {"type": "object", "properties": {}}
+            # 工具注解（readOnlyHint 等），langchain-mcp-adapters 放在 metadata 中
+            if isinstance(tool.metadata, dict):
+                tool_info["annotations"] = {
+                    k: v for k, v in tool.metadata.items() if k.endswith("Hint")
+                }
             tools_info.append(tool_info)
 
         logger.info("MCP connection test successful: %s, found %d tools", url, len(tools_info))
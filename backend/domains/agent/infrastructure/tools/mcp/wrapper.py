@@ -10,6 +10,7 @@ from typing import TYPE_CHECKING, Any
 
 from domains.agent.domain.types import ToolCategory, ToolResult
 from domains.agent.infrastructure.tools.base import BaseTool
+from domains.agent.infrastructure.tools.result_cache import ToolCacheScope
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -17,6 +18,9 @@ if TYPE_CHECKING:
 
 logger = get_logger(__name__)
 
+# 声明 readOnlyHint 的 MCP 工具按用户缓存的时长（服务端数据可能随时变化，取短 TTL）
+MCP_READ_ONLY_CACHE_TTL_SECONDS = 60
+
 
 class MCPToolWrapper(BaseTool):
     """
@@ -33,6 +37,9 @@ class MCPToolWrapper(BaseTool):
     description: str = ""
     category: ToolCategory = ToolCategory.EXTERNAL
     requires_confirmation: bool = False
+    cacheable: bool = False
+    cache_scope: ToolCacheScope = ToolCacheScope.USER
+    cache_ttl_seconds: int = 0
 
     def __init__(
         self,
@@ -78,6 +85,21 @@ class MCPToolWrapper(BaseTool):
 
         self.category = ToolCategory.EXTERNAL
 
+        # MCP 工具注解 readOnlyHint=true 表示无副作用，可按用户缓存结果
+        # （MCP 服务端凭据通常按用户配置，不跨用户共享）
+        if self._read_only_hint(langchain_tool):
+            self.cacheable = True
+            self.cache_ttl_seconds = MCP_READ_ONLY_CACHE_TTL_SECONDS
+
+    def _read_only_hint(self, tool: LangChainBaseTool | None) -> bool:
+        """从 LangChain 工具 metadata 或 MCP 工具定义的 annotations 读取 readOnlyHint"""
+        annotations: dict[str, Any] = {}
+        if tool is not None and isinstance(tool.metadata, dict):
+            annotations = tool.metadata
+        elif isinstance(self._tool_schema.get("annotations"), dict):
+            annotations = self._tool_schema["annotations"]
+        return annotations.get("readOnlyHint") is True
+
     def _init_schema_from_langchain_tool(self, tool: LangChainBaseTool) -> None:
         """从 LangChain 工具初始化参数 schema。"""
         if hasattr(tool, "args_schema") and tool.args_schema:
@@ -0,0 +1,29 @@
+"""
+Tool Progress - 工具执行进度上下文
+
+通过 contextvars 把当前工具调用的进度回调传给工具实现（如沙箱执行的流式输出），
+由 Agent 引擎在执行单个工具调用时设置，工具内部只需取出并调用。
+"""
+
+from collections.abc import Callable
+from contextvars import ContextVar, Token
+
+# 进度回调：(stream, content)，stream 如 "stdout" / "stderr"
+ToolProgressReporter = Callable[[str, str], None]
+
+tool_progress_var: ContextVar[ToolProgressReporter | None] = ContextVar(
+    "tool_progress",
+    default=None,
+)
+
+
+def set_tool_progress_reporter(
+    reporter: ToolProgressReporter | None,
+) -> Token[ToolProgressReporter | None]:
+    """设置当前工具调用的进度回调，返回 token 用于 finally 中 reset"""
+    return tool_progress_var.set(reporter)
+
+
+def get_tool_progress_reporter() -> ToolProgressReporter | None:
+    """获取当前工具调用的进度回调（不在 Agent 工具调用中时为 None）"""
+    return tool_progress_var.get()
@@ -0,0 +1,284 @@
+"""
+Tool Result Cache - 幂等工具结果缓存
+
+工具通过类属性声明可缓存性（``cacheable`` / ``cache_scope`` / ``cache_ttl_seconds``），
+Agent 引擎执行工具调用时经本模块查缓存：
+1. 键 - (作用域, 工具名, 规范化参数 JSON) 的 SHA-256；作用域为会话 / 用户 / 全局
+2. 存储 - 进程内 L1（LRU + TTL）+ Redis L2（跨 worker 共享）；Redis 不可用时仅用 L1
+3. 合并 - 同一键的并发调用（如同一轮 gather 里的重复调用）只执行一次
+4. 指标 - ``cache_requests_total{cache="agent_tool"}`` 与按工具的 ``agent_tool_cache_total``
+
+只缓存成功结果；未声明 cacheable 或需要人工确认的工具永不缓存。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from enum import StrEnum
+import hashlib
+import json
+import time
+from typing import TYPE_CHECKING, Any
+
+from domains.agent.domain.types import ToolResult
+from libs.observability.metrics import get_metrics_collector, record_cache_lookup
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Mapping
+
+    from domains.agent.infrastructure.tools.base import BaseTool
+
+logger = get_logger(__name__)
+
+_metrics = get_metrics_collector()
+
+_REDIS_KEY_PREFIX = "agent:tool_cache:"
+_LOCAL_MAX_ENTRIES = 1024
+
+
+class ToolCacheScope(StrEnum):
+    """缓存作用域：结果在谁之间共享"""
+
+    SESSION = "session"  # 同一会话内（含跨轮次）
+    USER = "user"  # 同一用户的所有会话
+    GLOBAL = "global"  # 所有用户（仅用于公开查询）
+
+
+def canonical_arguments(arguments: Mapping[str, Any]) -> str:
+    """参数规范化：键排序、紧凑分隔，保证等价参数得到相同文本"""
+    return json.dumps(
+        arguments, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    )
+
+
+def _scope_owner(scope: ToolCacheScope, *, user_id: str, session_id: str) -> str | None:
+    if scope is ToolCacheScope.GLOBAL:
+        return "*"
+    if scope is ToolCacheScope.USER:
+        return f"u:{user_id}" if user_id else None
+    return f"s:{session_id}" if session_id else None
+
+
+def tool_cache_key(
+    tool_name: str,
+    arguments: Mapping[str, Any],
+    scope: ToolCacheScope,
+    *,
+    user_id: str = "",
+    session_id: str = "",
+) -> str | None:
+    """缓存键；作用域所需的用户 / 会话标识缺失时返回 None（不缓存）"""
+    owner = _scope_owner(scope, user_id=user_id, session_id=session_id)
+    if owner is None:
+        return None
+    digest = hashlib.sha256(
+        f"{owner}\0{tool_name}\0{canonical_arguments(arguments)}".encode()
+    ).hexdigest()
+    return f"{scope.value}:{digest}"
+
+
+def is_cacheable(tool: BaseTool | None) -> bool:
+    return (
+        tool is not None
+        and getattr(tool, "cacheable", False) is True
+        and not getattr(tool, "requires_confirmation", False)
+        and int(getattr(tool, "cache_ttl_seconds", 0) or 0) > 0
+    )
+
+
+async def _get_redis_client() -> Any:
+    try:
+        from libs.db.redis import get_redis_client
+
+        return await get_redis_client()
+    except Exception:
+        return None
+
+
+class ToolResultCache:
+    """两级工具结果缓存 + 并发调用合并"""
+
+    def __init__(self, *, max_entries: int = _LOCAL_MAX_ENTRIES, use_redis: bool = True) -> None:
+        self._max_entries = max_entries
+        self._use_redis = use_redis
+        self._local: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Future[ToolResult]] = {}
+
+    # ------------------------------------------------------------------
+    # L1 / Redis
+    # ------------------------------------------------------------------
+
+    def _get_local(self, key: str) -> str | None:
+        hit = self._local.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() >= hit[1]:
+            self._local.pop(key, None)
+            return None
+        self._local.move_to_end(key)
+        return hit[0]
+
+    def _put_local(self, key: str, encoded: str, ttl_seconds: float) -> None:
+        self._local[key] = (encoded, time.monotonic() + ttl_seconds)
+        self._local.move_to_end(key)
+        while len(self._local) > self._max_entries:
+            self._local.popitem(last=False)
+
+    async def _get_redis(self, key: str) -> str | None:
+        if not self._use_redis:
+            return None
+        redis = await _get_redis_client()
+        if redis is None:
+            return None
+        try:
+            raw = await redis.get(f"{_REDIS_KEY_PREFIX}{key}")
+        except Exception:
+            logger.warning("Redis tool cache read failed", exc_info=True)
+            return None
+        if raw is None:
+            return None
+        return raw.decode() if isinstance(raw, bytes) else str(raw)
+
+    async def _put_redis(self, key: str, encoded: str, ttl_seconds: int) -> None:
+        if not self._use_redis:
+            return
+        redis = await _get_redis_client()
+        if redis is None:
+            return
+        try:
+            await redis.set(f"{_REDIS_KEY_PREFIX}{key}", encoded, ex=ttl_seconds)
+        except Exception:
+            logger.warning("Redis tool cache write failed", exc_info=True)
+
+    async def _lookup(self, key: str, ttl_seconds: int) -> ToolResult | None:
+        encoded = self._get_local(key)
+        if encoded is None:
+            encoded = await self._get_redis(key)
+            if encoded is None:
+                return None
+            # Redis 命中回填 L1；剩余 TTL 未知，按完整 TTL 的上限处理
+            self._put_local(key, encoded, ttl_seconds)
+        try:
+            return ToolResult.model_validate_json(encoded)
+        except ValueError:
+            self._local.pop(key, None)
+            return None
+
+    # ------------------------------------------------------------------
+    # 对外接口
+    # ------------------------------------------------------------------
+
+    async def _join(
+        self,
+        pending: asyncio.Future[ToolResult],
+        execute: Callable[[], Awaitable[ToolResult]],
+        tags: dict[str, str],
+    ) -> ToolResult:
+        """等待同键的进行中调用；其被取消（如发起方客户端断开）时自行执行"""
+        _metrics.increment("agent_tool_cache_total", tags={**tags, "result": "coalesced"})
+        record_cache_lookup("agent_tool", hit=True)
+        try:
+            return await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            task = asyncio.current_task()
+            if pending.cancelled() and not (task is not None and task.cancelling()):
+                return await execute()
+            raise
+
+    async def run(
+        self,
+        tool: BaseTool | None,
+        arguments: Mapping[str, Any],
+        execute: Callable[[], Awaitable[ToolResult]],
+        *,
+        user_id: str = "",
+        session_id: str = "",
+    ) -> ToolResult:
+        """执行工具调用；可缓存时先查缓存，并合并同键的并发调用"""
+        if tool is None or not is_cacheable(tool):
+            return await execute()
+
+        key = tool_cache_key(
+            tool.name,
+            arguments,
+            ToolCacheScope(getattr(tool, "cache_scope", ToolCacheScope.SESSION)),
+            user_id=user_id,
+            session_id=session_id,
+        )
+        if key is None:
+            return await execute()
+
+        ttl_seconds = int(tool.cache_ttl_seconds)
+        tags = {"tool": tool.name}
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await self._join(pending, execute, tags)
+
+        cached = await self._lookup(key, ttl_seconds)
+        if cached is not None:
+            _metrics.increment("agent_tool_cache_total", tags={**tags, "result": "hit"})
+            record_cache_lookup("agent_tool", hit=True)
+            return cached
+
+        # 查 Redis 期间可能已有同键调用开始执行
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await self._join(pending, execute, tags)
+
+        _metrics.increment("agent_tool_cache_total", tags={**tags, "result": "miss"})
+        record_cache_lookup("agent_tool", hit=False)
+        future: asyncio.Future[ToolResult] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await execute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # 已在此处抛出，避免无人等待时告警
+            raise
+        else:
+            future.set_result(result)
+        finally:
+            self._inflight.pop(key, None)
+
+        if result.success:
+            encoded = result.model_dump_json()
+            self._put_local(key, encoded, ttl_seconds)
+            await self._put_redis(key, encoded, ttl_seconds)
+        return result
+
+    def clear(self) -> None:
+        self._local.clear()
+        self._inflight.clear()
+
+
+# 进程级共享缓存；引擎按请求创建，缓存需跨请求存活
+_shared_cache: ToolResultCache | None = None
+
+
+def get_tool_result_cache() -> ToolResultCache:
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = ToolResultCache()
+    return _shared_cache
+
+
+def clear_tool_result_cache_for_tests() -> None:
+    if _shared_cache is not None:
+        _shared_cache.clear()
+
+
+__all__ = [
+    "ToolCacheScope",
+    "ToolResultCache",
+    "canonical_arguments",
+    "clear_tool_result_cache_for_tests",
+    "get_tool_result_cache",
+    "is_cacheable",
+    "tool_cache_key",
+]
@@ -6,12 +6,13 @@ import asyncio
 from pathlib import Path
 from typing import Any
 
-import httpx
 from pydantic import Field
 
 from bootstrap.config import settings
 from domains.agent.domain.types import ToolCategory, ToolResult
 from domains.agent.infrastructure.tools.base import BaseTool, ToolParameters, register_tool
+from domains.agent.infrastructure.tools.result_cache import ToolCacheScope
+from domains.agent.infrastructure.tools.web_search_client import cached_search, get_json
 
 
 class WebSearchParams(ToolParameters):
@@ -40,14 +41,21 @@ class WebSearchTool(BaseTool):
     requires_confirmation = False
     parameters_model = WebSearchParams
 
+    # 公开搜索结果与用户无关，全局共享短期缓存
+    cacheable = True
+    cache_scope = ToolCacheScope.GLOBAL
+    cache_ttl_seconds = 300
+
     async def execute(self, **kwargs: Any) -> ToolResult:
         params = WebSearchParams(**kwargs)
 
         try:
-            # 使用 DuckDuckGo 搜索 (无需 API Key)
-            results = await self._duckduckgo_search(
+            # 使用 DuckDuckGo 搜索 (无需 API Key)；规范化查询命中短期缓存时不访问上游
+            results = await cached_search(
+                "duckduckgo",
                 params.query,
                 params.num_results,
+                self._duckduckgo_search,
             )
 
             if not results:
@@ -81,19 +89,14 @@ class WebSearchTool(BaseTool):
         num_results: int,
     ) -> list[dict[str, str]]:
         """使用 DuckDuckGo 搜索"""
-        # DuckDuckGo Instant Answer API
-        url = "https://api.duckduckgo.com/"
+        # DuckDuckGo Instant Answer API（共享长连接池，受 provider 并发上限约束）
         params = {
             "q": query,
             "format": "json",
             "no_html": "1",
             "skip_disambig": "1",
         }
-
-        async with httpx.AsyncClient(timeout=30) as client:
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        data = await get_json("duckduckgo", settings.web_search_duckduckgo_url, params)
 
         results = []
 
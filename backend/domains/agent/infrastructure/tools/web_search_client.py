@@ -0,0 +1,149 @@
+"""
+Web Search Client - 搜索工具的长连接 HTTP 客户端
+
+WebSearchTool 的上游访问层：
+1. 连接 - 按 provider 复用 httpx.AsyncClient（HTTP/2 + keepalive），由应用 lifespan 关闭
+2. 并发 - 每个 provider 一个信号量，限制同时进行的上游请求，避免并行工具调用触发限流
+3. 缓存 - 规范化查询（大小写 / 空白）的短 TTL 进程内结果缓存
+
+client 与信号量绑定创建时的 event loop，检测到 loop 切换时重建（同 gateway 上游客户端池）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import importlib.util
+import time
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from bootstrap.config import settings
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+SearchResults = list[dict[str, str]]
+
+logger = get_logger(__name__)
+
+_DEFAULT_TIMEOUT = httpx.Timeout(connect=10.0, read=30.0, write=10.0, pool=30.0)
+
+# HTTP/2 依赖 h2（httpx[http2]）；未安装时退回 HTTP/1.1 keepalive
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+_RESULT_CACHE_MAX_ENTRIES = 256
+
+# provider -> client / semaphore / loop_id
+_clients: dict[str, httpx.AsyncClient] = {}
+_semaphores: dict[str, asyncio.Semaphore] = {}
+_loop_ids: dict[str, int] = {}
+_client_lock = asyncio.Lock()
+
+# (provider, 规范化查询, 结果数) -> (结果, 过期时间)
+_result_cache: OrderedDict[tuple[str, str, int], tuple[SearchResults, float]] = OrderedDict()
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=_DEFAULT_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=settings.web_search_max_connections,
+            max_keepalive_connections=settings.web_search_max_connections,
+            keepalive_expiry=60.0,
+        ),
+        follow_redirects=True,
+        http2=_HTTP2_AVAILABLE,
+    )
+
+
+async def _get_provider_state(provider: str) -> tuple[httpx.AsyncClient, asyncio.Semaphore]:
+    loop_id = id(asyncio.get_running_loop())
+    async with _client_lock:
+        client = _clients.get(provider)
+        if _loop_ids.get(provider) != loop_id or client is None or client.is_closed:
+            if client is not None and not client.is_closed:
+                await client.aclose()
+            client = _clients[provider] = _build_client()
+            _semaphores[provider] = asyncio.Semaphore(settings.web_search_max_concurrency)
+            _loop_ids[provider] = loop_id
+            logger.debug(
+                "Web search client created: provider=%s http2=%s", provider, _HTTP2_AVAILABLE
+            )
+        return client, _semaphores[provider]
+
+
+def normalize_query(query: str) -> str:
+    """查询规范化：折叠空白、忽略大小写"""
+    return " ".join(query.split()).casefold()
+
+
+def _get_cached(key: tuple[str, str, int]) -> SearchResults | None:
+    hit = _result_cache.get(key)
+    if hit is None:
+        return None
+    if time.monotonic() >= hit[1]:
+        _result_cache.pop(key, None)
+        return None
+    _result_cache.move_to_end(key)
+    return hit[0]
+
+
+def _put_cached(key: tuple[str, str, int], results: SearchResults) -> None:
+    ttl = settings.web_search_cache_ttl_seconds
+    if ttl <= 0:
+        return
+    _result_cache[key] = (results, time.monotonic() + ttl)
+    _result_cache.move_to_end(key)
+    while len(_result_cache) > _RESULT_CACHE_MAX_ENTRIES:
+        _result_cache.popitem(last=False)
+
+
+async def get_json(provider: str, url: str, params: dict[str, Any]) -> Any:
+    """经 provider 共享连接池与并发上限发起 GET 请求，返回 JSON"""
+    client, semaphore = await _get_provider_state(provider)
+    async with semaphore:
+        response = await client.get(url, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+async def cached_search(
+    provider: str,
+    query: str,
+    num_results: int,
+    fetch: Callable[[str, int], Awaitable[SearchResults]],
+) -> SearchResults:
+    """按规范化查询缓存 ``fetch(query, num_results)`` 的结果；空结果不缓存"""
+    key = (provider, normalize_query(query), num_results)
+    cached = _get_cached(key)
+    if cached is not None:
+        return list(cached)
+    results = await fetch(query, num_results)
+    if results:
+        _put_cached(key, results)
+    return results
+
+
+async def close_web_search_clients() -> None:
+    """关闭期清理；由 Agent shutdown 钩子调用"""
+    async with _client_lock:
+        for provider, client in list(_clients.items()):
+            if not client.is_closed:
+                await client.aclose()
+                logger.debug("Web search client closed: provider=%s", provider)
+        _clients.clear()
+        _semaphores.clear()
+        _loop_ids.clear()
+    _result_cache.clear()
+
+
+__all__ = [
+    "SearchResults",
+    "cached_search",
+    "close_web_search_clients",
+    "get_json",
+    "normalize_query",
+]
@@ -11,17 +11,30 @@ from domains.agent.infrastructure.llm.agent_llm_facade import AgentLlmFacade
 if TYPE_CHECKING:
     from pathlib import Path
 
-    from evaluation.gaia import GAIAEvaluator
-    from evaluation.llm_judge import JudgeScore, LLMJudge
+    from evaluation.gaia import GAIAEvaluator, GAIAReport
+    from evaluation.llm_judge import JudgeSample, JudgeScore, JudgeVerdictCache, LLMJudge
     from evaluation.task_completion import EvaluationReport
     from evaluation.tool_accuracy import ToolAccuracyEvaluator, ToolAccuracyReport
 
 
+# 进程内共享的裁判结论缓存（未指定缓存文件时使用）
+_judge_cache: JudgeVerdictCache | None = None
+
+
+def _shared_judge_cache() -> JudgeVerdictCache:
+    global _judge_cache
+    if _judge_cache is None:
+        from evaluation.llm_judge import JudgeVerdictCache
+
+        _judge_cache = JudgeVerdictCache()
+    return _judge_cache
+
+
 class EvaluationUseCase:
     """评估用例：封装对 LLM 与 benchmark 库的调用。"""
 
-    def __init__(self) -> None:
-        self._llm = AgentLlmFacade(config=settings)
+    def __init__(self, llm: AgentLlmFacade | None = None) -> None:
+        self._llm = llm or AgentLlmFacade(config=settings)
 
     @property
     def llm_gateway(self) -> AgentLlmFacade:
@@ -39,10 +52,28 @@ class EvaluationUseCase:
         evaluator.load_benchmark(benchmark_path)
         return evaluator
 
-    def llm_judge(self) -> LLMJudge:
+    def llm_judge(self, cache: JudgeVerdictCache | None = None) -> LLMJudge:
         from evaluation.llm_judge import LLMJudge
 
-        return LLMJudge(self._llm)
+        return LLMJudge(self._llm, cache=cache or _shared_judge_cache())
+
+    async def run_gaia(
+        self,
+        benchmark_path: Path,
+        agent: Any,
+        *,
+        concurrency: int = 4,
+        task_timeout: float = 300.0,
+        checkpoint_path: Path | None = None,
+    ) -> GAIAReport:
+        """并发执行 GAIA 基准；指定 ``checkpoint_path`` 时中断后重跑从断点继续。"""
+        evaluator = self.gaia_evaluator(benchmark_path)
+        return await evaluator.evaluate_agent(
+            agent,
+            concurrency=concurrency,
+            task_timeout=task_timeout,
+            checkpoint_path=checkpoint_path,
+        )
 
     async def run_tool_accuracy(
         self,
@@ -81,6 +112,22 @@ class EvaluationUseCase:
             criteria=criteria,
         )
 
+    async def run_llm_judge_batch(
+        self,
+        samples: list[JudgeSample],
+        *,
+        judge_model: str | None = None,
+        concurrency: int = 4,
+        cache_path: Path | None = None,
+    ) -> list[JudgeScore]:
+        """并发评估多条样本；``cache_path`` 指定时裁判结论持久化，重跑命中缓存。"""
+        from evaluation.llm_judge import JudgeVerdictCache
+
+        judge = self.llm_judge(JudgeVerdictCache(cache_path) if cache_path else None)
+        if judge_model is not None:
+            judge.judge_model = judge_model
+        return await judge.evaluate_many(samples, concurrency=concurrency)
+
     async def run_task_completion(
         self,
         test_cases: list[dict[str, Any]],
@@ -17,6 +17,7 @@ import time
 from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
+from libs.observability.metrics import record_cache_lookup
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
@@ -75,6 +76,11 @@ async def _fetch_tenant_version(team_id: UUID) -> str:
     return version
 
 
+async def fetch_tenant_version(team_id: UUID) -> str:
+    """租户读缓存版本号（供同样按租户失效的其他读缓存复用）。"""
+    return await _fetch_tenant_version(team_id)
+
+
 async def peek_resolve_cache_entry(
     team_id: UUID,
     name: str,
@@ -88,17 +94,21 @@ async def peek_resolve_cache_entry(
     key = _cache_key(team_id, cleaned, user_id=user_id)
     hit = _CACHE.get(key)
     if hit is None:
+        record_cache_lookup("resolve_model", hit=False)
         return CACHE_MISS
     payload, ts, stored_version = hit
     # 1) 单调时钟 TTL 兜底
     if time.monotonic() - ts >= _TTL_SEC:
         _CACHE.pop(key, None)
+        record_cache_lookup("resolve_model", hit=False)
         return CACHE_MISS
     # 2) Redis 版本号变化 → 失效
     current_version = await _fetch_tenant_version(team_id)
     if current_version != stored_version:
         _CACHE.pop(key, None)
+        record_cache_lookup("resolve_model", hit=False)
         return CACHE_MISS
+    record_cache_lookup("resolve_model", hit=True)
     if payload is _NEGATIVE_ENTRY:
         return None
     return payload
@@ -192,6 +202,7 @@ def _evict_oldest() -> None:
 __all__ = [
     "CACHE_MISS",
     "clear_resolve_model_cache_for_tests",
+    "fetch_tenant_version",
     "invalidate_all",
     "invalidate_for_tenant",
     "peek_resolve_cache_entry",
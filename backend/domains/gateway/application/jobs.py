@@ -1,11 +1,13 @@
 """
 Gateway Background Jobs
 
-- gateway_rollup_job: 5 分钟一次，把 GatewayRequestLog 增量聚合写入 gateway_metrics_hourly
-- gateway_metrics_repair_loop: 每日一次，重算最近 N 小时 hourly（覆盖写）
+- gateway_rollup_job: 5 分钟一次，把 GatewayRequestLog 增量聚合写入 gateway_metrics_hourly，
+  再把已完整的自然日 / 自然月重建进 gateway_metrics_daily / gateway_metrics_monthly
+- gateway_metrics_repair_loop: 每日一次，重算最近 N 小时 hourly（覆盖写），并级联重建受影响的日 / 月，
+  随后失效 dashboard 已完成分片缓存
 - gateway_alert_job: 1 分钟一次，扫规则、写事件、发 webhook + 站内通知
 - gateway_partition_job: 每天一次，确保下两个月的分区表存在，并清理过期配额汇总行
-- gateway_request_log_retention_loop: 按配置间隔删除早于保留期的整月分区
+- gateway_request_log_retention_loop: 按配置间隔删除早于保留期的整月分区（可先归档为 Parquet）
 """
 
 from __future__ import annotations
@@ -16,6 +18,10 @@ from typing import TYPE_CHECKING, Any
 
 from bootstrap.config import settings
 from domains.gateway.application.observability.gateway_alert_job import gateway_alert_loop
+from domains.gateway.application.usage.management.dashboard_tiles import (
+    bump_dashboard_tile_generation,
+)
+from domains.gateway.infrastructure.jobs.request_log_archive import RequestLogPartitionArchiver
 from domains.gateway.infrastructure.jobs.sql_jobs_repository import GatewaySqlJobsRepository
 from domains.gateway.infrastructure.repositories.gateway_rollup_state_repository import (
     GatewayRollupStateRepository,
@@ -24,9 +30,17 @@ from domains.gateway.infrastructure.repositories.metrics_rollup_repository impor
     GatewayMetricsRollupRepository,
     RollupUpsertMode,
 )
+from domains.gateway.infrastructure.repositories.metrics_tier_source import (
+    MetricsRollupTier,
+    floor_day,
+    floor_month,
+)
 from domains.gateway.infrastructure.repositories.quota_plan_usage_bucket_repository import (
     QuotaPlanUsageBucketRepository,
 )
+from domains.gateway.infrastructure.repositories.request_log_archive_format import (
+    build_request_log_archive_store,
+)
 from libs.background_tasks import register_app_background_task
 from libs.db.database import get_background_session_context
 from utils.logging import get_logger
@@ -57,8 +71,48 @@ def _floor_hour(value: datetime) -> datetime:
 # =============================================================================
 
 
+async def rebuild_calendar_tiers(
+    session: AsyncSession,
+    *,
+    repair_since: datetime | None = None,
+) -> tuple[int, int]:
+    """把 hourly 水位之前已完整的自然日 / 自然月重建进 daily / monthly 并推进水位（不 commit）。
+
+    - 首次运行从 hourly 最早桶所在月开始回填，保证 monthly 所依赖的 daily 覆盖整月；
+    - ``repair_since``：hourly 在该时刻之后被覆盖重算过，对应的日 / 月即使已在水位之前也重建。
+
+    返回 ``(daily_rows, monthly_rows)``。
+    """
+    state_repo = GatewayRollupStateRepository(session)
+    rollup_repo = GatewayMetricsRollupRepository(session)
+    marks = await state_repo.read_tier_watermarks_for_update()
+    if marks.daily is None or marks.monthly is None:
+        earliest = await rollup_repo.earliest_hourly_bucket()
+        daily_from = monthly_from = floor_month(min(earliest or marks.hourly, marks.hourly))
+    else:
+        daily_from, monthly_from = marks.daily, marks.monthly
+    if repair_since is not None:
+        daily_from = min(daily_from, floor_day(repair_since))
+        monthly_from = min(monthly_from, floor_month(repair_since))
+
+    daily_until = floor_day(marks.hourly)
+    monthly_until = floor_month(daily_until)
+    daily_rows = monthly_rows = 0
+    if daily_from < daily_until:
+        daily_rows = await rollup_repo.rebuild_calendar_tier(
+            MetricsRollupTier.DAILY, daily_from, daily_until
+        )
+    if monthly_from < monthly_until:
+        monthly_rows = await rollup_repo.rebuild_calendar_tier(
+            MetricsRollupTier.MONTHLY, monthly_from, monthly_until
+        )
+    if (marks.daily, marks.monthly) != (daily_until, monthly_until):
+        await state_repo.set_calendar_tier_watermarks(daily=daily_until, monthly=monthly_until)
+    return daily_rows, monthly_rows
+
+
 async def gateway_rollup_loop() -> None:
-    """按 watermark 增量 rollup 至当前整点小时。"""
+    """按 watermark 增量 rollup 至当前整点小时，再推进日 / 月级聚合。"""
     interval = settings.gateway_rollup_interval_seconds
     while True:
         try:
@@ -84,6 +138,14 @@ async def gateway_rollup_loop() -> None:
                         since.isoformat(),
                         until.isoformat(),
                     )
+            async with get_background_session_context() as session:
+                daily_rows, monthly_rows = await rebuild_calendar_tiers(session)
+                if daily_rows or monthly_rows:
+                    logger.debug(
+                        "gateway_rollup_job: rebuilt %d daily / %d monthly row(s)",
+                        daily_rows,
+                        monthly_rows,
+                    )
         except Exception as exc:  # pragma: no cover
             logger.warning("gateway_rollup_job error: %s", exc)
         await asyncio.sleep(interval)
@@ -106,12 +168,20 @@ async def gateway_metrics_repair_loop() -> None:
                         until,
                         mode=RollupUpsertMode.REPLACE,
                     )
+                    daily_rows, monthly_rows = await rebuild_calendar_tiers(
+                        session, repair_since=since
+                    )
                     logger.info(
-                        "gateway_metrics_repair: rebuilt %d hourly row(s) [%s, %s)",
+                        "gateway_metrics_repair: rebuilt %d hourly / %d daily / %d monthly "
+                        "row(s) [%s, %s)",
                         count,
+                        daily_rows,
+                        monthly_rows,
                         since.isoformat(),
                         until.isoformat(),
                     )
+                # 已完成的 dashboard 分片按原值长期缓存；覆盖重算提交后整体失效
+                await bump_dashboard_tile_generation()
         except Exception as exc:  # pragma: no cover
             logger.warning("gateway_metrics_repair_loop error: %s", exc)
         await asyncio.sleep(interval)
@@ -144,6 +214,26 @@ async def gateway_partition_loop() -> None:
         await asyncio.sleep(interval)
 
 
+async def _expire_request_log_partitions(session: AsyncSession, retention_days: int) -> None:
+    """过期整月分区：开启归档时先导出 Parquet 并校验，否则直接 DROP。"""
+    if settings.gateway_request_log_archive_enabled:
+        archiver = RequestLogPartitionArchiver(session, build_request_log_archive_store())
+        archived = await archiver.archive_expired(retention_days)
+        if archived:
+            logger.info(
+                "gateway_request_log_retention: archived and dropped %d partition(s)",
+                len(archived),
+            )
+        return
+    sql_jobs = GatewaySqlJobsRepository(session)
+    dropped = await sql_jobs.drop_expired_request_log_partitions(retention_days)
+    if dropped:
+        logger.info(
+            "gateway_request_log_retention: dropped %d partition(s)",
+            dropped,
+        )
+
+
 async def gateway_request_log_retention_loop() -> None:
     """按 ``gateway_request_log_retention_interval_seconds`` 清理过期明细分区。"""
     interval = settings.gateway_request_log_retention_interval_seconds
@@ -152,13 +242,7 @@ async def gateway_request_log_retention_loop() -> None:
             retention = settings.gateway_request_log_retention_days
             if retention is not None and retention > 0:
                 async with get_background_session_context() as session:
-                    sql_jobs = GatewaySqlJobsRepository(session)
-                    dropped = await sql_jobs.drop_expired_request_log_partitions(retention)
-                    if dropped:
-                        logger.info(
-                            "gateway_request_log_retention: dropped %d partition(s)",
-                            dropped,
-                        )
+                    await _expire_request_log_partitions(session, retention)
         except Exception as exc:  # pragma: no cover
             logger.warning("gateway_request_log_retention_loop error: %s", exc)
         await asyncio.sleep(interval)
@@ -180,5 +264,6 @@ __all__ = [
     "gateway_partition_loop",
     "gateway_request_log_retention_loop",
     "gateway_rollup_loop",
+    "rebuild_calendar_tiers",
     "schedule_gateway_jobs",
 ]
@@ -109,6 +109,9 @@ from domains.gateway.infrastructure.models.system_gateway import (
     SystemProviderCredential,
 )
 from domains.gateway.infrastructure.repositories.alert_repository import GatewayAlertRepository
+from domains.gateway.infrastructure.repositories.archived_request_log_repository import (
+    ArchivedRequestLogRepository,
+)
 from domains.gateway.infrastructure.repositories.budget_repository import BudgetRepository
 from domains.gateway.infrastructure.repositories.credential_repository import (
     ProviderCredentialRepository,
@@ -153,6 +156,9 @@ if TYPE_CHECKING:
     from domains.gateway.application.credential.management.playground_credential_reads import (
         PlaygroundCredentialSummaryItem,
     )
+    from domains.gateway.application.usage.management.dashboard_tiles import (
+        DashboardTileRunner,
+    )
 
 
 def _visible_member_budgets(
@@ -185,6 +191,7 @@ class GatewayManagementReadService(GatewayUsageLogReadMixin):
         membership: MembershipPort | None = None,
         api_key_grants: ApiKeyGatewayGrantQueryPort | None = None,
         user_summaries: UserSummaryQueryPort | None = None,
+        dashboard_tiles: DashboardTileRunner | None = None,
     ) -> None:
         self._session = session
         self._membership = membership or TenancyMembershipAdapter()
@@ -198,12 +205,15 @@ class GatewayManagementReadService(GatewayUsageLogReadMixin):
         self._routes = GatewayRouteRepository(session)
         self._budgets = BudgetRepository(session)
         self._logs = RequestLogRepository(session)
+        self._archived_logs = ArchivedRequestLogRepository(session)
         self._hourly_metrics = MetricsHourlyReadRepository(session)
-        self._usage_metrics = UsageMetricsRouter(self._logs, self._hourly_metrics)
+        self._usage_metrics = UsageMetricsRouter(
+            self._logs, self._hourly_metrics, tiles=dashboard_tiles
+        )
         self._alerts = GatewayAlertRepository(session)
         self._provider_quotas = ProviderQuotaRepository(session)
         self._entitlement_plans = EntitlementPlanRepository(session)
-        self._plan_usage = GatewayPlanUsageReadService(session)
+        self._plan_usage = GatewayPlanUsageReadService(session, tiles=dashboard_tiles)
         self.access = GatewayManagementAccessAssertions(
             session=session,
             creds=self._creds,
@@ -464,6 +464,9 @@ class GatewayManagementWriteBaseMixin:
         from domains.gateway.application.route.route_snapshot_cache import (
             clear_route_snapshot_cache_for_tests,
         )
+        from domains.gateway.application.vkey.proxy_model_list_cache import (
+            invalidate_all_model_list_cache,
+        )
         from libs.db.database import commit_pending_writes
 
         # 只提交凭据/模型等写入以释放唯一索引锁；Router 重载为只读，不必 rollback 只读事务。
@@ -475,6 +478,7 @@ class GatewayManagementWriteBaseMixin:
         else:
             invalidate_all()
             clear_route_snapshot_cache_for_tests()
+            invalidate_all_model_list_cache()
 
         from domains.gateway.infrastructure.litellm.router_reload_notifier import (
             publish_router_reload,
@@ -2,23 +2,44 @@
 
 通用实现见 ``libs.concurrency.DeferredDbTaskRunner``；本模块仅按 Gateway 配置装配进程级单例：
 响应后结算（``settle_usage`` 等不可合并任务）统一经此有界执行器派发，消除无界 ``create_task``。
+开启 ``gateway_deferred_task_journal_enabled`` 时挂载本地预写日志，崩溃遗留的结算在启动时重放。
 """
 
 from __future__ import annotations
 
-from libs.concurrency import DeferredDbTaskRunner
+from libs.concurrency import DeferredDbTaskRunner, DeferredJobJournal
+
+_RUNNER_NAME = "proxy-settlement"
+_journal: DeferredJobJournal | None = None
+
+
+def _proxy_deferred_journal() -> DeferredJobJournal | None:
+    """惰性构建进程级 journal；配置关闭时返回 ``None``（实时读取，便于测试切换）。"""
+    global _journal
+    from bootstrap.config import settings
+
+    if not settings.gateway_deferred_task_journal_enabled:
+        return None
+    if _journal is None:
+        _journal = DeferredJobJournal(
+            directory=settings.gateway_deferred_task_journal_dir,
+            name=_RUNNER_NAME,
+            fsync=bool(settings.gateway_deferred_task_journal_fsync),
+        )
+    return _journal
 
 
 def _build_proxy_deferred_runner() -> DeferredDbTaskRunner:
     from bootstrap.config import settings
 
     return DeferredDbTaskRunner(
-        name="proxy-settlement",
+        name=_RUNNER_NAME,
         max_workers=lambda: int(settings.gateway_deferred_task_max_workers),
         max_queue=lambda: int(settings.gateway_deferred_task_max_queue),
         submit_block_timeout_seconds=lambda: (
             float(settings.gateway_deferred_task_submit_block_timeout_ms) / 1000.0
         ),
+        journal=_proxy_deferred_journal,
     )
 
 
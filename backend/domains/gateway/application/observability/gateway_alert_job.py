@@ -1,19 +1,36 @@
-"""Gateway 告警后台任务（短事务 + commit 后 webhook）。"""
+"""Gateway 告警后台任务（短事务 + commit 后 webhook）。
+
+评估按 ``window_minutes`` 分组：每组对明细热尾做一次按租户 ``GROUP BY`` 的聚合，
+窗口跨越 rollup 热尾水位时整小时段改读 ``gateway_metrics_hourly``；规则数再多，
+每轮 SQL 次数只与不同窗口数成正比。webhook 并发投递（有界并发 + 超时 + 退避重试）。
+"""
 
 from __future__ import annotations
 
 import asyncio
-from datetime import UTC, datetime
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+import time
 from typing import Any
+import uuid
 
 import httpx
 
 from bootstrap.config import settings
+from domains.gateway.application.usage.management.usage_metrics_window import (
+    compute_hot_cutoff,
+    floor_hour,
+)
 from domains.gateway.domain.alert.alert_evaluation import (
     AlertEvaluationResult,
     alert_cooldown_elapsed,
     evaluate_alert_rule,
 )
+from domains.gateway.domain.alert.alert_metric_aggregates import (
+    AlertMetricAggregates,
+    AlertWindowTotals,
+)
 from domains.gateway.domain.alert.alert_rule_snapshot import AlertRuleSnapshot
 from domains.gateway.infrastructure.repositories.alert_repository import GatewayAlertRepository
 from libs.db.database import get_background_session_context
@@ -21,41 +38,155 @@ from utils.logging import get_logger
 
 logger = get_logger(__name__)
 
-
-async def _send_webhook(url: str, payload: dict[str, Any]) -> None:
-    try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            await client.post(url, json=payload)
-    except Exception as exc:  # pragma: no cover
-        logger.warning("alert webhook failed: %s", exc)
-
-
-async def run_gateway_alert_cycle() -> None:
-    """执行一轮告警扫描：单 read session 评估，单 write session 落库，commit 后外呼。"""
+_EMPTY_TOTALS = AlertWindowTotals()
+
+
+@dataclass(frozen=True, slots=True)
+class GatewayAlertCycleReport:
+    """一轮告警扫描的统计，用于日志与测试断言。"""
+
+    rules: int = 0
+    triggered: int = 0
+    webhooks_sent: int = 0
+    webhooks_failed: int = 0
+    duration_ms: int = 0
+
+
+def _cold_hour_range(
+    window_start: datetime, now: datetime, *, hot_cutoff: datetime | None
+) -> tuple[datetime, datetime] | None:
+    """窗口中可由 hourly 精确覆盖的整小时段 ``[start, end)``；不足一小时返回 None。"""
+    if hot_cutoff is None:
+        return None
+    first_full_hour = floor_hour(window_start)
+    if first_full_hour < window_start:
+        first_full_hour += timedelta(hours=1)
+    cold_end = min(hot_cutoff, floor_hour(now))
+    if cold_end <= first_full_hour:
+        return None
+    return first_full_hour, cold_end
+
+
+async def _fetch_aggregates_batch(
+    repo: GatewayAlertRepository,
+    rules: list[AlertRuleSnapshot],
+    now: datetime,
+) -> dict[uuid.UUID, AlertMetricAggregates]:
+    """按窗口分组批量聚合，返回 rule_id → 聚合；某组查询失败只跳过该组规则。"""
+    by_window: dict[int, list[AlertRuleSnapshot]] = defaultdict(list)
+    for snapshot in rules:
+        by_window[snapshot.window_minutes].append(snapshot)
+
+    hot_cutoff = (
+        compute_hot_cutoff(now=now, hot_tail_hours=settings.gateway_metrics_hot_tail_hours)
+        if settings.gateway_metrics_hybrid_read_enabled
+        else None
+    )
+    out: dict[uuid.UUID, AlertMetricAggregates] = {}
+    for window_minutes, group in by_window.items():
+        window_start = now - timedelta(minutes=window_minutes)
+        tenant_ids = {s.tenant_id for s in group if s.tenant_id is not None}
+        include_global = any(s.tenant_id is None for s in group)
+        with_p95 = any(s.metric == "latency_p95" for s in group)
+        # p95 无法由 hourly 合并，组内有 latency 规则时整窗读明细
+        cold_range = (
+            None if with_p95 else _cold_hour_range(window_start, now, hot_cutoff=hot_cutoff)
+        )
+        try:
+            totals = await repo.aggregate_log_window_totals(
+                window_start,
+                now,
+                tenant_ids=tenant_ids,
+                include_global=include_global,
+                with_p95=with_p95,
+                exclude_range=cold_range,
+            )
+            if cold_range is not None:
+                cold = await repo.aggregate_hourly_window_totals(
+                    cold_range[0],
+                    cold_range[1],
+                    tenant_ids=tenant_ids,
+                    include_global=include_global,
+                )
+                for key, value in cold.items():
+                    totals[key] = totals.get(key, _EMPTY_TOTALS).merge(value)
+        except Exception as exc:  # pragma: no cover
+            logger.warning(
+                "gateway_alert_job window %sm aggregate error (%d rules skipped): %s",
+                window_minutes,
+                len(group),
+                exc,
+            )
+            continue
+        for snapshot in group:
+            out[snapshot.rule_id] = totals.get(snapshot.tenant_id, _EMPTY_TOTALS).to_aggregates(
+                snapshot.metric, window_minutes
+            )
+    return out
+
+
+async def _send_webhook(client: httpx.AsyncClient, url: str, payload: dict[str, Any]) -> bool:
+    """投递单个 webhook；网络错误 / 5xx / 429 按指数退避重试，返回是否最终成功。"""
+    attempts = settings.gateway_alert_webhook_max_attempts
+    backoff = settings.gateway_alert_webhook_retry_backoff_seconds
+    for attempt in range(1, attempts + 1):
+        try:
+            response = await client.post(url, json=payload)
+            if response.status_code < 500 and response.status_code != 429:
+                return response.is_success
+            reason = f"HTTP {response.status_code}"
+        except httpx.HTTPError as exc:
+            reason = str(exc) or type(exc).__name__
+        if attempt < attempts:
+            await asyncio.sleep(backoff * (2 ** (attempt - 1)))
+    logger.warning("alert webhook failed after %d attempts: %s (%s)", attempts, url, reason)
+    return False
+
+
+async def _deliver_webhooks(queue: list[tuple[str, dict[str, Any]]]) -> tuple[int, int]:
+    """共享一个 client 并发投递，``gateway_alert_webhook_concurrency`` 限制在途数。"""
+    if not queue:
+        return 0, 0
+    semaphore = asyncio.Semaphore(settings.gateway_alert_webhook_concurrency)
+
+    async with httpx.AsyncClient(timeout=settings.gateway_alert_webhook_timeout_seconds) as client:
+
+        async def _one(url: str, payload: dict[str, Any]) -> bool:
+            async with semaphore:
+                try:
+                    return await _send_webhook(client, url, payload)
+                except Exception as exc:  # pragma: no cover
+                    logger.warning("alert webhook failed: %s", exc)
+                    return False
+
+        results = await asyncio.gather(*(_one(url, payload) for url, payload in queue))
+    sent = sum(1 for ok in results if ok)
+    return sent, len(results) - sent
+
+
+async def run_gateway_alert_cycle() -> GatewayAlertCycleReport:
+    """执行一轮告警扫描：单 read session 批量评估，单 write session 落库，commit 后外呼。"""
+    started = time.perf_counter()
     now = datetime.now(UTC)
     pending_triggers: list[tuple[AlertRuleSnapshot, AlertEvaluationResult]] = []
 
     async with get_background_session_context() as read_session:
         repo = GatewayAlertRepository(read_session)
         rules = await repo.list_all_enabled_rules()
+        aggregates_by_rule = await _fetch_aggregates_batch(repo, rules, now)
         for snapshot in rules:
-            try:
-                aggregates = await repo.fetch_rule_metric_aggregates(snapshot, now)
-                result = evaluate_alert_rule(snapshot, aggregates)
-                if result is None or not result.triggered:
-                    continue
-                if not alert_cooldown_elapsed(snapshot.last_triggered_at, now):
-                    continue
-                pending_triggers.append((snapshot, result))
-            except Exception as exc:  # pragma: no cover
-                logger.warning(
-                    "gateway_alert_job rule %s eval error: %s",
-                    snapshot.rule_id,
-                    exc,
-                )
+            aggregates = aggregates_by_rule.get(snapshot.rule_id)
+            if aggregates is None:
+                continue
+            result = evaluate_alert_rule(snapshot, aggregates)
+            if result is None or not result.triggered:
+                continue
+            if not alert_cooldown_elapsed(snapshot.last_triggered_at, now):
+                continue
+            pending_triggers.append((snapshot, result))
 
     if not pending_triggers:
-        return
+        return _finish_cycle(started, rules=len(rules))
 
     webhook_queue: list[tuple[str, dict[str, Any]]] = []
     async with get_background_session_context() as write_session:
@@ -78,8 +209,35 @@ async def run_gateway_alert_cycle() -> None:
                     exc,
                 )
 
-    for url, payload in webhook_queue:
-        await _send_webhook(url, payload)
+    sent, failed = await _deliver_webhooks(webhook_queue)
+    return _finish_cycle(
+        started,
+        rules=len(rules),
+        triggered=len(pending_triggers),
+        webhooks_sent=sent,
+        webhooks_failed=failed,
+    )
+
+
+def _finish_cycle(started: float, **counts: int) -> GatewayAlertCycleReport:
+    report = GatewayAlertCycleReport(
+        duration_ms=int((time.perf_counter() - started) * 1000), **counts
+    )
+    log = (
+        logger.warning
+        if report.duration_ms > settings.gateway_alert_interval_seconds * 1000
+        else logger.info
+    )
+    log(
+        "gateway_alert_cycle rules=%d triggered=%d webhooks_sent=%d webhooks_failed=%d "
+        "duration_ms=%d",
+        report.rules,
+        report.triggered,
+        report.webhooks_sent,
+        report.webhooks_failed,
+        report.duration_ms,
+    )
+    return report
 
 
 async def gateway_alert_loop() -> None:
@@ -93,4 +251,4 @@ async def gateway_alert_loop() -> None:
         await asyncio.sleep(interval)
 
 
-__all__ = ["gateway_alert_loop", "run_gateway_alert_cycle"]
+__all__ = ["GatewayAlertCycleReport", "gateway_alert_loop", "run_gateway_alert_cycle"]
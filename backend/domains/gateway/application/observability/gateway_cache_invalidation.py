@@ -13,6 +13,9 @@ from domains.gateway.application.grant.system_grants_cache import invalidate_gra
 from domains.gateway.application.route.route_snapshot_cache import (
     invalidate_route_snapshot_cache_for_tenant,
 )
+from domains.gateway.application.vkey.proxy_model_list_cache import (
+    invalidate_model_list_cache_for_tenant,
+)
 from domains.tenancy.application.team_cache import invalidate_team
 
 
@@ -25,6 +28,7 @@ def invalidate_gateway_read_caches_for_tenant(tenant_id: UUID) -> None:
     clear_local_quota_rule_cache_for_team(tenant_id)
     invalidate_for_tenant(tenant_id)
     invalidate_route_snapshot_cache_for_tenant(tenant_id)
+    invalidate_model_list_cache_for_tenant(tenant_id)
     invalidate_team(tenant_id)
 
 
@@ -69,8 +73,13 @@ async def invalidate_gateway_entitlement_config_cache() -> None:
     from domains.gateway.application.quota.entitlement_config_cache import (
         invalidate_entitlement_config_cache,
     )
+    from domains.gateway.application.vkey.proxy_model_list_cache import (
+        invalidate_all_model_list_cache,
+    )
 
     await invalidate_entitlement_config_cache()
+    # 列表含 entitlement_status；其他 worker 由列表缓存 TTL 兜底
+    invalidate_all_model_list_cache()
 
 
 async def invalidate_gateway_quota_rule_cache_for_team(team_id: UUID) -> None:
@@ -101,6 +110,9 @@ def clear_all_gateway_read_caches_for_tests() -> None:
     from domains.gateway.application.route.route_snapshot_cache import (
         clear_route_snapshot_cache_for_tests,
     )
+    from domains.gateway.application.vkey.proxy_model_list_cache import (
+        clear_model_list_cache_for_tests,
+    )
     from domains.tenancy.application.team_cache import clear_team_cache_for_tests
 
     clear_budget_config_cache_for_tests()
@@ -111,6 +123,7 @@ def clear_all_gateway_read_caches_for_tests() -> None:
     clear_resource_grants_cache_for_tests()
     clear_team_cache_for_tests()
     clear_route_snapshot_cache_for_tests()
+    clear_model_list_cache_for_tests()
 
 
 __all__ = [
@@ -8,6 +8,10 @@ from typing import TYPE_CHECKING, Any
 from domains.gateway.domain.proxy.anthropic_only_request_fields import (
     strip_anthropic_only_fields,
 )
+from domains.gateway.domain.route.route_hedge_policy import (
+    HedgePolicy,
+    hedge_policy_from_retry_policy,
+)
 from domains.gateway.domain.types import GatewayCapability
 from domains.gateway.domain.upstream.upstream_call_shape_policy import (
     resolve_effective_upstream_call_shape,
@@ -15,6 +19,7 @@ from domains.gateway.domain.upstream.upstream_call_shape_policy import (
 from domains.gateway.domain.upstream.upstream_profile import UpstreamCallShape
 from domains.gateway.infrastructure.litellm.router_singleton import ensure_router_deployment
 from libs.db.session_lifecycle import release_request_db_connection
+from libs.observability.metrics import get_metrics_collector
 from utils.logging import get_logger
 
 from .anthropic_native_adapt import (
@@ -25,6 +30,7 @@ from .proxy_chat_pipeline import (
     apply_timing_to_metadata,
     prepare_chat_proxy_request,
 )
+from .proxy_hedge import run_hedged_router_call
 from .proxy_litellm_client import apply_upstream_timeout
 from .proxy_response_adapter import (
     adapt_anthropic_response,
@@ -43,6 +49,10 @@ logger = get_logger(__name__)
 if TYPE_CHECKING:
     from collections.abc import AsyncIterator
 
+    from domains.gateway.application.catalog.model_or_route_resolution import (
+        ResolvedModelName,
+    )
+
     from .proxy_context import ProxyContext
     from .proxy_use_case import ProxyUseCase
 
@@ -93,7 +103,9 @@ async def estimate_anthropic_input_tokens(body: dict[str, Any], model: str) -> i
         if isinstance(counted, int) and counted > 0:
             return counted
     except Exception:
-        logger.warning("token_counter failed for model=%s, falling back to estimate", model, exc_info=True)
+        logger.warning(
+            "token_counter failed for model=%s, falling back to estimate", model, exc_info=True
+        )
     return estimate_anthropic_request_tokens(body)
 
 
@@ -112,11 +124,23 @@ def _collect_ttfb_stream(
                 _first = False
                 ttfb = max(0, int((time.perf_counter() - started_at) * 1000))
                 metadata["gateway_ttfb_ms"] = ttfb
+                get_metrics_collector().record_timer(
+                    "gateway_proxy_stage_ms", ttfb, {"stage": "upstream_ttfb"}
+                )
             yield chunk
 
     return _inner()
 
 
+def _route_hedge_policy(resolved: ResolvedModelName | None) -> HedgePolicy | None:
+    """命中路由且其 ``retry_policy`` 开启对冲时返回策略（直连模型不对冲）。"""
+    route = resolved.route if resolved is not None else None
+    if route is None:
+        return None
+    retry_policy = route.retry_policy
+    return hedge_policy_from_retry_policy(retry_policy if isinstance(retry_policy, dict) else None)
+
+
 class ProxyChatMixin:
     """``ProxyUseCase`` 的对话类能力入口（mixin）。"""
 
@@ -145,16 +169,31 @@ class ProxyChatMixin:
                 0, int((time.perf_counter() - direct_started) * 1000)
             )
 
+        hedge_policy = _route_hedge_policy(prepared.resolved)
+        # 对冲胜者可能是第二个尝试：其 metadata 才是回调持有的那份，TTFB / 结算须写入它
+        metadata = prepared.metadata
+
         async def _direct() -> Any:
             return await self.litellm.direct_chat_completion(prepared.kwargs)
 
         async def _router() -> Any:
+            nonlocal metadata
             encoded = str(prepared.kwargs.get("model") or "")
             ensure_litellm_router_team_metadata(prepared.kwargs, ctx.team_id)
             router = await ensure_router_deployment(self.session, encoded)
             apply_upstream_timeout(prepared.kwargs)
             await release_request_db_connection(self.session)
-            return await router.acompletion(**prepared.kwargs)
+            if hedge_policy is None:
+                return await router.acompletion(**prepared.kwargs)
+            hedged = await run_hedged_router_call(
+                router=router,
+                kwargs=prepared.kwargs,
+                policy=hedge_policy,
+                team_id=ctx.team_id,
+                stream=prepared.stream,
+            )
+            metadata = hedged.metadata
+            return hedged.response
 
         async def _upstream_probe() -> Exception | None:
             return await self.litellm.probe_deployment_upstream_error(
@@ -177,16 +216,14 @@ class ProxyChatMixin:
             upstream_probe=_upstream_probe,
         )
         if prepared.stream:
-            response = _collect_ttfb_stream(response, prepared.metadata, upstream_started)
+            response = _collect_ttfb_stream(response, metadata, upstream_started)
             if prepared.timings is not None:
-                apply_timing_to_metadata(prepared.metadata, prepared.timings)
+                apply_timing_to_metadata(metadata, prepared.timings)
                 ctx.proxy_timing = GatewayProxyTiming.from_prepare(prepared.timings)
         else:
             upstream_ms = max(0, int((time.perf_counter() - upstream_started) * 1000))
             if prepared.timings is not None:
-                apply_timing_to_metadata(
-                    prepared.metadata, prepared.timings, upstream_ms=upstream_ms
-                )
+                apply_timing_to_metadata(metadata, prepared.timings, upstream_ms=upstream_ms)
                 ctx.proxy_timing = GatewayProxyTiming.from_prepare(
                     prepared.timings, upstream_ms=upstream_ms
                 )
@@ -196,7 +233,7 @@ class ProxyChatMixin:
                 ctx,
                 self.budget_service,
                 self.entitlement_guard,
-                metadata=prepared.metadata,
+                metadata=metadata,
                 downstream_custom=prepared.downstream_custom,
             )
         return await adapt_response(
@@ -204,7 +241,7 @@ class ProxyChatMixin:
             ctx,
             self.budget_service,
             self.entitlement_guard,
-            metadata=prepared.metadata,
+            metadata=metadata,
             upstream_custom=prepared.upstream_custom,
             downstream_custom=prepared.downstream_custom,
         )
@@ -18,9 +18,11 @@ from domains.gateway.application.pricing.pricing_proxy_metadata import (
 )
 from domains.gateway.domain.proxy.proxy_policy import BudgetReservation
 from domains.gateway.domain.types import GatewayCapability
+from libs.observability.metrics import get_metrics_collector
 
 from .proxy_inbound_preflight import run_proxy_inbound_preflight
 from .proxy_timing import (
+    GatewayProxyTiming,
     ProxyPrepareTimings,
     timing_metadata_fields,
 )
@@ -31,6 +33,11 @@ if TYPE_CHECKING:
 
 BodyValidator = Callable[[dict[str, Any]], None]
 
+_metrics = get_metrics_collector()
+_metrics.describe(
+    "gateway_proxy_stage_ms", "Gateway chat proxy stage duration in milliseconds by stage"
+)
+
 
 @dataclass(frozen=True)
 class ChatProxyPrepared:
@@ -124,10 +131,25 @@ def apply_timing_to_metadata(
     upstream_ms: int | None = None,
 ) -> None:
     """把分段耗时写入 kwargs metadata，供 ``gateway_request_logs`` 落库。"""
-    from .proxy_timing import GatewayProxyTiming
-
     timing = GatewayProxyTiming.from_prepare(timings, upstream_ms=upstream_ms)
     metadata.update(timing_metadata_fields(timing))
+    record_proxy_stage_metrics(timing)
+
+
+def record_proxy_stage_metrics(timing: GatewayProxyTiming) -> None:
+    """分段耗时写入 ``gateway_proxy_stage_ms{stage}`` 直方图（与响应头 / 日志字段同源）。"""
+    stages: tuple[tuple[str, int | None], ...] = (
+        ("preflight", timing.preflight_ms),
+        ("guard", timing.guard_ms),
+        ("metadata", timing.metadata_ms),
+        ("pricing", timing.pricing_ms),
+        ("vision", timing.vision_ms),
+        ("direct_decide", timing.direct_decide_ms),
+        ("upstream", timing.upstream_ms),
+    )
+    for stage, value in stages:
+        if value is not None:
+            _metrics.record_timer("gateway_proxy_stage_ms", max(0, value), {"stage": stage})
 
 
 __all__ = [
@@ -135,4 +157,5 @@ __all__ = [
     "apply_stream_cost_defer_flag",
     "apply_timing_to_metadata",
     "prepare_chat_proxy_request",
+    "record_proxy_stage_metrics",
 ]
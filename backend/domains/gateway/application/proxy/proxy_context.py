@@ -76,6 +76,8 @@ class ProxyContext:
     platform_budget_preflight: PlatformBudgetPreflightState | None = None
     client_ua: str | None = None
     client_type: str = "unknown"
+    session_id: str | None = None
+    """入站会话头（``x-gateway-session-id`` / ``x-session-id``），用作 Prompt Cache 亲和键。"""
     user_display_snapshot: str | None = None
     """调用者展示名（name 或 email）；在鉴权/桥接层解析一次，metadata 构建不再查库。"""
     proxy_timing: GatewayProxyTiming | None = None
@@ -0,0 +1,339 @@
+"""对冲请求（hedged request）编排：路由开启 ``retry_policy["hedge"]`` 时使用。
+
+流程：首个尝试按 Router 正常调度；若在「模型组首字节延迟分位数」内仍无首字节，且
+团队对冲额度允许，则向同一 ``model_name`` 组内另一 deployment（按 ``model_info.id``
+指定）发第二个尝试。先产出首字节（流式）或先完成（非流式）者胜出，落后者被取消。
+
+结算恰好一次：
+- ``ProxyGuard`` 预扣只在全部尝试失败时由 ``invoke_router_with_direct_fallback`` 释放一次；
+- 每个尝试的 metadata 带 ``gateway_hedge_attempt_id``，``GatewayCustomLogger`` 经
+  :func:`should_settle_hedge_attempt` 判定：仅胜者的成功 / 失败回调（含流式中途出错）、
+  或无胜者时最后一个失败尝试的失败回调会落库与结算，其余（落后者、被对冲覆盖的中途失败）
+  全部跳过。
+
+延迟样本、团队额度与竞速登记均为进程内有界结构（与 ``LocalGcraLimiter`` 一致）。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+import math
+import random
+import time
+from typing import TYPE_CHECKING, Any
+import uuid
+
+from domains.gateway.domain.proxy.stream_utils import safe_aclose_stream
+from domains.gateway.domain.route.route_hedge_policy import HedgePolicy, hedge_delay_ms
+from libs.observability.metrics import get_metrics_collector
+
+if TYPE_CHECKING:
+    from collections.abc import AsyncIterator
+
+
+HEDGE_ATTEMPT_METADATA_KEY = "gateway_hedge_attempt_id"
+
+_LATENCY_SAMPLES = 256
+_MAX_GROUPS = 4096
+_MAX_TEAMS = 65_536
+_MAX_RACES = 16_384
+_BUDGET_BURST = 3.0
+
+_metrics = get_metrics_collector()
+_metrics.describe(
+    "gateway_hedge_total",
+    "Hedge-enabled proxy calls by outcome (primary_won/hedge_won/all_failed/skipped_*)",
+)
+_metrics.describe(
+    "gateway_hedge_first_byte_ms", "First-byte latency of hedge-enabled upstream calls"
+)
+
+
+class _LatencyTracker:
+    """按模型组保留最近 N 个首字节延迟样本，按需求分位数。"""
+
+    def __init__(self) -> None:
+        self._groups: OrderedDict[str, deque[float]] = OrderedDict()
+
+    def observe(self, group: str, latency_ms: float) -> None:
+        samples = self._groups.get(group)
+        if samples is None:
+            samples = self._groups[group] = deque(maxlen=_LATENCY_SAMPLES)
+            while len(self._groups) > _MAX_GROUPS:
+                self._groups.popitem(last=False)
+        else:
+            self._groups.move_to_end(group)
+        samples.append(latency_ms)
+
+    def percentile(self, group: str, q: float, *, min_samples: int) -> float | None:
+        samples = self._groups.get(group)
+        if samples is None or len(samples) < min_samples:
+            return None
+        ordered = sorted(samples)
+        rank = max(0, math.ceil(len(ordered) * q / 100.0) - 1)
+        return ordered[min(rank, len(ordered) - 1)]
+
+    def clear(self) -> None:
+        self._groups.clear()
+
+
+class _TeamHedgeBudget:
+    """每团队令牌桶：每个合格请求存入 ``ratio`` 个令牌，每次对冲消耗 1 个。"""
+
+    def __init__(self) -> None:
+        self._tokens: OrderedDict[uuid.UUID, float] = OrderedDict()
+
+    def credit(self, team_id: uuid.UUID, ratio: float) -> None:
+        current = self._tokens.pop(team_id, 1.0)
+        self._tokens[team_id] = min(_BUDGET_BURST, current + ratio)
+        while len(self._tokens) > _MAX_TEAMS:
+            self._tokens.popitem(last=False)
+
+    def try_spend(self, team_id: uuid.UUID) -> bool:
+        current = self._tokens.get(team_id, 1.0)
+        if current < 1.0:
+            return False
+        self._tokens[team_id] = current - 1.0
+        return True
+
+    def clear(self) -> None:
+        self._tokens.clear()
+
+
+@dataclass(slots=True)
+class _HedgeRace:
+    pending: set[str] = field(default_factory=set)
+    winner: str | None = None
+    success_claimed: str | None = None
+    winner_failed: bool = False
+
+
+_latency = _LatencyTracker()
+_budget = _TeamHedgeBudget()
+_RACES: OrderedDict[str, _HedgeRace] = OrderedDict()
+"""attempt id → 所属竞速；落后者回调可能晚于请求结束，故按容量淘汰而非请求结束即删。"""
+
+
+def _register_attempt(race: _HedgeRace, attempt_id: str) -> None:
+    race.pending.add(attempt_id)
+    _RACES[attempt_id] = race
+    while len(_RACES) > _MAX_RACES:
+        _RACES.popitem(last=False)
+
+
+def should_settle_hedge_attempt(attempt_id: str, *, success: bool) -> bool:
+    """LiteLLM 回调判定：该尝试是否代表请求的最终结果（落库 + 预算结算）。"""
+    race = _RACES.get(attempt_id)
+    if race is None:
+        return True
+    if success:
+        if race.winner_failed:
+            return False
+        if race.winner not in (None, attempt_id):
+            return False
+        if race.success_claimed not in (None, attempt_id):
+            return False
+        race.success_claimed = attempt_id
+        return True
+    race.pending.discard(attempt_id)
+    if race.winner == attempt_id:
+        # 胜者本身失败（如流式中途出错）：由它结算失败；已结算过则不再重复
+        if race.success_claimed is not None or race.winner_failed:
+            return False
+        race.winner_failed = True
+        return True
+    if race.winner is not None or race.success_claimed is not None:
+        return False
+    return not race.pending
+
+
+@dataclass(frozen=True, slots=True)
+class HedgeResult:
+    """胜出尝试的响应及其 metadata（流式 TTFB / 结算须写入胜者的 metadata）。"""
+
+    response: Any
+    metadata: dict[str, Any]
+    hedged: bool
+
+
+async def _prepend(first: Any, stream: Any) -> AsyncIterator[Any]:
+    try:
+        yield first
+        async for chunk in stream:
+            yield chunk
+    finally:
+        await safe_aclose_stream(stream)
+
+
+async def _empty_stream() -> AsyncIterator[Any]:
+    return
+    yield  # pragma: no cover
+
+
+async def _attempt(router: Any, kwargs: dict[str, Any], *, stream: bool) -> Any:
+    """执行一次尝试；流式时读取首个 chunk 再返回，以首字节作为胜出判据。"""
+    response = await router.acompletion(**kwargs)
+    if not stream:
+        return response
+    try:
+        iterator = response.__aiter__()
+        first = await iterator.__anext__()
+    except StopAsyncIteration:
+        await safe_aclose_stream(response)
+        return _empty_stream()
+    except BaseException:
+        await safe_aclose_stream(response)
+        raise
+    return _prepend(first, iterator)
+
+
+def _alternate_deployment_id(router: Any, group: str, exclude: str | None) -> str | None:
+    candidates: list[str] = []
+    for deployment in router.get_model_list(model_name=group) or []:
+        info = deployment.get("model_info") if isinstance(deployment, dict) else None
+        dep_id = info.get("id") if isinstance(info, dict) else None
+        if dep_id and str(dep_id) != exclude:
+            candidates.append(str(dep_id))
+    return random.choice(candidates) if candidates else None
+
+
+def _picked_deployment_id(metadata: dict[str, Any]) -> str | None:
+    info = metadata.get("model_info")
+    dep_id = info.get("id") if isinstance(info, dict) else None
+    return str(dep_id) if dep_id else None
+
+
+async def _discard(task: asyncio.Task[Any]) -> None:
+    """取消落后者；若其已完成则关闭已打开的流。"""
+    if not task.done():
+        task.cancel()
+    try:
+        result = await task
+    except BaseException:
+        return
+    await safe_aclose_stream(result)
+
+
+def _outcome(outcome: str) -> None:
+    _metrics.increment("gateway_hedge_total", tags={"outcome": outcome})
+
+
+def _observe_first_byte(group: str, started: float, *, winner: str) -> None:
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    _latency.observe(group, elapsed_ms)
+    _metrics.record_timer("gateway_hedge_first_byte_ms", elapsed_ms, {"winner": winner})
+
+
+async def run_hedged_router_call(
+    *,
+    router: Any,
+    kwargs: dict[str, Any],
+    policy: HedgePolicy,
+    team_id: uuid.UUID,
+    stream: bool,
+) -> HedgeResult:
+    """按对冲策略调用 ``router.acompletion``；全部失败时抛出首个尝试的异常。"""
+    group = str(kwargs.get("model") or "")
+    meta = kwargs.get("metadata")
+    primary_meta: dict[str, Any] = meta if isinstance(meta, dict) else {}
+    kwargs["metadata"] = primary_meta
+    hedge_meta_base = dict(primary_meta)
+
+    race = _HedgeRace()
+    primary_id = uuid.uuid4().hex
+    primary_meta[HEDGE_ATTEMPT_METADATA_KEY] = primary_id
+    _register_attempt(race, primary_id)
+    _budget.credit(team_id, policy.max_hedge_ratio)
+
+    started = time.perf_counter()
+    primary = asyncio.create_task(_attempt(router, kwargs, stream=stream))
+    delay_ms = hedge_delay_ms(
+        policy,
+        _latency.percentile(group, policy.delay_percentile, min_samples=policy.min_samples),
+    )
+    try:
+        done, _ = await asyncio.wait({primary}, timeout=delay_ms / 1000.0)
+    except BaseException:
+        await _discard(primary)
+        raise
+
+    alternate: str | None = None
+    if done:
+        _outcome("not_needed")
+    else:
+        alternate = _alternate_deployment_id(router, group, _picked_deployment_id(primary_meta))
+        if alternate is None:
+            _outcome("skipped_no_alternate")
+        elif not _budget.try_spend(team_id):
+            _outcome("skipped_budget")
+            alternate = None
+
+    if alternate is None:
+        try:
+            response = await primary
+        finally:
+            race.pending.discard(primary_id)
+        race.winner = primary_id
+        _observe_first_byte(group, started, winner="primary")
+        return HedgeResult(response=response, metadata=primary_meta, hedged=False)
+
+    hedge_id = uuid.uuid4().hex
+    hedge_meta = {**hedge_meta_base, HEDGE_ATTEMPT_METADATA_KEY: hedge_id}
+    _register_attempt(race, hedge_id)
+    hedge = asyncio.create_task(
+        _attempt(router, {**kwargs, "model": alternate, "metadata": hedge_meta}, stream=stream)
+    )
+    attempts: dict[asyncio.Task[Any], tuple[str, dict[str, Any]]] = {
+        primary: (primary_id, primary_meta),
+        hedge: (hedge_id, hedge_meta),
+    }
+    pending: set[asyncio.Task[Any]] = set(attempts)
+    first_error: BaseException | None = None
+    winner: asyncio.Task[Any] | None = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: t is not primary):
+                if task.exception() is None and winner is None:
+                    winner = task
+                    continue
+                if task.exception() is not None:
+                    race.pending.discard(attempts[task][0])
+                    if task is primary or first_error is None:
+                        first_error = task.exception()
+                else:
+                    pending.add(task)
+    except BaseException:
+        for task in attempts:
+            await _discard(task)
+        raise
+
+    if winner is None:
+        _outcome("all_failed")
+        assert first_error is not None
+        raise first_error
+
+    win_id, win_meta = attempts[winner]
+    race.winner = win_id
+    for task in pending:
+        await _discard(task)
+    _observe_first_byte(group, started, winner="primary" if winner is primary else "hedge")
+    _outcome("primary_won" if winner is primary else "hedge_won")
+    return HedgeResult(response=winner.result(), metadata=win_meta, hedged=True)
+
+
+def clear_hedge_state_for_tests() -> None:
+    _latency.clear()
+    _budget.clear()
+    _RACES.clear()
+
+
+__all__ = [
+    "HEDGE_ATTEMPT_METADATA_KEY",
+    "HedgeResult",
+    "clear_hedge_state_for_tests",
+    "run_hedged_router_call",
+    "should_settle_hedge_attempt",
+]
@@ -6,6 +6,10 @@ from typing import Any
 
 from domains.gateway.application.catalog.model_or_route_resolution import ResolvedModelName
 from domains.gateway.application.upstream.upstream_adapter import UpstreamAdapter
+from domains.gateway.domain.route.prompt_cache_affinity import (
+    AFFINITY_METADATA_KEY,
+    prompt_cache_affinity_key,
+)
 
 from .prompt_cache_middleware import PromptCacheMiddleware
 from .proxy_context import ProxyContext
@@ -45,11 +49,26 @@ def kwargs_from_prepared(
         resolved=resolved,
         credential_profile_id=credential_profile_id,
     )
-    return prompt_cache.inbound(
+    kwargs = prompt_cache.inbound(
         kwargs,
         model=prepared.client_model or str(kwargs.get("model", "")),
         tags=tag_dict,
     )
+    _assign_cache_affinity_key(kwargs)
+    return kwargs
+
+
+def _assign_cache_affinity_key(kwargs: dict[str, Any]) -> None:
+    """写入 Prompt Cache 亲和键，供 Router 选路扩展把同一会话 / 前缀钉到同一 deployment。"""
+    meta = kwargs.get("metadata")
+    if not isinstance(meta, dict):
+        return
+    session_id = meta.get("gateway_session_id")
+    key = prompt_cache_affinity_key(
+        kwargs, session_id=session_id if isinstance(session_id, str) else None
+    )
+    if key is not None:
+        meta[AFFINITY_METADATA_KEY] = key
 
 
 async def prepare_litellm_invoke(
@@ -165,6 +165,7 @@ class ProxyMetadataBuilder:
             ),
             "gateway_client_ua": ctx.client_ua,
             "gateway_client_type": ctx.client_type,
+            "gateway_session_id": ctx.session_id,
         }
         if ctx.entitlement_state is not None and ctx.entitlement_state.reservations:
             meta["gateway_entitlement_plan_reservations"] = [
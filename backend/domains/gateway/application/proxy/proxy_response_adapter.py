@@ -51,6 +51,7 @@ from .prompt_cache_middleware import (
     apply_gateway_cache_hit_to_metadata,
 )
 from .proxy_context import BudgetAnchorCoord, ProxyContext
+from .proxy_settlement_journal import SETTLE_USAGE_JOB_KIND, encode_settle_usage_payload
 from .proxy_stream_settlement import (
     finalize_deferred_stream_settlement,
 )
@@ -559,6 +560,7 @@ async def schedule_settle_usage(
     结算走 **后台连接池**，与 ``/v1/*`` 热路径物理隔离；有界队列 + 固定 worker 池消除
     无上限 fire-and-forget 占满后台池、拖垮事件循环（与 vkey 回写、桶 upsert 同策略）。
     队列满载时由 ``submit`` 背压（阻塞短超时→inline 降级），不丢结算。
+    入队前写预写日志（``proxy_settlement_journal``），进程崩溃遗留的结算在下次启动重放。
     流式路径的 ``finalize_deferred_stream_settlement`` 仍在请求 task 内直接 await，
     属请求生命周期，沿用主池，不受此影响。
     """
@@ -577,8 +579,19 @@ async def schedule_settle_usage(
                 metadata=metadata,
             )
 
+    payload = encode_settle_usage_payload(
+        ctx,
+        tokens=tokens,
+        cost=cost,
+        requests=requests,
+        image_count=image_count,
+        request_id=request_id,
+        with_entitlement=entitlement_guard is not None,
+    )
     with suppress(RuntimeError):
-        await proxy_deferred_runner.submit(_settle)
+        await proxy_deferred_runner.submit(
+            _settle, journal_kind=SETTLE_USAGE_JOB_KIND, journal_payload=payload
+        )
 
 
 def _calc_upstream_cost(
@@ -0,0 +1,325 @@
+"""响应后结算的预写日志编解码与启动重放。
+
+``schedule_settle_usage`` 把结算交给有界执行器后，进程崩溃 / OOM 会丢掉排队中的任务：
+Redis 预扣（请求数 / token / 图片）永不释放、用量少记。这里把 ``settle_usage`` 真正读取的
+上下文（计费坐标、preflight 锚点与预扣句柄、entitlement 套餐预扣）编码为 JSON 写入
+journal，下次启动由 :func:`replay_proxy_deferred_journal` 还原最小 ``ProxyContext`` 重跑。
+
+- ``metadata`` 不参与结算，不入 journal；
+- ``entitlement_guard`` 只在结算时用于 commit，重放时按会话重新构建；
+- 流式路径的 ``finalize_deferred_stream_settlement`` 在请求 task 内直接 await，不经执行器，
+  不在本 journal 范围内。
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any
+import uuid
+
+from domains.gateway.application.budget.budget_platform_settlement import (
+    deserialize_budget_anchor_pins,
+    serialize_budget_anchor_pins,
+)
+from domains.gateway.application.observability.deferred_task_runner import proxy_deferred_runner
+from domains.gateway.domain.proxy.proxy_policy import BudgetReservation
+from domains.gateway.domain.quota.period_reset_anchor import (
+    PeriodResetAnchor,
+    normalize_period_reset_anchor,
+)
+from domains.gateway.domain.quota.quota_plan import PlanQuotaSpec, QuotaPlanReservation
+from domains.gateway.domain.types import GatewayCapability, VirtualKeyPrincipal
+from libs.db.database import get_session_context, prefer_background_pool
+from utils.logging import get_logger
+
+from .proxy_context import (
+    EntitlementReservationState,
+    PlatformBudgetPreflightState,
+    ProxyContext,
+)
+
+logger = get_logger(__name__)
+
+SETTLE_USAGE_JOB_KIND = "proxy.settle_usage"
+
+
+def _str_or_none(value: object) -> str | None:
+    return str(value) if value is not None else None
+
+
+def _uuid_or_none(value: object) -> uuid.UUID | None:
+    if value is None:
+        return None
+    try:
+        return uuid.UUID(str(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _decimal_or_none(value: object) -> Decimal | None:
+    return Decimal(str(value)) if value is not None else None
+
+
+def _encode_anchor(anchor: PeriodResetAnchor) -> dict[str, Any]:
+    return {
+        "timezone": anchor.timezone,
+        "time_minutes": anchor.time_minutes,
+        "day_of_month": anchor.day_of_month,
+    }
+
+
+def _decode_anchor(raw: object) -> PeriodResetAnchor:
+    data = raw if isinstance(raw, dict) else {}
+    return normalize_period_reset_anchor(
+        timezone=data.get("timezone"),
+        time_minutes=data.get("time_minutes"),
+        day_of_month=data.get("day_of_month"),
+    )
+
+
+def _encode_budget_reservation(r: BudgetReservation) -> dict[str, Any]:
+    return {
+        "target_kind": r.target_kind,
+        "target_id": r.target_id,
+        "period": r.period,
+        "budget_model_name": r.budget_model_name,
+        "reserved_requests": r.reserved_requests,
+        "reserved_tokens": r.reserved_tokens,
+        "reserved_images": r.reserved_images,
+        "credential_id": _str_or_none(r.credential_id),
+        "tenant_id": _str_or_none(r.tenant_id),
+        "period_reset_anchor": _encode_anchor(r.period_reset_anchor),
+    }
+
+
+def _decode_budget_reservation(raw: dict[str, Any]) -> BudgetReservation:
+    return BudgetReservation(
+        target_kind=raw["target_kind"],
+        target_id=raw.get("target_id"),
+        period=raw["period"],
+        budget_model_name=raw.get("budget_model_name"),
+        reserved_requests=int(raw.get("reserved_requests") or 0),
+        reserved_tokens=int(raw.get("reserved_tokens") or 0),
+        reserved_images=int(raw.get("reserved_images") or 0),
+        credential_id=_uuid_or_none(raw.get("credential_id")),
+        tenant_id=_uuid_or_none(raw.get("tenant_id")),
+        period_reset_anchor=_decode_anchor(raw.get("period_reset_anchor")),
+    )
+
+
+def _encode_spec(spec: PlanQuotaSpec) -> dict[str, Any]:
+    return {
+        "quota_id": str(spec.quota_id),
+        "label": spec.label,
+        "window_seconds": spec.window_seconds,
+        "limit_usd": _str_or_none(spec.limit_usd),
+        "limit_tokens": spec.limit_tokens,
+        "limit_requests": spec.limit_requests,
+        "limit_images": spec.limit_images,
+        "reset_strategy": spec.reset_strategy,
+        "period_reset_anchor": _encode_anchor(spec.period_reset_anchor),
+    }
+
+
+def _decode_spec(raw: dict[str, Any]) -> PlanQuotaSpec:
+    return PlanQuotaSpec(
+        quota_id=uuid.UUID(raw["quota_id"]),
+        label=raw["label"],
+        window_seconds=int(raw["window_seconds"]),
+        limit_usd=_decimal_or_none(raw.get("limit_usd")),
+        limit_tokens=raw.get("limit_tokens"),
+        limit_requests=raw.get("limit_requests"),
+        limit_images=raw.get("limit_images"),
+        reset_strategy=raw["reset_strategy"],
+        period_reset_anchor=_decode_anchor(raw.get("period_reset_anchor")),
+    )
+
+
+def _encode_entitlement(state: EntitlementReservationState) -> dict[str, Any]:
+    return {
+        "plan_id": str(state.plan_id),
+        "plan_label": state.plan_label,
+        "specs": [_encode_spec(s) for s in state.specs],
+        "reservations": [
+            {
+                "plan_id": str(r.plan_id),
+                "spec": _encode_spec(r.spec),
+                "minute_unix": r.minute_unix,
+                "reserved_requests": r.reserved_requests,
+                "reserved_images": r.reserved_images,
+            }
+            for r in state.reservations
+        ],
+    }
+
+
+def _decode_entitlement(raw: dict[str, Any]) -> EntitlementReservationState:
+    return EntitlementReservationState(
+        plan_id=uuid.UUID(raw["plan_id"]),
+        plan_label=raw.get("plan_label"),
+        specs=[_decode_spec(s) for s in raw.get("specs") or ()],
+        reservations=[
+            QuotaPlanReservation(
+                plan_id=uuid.UUID(r["plan_id"]),
+                spec=_decode_spec(r["spec"]),
+                minute_unix=int(r["minute_unix"]),
+                reserved_requests=int(r.get("reserved_requests") or 0),
+                reserved_images=int(r.get("reserved_images") or 0),
+            )
+            for r in raw.get("reservations") or ()
+        ],
+    )
+
+
+def encode_settle_usage_payload(
+    ctx: ProxyContext,
+    *,
+    tokens: int,
+    cost: Decimal,
+    requests: int,
+    image_count: int,
+    request_id: str | None,
+    with_entitlement: bool,
+) -> dict[str, Any]:
+    """把 ``settle_usage`` 所需的上下文编码为 JSON 安全的 journal payload。"""
+    preflight = ctx.platform_budget_preflight
+    vkey = ctx.vkey
+    return {
+        "team_id": str(ctx.team_id),
+        "user_id": _str_or_none(ctx.user_id),
+        "vkey": (
+            {
+                "vkey_id": str(vkey.vkey_id),
+                "vkey_name": vkey.vkey_name,
+                "team_id": str(vkey.team_id),
+                "user_id": _str_or_none(vkey.user_id),
+                "is_system": vkey.is_system,
+            }
+            if vkey is not None
+            else None
+        ),
+        "capability": ctx.capability.value,
+        "ctx_request_id": ctx.request_id,
+        "budget_model": ctx.budget_model,
+        "inbound_via": ctx.inbound_via,
+        "preflight": (
+            {
+                "anchor_pins": serialize_budget_anchor_pins(preflight.anchor_pins),
+                "reservations": [_encode_budget_reservation(r) for r in preflight.reservations],
+                "token_reservations_released": preflight.token_reservations_released,
+            }
+            if preflight is not None
+            else None
+        ),
+        "entitlement": (
+            _encode_entitlement(ctx.entitlement_state)
+            if ctx.entitlement_state is not None
+            else None
+        ),
+        "tokens": tokens,
+        "cost": str(cost),
+        "requests": requests,
+        "image_count": image_count,
+        "request_id": request_id,
+        "with_entitlement": with_entitlement,
+    }
+
+
+def decode_settle_usage_context(payload: dict[str, Any]) -> ProxyContext:
+    """还原结算所需的最小 ``ProxyContext``（日志 / 护栏等字段取保守默认值）。"""
+    raw_vkey = payload.get("vkey")
+    vkey = (
+        VirtualKeyPrincipal(
+            vkey_id=uuid.UUID(raw_vkey["vkey_id"]),
+            vkey_name=str(raw_vkey.get("vkey_name") or ""),
+            team_id=uuid.UUID(raw_vkey["team_id"]),
+            user_id=_uuid_or_none(raw_vkey.get("user_id")),
+            allowed_models=(),
+            allowed_capabilities=(),
+            rpm_limit=None,
+            tpm_limit=None,
+            store_full_messages=False,
+            guardrail_enabled=False,
+            is_system=bool(raw_vkey.get("is_system")),
+        )
+        if isinstance(raw_vkey, dict)
+        else None
+    )
+    raw_preflight = payload.get("preflight")
+    preflight = (
+        PlatformBudgetPreflightState(
+            anchor_pins=deserialize_budget_anchor_pins(raw_preflight.get("anchor_pins")),
+            reservations=[
+                _decode_budget_reservation(r) for r in raw_preflight.get("reservations") or ()
+            ],
+            token_reservations_released=bool(raw_preflight.get("token_reservations_released")),
+        )
+        if isinstance(raw_preflight, dict)
+        else None
+    )
+    raw_entitlement = payload.get("entitlement")
+    return ProxyContext(
+        team_id=uuid.UUID(payload["team_id"]),
+        user_id=_uuid_or_none(payload.get("user_id")),
+        vkey=vkey,
+        capability=GatewayCapability(payload["capability"]),
+        request_id=str(payload.get("ctx_request_id") or ""),
+        store_full_messages=False,
+        guardrail_enabled=False,
+        budget_model=payload.get("budget_model"),
+        inbound_via=payload.get("inbound_via") or "vkey",
+        entitlement_state=(
+            _decode_entitlement(raw_entitlement) if isinstance(raw_entitlement, dict) else None
+        ),
+        platform_budget_preflight=preflight,
+    )
+
+
+async def replay_settle_usage(payload: dict[str, Any]) -> None:
+    """重放一条崩溃遗留的 ``settle_usage``（走后台连接池）。"""
+    from domains.gateway.application.budget.budget_service import BudgetService
+    from domains.gateway.application.quota.entitlement_guard import (
+        build_entitlement_guard_for_session,
+    )
+
+    from .proxy_response_adapter import settle_usage
+
+    try:
+        ctx = decode_settle_usage_context(payload)
+    except (KeyError, TypeError, ValueError):
+        logger.warning("Drop malformed settle_usage journal payload: %r", payload)
+        return
+    with prefer_background_pool():
+        async with get_session_context() as session:
+            guard = (
+                build_entitlement_guard_for_session(session)
+                if payload.get("with_entitlement")
+                else None
+            )
+            await settle_usage(
+                ctx,
+                BudgetService(),
+                tokens=int(payload.get("tokens") or 0),
+                cost=Decimal(str(payload.get("cost") or "0")),
+                requests=int(payload.get("requests") or 0),
+                image_count=int(payload.get("image_count") or 0),
+                entitlement_guard=guard,
+                request_id=payload.get("request_id"),
+            )
+
+
+proxy_deferred_runner.register_replay_handler(SETTLE_USAGE_JOB_KIND, replay_settle_usage)
+
+
+async def replay_proxy_deferred_journal() -> int:
+    """启动钩子：重放崩溃进程遗留的代理结算；返回重新登记的任务数。"""
+    return await proxy_deferred_runner.replay_journal()
+
+
+__all__ = [
+    "SETTLE_USAGE_JOB_KIND",
+    "decode_settle_usage_context",
+    "encode_settle_usage_payload",
+    "replay_proxy_deferred_journal",
+    "replay_settle_usage",
+]
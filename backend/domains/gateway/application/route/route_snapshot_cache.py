@@ -18,6 +18,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from domains.gateway.domain.route.route_snapshot import build_route_snapshot_metadata
 from domains.gateway.infrastructure.repositories.model_repository import GatewayRouteRepository
+from libs.observability.metrics import record_cache_lookup
 from utils.logging import get_logger
 
 logger = get_logger(__name__)
@@ -76,9 +77,11 @@ async def get_route_snapshot_metadata(
         if now - ts < _TTL_SEC:
             current_version = await _fetch_tenant_version(team_id)
             if current_version == stored_version:
+                record_cache_lookup("route_snapshot", hit=True)
                 return payload
         # TTL 或版本号变化 → 失效，落库重查
         _CACHE.pop(key, None)
+    record_cache_lookup("route_snapshot", hit=False)
     route = await GatewayRouteRepository(session).resolve_by_virtual_model(team_id, virtual_model)
     if route is None:
         _CACHE[key] = (None, now, await _fetch_tenant_version(team_id))
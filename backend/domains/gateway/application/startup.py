@@ -62,6 +62,17 @@ async def run_gateway_startup(app: FastAPI) -> None:
             )
 
         schedule_gateway_jobs(app)
+
+        # 重放上次进程崩溃遗留的响应后结算（预扣释放 + 用量记账），由有界执行器后台执行
+        try:
+            from domains.gateway.application.proxy.proxy_settlement_journal import (
+                replay_proxy_deferred_journal,
+            )
+
+            await replay_proxy_deferred_journal()
+        except Exception:
+            logger.warning("proxy settlement journal replay failed", exc_info=True)
+
         logger.info("AI Gateway initialized: Router + background jobs scheduled")
     except Exception as e:
         logger.warning("Failed to initialize AI Gateway: %s", e)
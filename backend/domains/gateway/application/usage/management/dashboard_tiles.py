@@ -0,0 +1,424 @@
+"""Dashboard 分片（tile）执行器：并发、缓存、同键合并。
+
+Dashboard 各端点由若干互不依赖的聚合片组成（hourly 冷段 / 明细热尾 / client_type / 计数等）。
+``DashboardTileRunner`` 让每片各取一个池化会话并发执行，并按 ``(团队/轴, 筛选, 时间段)`` 缓存：
+
+- 已完成分片：时间段止于 hourly rollup 水位之前，结果不再变化，键用精确时间、长 TTL；
+  repair 覆盖重算后经 ``bump_dashboard_tile_generation`` 整体失效；
+- 未完成分片：含热尾 / 当前小时，键内时间按 ``open_ttl`` 取整、短 TTL，只有这部分会反复重算；
+- 同键并发（多人同时打开 / 自动刷新）在进程内合并为一次计算，发起方取消不影响其余等待方。
+
+缓存为 L1 进程内 + Redis 两层，值为带类型标记的 JSON，命中时反序列化出独立副本。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass, fields, is_dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+import hashlib
+import json
+import time
+from typing import TYPE_CHECKING, Any, TypeVar
+import uuid
+
+from bootstrap.config import settings
+from domains.gateway.infrastructure.repositories.gateway_rollup_state_repository import (
+    GatewayRollupStateRepository,
+)
+from domains.gateway.infrastructure.repositories.metrics_hourly_read_repository import (
+    MetricsHourlyReadRepository,
+)
+from domains.gateway.infrastructure.repositories.request_log_repository import (
+    BreakdownPairRow,
+    RequestLogRepository,
+    RequestLogUsageAggregateRow,
+    RequestLogUsageTotals,
+)
+from libs.db.database import get_session_context
+from libs.observability.metrics import get_metrics_collector
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+_LOCAL_MAX = 2048
+_REDIS_GENERATION_KEY = "gw:dash_tile:gen"
+_REDIS_ENTRY_PREFIX = "gw:dash_tile:"
+
+_LocalEntry = tuple[str, float]  # (encoded, expires_at monotonic)
+
+_LOCAL: dict[str, _LocalEntry] = {}
+_INFLIGHT: dict[str, asyncio.Task[str]] = {}
+_GENERATION: tuple[str, float] | None = None  # (generation, expires_at)
+_WATERMARK: tuple[datetime | None, float] | None = None  # (last_rolled_at, expires_at)
+
+_metrics = get_metrics_collector()
+_metrics.describe(
+    "gateway_dashboard_tile_total",
+    "Dashboard tile lookups by outcome (local_hit/redis_hit/shared/computed) and state",
+)
+_metrics.describe("gateway_dashboard_tile_compute_ms", "Dashboard tile aggregate compute latency")
+
+
+# ---------------------------------------------------------------------------
+# 值编码（带类型标记的 JSON）
+# ---------------------------------------------------------------------------
+
+_DATACLASSES: dict[str, type[Any]] = {
+    cls.__name__: cls
+    for cls in (RequestLogUsageAggregateRow, RequestLogUsageTotals, BreakdownPairRow)
+}
+
+
+def register_tile_dataclass(cls: type[T]) -> type[T]:
+    """登记可缓存的 dataclass（分片结果里出现的行类型）。"""
+    _DATACLASSES[cls.__name__] = cls
+    return cls
+
+
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, bool | int | float | str):
+        return value
+    if isinstance(value, Decimal):
+        return {"t": "dec", "v": str(value)}
+    if isinstance(value, uuid.UUID):
+        return {"t": "uuid", "v": str(value)}
+    if isinstance(value, datetime):
+        return {"t": "dt", "v": value.isoformat()}
+    if isinstance(value, list):
+        return [_encode(v) for v in value]
+    if isinstance(value, tuple):
+        return {"t": "tuple", "v": [_encode(v) for v in value]}
+    if isinstance(value, dict):
+        return {"t": "map", "v": {str(k): _encode(v) for k, v in value.items()}}
+    name = type(value).__name__
+    if is_dataclass(value) and _DATACLASSES.get(name) is type(value):
+        return {
+            "t": "dc",
+            "c": name,
+            "v": {f.name: _encode(getattr(value, f.name)) for f in fields(value)},
+        }
+    raise TypeError(f"dashboard tile value not cacheable: {type(value)!r}")
+
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    tag, raw = value["t"], value["v"]
+    if tag == "dec":
+        return Decimal(raw)
+    if tag == "uuid":
+        return uuid.UUID(raw)
+    if tag == "dt":
+        return datetime.fromisoformat(raw)
+    if tag == "tuple":
+        return tuple(_decode(v) for v in raw)
+    if tag == "map":
+        return {k: _decode(v) for k, v in raw.items()}
+    if tag == "dc":
+        return _DATACLASSES[value["c"]](**{k: _decode(v) for k, v in raw.items()})
+    raise ValueError(f"unknown dashboard tile tag: {tag!r}")
+
+
+def encode_tile_value(value: Any) -> str:
+    return json.dumps(_encode(value), separators=(",", ":"))
+
+
+def decode_tile_value(raw: str | bytes) -> Any:
+    return _decode(json.loads(raw))
+
+
+# ---------------------------------------------------------------------------
+# 分片键
+# ---------------------------------------------------------------------------
+
+
+def _on_hour(value: datetime) -> bool:
+    """整点，或整点前 1 微秒（明细仓储的含端 ``end`` 约定）。"""
+    utc = value.astimezone(UTC)
+    for candidate in (utc, utc + timedelta(microseconds=1)):
+        if candidate.minute == 0 and candidate.second == 0 and candidate.microsecond == 0:
+            return True
+    return False
+
+
+def _scope_default(value: Any) -> Any:
+    if is_dataclass(value) and not isinstance(value, type):
+        return {f.name: getattr(value, f.name) for f in fields(value)}
+    return str(value)
+
+
+@dataclass(frozen=True)
+class DashboardTile:
+    """一个聚合片：``kind`` + 作用域（轴 / 筛选 / 参数）+ 时间段 ``[start, end]``。"""
+
+    kind: str
+    scope: tuple[Any, ...]
+    start: datetime
+    end: datetime
+
+    def scope_digest(self) -> str:
+        payload = json.dumps(self.scope, default=_scope_default, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()[:24]
+
+    def is_completed(self, watermark: datetime | None) -> bool:
+        """整点对齐且止于 rollup 水位之前：该段已定稿，可用精确键长期缓存。
+
+        非整点边界（随请求时刻滑动的窗口首尾）每次都不同，精确键无复用价值，按未完成处理。
+        """
+        if watermark is None or self.end > watermark:
+            return False
+        return _on_hour(self.start) and _on_hour(self.end)
+
+    def cache_key(self, *, completed: bool, open_ttl_seconds: int) -> str:
+        if completed:
+            span = (
+                f"{self.start.astimezone(UTC).isoformat()}~{self.end.astimezone(UTC).isoformat()}"
+            )
+        else:
+            step = max(1, open_ttl_seconds)
+            span = f"o{int(self.start.timestamp()) // step}~{int(self.end.timestamp()) // step}"
+        return f"{self.kind}:{self.scope_digest()}:{span}"
+
+
+@dataclass(frozen=True)
+class UsageReadRepos:
+    """单个分片会话上的只读仓储。"""
+
+    session: AsyncSession
+    logs: RequestLogRepository
+    hourly: MetricsHourlyReadRepository
+
+    @classmethod
+    def for_session(cls, session: AsyncSession) -> UsageReadRepos:
+        return cls(session, RequestLogRepository(session), MetricsHourlyReadRepository(session))
+
+
+# ---------------------------------------------------------------------------
+# L1 / Redis
+# ---------------------------------------------------------------------------
+
+
+def _get_local(key: str) -> str | None:
+    hit = _LOCAL.get(key)
+    if hit is None:
+        return None
+    if time.monotonic() >= hit[1]:
+        _LOCAL.pop(key, None)
+        return None
+    return hit[0]
+
+
+def _put_local(key: str, encoded: str, ttl_seconds: float) -> None:
+    if len(_LOCAL) >= _LOCAL_MAX:
+        oldest = min(_LOCAL.items(), key=lambda item: item[1][1])[0]
+        _LOCAL.pop(oldest, None)
+    _LOCAL[key] = (encoded, time.monotonic() + ttl_seconds)
+
+
+def clear_all_local_dashboard_tiles_for_tests() -> None:
+    """测试专用：清除本地分片缓存、水位与代号缓存。"""
+    global _GENERATION, _WATERMARK
+    _LOCAL.clear()
+    _INFLIGHT.clear()
+    _GENERATION = None
+    _WATERMARK = None
+
+
+async def _get_redis_client():
+    try:
+        from libs.db.redis import get_redis_client
+
+        return await get_redis_client()
+    except Exception:
+        return None
+
+
+async def _current_generation() -> str:
+    global _GENERATION
+    now = time.monotonic()
+    if _GENERATION is not None and now < _GENERATION[1]:
+        return _GENERATION[0]
+    generation = "0"
+    redis = await _get_redis_client()
+    if redis is not None:
+        try:
+            raw = await redis.get(_REDIS_GENERATION_KEY)
+            if raw is not None:
+                generation = raw.decode() if isinstance(raw, bytes) else str(raw)
+        except Exception:
+            logger.warning("Redis dashboard tile generation read failed", exc_info=True)
+    _GENERATION = (generation, now + settings.gateway_dashboard_tile_open_ttl_seconds)
+    return generation
+
+
+async def bump_dashboard_tile_generation() -> None:
+    """hourly 覆盖重算后调用：已完成分片整体失效（其他实例在一个 open TTL 内跟进）。"""
+    global _GENERATION
+    _LOCAL.clear()
+    _GENERATION = None
+    redis = await _get_redis_client()
+    if redis is None:
+        return
+    try:
+        await redis.incr(_REDIS_GENERATION_KEY)
+    except Exception:
+        logger.warning("Redis dashboard tile generation bump failed", exc_info=True)
+
+
+async def _get_redis(key: str) -> str | None:
+    redis = await _get_redis_client()
+    if redis is None:
+        return None
+    try:
+        raw = await redis.get(f"{_REDIS_ENTRY_PREFIX}{key}")
+    except Exception:
+        logger.warning("Redis dashboard tile read failed", exc_info=True)
+        return None
+    if raw is None:
+        return None
+    return raw.decode() if isinstance(raw, bytes) else str(raw)
+
+
+async def _put_redis(key: str, encoded: str, ttl_seconds: int) -> None:
+    redis = await _get_redis_client()
+    if redis is None:
+        return
+    try:
+        await redis.set(f"{_REDIS_ENTRY_PREFIX}{key}", encoded, ex=ttl_seconds)
+    except Exception:
+        logger.warning("Redis dashboard tile write failed", exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+
+class DashboardTileRunner:
+    """单个 dashboard 请求内的分片执行器（并发上限按请求计）。"""
+
+    def __init__(
+        self,
+        *,
+        session_scope: Callable[[], AbstractAsyncContextManager[AsyncSession]] | None = None,
+        concurrency: int | None = None,
+    ) -> None:
+        self._session_scope = session_scope or get_session_context
+        self._semaphore = asyncio.Semaphore(
+            concurrency or settings.gateway_dashboard_tile_concurrency
+        )
+
+    async def watermark(self) -> datetime | None:
+        """hourly rollup 水位（进程内缓存一个 open TTL）。"""
+        global _WATERMARK
+        now = time.monotonic()
+        if _WATERMARK is not None and now < _WATERMARK[1]:
+            return _WATERMARK[0]
+        async with self._semaphore, self._session_scope() as session:
+            value = await GatewayRollupStateRepository(session).get_last_rolled_at()
+        _WATERMARK = (value, now + settings.gateway_dashboard_tile_open_ttl_seconds)
+        return value
+
+    async def gather(self, *calls: Awaitable[Any]) -> list[Any]:
+        return list(await asyncio.gather(*calls))
+
+    async def run(
+        self, tile: DashboardTile, compute: Callable[[UsageReadRepos], Awaitable[T]]
+    ) -> T:
+        completed = tile.is_completed(await self.watermark())
+        state = "completed" if completed else "open"
+        open_ttl = settings.gateway_dashboard_tile_open_ttl_seconds
+        ttl = settings.gateway_dashboard_tile_completed_ttl_seconds if completed else open_ttl
+        generation = await _current_generation()
+        key = f"{generation}:{tile.cache_key(completed=completed, open_ttl_seconds=open_ttl)}"
+
+        encoded = _get_local(key)
+        if encoded is not None:
+            _metrics.increment(
+                "gateway_dashboard_tile_total", tags={"outcome": "local_hit", "state": state}
+            )
+            return decode_tile_value(encoded)
+
+        task = _INFLIGHT.get(key)
+        if task is None:
+            task = asyncio.create_task(self._load(key, tile, compute, ttl=ttl, state=state))
+            _INFLIGHT[key] = task
+            task.add_done_callback(lambda t, k=key: _finish_inflight(k, t))
+        else:
+            _metrics.increment(
+                "gateway_dashboard_tile_total", tags={"outcome": "shared", "state": state}
+            )
+        # shield：发起方请求被取消时，其余等待同键的请求仍拿到结果
+        return decode_tile_value(await asyncio.shield(task))
+
+    async def _load(
+        self,
+        key: str,
+        tile: DashboardTile,
+        compute: Callable[[UsageReadRepos], Awaitable[Any]],
+        *,
+        ttl: int,
+        state: str,
+    ) -> str:
+        encoded = await _get_redis(key)
+        if encoded is not None:
+            _metrics.increment(
+                "gateway_dashboard_tile_total", tags={"outcome": "redis_hit", "state": state}
+            )
+            _put_local(key, encoded, ttl)
+            return encoded
+
+        started = time.perf_counter()
+        async with self._semaphore, self._session_scope() as session:
+            value = await compute(UsageReadRepos.for_session(session))
+        _metrics.record_timer(
+            "gateway_dashboard_tile_compute_ms",
+            (time.perf_counter() - started) * 1000,
+            {"kind": tile.kind, "state": state},
+        )
+        _metrics.increment(
+            "gateway_dashboard_tile_total", tags={"outcome": "computed", "state": state}
+        )
+        encoded = encode_tile_value(value)
+        _put_local(key, encoded, ttl)
+        await _put_redis(key, encoded, ttl)
+        return encoded
+
+
+def _finish_inflight(key: str, task: asyncio.Task[str]) -> None:
+    if _INFLIGHT.get(key) is task:
+        _INFLIGHT.pop(key, None)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("Dashboard tile %s failed: %s", key, task.exception())
+
+
+def build_dashboard_tile_runner() -> DashboardTileRunner | None:
+    """按配置构造；关闭时返回 ``None``，调用方退回单会话顺序执行。"""
+    if not settings.gateway_dashboard_tiles_enabled:
+        return None
+    return DashboardTileRunner()
+
+
+__all__ = [
+    "DashboardTile",
+    "DashboardTileRunner",
+    "UsageReadRepos",
+    "build_dashboard_tile_runner",
+    "bump_dashboard_tile_generation",
+    "clear_all_local_dashboard_tiles_for_tests",
+    "decode_tile_value",
+    "encode_tile_value",
+    "register_tile_dataclass",
+]
@@ -102,8 +102,28 @@ class GatewayUsageLogReadMixin:
         user_id: UUID | None = None,
         model: str | None = None,
         client_type: str | None = None,
-    ) -> RequestLogListPage:
+        archived_month: tuple[int, int] | None = None,
+    ) -> RequestLogListPage | None:
+        """``archived_month=(year, month)`` 时只读查询已归档月份；该月无归档返回 ``None``。"""
         axis = self._resolve_usage_axis(ctx, usage_aggregation, vkey_id=vkey_id)
+        if archived_month is not None:
+            year, month = archived_month
+            return await self._archived_logs.list_month_by_axis(
+                axis,
+                year,
+                month,
+                start=start,
+                end=end,
+                status=status_filter,
+                capability=capability,
+                vkey_id=vkey_id,
+                credential_id=credential_id,
+                user_id=user_id,
+                model=model,
+                client_type=client_type,
+                page=page,
+                page_size=page_size,
+            )
         return await self._logs.list_by_axis(
             axis,
             start=start,
@@ -438,22 +458,24 @@ class GatewayUsageLogReadMixin:
             group_by=parent_group_by,
             group_key=normalized_parent_key,
         )
-        parent_requests = await self._usage_metrics.count_usage_requests(
-            axis,
-            start,
-            end,
-            filters=filters,
-            parent_scope=parent_scope,
-        )
-        rows, _, _ = await self._usage_metrics.aggregate_usage_statistics(
-            axis,
-            start,
-            end,
-            group_by=breakdown_group_by,
-            filters=filters,
-            page=1,
-            page_size=top_n,
-            parent_scope=parent_scope,
+        parent_requests, (rows, _, _) = await self._usage_metrics.gather(
+            self._usage_metrics.count_usage_requests(
+                axis,
+                start,
+                end,
+                filters=filters,
+                parent_scope=parent_scope,
+            ),
+            self._usage_metrics.aggregate_usage_statistics(
+                axis,
+                start,
+                end,
+                group_by=breakdown_group_by,
+                filters=filters,
+                page=1,
+                page_size=top_n,
+                parent_scope=parent_scope,
+            ),
         )
         labels = await self._usage_statistics_labels(
             rows, breakdown_group_by, viewer_user_id=ctx.user_id
@@ -1,9 +1,13 @@
-"""Dashboard/Statistics hybrid 读路由（hourly 冷段 + logs 热尾）。"""
+"""Dashboard/Statistics hybrid 读路由（hourly 冷段 + logs 热尾）。
+
+注入 ``DashboardTileRunner`` 时，每次仓储读取都是一个分片：互不依赖的冷段 / 热段 / client_type
+并发执行（各自取池化会话）且按分片缓存；未注入时在构造传入的仓储上顺序执行（单会话不可并发）。
+"""
 
 from __future__ import annotations
 
 from decimal import Decimal
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
 from bootstrap.config import settings
 from domains.gateway.domain.usage.usage_read_model import (
@@ -17,6 +21,7 @@ from domains.gateway.infrastructure.repositories.request_log_repository import (
     RequestLogUsageTotals,
 )
 
+from .dashboard_tiles import DashboardTile
 from .usage_metrics import (
     merge_statistics_items,
     merge_statistics_totals,
@@ -31,6 +36,7 @@ from .usage_metrics_window import (
 )
 
 if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Coroutine
     from datetime import datetime
     from uuid import UUID
 
@@ -42,6 +48,10 @@ if TYPE_CHECKING:
         RequestLogRepository,
     )
 
+    from .dashboard_tiles import DashboardTileRunner
+
+T = TypeVar("T")
+
 _EMPTY_TOTALS = RequestLogUsageTotals(0, 0, 0, 0, 0, 0, 0, Decimal("0"), 0.0, 0.0, 0)
 
 
@@ -50,9 +60,66 @@ class UsageMetricsRouter:
         self,
         logs: RequestLogRepository,
         hourly: MetricsHourlyReadRepository,
+        *,
+        tiles: DashboardTileRunner | None = None,
     ) -> None:
         self._logs = logs
         self._hourly = hourly
+        self._tiles = tiles
+
+    async def gather(self, *calls: Coroutine[Any, Any, Any]) -> list[Any]:
+        """并发执行互不依赖的读取；无分片执行器时共用一个会话，只能按序 await。"""
+        if self._tiles is not None:
+            return await self._tiles.gather(*calls)
+        pending = list(calls)
+        results: list[Any] = []
+        try:
+            while pending:
+                results.append(await pending.pop(0))
+        finally:
+            for call in pending:
+                call.close()
+        return results
+
+    async def _tile(
+        self,
+        kind: str,
+        axis: UsageAxis,
+        start: datetime,
+        end: datetime,
+        scope: dict[str, Any],
+        compute: Callable[[RequestLogRepository, MetricsHourlyReadRepository], Awaitable[T]],
+    ) -> T:
+        if self._tiles is None:
+            return await compute(self._logs, self._hourly)
+        tile = DashboardTile(kind=kind, scope=(axis, scope), start=start, end=end)
+        return await self._tiles.run(tile, lambda repos: compute(repos.logs, repos.hourly))
+
+    async def _read_logs(
+        self, method: str, axis: UsageAxis, start: datetime, end: datetime, **kwargs: Any
+    ) -> Any:
+        """明细表分片：``RequestLogRepository.<method>(axis, start, end, **kwargs)``。"""
+        return await self._tile(
+            f"logs.{method}",
+            axis,
+            start,
+            end,
+            kwargs,
+            lambda logs, _hourly: getattr(logs, method)(axis, start, end, **kwargs),
+        )
+
+    async def _read_hourly(
+        self, method: str, axis: UsageAxis, start: datetime, end: datetime, **kwargs: Any
+    ) -> Any:
+        """hourly 冷段分片：``[start, end)`` 为整点桶范围。"""
+        return await self._tile(
+            f"hourly.{method}",
+            axis,
+            start,
+            end,
+            kwargs,
+            lambda _logs, hourly: getattr(hourly, method)(axis, start, end, **kwargs),
+        )
 
     def _hybrid_enabled(self) -> bool:
         return settings.gateway_metrics_hybrid_read_enabled
@@ -98,22 +165,17 @@ class UsageMetricsRouter:
             return None
         return bucket_start, bucket_end
 
-    async def _attach_cold_client_type(
+    async def _cold_client_type(
         self,
         axis: UsageAxis,
         split: UsageMetricsWindowSplit,
-        summary: dict[str, Any],
         list_kwargs: dict[str, Any],
-    ) -> None:
+    ) -> list[dict[str, Any]]:
         cold_logs = cold_logs_time_range(split)
         if cold_logs is None:
-            summary["by_client_type"] = []
-            return
-        summary["by_client_type"] = await self._logs.aggregate_by_client_type(
-            axis,
-            cold_logs[0],
-            cold_logs[1],
-            **list_kwargs,
+            return []
+        return await self._read_logs(
+            "aggregate_by_client_type", axis, cold_logs[0], cold_logs[1], **list_kwargs
         )
 
     async def _logs_summary_with_client_type(
@@ -123,12 +185,31 @@ class UsageMetricsRouter:
         end: datetime,
         list_kwargs: dict[str, Any],
     ) -> dict[str, Any]:
-        summary = await self._logs.aggregate_summary_by_axis(axis, start, end, **list_kwargs)
-        summary["by_client_type"] = await self._logs.aggregate_by_client_type(
-            axis, start, end, **list_kwargs
+        summary, by_client_type = await self.gather(
+            self._read_logs("aggregate_summary_by_axis", axis, start, end, **list_kwargs),
+            self._read_logs("aggregate_by_client_type", axis, start, end, **list_kwargs),
         )
+        summary["by_client_type"] = by_client_type
         return summary
 
+    async def _hourly_summary(
+        self,
+        axis: UsageAxis,
+        cold_range: tuple[datetime, datetime],
+        filters: UsageStatisticsFilters,
+    ) -> dict[str, Any]:
+        return await self._read_hourly(
+            "aggregate_summary_by_axis",
+            axis,
+            cold_range[0],
+            cold_range[1],
+            capability=filters.capability,
+            vkey_id=filters.vkey_id,
+            credential_id=filters.credential_id,
+            user_id=filters.user_id,
+            model=filters.model,
+        )
+
     async def aggregate_summary(
         self,
         axis: UsageAxis,
@@ -179,18 +260,11 @@ class UsageMetricsRouter:
         has_hot = split.hot_start is not None and split.hot_end is not None
 
         if cold_range is not None and not has_hot:
-            bucket_start, bucket_end = cold_range
-            merged = await self._hourly.aggregate_summary_by_axis(
-                axis,
-                bucket_start,
-                bucket_end,
-                capability=filters.capability,
-                vkey_id=filters.vkey_id,
-                credential_id=filters.credential_id,
-                user_id=filters.user_id,
-                model=filters.model,
+            merged, by_client_type = await self.gather(
+                self._hourly_summary(axis, cold_range, filters),
+                self._cold_client_type(axis, split, list_kwargs),
             )
-            await self._attach_cold_client_type(axis, split, merged, list_kwargs)
+            merged["by_client_type"] = by_client_type
             return merged
 
         if has_hot and cold_range is None:
@@ -202,21 +276,11 @@ class UsageMetricsRouter:
             return await self._logs_summary_with_client_type(axis, start, end, list_kwargs)
 
         assert cold_range is not None
-        bucket_start, bucket_end = cold_range
-        merged: dict[str, Any] | None = await self._hourly.aggregate_summary_by_axis(
-            axis,
-            bucket_start,
-            bucket_end,
-            capability=filters.capability,
-            vkey_id=filters.vkey_id,
-            credential_id=filters.credential_id,
-            user_id=filters.user_id,
-            model=filters.model,
-        )
-        hot_summary = await self._logs_summary_with_client_type(
-            axis, split.hot_start, split.hot_end, list_kwargs
+        cold_summary, hot_summary = await self.gather(
+            self._hourly_summary(axis, cold_range, filters),
+            self._logs_summary_with_client_type(axis, split.hot_start, split.hot_end, list_kwargs),
         )
-        merged = merge_summary_slices(merged, hot_summary)
+        merged = merge_summary_slices(cold_summary, hot_summary)
         if "by_client_type" not in merged:
             merged["by_client_type"] = hot_summary.get("by_client_type", [])
         return merged
@@ -240,28 +304,34 @@ class UsageMetricsRouter:
         hot_end = split.hot_end
         assert hot_start is not None and hot_end is not None
 
-        _, cold_totals, cold_group_total = await self._hourly.aggregate_usage_statistics_by_axis(
-            axis,
-            bucket_start,
-            bucket_end,
-            group_by=group_by,
-            filters=filters,
-            page=1,
-            page_size=0,
-            parent_scope=parent_scope,
-        )
-        _, hot_totals, hot_group_total = await self._logs.aggregate_usage_statistics_by_axis(
-            axis,
-            hot_start,
-            hot_end,
-            group_by=group_by,
-            filters=filters,
-            page=1,
-            page_size=0,
-            parent_scope=parent_scope,
+        cold_probe, hot_probe = await self.gather(
+            self._read_hourly(
+                "aggregate_usage_statistics_by_axis",
+                axis,
+                bucket_start,
+                bucket_end,
+                group_by=group_by,
+                filters=filters,
+                page=1,
+                page_size=0,
+                parent_scope=parent_scope,
+            ),
+            self._read_logs(
+                "aggregate_usage_statistics_by_axis",
+                axis,
+                hot_start,
+                hot_end,
+                group_by=group_by,
+                filters=filters,
+                page=1,
+                page_size=0,
+                parent_scope=parent_scope,
+            ),
         )
+        cold_group_total, hot_group_total = cold_probe[2], hot_probe[2]
         if cold_group_total + hot_group_total > settings.gateway_metrics_hybrid_merge_max_groups:
-            return await self._logs.aggregate_usage_statistics_by_axis(
+            return await self._read_logs(
+                "aggregate_usage_statistics_by_axis",
                 axis,
                 start,
                 end,
@@ -272,23 +342,27 @@ class UsageMetricsRouter:
                 parent_scope=parent_scope,
             )
 
-        cold_items, cold_totals, _ = await self._hourly.aggregate_usage_statistics_by_axis(
-            axis,
-            bucket_start,
-            bucket_end,
-            group_by=group_by,
-            filters=filters,
-            parent_scope=parent_scope,
-            fetch_all_groups=True,
-        )
-        hot_items, hot_totals, _ = await self._logs.aggregate_usage_statistics_by_axis(
-            axis,
-            hot_start,
-            hot_end,
-            group_by=group_by,
-            filters=filters,
-            parent_scope=parent_scope,
-            fetch_all_groups=True,
+        (cold_items, cold_totals, _), (hot_items, hot_totals, _) = await self.gather(
+            self._read_hourly(
+                "aggregate_usage_statistics_by_axis",
+                axis,
+                bucket_start,
+                bucket_end,
+                group_by=group_by,
+                filters=filters,
+                parent_scope=parent_scope,
+                fetch_all_groups=True,
+            ),
+            self._read_logs(
+                "aggregate_usage_statistics_by_axis",
+                axis,
+                hot_start,
+                hot_end,
+                group_by=group_by,
+                filters=filters,
+                parent_scope=parent_scope,
+                fetch_all_groups=True,
+            ),
         )
 
         merged_items = merge_statistics_items(cold_items, hot_items)
@@ -335,7 +409,8 @@ class UsageMetricsRouter:
             filters=filters,
             parent_group_by=parent_scope.group_by if parent_scope else None,
         ):
-            return await self._logs.aggregate_usage_statistics_by_axis(
+            return await self._read_logs(
+                "aggregate_usage_statistics_by_axis",
                 axis,
                 start,
                 end,
@@ -356,7 +431,8 @@ class UsageMetricsRouter:
 
         if cold_range is not None and not has_hot:
             bucket_start, bucket_end = cold_range
-            return await self._hourly.aggregate_usage_statistics_by_axis(
+            return await self._read_hourly(
+                "aggregate_usage_statistics_by_axis",
                 axis,
                 bucket_start,
                 bucket_end,
@@ -368,7 +444,8 @@ class UsageMetricsRouter:
             )
 
         if has_hot and cold_range is None:
-            return await self._logs.aggregate_usage_statistics_by_axis(
+            return await self._read_logs(
+                "aggregate_usage_statistics_by_axis",
                 axis,
                 split.hot_start,
                 split.hot_end,
@@ -380,7 +457,8 @@ class UsageMetricsRouter:
             )
 
         if cold_range is None and not has_hot:
-            return await self._logs.aggregate_usage_statistics_by_axis(
+            return await self._read_logs(
+                "aggregate_usage_statistics_by_axis",
                 axis,
                 start,
                 end,
@@ -419,7 +497,8 @@ class UsageMetricsRouter:
             filters=filters,
             parent_group_by=parent_scope.group_by if parent_scope else None,
         ):
-            return await self._logs.count_usage_requests_by_axis(
+            return await self._read_logs(
+                "count_usage_requests_by_axis",
                 axis,
                 start,
                 end,
@@ -434,24 +513,30 @@ class UsageMetricsRouter:
         )
         cold_range = self._cold_bucket_range(split)
         has_hot = split.hot_start is not None and split.hot_end is not None
-        total = 0
+        calls = []
         if cold_range is not None:
-            total += await self._hourly.count_usage_requests_by_axis(
-                axis,
-                cold_range[0],
-                cold_range[1],
-                filters=filters,
-                parent_scope=parent_scope,
+            calls.append(
+                self._read_hourly(
+                    "count_usage_requests_by_axis",
+                    axis,
+                    cold_range[0],
+                    cold_range[1],
+                    filters=filters,
+                    parent_scope=parent_scope,
+                )
             )
         if has_hot:
-            total += await self._logs.count_usage_requests_by_axis(
-                axis,
-                split.hot_start,
-                split.hot_end,
-                filters=filters,
-                parent_scope=parent_scope,
+            calls.append(
+                self._read_logs(
+                    "count_usage_requests_by_axis",
+                    axis,
+                    split.hot_start,
+                    split.hot_end,
+                    filters=filters,
+                    parent_scope=parent_scope,
+                )
             )
-        return total
+        return sum(await self.gather(*calls))
 
     @staticmethod
     def _merge_breakdown_pairs(
@@ -499,7 +584,8 @@ class UsageMetricsRouter:
             filters=filters,
             parent_group_by=parent_group_by,
         ):
-            return await self._logs.aggregate_breakdown_pairs_by_axis(
+            return await self._read_logs(
+                "aggregate_breakdown_pairs_by_axis",
                 axis,
                 start,
                 end,
@@ -517,40 +603,61 @@ class UsageMetricsRouter:
         cold_range = self._cold_bucket_range(split)
         has_hot = split.hot_start is not None and split.hot_end is not None
 
-        cold_pairs: list[BreakdownPairRow] = []
-        if cold_range is not None:
-            cold_pairs = await self._hourly.aggregate_breakdown_pairs_by_axis(
+        if cold_range is None and not has_hot:
+            return await self._read_logs(
+                "aggregate_breakdown_pairs_by_axis",
                 axis,
-                cold_range[0],
-                cold_range[1],
+                start,
+                end,
                 parent_group_by=parent_group_by,
                 breakdown_group_by=breakdown_group_by,
                 parent_keys=parent_keys,
                 filters=filters,
             )
+        pair_kwargs: dict[str, Any] = {
+            "parent_group_by": parent_group_by,
+            "breakdown_group_by": breakdown_group_by,
+            "parent_keys": parent_keys,
+            "filters": filters,
+        }
+        cold_pairs: list[BreakdownPairRow] = []
         hot_pairs: list[BreakdownPairRow] = []
-        if has_hot:
-            hot_pairs = await self._logs.aggregate_breakdown_pairs_by_axis(
+        if cold_range is not None and has_hot:
+            cold_pairs, hot_pairs = await self.gather(
+                self._read_hourly(
+                    "aggregate_breakdown_pairs_by_axis",
+                    axis,
+                    cold_range[0],
+                    cold_range[1],
+                    **pair_kwargs,
+                ),
+                self._read_logs(
+                    "aggregate_breakdown_pairs_by_axis",
+                    axis,
+                    split.hot_start,
+                    split.hot_end,
+                    **pair_kwargs,
+                ),
+            )
+        elif cold_range is not None:
+            cold_pairs = await self._read_hourly(
+                "aggregate_breakdown_pairs_by_axis",
                 axis,
-                split.hot_start,
-                split.hot_end,
-                parent_group_by=parent_group_by,
-                breakdown_group_by=breakdown_group_by,
-                parent_keys=parent_keys,
-                filters=filters,
+                cold_range[0],
+                cold_range[1],
+                **pair_kwargs,
             )
-        if cold_range is None and not has_hot:
-            return await self._logs.aggregate_breakdown_pairs_by_axis(
+        else:
+            hot_pairs = await self._read_logs(
+                "aggregate_breakdown_pairs_by_axis",
                 axis,
-                start,
-                end,
-                parent_group_by=parent_group_by,
-                breakdown_group_by=breakdown_group_by,
-                parent_keys=parent_keys,
-                filters=filters,
+                split.hot_start,
+                split.hot_end,
+                **pair_kwargs,
             )
         if len(cold_pairs) + len(hot_pairs) > settings.gateway_metrics_hybrid_merge_max_groups:
-            return await self._logs.aggregate_breakdown_pairs_by_axis(
+            return await self._read_logs(
+                "aggregate_breakdown_pairs_by_axis",
                 axis,
                 start,
                 end,
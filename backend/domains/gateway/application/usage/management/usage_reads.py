@@ -5,6 +5,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
 from decimal import Decimal
+from typing import TYPE_CHECKING, Any
 from uuid import UUID
 
 from sqlalchemy import and_, func, or_, select
@@ -29,6 +30,13 @@ from domains.gateway.infrastructure.repositories.entitlement_plan_repository imp
 )
 from domains.tenancy.application.team_service import TeamService
 
+from .dashboard_tiles import DashboardTile, register_tile_dataclass
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Iterable
+
+    from .dashboard_tiles import DashboardTileRunner
+
 
 @dataclass(frozen=True)
 class UserQuotaReadModel:
@@ -310,11 +318,127 @@ def _entitlement_revenue_decimal(
     return revenue
 
 
+@register_tile_dataclass
+@dataclass(frozen=True)
+class MarginTileRow:
+    """margin 分组聚合行（可跨时间段合并、可缓存）。"""
+
+    group_key: UUID | str | None
+    cost_usd: Decimal
+    credential_name_snapshot: str | None = None
+
+
+def _ceil_hour(value: datetime) -> datetime:
+    floored = value.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+    return floored if floored == value else floored + timedelta(hours=1)
+
+
+async def _margin_rows(
+    session: AsyncSession,
+    team_id: UUID,
+    group_by: MarginGroupBy,
+    start: datetime,
+    end: datetime,
+    *,
+    end_inclusive: bool = True,
+) -> list[MarginTileRow]:
+    # 分组键
+    group_col = {
+        "credential": GatewayRequestLog.credential_id,
+        "model": GatewayRequestLog.real_model,
+        "team": GatewayRequestLog.tenant_id,
+    }[group_by]
+    columns = [
+        group_col.label("group_key"),
+        func.coalesce(func.sum(GatewayRequestLog.cost_usd), 0).label("cost_usd"),
+    ]
+    if group_by == "credential":
+        columns.append(
+            func.max(GatewayRequestLog.credential_name_snapshot).label("credential_name_snapshot")
+        )
+    end_clause = (
+        GatewayRequestLog.created_at <= end if end_inclusive else GatewayRequestLog.created_at < end
+    )
+    stmt = (
+        select(*columns)
+        .where(
+            and_(
+                GatewayRequestLog.tenant_id == team_id,
+                GatewayRequestLog.created_at >= start,
+                end_clause,
+            )
+        )
+        .group_by(group_col)
+    )
+    rows = (await session.execute(stmt)).all()
+    return [
+        MarginTileRow(
+            group_key=row.group_key,
+            cost_usd=Decimal(row.cost_usd or 0),
+            credential_name_snapshot=getattr(row, "credential_name_snapshot", None),
+        )
+        for row in rows
+    ]
+
+
+def _merge_margin_rows(rows: Iterable[MarginTileRow]) -> list[MarginTileRow]:
+    merged: dict[UUID | str | None, MarginTileRow] = {}
+    for row in rows:
+        existing = merged.get(row.group_key)
+        if existing is None:
+            merged[row.group_key] = row
+            continue
+        snapshots = [
+            s for s in (existing.credential_name_snapshot, row.credential_name_snapshot) if s
+        ]
+        merged[row.group_key] = MarginTileRow(
+            group_key=row.group_key,
+            cost_usd=existing.cost_usd + row.cost_usd,
+            credential_name_snapshot=max(snapshots) if snapshots else None,
+        )
+    return list(merged.values())
+
+
 class GatewayPlanUsageReadService:
     """上下游套餐统计读侧（CQRS read 工程分包）。"""
 
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(self, session: AsyncSession, *, tiles: DashboardTileRunner | None = None) -> None:
         self._session = session
+        self._tiles = tiles
+
+    @staticmethod
+    async def _margin_rows_tiled(
+        tiles: DashboardTileRunner,
+        team_id: UUID,
+        group_by: MarginGroupBy,
+        start: datetime,
+        end: datetime,
+    ) -> list[MarginTileRow]:
+        """按整点切成首尾碎片 + 中段，各片并发取数并缓存；中段止于 rollup 水位时长期命中。"""
+        body_start = _ceil_hour(start)
+        body_end = end.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+        if body_start >= body_end:
+            segments = [(start, end, True)]
+        else:
+            segments = [(body_start, body_end, False), (body_end, end, True)]
+            if start < body_start:
+                segments.insert(0, (start, body_start, False))
+
+        def tile(seg_start: datetime, seg_end: datetime, inclusive: bool) -> Awaitable[Any]:
+            return tiles.run(
+                DashboardTile(
+                    kind="margin",
+                    scope=(team_id, group_by, inclusive),
+                    start=seg_start,
+                    end=seg_end,
+                ),
+                lambda repos: _margin_rows(
+                    repos.session, team_id, group_by, seg_start, seg_end, end_inclusive=inclusive
+                ),
+            )
+
+        parts = await tiles.gather(*(tile(*segment) for segment in segments))
+        return _merge_margin_rows(part for rows in parts for part in rows)
 
     async def get_entitlement_usage(
         self,
@@ -427,47 +551,10 @@ class GatewayPlanUsageReadService:
     ) -> MarginSummaryReadModel:
         end = until or datetime.now(UTC)
         start = since or (end - timedelta(days=30))
-        # 分组键
-        group_col = {
-            "credential": GatewayRequestLog.credential_id,
-            "model": GatewayRequestLog.real_model,
-            "team": GatewayRequestLog.tenant_id,
-        }[group_by]
-
-        if group_by == "credential":
-            stmt = (
-                select(
-                    group_col.label("group_key"),
-                    func.coalesce(func.sum(GatewayRequestLog.cost_usd), 0).label("cost_usd"),
-                    func.max(GatewayRequestLog.credential_name_snapshot).label(
-                        "credential_name_snapshot"
-                    ),
-                )
-                .where(
-                    and_(
-                        GatewayRequestLog.tenant_id == team_id,
-                        GatewayRequestLog.created_at >= start,
-                        GatewayRequestLog.created_at <= end,
-                    )
-                )
-                .group_by(group_col)
-            )
+        if self._tiles is None:
+            rows = await _margin_rows(self._session, team_id, group_by, start, end)
         else:
-            stmt = (
-                select(
-                    group_col.label("group_key"),
-                    func.coalesce(func.sum(GatewayRequestLog.cost_usd), 0).label("cost_usd"),
-                )
-                .where(
-                    and_(
-                        GatewayRequestLog.tenant_id == team_id,
-                        GatewayRequestLog.created_at >= start,
-                        GatewayRequestLog.created_at <= end,
-                    )
-                )
-                .group_by(group_col)
-            )
-        rows = (await self._session.execute(stmt)).all()
+            rows = await self._margin_rows_tiled(self._tiles, team_id, group_by, start, end)
 
         credential_names: dict[UUID, str] = {}
         if group_by == "credential":
@@ -0,0 +1,154 @@
+"""代理端 ``GET /v1/models`` 预编码响应缓存（按 principal 维度 + 内容哈希 ETag）。
+
+键维度：``(team, user, vkey, apikey grant, 可见 tenant 集合, allowed 集合)``——与
+``list_openai_proxy_models`` 的全部输入一一对应；值为 orjson 预编码的响应体与其
+blake2b ETag，命中时路由层直接返回 bytes，``If-None-Match`` 命中返回 304，均不触达 DB。
+
+跨进程一致性：复用 ``resolve_model_cache`` 的租户版本号 ``gw:resolve_model:ver:<tenant>``
+（模型/路由/grant 写路径经 ``gateway_cache_invalidation`` 统一 bump）；条目记录写入时
+可见 tenant 的版本向量，读时任一变化即失效。列表含 entitlement 用量状态与连通性等随
+时间变化的字段，另以较短 TTL 兜底。
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import time
+from typing import TYPE_CHECKING
+from uuid import UUID
+
+import orjson
+
+from domains.gateway.application.grant.resolve_model_cache import fetch_tenant_version
+from domains.gateway.domain.vkey.virtual_key_proxy_list_policy import ordered_grant_tenant_ids
+from libs.observability.metrics import record_cache_lookup
+
+if TYPE_CHECKING:
+    from domains.gateway.domain.types import VirtualKeyPrincipal
+
+_TTL_SEC = 30.0
+_MAX_ENTRIES = 4096
+
+ModelListCacheKey = tuple[
+    UUID,
+    UUID | None,
+    UUID | None,
+    UUID | None,
+    tuple[UUID, ...],
+    frozenset[str] | None,
+]
+
+
+@dataclass(frozen=True, slots=True)
+class CachedModelList:
+    """预编码的 ``{"object": "list", "data": [...]}`` 响应体及其强 ETag。"""
+
+    body: bytes
+    etag: str
+
+
+_CACHE: OrderedDict[ModelListCacheKey, tuple[CachedModelList, float, tuple[str, ...]]] = (
+    OrderedDict()
+)
+"""key → (entry, ts, versions)。``versions`` 与 key 中 tenant 元组逐一对应。"""
+
+
+def scope_tenant_ids(team_id: UUID, vkey: VirtualKeyPrincipal | None) -> tuple[UUID, ...]:
+    """列表内容依赖的 tenant：multi-grant vkey 为全部 grant team，否则仅本 team。"""
+    if vkey is not None and not vkey.is_system and len(vkey.granted_team_ids) > 1:
+        return tuple(ordered_grant_tenant_ids(vkey.team_id, vkey.granted_team_ids))
+    return (team_id,)
+
+
+def model_list_cache_key(
+    *,
+    team_id: UUID,
+    user_id: UUID | None,
+    vkey: VirtualKeyPrincipal | None,
+    api_key_grant_id: UUID | None,
+    allowed: set[str] | None,
+) -> ModelListCacheKey:
+    return (
+        team_id,
+        user_id,
+        vkey.vkey_id if vkey else None,
+        api_key_grant_id,
+        scope_tenant_ids(team_id, vkey),
+        frozenset(allowed) if allowed is not None else None,
+    )
+
+
+async def fetch_scope_versions(key: ModelListCacheKey) -> tuple[str, ...]:
+    return tuple([await fetch_tenant_version(tenant_id) for tenant_id in key[4]])
+
+
+async def get_cached_model_list(key: ModelListCacheKey) -> CachedModelList | None:
+    hit = _CACHE.get(key)
+    if hit is None:
+        record_cache_lookup("proxy_model_list", hit=False)
+        return None
+    entry, ts, stored_versions = hit
+    if time.monotonic() - ts >= _TTL_SEC or await fetch_scope_versions(key) != stored_versions:
+        _CACHE.pop(key, None)
+        record_cache_lookup("proxy_model_list", hit=False)
+        return None
+    _CACHE.move_to_end(key)
+    record_cache_lookup("proxy_model_list", hit=True)
+    return entry
+
+
+def encode_model_list(data: list[dict[str, object]]) -> CachedModelList:
+    body = orjson.dumps({"object": "list", "data": data})
+    return CachedModelList(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+
+
+def put_cached_model_list(
+    key: ModelListCacheKey, entry: CachedModelList, *, versions: tuple[str, ...]
+) -> None:
+    """写入缓存。``versions`` 须在读 DB **之前**取得，避免并发写入把旧列表标成新版本。"""
+    _CACHE[key] = (entry, time.monotonic(), versions)
+    _CACHE.move_to_end(key)
+    while len(_CACHE) > _MAX_ENTRIES:
+        _CACHE.popitem(last=False)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """``If-None-Match`` 弱比较（RFC 9110 §13.1.2）：支持 ``*``、列表与 ``W/`` 前缀。"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag for candidate in if_none_match.split(",")
+    )
+
+
+def invalidate_model_list_cache_for_tenant(tenant_id: UUID) -> None:
+    """清本进程中可见范围包含该 tenant 的条目（跨进程由版本号感知）。"""
+    for key in [k for k in _CACHE if tenant_id in k[4]]:
+        _CACHE.pop(key, None)
+
+
+def invalidate_all_model_list_cache() -> None:
+    _CACHE.clear()
+
+
+def clear_model_list_cache_for_tests() -> None:
+    _CACHE.clear()
+
+
+__all__ = [
+    "CachedModelList",
+    "clear_model_list_cache_for_tests",
+    "encode_model_list",
+    "etag_matches",
+    "fetch_scope_versions",
+    "get_cached_model_list",
+    "invalidate_all_model_list_cache",
+    "invalidate_model_list_cache_for_tenant",
+    "model_list_cache_key",
+    "put_cached_model_list",
+    "scope_tenant_ids",
+]
@@ -30,6 +30,14 @@ from domains.gateway.infrastructure.models.gateway_route import GatewayRoute
 from domains.gateway.infrastructure.models.system_gateway import SystemGatewayRoute
 from utils.logging import get_logger
 
+from .proxy_model_list_cache import (
+    CachedModelList,
+    encode_model_list,
+    fetch_scope_versions,
+    get_cached_model_list,
+    model_list_cache_key,
+    put_cached_model_list,
+)
 from .virtual_key_team_resolution import fetch_grant_team_slug_rows
 
 if TYPE_CHECKING:
@@ -318,7 +326,42 @@ async def list_openai_proxy_models(
     )
 
 
+async def get_openai_proxy_model_list_response(
+    session: AsyncSession,
+    *,
+    team_id: uuid.UUID,
+    user_id: uuid.UUID | None,
+    vkey: VirtualKeyPrincipal | None,
+    api_key_grant_id: uuid.UUID | None,
+    allowed: set[str] | None,
+) -> CachedModelList:
+    """GET /v1/models 预编码响应：命中缓存时不触达 DB。"""
+    key = model_list_cache_key(
+        team_id=team_id,
+        user_id=user_id,
+        vkey=vkey,
+        api_key_grant_id=api_key_grant_id,
+        allowed=allowed,
+    )
+    cached = await get_cached_model_list(key)
+    if cached is not None:
+        return cached
+    versions = await fetch_scope_versions(key)
+    data = await list_openai_proxy_models(
+        session,
+        team_id=team_id,
+        user_id=user_id,
+        vkey=vkey,
+        api_key_grant_id=api_key_grant_id,
+        allowed=allowed,
+    )
+    entry = encode_model_list(data)
+    put_cached_model_list(key, entry, versions=versions)
+    return entry
+
+
 __all__ = [
+    "get_openai_proxy_model_list_response",
     "list_openai_proxy_models",
     "list_proxy_models_for_multi_grant_vkey",
     "list_proxy_models_for_team",
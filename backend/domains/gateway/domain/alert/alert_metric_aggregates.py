@@ -18,4 +18,38 @@ class AlertMetricAggregates:
     window_minutes: int = 5
 
 
-__all__ = ["AlertMetricAggregates"]
+@dataclass(frozen=True, slots=True)
+class AlertWindowTotals:
+    """一个时间段内按租户（或全局）分组的可加和计数，冷段 hourly 与热段明细相加后再展开到规则。
+
+    ``latency_p95_ms`` 不可跨段相加，只由明细段提供。
+    """
+
+    total_count: int = 0
+    error_count: int = 0
+    cost_sum: float = 0.0
+    latency_p95_ms: float | None = None
+
+    def merge(self, other: AlertWindowTotals) -> AlertWindowTotals:
+        return AlertWindowTotals(
+            total_count=self.total_count + other.total_count,
+            error_count=self.error_count + other.error_count,
+            cost_sum=self.cost_sum + other.cost_sum,
+            latency_p95_ms=(
+                self.latency_p95_ms if self.latency_p95_ms is not None else other.latency_p95_ms
+            ),
+        )
+
+    def to_aggregates(self, metric: str, window_minutes: int) -> AlertMetricAggregates:
+        return AlertMetricAggregates(
+            metric=metric,
+            total_count=self.total_count,
+            error_count=self.error_count,
+            request_count=self.total_count,
+            latency_p95_ms=self.latency_p95_ms,
+            cost_sum=self.cost_sum,
+            window_minutes=window_minutes,
+        )
+
+
+__all__ = ["AlertMetricAggregates", "AlertWindowTotals"]
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+from collections import OrderedDict
 import hashlib
 import re
+import threading
 from typing import Any, ClassVar
 
 
@@ -27,24 +29,108 @@ class PiiPatterns:
         (IPV4, "[REDACTED_IP]"),
     ]
 
+    # 全部规则的单次扫描预筛：绝大多数消息不含 PII，一次 ``search`` 即可判定放行；
+    # 命中时再按 ``REDACTIONS`` 顺序逐条替换，保证与逐条规则的结果逐字节一致。
+    ANY: ClassVar[re.Pattern[str]] = re.compile(
+        "|".join(f"(?:{pattern.pattern})" for pattern, _ in REDACTIONS)
+    )
 
-def redact_text(text: str) -> tuple[str, list[str]]:
-    """对单段文本脱敏，返回 (脱敏文本, 命中类别占位符去括号小写列表)。"""
-    if not text:
+
+# 低于该长度的文本直接扫描：计算摘要 + 查表的开销与预筛相当，不值得进入缓存
+_MEMO_MIN_CHARS = 256
+_MEMO_MAX_ENTRIES = 4096
+
+
+class _RedactionMemo:
+    """按内容摘要缓存单段文本的脱敏结果（线程安全的有界 LRU）。
+
+    Agent 会话每轮会重发全部历史消息，绝大多数内容与上一轮完全相同；
+    以 blake2b 摘要为键可跳过重复扫描，且不在进程内保留原文。
+    """
+
+    def __init__(self, max_entries: int = _MEMO_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[bytes, tuple[str | None, tuple[str, ...]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: bytes) -> tuple[str | None, tuple[str, ...]] | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: bytes, value: tuple[str | None, tuple[str, ...]]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_memo = _RedactionMemo()
+
+
+def _redact_uncached(text: str) -> tuple[str, list[str]]:
+    if not PiiPatterns.ANY.search(text):
         return text, []
     hits: list[str] = []
     redacted = text
     for pattern, placeholder in PiiPatterns.REDACTIONS:
-        if pattern.search(redacted):
-            hits.append(placeholder.strip("[]").lower())
-            redacted = pattern.sub(placeholder, redacted)
-    seen: set[str] = set()
-    unique_hits: list[str] = []
-    for h in hits:
-        if h not in seen:
-            seen.add(h)
-            unique_hits.append(h)
-    return redacted, unique_hits
+        redacted, count = pattern.subn(placeholder, redacted)
+        if count:
+            hit = placeholder.strip("[]").lower()
+            if hit not in hits:
+                hits.append(hit)
+    return redacted, hits
+
+
+def redact_text(text: str) -> tuple[str, list[str]]:
+    """对单段文本脱敏，返回 (脱敏文本, 命中类别占位符去括号小写列表)。
+
+    长文本按内容摘要走进程内 LRU，未变化的历史消息不再重复扫描。
+    """
+    if not text:
+        return text, []
+    if len(text) < _MEMO_MIN_CHARS:
+        return _redact_uncached(text)
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    cached = _memo.get(key)
+    if cached is not None:
+        redacted_or_none, cached_hits = cached
+        # 未命中时缓存 None，直接返回原字符串引用，避免缓存持有原文副本
+        return (text if redacted_or_none is None else redacted_or_none), list(cached_hits)
+    redacted, hits = _redact_uncached(text)
+    _memo.put(key, (redacted if hits else None, tuple(hits)))
+    return redacted, hits
+
+
+def clear_redaction_memo() -> None:
+    """清空脱敏结果缓存（测试 / 规则热更新时使用）。"""
+    _memo.clear()
+
+
+def messages_text_chars(messages: list[dict[str, Any]]) -> int:
+    """统计消息中参与脱敏的文本总字符数，供调用方决定是否卸载到线程执行。"""
+    total = 0
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, str):
+            total += len(content)
+        elif isinstance(content, list):
+            for part in content:
+                if isinstance(part, dict) and part.get("type") == "text":
+                    text = part.get("text")
+                    if isinstance(text, str):
+                        total += len(text)
+    return total
 
 
 def hash_original(text: str) -> str:
@@ -122,8 +208,10 @@ def hash_messages_streaming(messages: list[dict[str, Any]]) -> str:
 
 __all__ = [
     "PiiPatterns",
+    "clear_redaction_memo",
     "hash_messages_streaming",
     "hash_original",
+    "messages_text_chars",
     "redact_messages",
     "redact_text",
 ]
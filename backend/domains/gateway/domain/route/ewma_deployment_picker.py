@@ -0,0 +1,120 @@
+"""``ewma-latency`` 路由策略：按 deployment 的 EWMA 统计预测延迟并加权选路（纯函数）。
+
+每个 deployment 维护三项指数加权移动平均（EWMA）：首字节耗时 TTFB、输出吞吐 tokens/s、
+错误率（0/1 样本）。预测延迟 = TTFB + 典型输出长度 / 吞吐，再按错误率放大（失败意味着
+重试的额外耗时）。选取概率 ∝ ``weight / 预测延迟``：
+
+- 配置权重依然生效（同等延迟下按权重分流）；
+- 变慢或报错的 deployment 份额随统计连续下降，而不是等到 cooldown 才被剔除；
+- 尚无样本的 deployment 按当前最优预测参与（乐观探索），避免冷启动后永远分不到流量。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+import random
+from typing import Any
+
+from domains.gateway.domain.catalog.deployment_weight import coerce_deployment_weight
+
+EWMA_ALPHA = 0.2
+EXPECTED_OUTPUT_TOKENS = 256
+_MIN_SUCCESS_RATIO = 0.05
+
+
+@dataclass(frozen=True, slots=True)
+class DeploymentLatencyStats:
+    """单个 Router deployment（``model_info.id``）的 EWMA 统计。"""
+
+    ttfb_ms: float | None = None
+    tokens_per_sec: float | None = None
+    error_rate: float = 0.0
+    samples: int = 0
+
+
+def ewma(previous: float | None, value: float, alpha: float = EWMA_ALPHA) -> float:
+    if previous is None:
+        return value
+    return previous + alpha * (value - previous)
+
+
+def update_stats(
+    stats: DeploymentLatencyStats | None,
+    *,
+    ttfb_ms: float | None,
+    tokens_per_sec: float | None,
+    failed: bool,
+    alpha: float = EWMA_ALPHA,
+) -> DeploymentLatencyStats:
+    """并入一次调用结果（失败调用只更新错误率）。"""
+    base = stats or DeploymentLatencyStats()
+    return DeploymentLatencyStats(
+        ttfb_ms=ewma(base.ttfb_ms, ttfb_ms, alpha) if ttfb_ms is not None else base.ttfb_ms,
+        tokens_per_sec=(
+            ewma(base.tokens_per_sec, tokens_per_sec, alpha)
+            if tokens_per_sec is not None and tokens_per_sec > 0
+            else base.tokens_per_sec
+        ),
+        error_rate=ewma(base.error_rate if base.samples else None, 1.0 if failed else 0.0, alpha),
+        samples=base.samples + 1,
+    )
+
+
+def predicted_latency_ms(
+    stats: DeploymentLatencyStats | None,
+    *,
+    expected_output_tokens: int = EXPECTED_OUTPUT_TOKENS,
+) -> float | None:
+    """无 TTFB 样本时返回 ``None``（由调用方按乐观探索处理）。"""
+    if stats is None or stats.ttfb_ms is None:
+        return None
+    latency = max(1.0, stats.ttfb_ms)
+    if stats.tokens_per_sec:
+        latency += expected_output_tokens / stats.tokens_per_sec * 1000.0
+    return latency / max(_MIN_SUCCESS_RATIO, 1.0 - stats.error_rate)
+
+
+def deployment_row_id(deployment: dict[str, Any]) -> str | None:
+    info = deployment.get("model_info")
+    dep_id = info.get("id") if isinstance(info, dict) else None
+    return str(dep_id) if dep_id else None
+
+
+def _deployment_weight(deployment: dict[str, Any]) -> int:
+    params = deployment.get("litellm_params")
+    return coerce_deployment_weight(params.get("weight", 1) if isinstance(params, dict) else 1)
+
+
+def pick_deployment_by_predicted_latency(
+    deployments: list[dict[str, Any]],
+    stats_by_id: dict[str, DeploymentLatencyStats],
+    *,
+    rng: random.Random | None = None,
+) -> dict[str, Any]:
+    """从健康 deployment 中按 ``weight / 预测延迟`` 加权随机选取一个。"""
+    if not deployments:
+        raise ValueError("deployments must not be empty")
+    if len(deployments) == 1:
+        return deployments[0]
+    predictions = [
+        predicted_latency_ms(stats_by_id.get(deployment_row_id(d) or "")) for d in deployments
+    ]
+    known = [p for p in predictions if p is not None]
+    optimistic = min(known) if known else 1.0
+    scores = [
+        _deployment_weight(d) / (p if p is not None else optimistic)
+        for d, p in zip(deployments, predictions, strict=True)
+    ]
+    return (rng or random).choices(deployments, weights=scores, k=1)[0]
+
+
+__all__ = [
+    "EWMA_ALPHA",
+    "EXPECTED_OUTPUT_TOKENS",
+    "DeploymentLatencyStats",
+    "deployment_row_id",
+    "ewma",
+    "pick_deployment_by_predicted_latency",
+    "predicted_latency_ms",
+    "update_stats",
+]
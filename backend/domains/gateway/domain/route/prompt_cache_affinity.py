@@ -0,0 +1,129 @@
+"""Prompt Cache 亲和选路：同一可缓存前缀 / 会话尽量落到同一 deployment（纯函数）。
+
+上游 Prompt Cache 按 deployment（凭据 / 账号 / 区域）各自维护；同一会话的连续轮次若被
+打散到组内不同 deployment，已缓存的前缀会整体失效（全价输入 + 重新 prefill）。
+
+- 亲和键：显式会话头优先；否则取可缓存前缀（system、tools、首条非 system 消息）的
+  摘要——同一会话后续轮次只在尾部追加消息，前缀不变，键也就不变；
+- 选取：rendezvous（最高随机权重）一致性哈希——组内增删 deployment 时只有落在
+  变动节点上的键会迁移；
+- 有界负载：按最近窗口内的分配数，首选 deployment 超过 ``load_factor × 平均值`` 时
+  顺延到哈希序的下一个，避免热点会话压垮单个 deployment。cooldown / 限流中的
+  deployment 在进入此处前已由 Router 健康检查剔除。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from typing import TYPE_CHECKING, Any
+
+from domains.gateway.domain.route.ewma_deployment_picker import deployment_row_id
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+SESSION_HEADER_NAMES: tuple[str, ...] = ("x-gateway-session-id", "x-session-id")
+AFFINITY_METADATA_KEY = "gateway_cache_affinity_key"
+MIN_PREFIX_CHARS = 1024
+DEFAULT_LOAD_FACTOR = 1.25
+# 低流量时平均负载趋近 0，容量下限避免刚分配过一两次就被判为饱和
+DEFAULT_MIN_CAPACITY = 8
+_PREFIX_MESSAGES = 1
+_MAX_SESSION_ID_CHARS = 200
+
+
+def session_id_from_headers(headers: Mapping[str, str]) -> str | None:
+    """按 ``SESSION_HEADER_NAMES`` 顺序取首个非空会话头（HTTP 头名大小写不敏感）。"""
+    lowered = {str(k).lower(): v for k, v in headers.items()}
+    for name in SESSION_HEADER_NAMES:
+        value = str(lowered.get(name) or "").strip()
+        if value:
+            return value[:_MAX_SESSION_ID_CHARS]
+    return None
+
+
+def _digest(raw: str) -> str:
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cacheable_prefix(kwargs: Mapping[str, Any]) -> list[Any]:
+    prefix: list[Any] = []
+    if kwargs.get("system"):
+        prefix.append(kwargs["system"])
+    if kwargs.get("tools"):
+        prefix.append(kwargs["tools"])
+    early = 0
+    for msg in kwargs.get("messages") or ():
+        if not isinstance(msg, dict):
+            continue
+        if msg.get("role") in ("system", "developer"):
+            prefix.append(msg.get("content"))
+        elif early < _PREFIX_MESSAGES:
+            prefix.append(msg.get("content"))
+            early += 1
+    return prefix
+
+
+def prompt_cache_affinity_key(
+    kwargs: Mapping[str, Any],
+    *,
+    session_id: str | None = None,
+    min_prefix_chars: int = MIN_PREFIX_CHARS,
+) -> str | None:
+    """返回亲和键；前缀过短（缓存无收益）且无会话头时返回 ``None``。"""
+    if session_id:
+        return "s:" + _digest(session_id)
+    prefix = _cacheable_prefix(kwargs)
+    if not prefix:
+        return None
+    serialized = json.dumps(prefix, ensure_ascii=False, sort_keys=True, default=str)
+    if len(serialized) < min_prefix_chars:
+        return None
+    return "p:" + _digest(serialized)
+
+
+def rendezvous_order(key: str, deployment_ids: list[str]) -> list[str]:
+    """按 ``hash(key, id)`` 降序排列 deployment id（首位即首选）。"""
+
+    def _score(dep_id: str) -> int:
+        return int.from_bytes(
+            hashlib.blake2b(f"{key}|{dep_id}".encode(), digest_size=8).digest(), "big"
+        )
+
+    return sorted(deployment_ids, key=_score, reverse=True)
+
+
+def pick_affinity_deployment(
+    key: str,
+    deployments: list[dict[str, Any]],
+    recent_load: Mapping[str, int],
+    *,
+    load_factor: float = DEFAULT_LOAD_FACTOR,
+    min_capacity: int = DEFAULT_MIN_CAPACITY,
+) -> tuple[dict[str, Any], bool] | None:
+    """按一致性哈希 + 有界负载选取；返回 ``(deployment, 是否首选)``，无可识别 id 时 ``None``。"""
+    by_id = {dep_id: d for d in deployments if (dep_id := deployment_row_id(d))}
+    if not by_id:
+        return None
+    order = rendezvous_order(key, list(by_id))
+    total = sum(recent_load.get(dep_id, 0) for dep_id in order)
+    capacity = max(min_capacity, 1, math.ceil(load_factor * (total + 1) / len(order)))
+    for index, dep_id in enumerate(order):
+        if recent_load.get(dep_id, 0) < capacity:
+            return by_id[dep_id], index == 0
+    return by_id[order[0]], True
+
+
+__all__ = [
+    "AFFINITY_METADATA_KEY",
+    "DEFAULT_LOAD_FACTOR",
+    "DEFAULT_MIN_CAPACITY",
+    "MIN_PREFIX_CHARS",
+    "SESSION_HEADER_NAMES",
+    "pick_affinity_deployment",
+    "prompt_cache_affinity_key",
+    "rendezvous_order",
+    "session_id_from_headers",
+]
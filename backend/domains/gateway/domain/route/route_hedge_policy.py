@@ -0,0 +1,88 @@
+"""虚拟路由 ``retry_policy["hedge"]`` → 对冲请求策略（纯函数）。
+
+对冲（hedged request）：首个上游尝试在「首字节延迟分位数」内未产出首字节时，向同一
+``model_name`` 组内的另一 deployment 发第二次尝试，取先到者、取消落后者。
+
+配置写在路由已有的 JSONB ``retry_policy`` 内，无需迁移；LiteLLM ``RetryPolicy`` 仅取
+白名单键（见 ``route_retry_policy``），``hedge`` 子键不会透传给 Router::
+
+    {"hedge": {"enabled": true, "delay_percentile": 95, "max_hedge_ratio": 0.1}}
+    {"hedge": true}  # 全部取默认值
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+HEDGE_POLICY_KEY = "hedge"
+
+
+@dataclass(frozen=True, slots=True)
+class HedgePolicy:
+    """单条路由的对冲参数。
+
+    Attributes:
+        delay_percentile: 按模型组首字节延迟的该分位数决定何时发对冲。
+        min_delay_ms / max_delay_ms: 分位数延迟的上下限；样本不足时取 ``max_delay_ms``。
+        max_hedge_ratio: 每团队对冲请求占合格请求的最大比例（令牌桶限额）。
+        min_samples: 分位数生效所需的最少延迟样本数。
+    """
+
+    delay_percentile: float = 95.0
+    min_delay_ms: int = 50
+    max_delay_ms: int = 2000
+    max_hedge_ratio: float = 0.1
+    min_samples: int = 20
+
+
+def _number(raw: Any, default: float, *, low: float, high: float) -> float:
+    if isinstance(raw, bool) or not isinstance(raw, int | float | str):
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        return default
+    if value != value:  # NaN
+        return default
+    return min(high, max(low, value))
+
+
+def hedge_policy_from_retry_policy(policy: dict[str, Any] | None) -> HedgePolicy | None:
+    """解析路由 ``retry_policy``；未开启对冲时返回 ``None``。"""
+    if not isinstance(policy, dict):
+        return None
+    raw = policy.get(HEDGE_POLICY_KEY)
+    if raw is True:
+        return HedgePolicy()
+    if not isinstance(raw, dict) or raw.get("enabled", True) is not True:
+        return None
+    defaults = HedgePolicy()
+    min_delay = int(_number(raw.get("min_delay_ms"), defaults.min_delay_ms, low=0, high=60_000))
+    max_delay = int(_number(raw.get("max_delay_ms"), defaults.max_delay_ms, low=0, high=60_000))
+    return HedgePolicy(
+        delay_percentile=_number(
+            raw.get("delay_percentile"), defaults.delay_percentile, low=1, high=99.9
+        ),
+        min_delay_ms=min(min_delay, max_delay),
+        max_delay_ms=max(min_delay, max_delay),
+        max_hedge_ratio=_number(
+            raw.get("max_hedge_ratio"), defaults.max_hedge_ratio, low=0, high=1
+        ),
+        min_samples=int(_number(raw.get("min_samples"), defaults.min_samples, low=1, high=10_000)),
+    )
+
+
+def hedge_delay_ms(policy: HedgePolicy, percentile_ms: float | None) -> float:
+    """分位数延迟夹到 ``[min_delay_ms, max_delay_ms]``；无样本时取上限。"""
+    if percentile_ms is None:
+        return float(policy.max_delay_ms)
+    return float(min(policy.max_delay_ms, max(policy.min_delay_ms, percentile_ms)))
+
+
+__all__ = [
+    "HEDGE_POLICY_KEY",
+    "HedgePolicy",
+    "hedge_delay_ms",
+    "hedge_policy_from_retry_policy",
+]
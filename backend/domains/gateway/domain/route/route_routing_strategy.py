@@ -0,0 +1,103 @@
+"""虚拟路由 ``strategy`` → LiteLLM ``routing_groups`` / 网关原生 picker（纯函数）。
+
+LiteLLM Router 单例只有一个顶层 ``routing_strategy``（隐式 ``default`` 组），但支持
+``routing_groups`` 为指定 ``model_name`` 使用独立策略与独立 selector 状态。这里按策略
+把路由的 Router ``model_name`` 分组：
+
+- ``simple-shuffle`` / ``weighted-pick``：留在 ``default`` 组（LiteLLM 按 deployment
+  ``weight`` 加权随机）；
+- 其余 LiteLLM 原生策略：每种策略一个 ``gw-<strategy>`` 组；
+- 网关原生策略（``ewma-latency``）：不进 LiteLLM 组，由 ``GatewayRoutingStrategy`` 在
+  LiteLLM 健康检查 / cooldown 过滤之后自行选取。
+
+LiteLLM 版本不支持 ``routing_groups`` 时，顶层策略按路由多数票选取，其余路由策略无法
+单独生效（由 Router 装配处逐路由告警）。
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from domains.gateway.domain.types import RoutingStrategy
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+GATEWAY_NATIVE_STRATEGIES: frozenset[str] = frozenset({RoutingStrategy.EWMA_LATENCY.value})
+
+_DEFAULT_GROUP_STRATEGY = RoutingStrategy.SIMPLE_SHUFFLE.value
+
+
+def litellm_routing_strategy(strategy: str | None) -> str:
+    """将项目策略字面量映射为 LiteLLM Router 原生支持的 ``routing_strategy``。
+
+    ``weighted-pick`` 与网关原生策略在 LiteLLM 侧均按 ``simple-shuffle``（加权随机）兜底。
+    """
+    if not strategy or strategy == RoutingStrategy.WEIGHTED_PICK.value:
+        return _DEFAULT_GROUP_STRATEGY
+    if strategy in GATEWAY_NATIVE_STRATEGIES:
+        return _DEFAULT_GROUP_STRATEGY
+    return strategy
+
+
+def routing_groups_for_strategies(strategy_by_model_name: Mapping[str, str]) -> list[dict]:
+    """``{router model_name: 项目策略}`` → LiteLLM ``routing_groups`` 参数。"""
+    by_strategy: dict[str, list[str]] = {}
+    for model_name, strategy in strategy_by_model_name.items():
+        litellm_strategy = litellm_routing_strategy(strategy)
+        if litellm_strategy == _DEFAULT_GROUP_STRATEGY:
+            continue
+        by_strategy.setdefault(litellm_strategy, []).append(model_name)
+    return [
+        {
+            "group_name": f"gw-{strategy}",
+            "models": sorted(models),
+            "routing_strategy": strategy,
+        }
+        for strategy, models in sorted(by_strategy.items())
+    ]
+
+
+def native_strategy_model_names(
+    strategy_by_model_name: Mapping[str, str],
+) -> dict[str, str]:
+    """仅保留需网关原生 picker 处理的 ``model_name``。"""
+    return {
+        model_name: strategy
+        for model_name, strategy in strategy_by_model_name.items()
+        if strategy in GATEWAY_NATIVE_STRATEGIES
+    }
+
+
+def cache_affinity_model_names(
+    model_names: Iterable[str],
+    strategy_by_model_name: Mapping[str, str],
+    *,
+    default_strategy: str,
+) -> frozenset[str]:
+    """可按 Prompt Cache 亲和选路的 ``model_name``：实际生效策略为加权随机。
+
+    亲和选路会替代组内策略，只对本就随机分配的 ``simple-shuffle`` / ``weighted-pick``
+    生效；配置了其他策略（含 ``ewma-latency``）的路由保持原策略。未分组的 ``model_name``
+    按顶层 ``default_strategy`` 判断。
+    """
+    eligible: set[str] = set()
+    for model_name in model_names:
+        strategy = strategy_by_model_name.get(model_name)
+        if strategy in GATEWAY_NATIVE_STRATEGIES:
+            continue
+        effective = litellm_routing_strategy(strategy)
+        if effective == _DEFAULT_GROUP_STRATEGY:
+            effective = default_strategy
+        if effective == _DEFAULT_GROUP_STRATEGY:
+            eligible.add(model_name)
+    return frozenset(eligible)
+
+
+__all__ = [
+    "GATEWAY_NATIVE_STRATEGIES",
+    "cache_affinity_model_names",
+    "litellm_routing_strategy",
+    "native_strategy_model_names",
+    "routing_groups_for_strategies",
+]
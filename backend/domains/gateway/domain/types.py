@@ -138,6 +138,8 @@ class RoutingStrategy(str, Enum):
     LATENCY_BASED = "latency-based-routing"
     USAGE_BASED = "usage-based-routing-v2"
     COST_BASED = "cost-based-routing"
+    # 网关原生：按 deployment 的 TTFB / 吞吐 / 错误率 EWMA 预测延迟选路（非 LiteLLM 策略）
+    EWMA_LATENCY = "ewma-latency"
 
 
 class FallbackKind(str, Enum):
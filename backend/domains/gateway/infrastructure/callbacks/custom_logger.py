@@ -1090,6 +1090,57 @@ async def _resolve_persist_user_id(
     return None
 
 
+def _routing_model_info(kwargs: dict[str, Any], metadata: dict[str, Any]) -> dict[str, Any] | None:
+    for container in (
+        kwargs.get("litellm_params"),
+        kwargs.get("standard_logging_object"),
+        metadata,
+    ):
+        mi = container.get("model_info") if isinstance(container, dict) else None
+        if isinstance(mi, dict) and mi.get("id"):
+            return mi
+    return None
+
+
+async def _record_routing_latency(
+    kwargs: dict[str, Any],
+    metadata: dict[str, Any],
+    *,
+    status: str,
+    latency_ms: int | None,
+    ttfb_ms: int | None,
+    output_tokens: int,
+) -> None:
+    """仅 ``model_info.gateway_routing_strategy == ewma-latency`` 的 deployment 计入统计。
+
+    流式：TTFB 取代理记录的首字节耗时，吞吐 = 输出 token / 首字节之后的耗时；
+    非流式无首字节时间，以总耗时作为 TTFB 样本、不更新吞吐。
+    """
+    from domains.gateway.domain.types import RoutingStrategy
+
+    info = _routing_model_info(kwargs, metadata)
+    if info is None or info.get("gateway_routing_strategy") != RoutingStrategy.EWMA_LATENCY.value:
+        return
+    failed = status != "success"
+    first_byte_ms = ttfb_ms if ttfb_ms is not None else latency_ms
+    tokens_per_sec: float | None = None
+    if ttfb_ms is not None and latency_ms is not None and output_tokens > 0:
+        generation_ms = latency_ms - ttfb_ms
+        if generation_ms > 0:
+            tokens_per_sec = output_tokens / (generation_ms / 1000.0)
+    with suppress(Exception):
+        from domains.gateway.infrastructure.litellm.deployment_latency_stats import (
+            get_deployment_latency_stats_store,
+        )
+
+        await get_deployment_latency_stats_store().record(
+            str(info["id"]),
+            ttfb_ms=None if failed else first_byte_ms,
+            tokens_per_sec=None if failed else tokens_per_sec,
+            failed=failed,
+        )
+
+
 async def _persist_event(
     *,
     kwargs: dict[str, Any],
@@ -1105,6 +1156,14 @@ async def _persist_event(
 
     metadata = _extract_gateway_metadata(kwargs)
 
+    # 0. 对冲请求：只有代表最终结果的尝试落库 / 结算（落后者与中途失败者跳过）
+    hedge_attempt_id = metadata.get("gateway_hedge_attempt_id")
+    if hedge_attempt_id:
+        from domains.gateway.application.proxy.proxy_hedge import should_settle_hedge_attempt
+
+        if not should_settle_hedge_attempt(str(hedge_attempt_id), success=status == "success"):
+            return
+
     # 1. 归因 + 路由
     team_id, user_id, vkey_id = _extract_attribution_ids(metadata, kwargs)
     (
@@ -1157,6 +1216,16 @@ async def _persist_event(
     # 3. 时间 + 延迟
     _start_dt, _end_dt, latency_ms, ttfb_ms = _resolve_time_latency(start_time, end_time, metadata)
 
+    # 3.5 ``ewma-latency`` 路由：把本次结果计入 deployment 选路统计
+    await _record_routing_latency(
+        kwargs,
+        metadata,
+        status=status,
+        latency_ms=latency_ms,
+        ttfb_ms=ttfb_ms,
+        output_tokens=output_tokens,
+    )
+
     verbose_log = bool(metadata.get("gateway_store_full_messages"))
     persist_detail_jsonb = settings.gateway_request_log_persist_detail_jsonb
     build_detail_jsonb = _should_build_detail_jsonb(
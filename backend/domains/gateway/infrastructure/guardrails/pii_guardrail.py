@@ -6,6 +6,7 @@ GatewayPiiGuardrail - LiteLLM CustomGuardrail 适配
 
 from __future__ import annotations
 
+import asyncio
 from contextlib import suppress
 from typing import Any
 
@@ -13,10 +14,22 @@ from domains.gateway.domain.proxy.pii_redaction_policy import (
     PiiPatterns,
     hash_messages_streaming,
     hash_original,
+    messages_text_chars,
     redact_messages,
     redact_text,
 )
 
+# 文本总量超过该阈值时脱敏卸载到线程池，避免长上下文的正则扫描阻塞事件循环
+PII_OFFLOAD_THRESHOLD_CHARS = 256 * 1024
+
+
+async def _redact_messages_maybe_offloaded(
+    messages: list[dict[str, Any]],
+) -> tuple[list[dict[str, Any]], list[str]]:
+    if messages_text_chars(messages) >= PII_OFFLOAD_THRESHOLD_CHARS:
+        return await asyncio.to_thread(redact_messages, messages)
+    return redact_messages(messages)
+
 
 def _import_custom_guardrail() -> Any:
     from litellm.integrations.custom_guardrail import CustomGuardrail
@@ -61,7 +74,7 @@ def _build_pii_guardrail_instance(
                 return None
             messages = data.get("messages")
             if isinstance(messages, list):
-                redacted, hits = redact_messages(messages)
+                redacted, hits = await _redact_messages_maybe_offloaded(messages)
                 if hits:
                     metadata = data.setdefault("metadata", {})
                     metadata.setdefault("pii_redactions", []).extend(hits)
@@ -88,6 +101,7 @@ def _build_pii_guardrail_instance(
 
 
 __all__ = [
+    "PII_OFFLOAD_THRESHOLD_CHARS",
     "GatewayPiiGuardrail",
     "PiiPatterns",
     "_build_pii_guardrail_instance",
@@ -0,0 +1,256 @@
+"""过期请求明细分区归档：服务端游标流式导出 zstd Parquet → 回读校验 → manifest → DETACH + DROP。
+
+单个分区在一个事务内完成：
+
+1. ``LOCK TABLE … IN SHARE MODE`` 阻止迟到写入，``count(*)`` 与导出看到同一份数据；
+2. ``session.stream`` 服务端游标按 ``gateway_request_log_archive_fetch_size`` 分批拉取，
+   按 ``created_at`` 升序写入 Parquet 分片（每片不超过 ``rows_per_file`` 行），内存只保留一个分片；
+3. 逐片回读校验 sha256 与 Parquet 行数，合计行数须等于 ``count(*)``；
+4. 校验通过才写 manifest，随后 DETACH + DROP 分区并提交。
+
+任一步失败则回滚，分区原样保留，下个周期重试；manifest 已存在且与分区行数一致时复用已有归档
+（上次在 DROP 前中断），只重新校验不再导出。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+from datetime import UTC, datetime
+import hashlib
+from typing import TYPE_CHECKING
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import column, select, table
+
+from bootstrap.config import settings
+from domains.gateway.infrastructure.jobs.sql_jobs_repository import (
+    GatewaySqlJobsRepository,
+    RequestLogPartition,
+)
+from domains.gateway.infrastructure.repositories.request_log_archive_format import (
+    ARCHIVE_COMPRESSION,
+    ArchivedFile,
+    RequestLogArchiveManifest,
+    archive_manifest_key,
+    archive_part_key,
+    load_archive_manifest,
+    request_log_arrow_schema,
+    request_log_columns,
+    rows_to_record_batch,
+)
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from libs.storage.archive_store import ArchiveObjectStore
+
+logger = get_logger(__name__)
+
+_PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+
+class RequestLogArchiveError(RuntimeError):
+    """归档校验失败：分区保留不删。"""
+
+
+@dataclass(frozen=True)
+class RequestLogArchiveResult:
+    partition: str
+    rows: int
+    files: int
+    reused: bool
+
+
+class _PartWriter:
+    """单个 Parquet 分片的内存写入器。"""
+
+    def __init__(self, zstd_level: int) -> None:
+        self._sink = pa.BufferOutputStream()
+        self._writer = pq.ParquetWriter(
+            self._sink,
+            request_log_arrow_schema(),
+            compression=ARCHIVE_COMPRESSION,
+            compression_level=zstd_level,
+        )
+        self.rows = 0
+
+    def write(self, batch: pa.RecordBatch) -> None:
+        self._writer.write_batch(batch)
+        self.rows += batch.num_rows
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.getvalue().to_pybytes()
+
+
+class RequestLogPartitionArchiver:
+    """把过期整月分区归档到对象存储后再删除。"""
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        store: ArchiveObjectStore,
+        *,
+        rows_per_file: int | None = None,
+        fetch_size: int | None = None,
+        zstd_level: int | None = None,
+    ) -> None:
+        self._session = session
+        self._store = store
+        self._sql = GatewaySqlJobsRepository(session)
+        self._rows_per_file = rows_per_file or settings.gateway_request_log_archive_rows_per_file
+        self._fetch_size = fetch_size or settings.gateway_request_log_archive_fetch_size
+        self._zstd_level = zstd_level or settings.gateway_request_log_archive_zstd_level
+
+    async def archive_expired(self, retention_days: int) -> list[RequestLogArchiveResult]:
+        """逐个归档并删除过期分区；单个分区失败不影响其余分区。"""
+        partitions = await self._sql.list_expired_request_log_partitions(retention_days)
+        await self._session.commit()
+        results: list[RequestLogArchiveResult] = []
+        for partition in partitions:
+            try:
+                results.append(await self.archive_and_drop(partition))
+            except Exception as exc:
+                await self._session.rollback()
+                logger.warning(
+                    "gateway_request_log_archive: %s kept, archive failed: %s",
+                    partition.partition_name,
+                    exc,
+                )
+        return results
+
+    async def archive_and_drop(self, partition: RequestLogPartition) -> RequestLogArchiveResult:
+        await self._sql.lock_partition_for_archive(partition)
+        expected_rows = await self._sql.count_partition_rows(partition)
+
+        existing = await load_archive_manifest(self._store, partition.year, partition.month)
+        reused = existing is not None and existing.rows == expected_rows
+        if existing is not None and reused:
+            await self._verify(existing)
+            manifest = existing
+        else:
+            manifest = await self._export(partition)
+            if manifest.rows != expected_rows:
+                raise RequestLogArchiveError(
+                    f"{partition.partition_name}: exported {manifest.rows} rows, "
+                    f"partition has {expected_rows}"
+                )
+            await self._verify(manifest)
+            await self._store.put_bytes(
+                archive_manifest_key(partition.year, partition.month),
+                manifest.to_json(),
+                content_type="application/json",
+            )
+
+        await self._sql.detach_and_drop_partition(partition)
+        await self._session.commit()
+        logger.info(
+            "gateway_request_log_archive: %s archived (%d rows, %d file(s)%s) and dropped",
+            partition.partition_name,
+            manifest.rows,
+            len(manifest.files),
+            ", reused" if reused else "",
+        )
+        return RequestLogArchiveResult(
+            partition=partition.partition_name,
+            rows=manifest.rows,
+            files=len(manifest.files),
+            reused=reused,
+        )
+
+    async def _export(self, partition: RequestLogPartition) -> RequestLogArchiveManifest:
+        columns = request_log_columns()
+        source = table(
+            partition.partition_name,
+            *(column(c.name, c.type) for c in columns),
+            schema=partition.schema_name,
+        )
+        stmt = (
+            select(*source.c)
+            .order_by(source.c.created_at, source.c.id)
+            .execution_options(yield_per=self._fetch_size)
+        )
+
+        files: list[ArchivedFile] = []
+        writer: _PartWriter | None = None
+        min_created: datetime | None = None
+        max_created: datetime | None = None
+
+        result = await self._session.stream(stmt)
+        async for chunk in result.mappings().partitions():
+            if not chunk:
+                continue
+            if min_created is None:
+                min_created = chunk[0]["created_at"]
+            max_created = chunk[-1]["created_at"]
+            batch = rows_to_record_batch(chunk)
+            offset = 0
+            while offset < batch.num_rows:
+                if writer is None:
+                    writer = _PartWriter(self._zstd_level)
+                take = min(batch.num_rows - offset, self._rows_per_file - writer.rows)
+                await asyncio.to_thread(writer.write, batch.slice(offset, take))
+                offset += take
+                if writer.rows >= self._rows_per_file:
+                    files.append(await self._upload_part(partition, len(files), writer))
+                    writer = None
+        if writer is not None and writer.rows:
+            files.append(await self._upload_part(partition, len(files), writer))
+
+        return RequestLogArchiveManifest(
+            partition=partition.partition_name,
+            year=partition.year,
+            month=partition.month,
+            rows=sum(f.rows for f in files),
+            files=tuple(files),
+            columns=tuple(c.name for c in columns),
+            archived_at=datetime.now(UTC),
+            min_created_at=min_created,
+            max_created_at=max_created,
+        )
+
+    async def _upload_part(
+        self, partition: RequestLogPartition, index: int, writer: _PartWriter
+    ) -> ArchivedFile:
+        content = await asyncio.to_thread(writer.finish)
+        key = archive_part_key(partition.year, partition.month, index)
+        await self._store.put_bytes(key, content, content_type=_PARQUET_CONTENT_TYPE)
+        return ArchivedFile(
+            key=key,
+            rows=writer.rows,
+            bytes=len(content),
+            sha256=hashlib.sha256(content).hexdigest(),
+        )
+
+    async def _verify(self, manifest: RequestLogArchiveManifest) -> None:
+        """回读每个分片：sha256、Parquet 元数据行数与列名均须与 manifest 一致。"""
+        expected_columns = list(manifest.columns)
+        total = 0
+        for archived in manifest.files:
+            content = await self._store.get_bytes(archived.key)
+            if content is None:
+                raise RequestLogArchiveError(f"{archived.key}: missing after upload")
+            if hashlib.sha256(content).hexdigest() != archived.sha256:
+                raise RequestLogArchiveError(f"{archived.key}: sha256 mismatch")
+            metadata = pq.ParquetFile(pa.BufferReader(content)).metadata
+            if metadata.num_rows != archived.rows:
+                raise RequestLogArchiveError(
+                    f"{archived.key}: {metadata.num_rows} rows, manifest says {archived.rows}"
+                )
+            if metadata.schema.to_arrow_schema().names != expected_columns:
+                raise RequestLogArchiveError(f"{archived.key}: column mismatch")
+            total += archived.rows
+        if total != manifest.rows:
+            raise RequestLogArchiveError(
+                f"{manifest.partition}: files hold {total} rows, manifest says {manifest.rows}"
+            )
+
+
+__all__ = [
+    "RequestLogArchiveError",
+    "RequestLogArchiveResult",
+    "RequestLogPartitionArchiver",
+]
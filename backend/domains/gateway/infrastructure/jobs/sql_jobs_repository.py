@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 import re
 from typing import TYPE_CHECKING
@@ -22,6 +23,28 @@ def month_partition_upper_bound(year: int, month: int) -> datetime:
     return datetime(year, month + 1, 1, tzinfo=UTC)
 
 
+@dataclass(frozen=True)
+class RequestLogPartition:
+    """``gateway_request_logs`` 的一个整月子分区（名称已经过白名单校验）。"""
+
+    schema_name: str
+    partition_name: str
+    year: int
+    month: int
+
+    @property
+    def qualified_name(self) -> str:
+        return f'"{self.schema_name}"."{self.partition_name}"'
+
+    @property
+    def lower_bound(self) -> datetime:
+        return datetime(self.year, self.month, 1, tzinfo=UTC)
+
+    @property
+    def upper_bound(self) -> datetime:
+        return month_partition_upper_bound(self.year, self.month)
+
+
 class GatewaySqlJobsRepository:
     """请求日志分区上的 SQL 写路径（供 application/jobs 编排调用）。"""
 
@@ -46,8 +69,10 @@ class GatewaySqlJobsRepository:
         )
         await self._session.commit()
 
-    async def drop_expired_request_log_partitions(self, retention_days: int) -> int:
-        """删除「分区上界」不晚于 cutoff 的整月子分区（数据全部早于保留窗口）。"""
+    async def list_expired_request_log_partitions(
+        self, retention_days: int
+    ) -> list[RequestLogPartition]:
+        """「分区上界」不晚于 cutoff 的整月子分区（数据全部早于保留窗口），按月份升序。"""
         cutoff = datetime.now(UTC) - timedelta(days=retention_days)
         stmt = text(
             """
@@ -60,7 +85,7 @@ class GatewaySqlJobsRepository:
         """
         )
         rows = (await self._session.execute(stmt)).mappings().all()
-        dropped = 0
+        expired: list[RequestLogPartition] = []
         for row in rows:
             schema_name = str(row["schema_name"])
             partition_name = str(row["partition_name"])
@@ -69,16 +94,47 @@ class GatewaySqlJobsRepository:
             match = _PARTITION_NAME.match(partition_name)
             if not match:
                 continue
-            year, month = int(match.group(1)), int(match.group(2))
-            upper = month_partition_upper_bound(year, month)
-            if upper > cutoff:
-                continue
-            await self._session.execute(
-                text(f'DROP TABLE IF EXISTS "{schema_name}"."{partition_name}"')
+            partition = RequestLogPartition(
+                schema_name=schema_name,
+                partition_name=partition_name,
+                year=int(match.group(1)),
+                month=int(match.group(2)),
             )
+            if partition.upper_bound > cutoff:
+                continue
+            expired.append(partition)
+        expired.sort(key=lambda p: (p.year, p.month))
+        return expired
+
+    async def drop_expired_request_log_partitions(self, retention_days: int) -> int:
+        """删除「分区上界」不晚于 cutoff 的整月子分区（数据全部早于保留窗口）。"""
+        dropped = 0
+        for partition in await self.list_expired_request_log_partitions(retention_days):
+            await self._session.execute(text(f"DROP TABLE IF EXISTS {partition.qualified_name}"))
             dropped += 1
         return dropped
 
+    async def lock_partition_for_archive(self, partition: RequestLogPartition) -> None:
+        """SHARE 锁：归档导出期间阻止迟到写入，读不受影响（随事务结束释放）。"""
+        await self._session.execute(text(f"LOCK TABLE {partition.qualified_name} IN SHARE MODE"))
+
+    async def count_partition_rows(self, partition: RequestLogPartition) -> int:
+        result = await self._session.execute(
+            text(f"SELECT count(*) FROM {partition.qualified_name}")
+        )
+        return int(result.scalar_one())
+
+    async def detach_and_drop_partition(self, partition: RequestLogPartition) -> None:
+        """先从父表 DETACH 再 DROP，二者在调用方同一事务内完成。
+
+        DETACH 取得的父表 ACCESS EXCLUSIVE 锁会持有到事务提交（含 DROP），调用方应在 DROP 后
+        尽快提交；不在中间提交，是为了 DROP 失败时随回滚恢复分区，不留下已脱离的孤表。
+        """
+        await self._session.execute(
+            text(f"ALTER TABLE gateway_request_logs DETACH PARTITION {partition.qualified_name}")
+        )
+        await self._session.execute(text(f"DROP TABLE IF EXISTS {partition.qualified_name}"))
+
 
 # 测试与 jobs 模块向后兼容的模块级别名
 _PARTITION_NAME_RE = _PARTITION_NAME
@@ -87,5 +143,6 @@ __all__ = [
     "_PARTITION_NAME_RE",
     "_SAFE_SQL_IDENT",
     "GatewaySqlJobsRepository",
+    "RequestLogPartition",
     "month_partition_upper_bound",
 ]
@@ -0,0 +1,170 @@
+"""``ewma-latency`` 选路统计：进程内快照 + Redis 跨 worker 共享。
+
+写：``GatewayCustomLogger`` 成功/失败回调对 ``ewma-latency`` 路由的 deployment 调用
+:meth:`DeploymentLatencyStatsStore.record`，本进程统计立即更新，同时以 Lua 在 Redis
+``gw:deploy_ewma:<deployment_id>`` 上原子地做同一次 EWMA（其他 worker 的样本也汇入）。
+
+读：picker 每次选路调用 :meth:`get_many`；本进程快照在 ``_REFRESH_SEC`` 内直接命中，
+过期后一次 pipeline 批量 ``HMGET`` 刷新整组。Redis 不可用时退化为纯本进程统计。
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from contextlib import suppress
+import time
+from typing import Any
+
+from domains.gateway.domain.route.ewma_deployment_picker import (
+    EWMA_ALPHA,
+    DeploymentLatencyStats,
+    update_stats,
+)
+from libs.db.redis import get_redis_client
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_KEY_PREFIX = "gw:deploy_ewma:"
+_KEY_TTL_SEC = 600
+_REFRESH_SEC = 1.0
+_MAX_ENTRIES = 16_384
+
+# KEYS[1]=hash；ARGV: alpha, ttfb_ms(-1 跳过), tokens_per_sec(-1 跳过), failed(0/1), ttl
+_EWMA_LUA = """
+local alpha = tonumber(ARGV[1])
+local n = tonumber(redis.call('HGET', KEYS[1], 'n') or '0')
+local function upd(field, v)
+  if v < 0 then return end
+  local cur = tonumber(redis.call('HGET', KEYS[1], field))
+  if cur == nil or (field == 'err' and n == 0) then
+    cur = v
+  else
+    cur = cur + alpha * (v - cur)
+  end
+  redis.call('HSET', KEYS[1], field, tostring(cur))
+end
+upd('ttfb', tonumber(ARGV[2]))
+upd('tps', tonumber(ARGV[3]))
+upd('err', tonumber(ARGV[4]))
+redis.call('HSET', KEYS[1], 'n', n + 1)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[5]))
+return n + 1
+"""
+
+
+def _float_or_none(raw: Any) -> float | None:
+    if raw is None:
+        return None
+    with suppress(TypeError, ValueError):
+        return float(raw.decode() if isinstance(raw, bytes) else raw)
+    return None
+
+
+def _stats_from_hash(values: list[Any]) -> DeploymentLatencyStats | None:
+    ttfb, tps, err, samples = (_float_or_none(v) for v in values)
+    if not samples:
+        return None
+    return DeploymentLatencyStats(
+        ttfb_ms=ttfb, tokens_per_sec=tps, error_rate=err or 0.0, samples=int(samples)
+    )
+
+
+class DeploymentLatencyStatsStore:
+    """按 Router deployment 行 id（``model_info.id``）维护 EWMA 统计。"""
+
+    def __init__(self, *, redis_client_factory: Any = get_redis_client) -> None:
+        self._redis_client_factory = redis_client_factory
+        self._local: OrderedDict[str, tuple[DeploymentLatencyStats, float]] = OrderedDict()
+        self._script: tuple[Any, Any] | None = None
+
+    def _put(self, deployment_id: str, stats: DeploymentLatencyStats, fetched_at: float) -> None:
+        self._local[deployment_id] = (stats, fetched_at)
+        self._local.move_to_end(deployment_id)
+        while len(self._local) > _MAX_ENTRIES:
+            self._local.popitem(last=False)
+
+    async def record(
+        self,
+        deployment_id: str,
+        *,
+        ttfb_ms: float | None,
+        tokens_per_sec: float | None,
+        failed: bool,
+    ) -> None:
+        current = self._local.get(deployment_id)
+        updated = update_stats(
+            current[0] if current else None,
+            ttfb_ms=ttfb_ms,
+            tokens_per_sec=tokens_per_sec,
+            failed=failed,
+        )
+        # 保留原刷新时间：本地增量不应推迟从 Redis 合并其他 worker 的样本
+        self._put(deployment_id, updated, current[1] if current else 0.0)
+        try:
+            client = await self._redis_client_factory()
+            if self._script is None or self._script[0] is not client:
+                self._script = (client, client.register_script(_EWMA_LUA))
+            await self._script[1](
+                keys=[_KEY_PREFIX + deployment_id],
+                args=[
+                    EWMA_ALPHA,
+                    -1 if ttfb_ms is None else float(ttfb_ms),
+                    -1 if not tokens_per_sec else float(tokens_per_sec),
+                    1 if failed else 0,
+                    _KEY_TTL_SEC,
+                ],
+            )
+        except Exception as exc:
+            logger.debug("deployment EWMA redis update failed: %s", exc)
+
+    async def get_many(self, deployment_ids: list[str]) -> dict[str, DeploymentLatencyStats]:
+        now = time.monotonic()
+        out: dict[str, DeploymentLatencyStats] = {}
+        stale: list[str] = []
+        for dep_id in deployment_ids:
+            hit = self._local.get(dep_id)
+            if hit is not None:
+                out[dep_id] = hit[0]
+            if hit is None or now - hit[1] >= _REFRESH_SEC:
+                stale.append(dep_id)
+        if not stale:
+            return out
+        try:
+            client = await self._redis_client_factory()
+            pipe = client.pipeline()
+            for dep_id in stale:
+                pipe.hmget(_KEY_PREFIX + dep_id, "ttfb", "tps", "err", "n")
+            rows = await pipe.execute()
+        except Exception as exc:
+            logger.debug("deployment EWMA redis refresh failed: %s", exc)
+            for dep_id in stale:
+                hit = self._local.get(dep_id)
+                self._put(dep_id, hit[0] if hit else DeploymentLatencyStats(), now)
+            return out
+        for dep_id, values in zip(stale, rows, strict=True):
+            stats = _stats_from_hash(list(values or [None] * 4))
+            if stats is None:
+                stats = out.get(dep_id) or DeploymentLatencyStats()
+            self._put(dep_id, stats, now)
+            out[dep_id] = stats
+        return out
+
+    def clear(self) -> None:
+        self._local.clear()
+
+
+_store: DeploymentLatencyStatsStore | None = None
+
+
+def get_deployment_latency_stats_store() -> DeploymentLatencyStatsStore:
+    global _store  # pylint: disable=global-statement
+    if _store is None:
+        _store = DeploymentLatencyStatsStore()
+    return _store
+
+
+__all__ = [
+    "DeploymentLatencyStatsStore",
+    "get_deployment_latency_stats_store",
+]
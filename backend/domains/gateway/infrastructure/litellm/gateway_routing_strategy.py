@@ -0,0 +1,207 @@
+"""LiteLLM Router 的网关选路扩展点（``Router.set_custom_routing_strategy``）。
+
+LiteLLM 的自定义策略会整体替换 ``async_get_available_deployment``；这里只在两种情况下
+接管，其余一律委托回 LiteLLM 原实现（含 ``routing_groups`` 的按路由策略）：
+
+1. 请求带 Prompt Cache 亲和键（``gateway_cache_affinity_key``）且 ``model_name`` 的策略为
+   加权随机：一致性哈希 + 有界负载，让同一会话 / 同一可缓存前缀落到同一 deployment；
+2. 网关原生策略（``ewma-latency``）的 ``model_name``：按 EWMA 预测延迟加权选取。
+
+接管时仍先走 ``async_get_healthy_deployments``，因此 cooldown、pre-call 检查（上下文
+窗口 / rpm / tpm）与 ``order`` 过滤都照常生效。
+"""
+
+from __future__ import annotations
+
+from collections import deque
+import time
+from typing import Any
+
+from bootstrap.config import settings
+from domains.gateway.domain.route.ewma_deployment_picker import (
+    deployment_row_id,
+    pick_deployment_by_predicted_latency,
+)
+from domains.gateway.domain.route.prompt_cache_affinity import (
+    AFFINITY_METADATA_KEY,
+    pick_affinity_deployment,
+)
+from domains.gateway.domain.types import RoutingStrategy
+from domains.gateway.infrastructure.litellm.deployment_latency_stats import (
+    DeploymentLatencyStatsStore,
+    get_deployment_latency_stats_store,
+)
+from libs.observability.metrics import get_metrics_collector
+
+_LOAD_WINDOW_SEC = 10.0
+_MAX_TRACKED_PICKS = 4096
+
+_metrics = get_metrics_collector()
+_metrics.describe(
+    "gateway_cache_affinity_total",
+    "Prompt-cache affinity picks by outcome (preferred/spilled)",
+)
+
+
+class _RecentPickLoad:
+    """进程内按 deployment 统计最近窗口的分配次数（有界负载的负载估计）。"""
+
+    def __init__(self, window_sec: float = _LOAD_WINDOW_SEC) -> None:
+        self._window_sec = window_sec
+        self._picks: dict[str, deque[float]] = {}
+
+    def _trim(self, dep_id: str, now: float) -> deque[float]:
+        picks = self._picks.setdefault(dep_id, deque(maxlen=_MAX_TRACKED_PICKS))
+        while picks and now - picks[0] > self._window_sec:
+            picks.popleft()
+        return picks
+
+    def snapshot(self, deployment_ids: list[str]) -> dict[str, int]:
+        now = time.monotonic()
+        return {dep_id: len(self._trim(dep_id, now)) for dep_id in deployment_ids}
+
+    def record(self, dep_id: str) -> None:
+        now = time.monotonic()
+        self._trim(dep_id, now).append(now)
+
+
+def _affinity_key(request_kwargs: dict | None) -> str | None:
+    if not request_kwargs or not settings.gateway_prompt_cache_affinity_enabled:
+        return None
+    for meta_key in ("metadata", "litellm_metadata"):
+        meta = request_kwargs.get(meta_key)
+        if isinstance(meta, dict) and (key := meta.get(AFFINITY_METADATA_KEY)):
+            return str(key)
+    return None
+
+
+class GatewayRoutingStrategy:
+    """按请求 / ``model_name`` 分派：亲和与网关原生策略自行选取，其余委托 LiteLLM。"""
+
+    def __init__(
+        self,
+        router: Any,
+        *,
+        stats_store: DeploymentLatencyStatsStore | None = None,
+    ) -> None:
+        self._router = router
+        router_cls = type(router)
+        # 取类上的原实现再绑定：重复安装时不会把自身当作「原实现」
+        self._default_async = router_cls.async_get_available_deployment.__get__(router)
+        self._default_sync = router_cls.get_available_deployment.__get__(router)
+        self._stats_store = stats_store
+        self._strategies: dict[str, str] = {}
+        self._affinity_models: frozenset[str] = frozenset()
+        self._load = _RecentPickLoad()
+
+    def set_model_strategies(
+        self,
+        strategies: dict[str, str],
+        affinity_model_names: frozenset[str] = frozenset(),
+    ) -> None:
+        self._strategies = dict(strategies)
+        self._affinity_models = affinity_model_names
+
+    def strategy_for(self, model: str) -> str | None:
+        return self._strategies.get(model)
+
+    async def _delegate(self, model: str, **kwargs: Any) -> Any:
+        kwargs["request_kwargs"] = kwargs.get("request_kwargs") or {}
+        return await self._default_async(model=model, **kwargs)
+
+    async def async_get_available_deployment(
+        self,
+        model: str,
+        messages: list[dict[str, str]] | None = None,
+        input: str | list | None = None,  # LiteLLM 接口参数名
+        specific_deployment: bool | None = False,
+        request_kwargs: dict | None = None,
+    ) -> Any:
+        call = {
+            "messages": messages,
+            "input": input,
+            "specific_deployment": specific_deployment,
+            "request_kwargs": request_kwargs,
+        }
+        is_ewma = self._strategies.get(model) == RoutingStrategy.EWMA_LATENCY.value
+        affinity_key = (
+            _affinity_key(request_kwargs)
+            if not specific_deployment and model in self._affinity_models
+            else None
+        )
+        if not is_ewma and affinity_key is None:
+            return await self._delegate(model, **call)
+        healthy = await self._router.async_get_healthy_deployments(
+            model=model,
+            request_kwargs=request_kwargs or {},
+            messages=messages,
+            input=input,
+            specific_deployment=specific_deployment,
+        )
+        if isinstance(healthy, dict):
+            return healthy
+        if not healthy:
+            # 交回 LiteLLM：由其抛出标准的 no-deployment / cooldown 异常
+            return await self._delegate(model, **call)
+        ids = [dep_id for d in healthy if (dep_id := deployment_row_id(d))]
+        if affinity_key is not None and len(healthy) > 1:
+            picked = pick_affinity_deployment(
+                affinity_key,
+                healthy,
+                self._load.snapshot(ids),
+                load_factor=settings.gateway_prompt_cache_affinity_load_factor,
+            )
+            if picked is not None:
+                deployment, preferred = picked
+                self._load.record(deployment_row_id(deployment) or "")
+                _metrics.increment(
+                    "gateway_cache_affinity_total",
+                    tags={"outcome": "preferred" if preferred else "spilled"},
+                )
+                return deployment
+        if not is_ewma:
+            return await self._delegate(model, **call)
+        store = self._stats_store or get_deployment_latency_stats_store()
+        stats = await store.get_many(ids)
+        return pick_deployment_by_predicted_latency(healthy, stats)
+
+    def get_available_deployment(
+        self,
+        model: str,
+        messages: list[dict[str, str]] | None = None,
+        input: str | list | None = None,  # LiteLLM 接口参数名
+        specific_deployment: bool | None = False,
+        request_kwargs: dict | None = None,
+    ) -> Any:
+        """同步路径（网关代理不使用）：直接委托 LiteLLM。"""
+        return self._default_sync(
+            model=model,
+            messages=messages,
+            input=input,
+            specific_deployment=specific_deployment,
+            request_kwargs=request_kwargs,
+        )
+
+
+def install_gateway_routing_strategy(
+    router: Any,
+    strategies: dict[str, str],
+    affinity_model_names: frozenset[str] = frozenset(),
+) -> None:
+    """安装（或刷新）网关选路扩展。
+
+    ``strategies`` 仅含网关原生策略的 ``model_name``；``affinity_model_names`` 为允许
+    Prompt Cache 亲和接管的 ``model_name``（策略为加权随机）。
+    """
+    current = router.__dict__.get("async_get_available_deployment")
+    strategy = getattr(current, "__self__", None)
+    if not isinstance(strategy, GatewayRoutingStrategy):
+        strategy = GatewayRoutingStrategy(router)
+        router.set_custom_routing_strategy(strategy)
+    strategy.set_model_strategies(strategies, affinity_model_names)
+
+
+__all__ = [
+    "GatewayRoutingStrategy",
+    "install_gateway_routing_strategy",
+]
@@ -17,6 +17,9 @@
     quota_rule_cache）。``tenant_id`` 缺省时清空全部 L1。
 
   并按 ``event_id`` 做幂等去重，避免收到自己发的事件时重复刷新。
+
+每次发布前对 ``gateway:router:version`` 做 ``INCR``，单调版本号随事件下发；Router 冷启动
+快照（``router_snapshot``）记录构建时的版本，新 worker 据此判断快照是否过期。
 """
 
 from __future__ import annotations
@@ -35,6 +38,9 @@ logger = get_logger(__name__)
 # Redis pub/sub channel：所有 worker 共享。
 _CHANNEL = "gateway:router:reload"
 
+# Router 配置版本号（单调递增）：每次发布重载事件前 INCR。
+_VERSION_KEY = "gateway:router:version"
+
 # 订阅 task 句柄 + 关闭信号；模块级，单 worker 单订阅。
 _subscriber_task: asyncio.Task[Any] | None = None
 _subscriber_stop: asyncio.Event | None = None
@@ -63,9 +69,11 @@ async def publish_router_reload(
 
         client = await get_redis_client()
         event_id = uuid.uuid4().hex
+        version = int(await client.incr(_VERSION_KEY))
         payload = json.dumps(
             {
                 "event_id": event_id,
+                "version": version,
                 "source": source,
                 "origin_pid": os.getpid(),
                 "tenant_id": str(tenant_id) if tenant_id is not None else None,
@@ -75,8 +83,9 @@ async def publish_router_reload(
         )
         await client.publish(_CHANNEL, payload)
         logger.debug(
-            "router reload published: event_id=%s source=%s tenant_id=%s",
+            "router reload published: event_id=%s version=%s source=%s tenant_id=%s",
             event_id,
+            version,
             source,
             tenant_id,
         )
@@ -88,6 +97,19 @@ async def publish_router_reload(
         )
 
 
+async def current_router_version() -> int | None:
+    """读取当前 Router 配置版本号；从未发布过为 0，Redis 不可用时返回 None（版本未知）。"""
+    try:
+        from libs.db.redis import get_redis_client
+
+        client = await get_redis_client()
+        raw = await client.get(_VERSION_KEY)
+        return int(raw) if raw is not None else 0
+    except Exception:
+        logger.debug("router version read failed", exc_info=True)
+        return None
+
+
 def _remember_event_id(event_id: str) -> bool:
     """记录已处理事件 ID；返回 True 表示首次见到，应当处理。"""
     now = asyncio.get_running_loop().time()
@@ -121,6 +143,9 @@ async def _invalidate_l1_for_tenant(tenant_id: uuid.UUID | None) -> None:
     from domains.gateway.application.route.route_snapshot_cache import (
         clear_route_snapshot_cache_for_tests,
     )
+    from domains.gateway.application.vkey.proxy_model_list_cache import (
+        invalidate_all_model_list_cache,
+    )
 
     if tenant_id is not None:
         invalidate_gateway_read_caches_for_tenant(tenant_id)
@@ -130,6 +155,7 @@ async def _invalidate_l1_for_tenant(tenant_id: uuid.UUID | None) -> None:
     else:
         invalidate_all()
         clear_route_snapshot_cache_for_tests()
+        invalidate_all_model_list_cache()
         _RESOURCE_GRANTS_LOCAL.clear()
 
 
@@ -281,6 +307,7 @@ async def stop_router_reload_subscriber() -> None:
 
 
 __all__ = [
+    "current_router_version",
     "publish_router_reload",
     "start_router_reload_subscriber",
     "stop_router_reload_subscriber",
@@ -6,14 +6,18 @@ LiteLLM Router Singleton + Factory
 特性：
 - 从 GatewayModel + ProviderCredential 拼装 model_list
 - 跨进程 cooldown：使用 redis_url 共享 cooldown / TPM / RPM 状态
-- 6 种 routing 策略，3 类 fallback
+- 按路由 routing 策略（LiteLLM ``routing_groups`` + 网关原生 ``ewma-latency``），3 类 fallback
 - 热重载：set_model_list / add_deployment / delete_deployment
 """
 
 from __future__ import annotations
 
 import asyncio
+import functools
+import inspect
+import time
 from typing import TYPE_CHECKING, Any
+import weakref
 
 from bootstrap.config import settings
 from domains.gateway.application.route.route_owner_slug_maps import (
@@ -37,6 +41,13 @@ from domains.gateway.domain.route.route_retry_policy import (
     deployment_num_retries_from_policy,
     routes_to_model_group_retry_policy,
 )
+from domains.gateway.domain.route.route_routing_strategy import (
+    GATEWAY_NATIVE_STRATEGIES,
+    cache_affinity_model_names,
+    litellm_routing_strategy,
+    native_strategy_model_names,
+    routing_groups_for_strategies,
+)
 from domains.gateway.domain.route.router_model_name import (
     decode_router_model_name,
     deployment_scope_team_id,
@@ -49,14 +60,24 @@ from domains.gateway.domain.upstream.upstream_call_shape_policy import (
 )
 from domains.gateway.domain.upstream.upstream_endpoint import resolve_upstream_endpoint
 from domains.gateway.domain.upstream.upstream_profile import UpstreamCallShape, UpstreamProtocol
+from domains.gateway.infrastructure.litellm.gateway_routing_strategy import (
+    install_gateway_routing_strategy,
+)
 from domains.gateway.infrastructure.litellm.litellm_router_model_registry import (
     register_router_deployments_in_litellm_registry,
 )
+from domains.gateway.infrastructure.litellm.router_snapshot import (
+    RouterSnapshot,
+    load_router_snapshot,
+    schedule_router_snapshot_save,
+)
 from libs.crypto import decrypt_value, derive_encryption_key
 from libs.db.redis import build_authenticated_redis_url
+from libs.observability.metrics import get_metrics_collector
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
+    from collections.abc import Iterable
     import uuid
 
     from litellm.router import Router  # type: ignore[import-not-found]
@@ -76,6 +97,13 @@ logger = get_logger(__name__)
 _router_instance: Router | None = None
 _router_lock = asyncio.Lock()
 _pii_guardrail_instance: Any | None = None
+_reconcile_tasks: set[asyncio.Task[None]] = set()
+
+_metrics = get_metrics_collector()
+_metrics.describe(
+    "gateway_router_init_ms",
+    "LiteLLM Router cold initialization duration in milliseconds by source (snapshot/db)",
+)
 
 
 def _get_encryption_key() -> str:
@@ -271,6 +299,7 @@ def _build_deployment(
     via_route: str | None = None,
     pricing_lookup: PricingLookup | None = None,
     num_retries: int | None = None,
+    routing_strategy: str | None = None,
 ) -> dict[str, Any]:
     """构造单个 deployment dict（model_list 一行）。"""
     pricing = _pricing_for_model(src, pricing_lookup)
@@ -322,6 +351,8 @@ def _build_deployment(
                 else None
             ),
             "gateway_via_route": via_route,
+            # 路由 deployment 的选路策略随行携带：全量 / 增量装配都能从 model_list 还原分组
+            "gateway_routing_strategy": routing_strategy,
         }
     tags_dict = src.tags if isinstance(getattr(src, "tags", None), dict) else {}
     ctx_raw = tags_dict.get("context_window")
@@ -449,6 +480,7 @@ def _routes_to_virtual_deployments(
                     via_route=r.virtual_model,
                     pricing_lookup=pricing_lookup,
                     num_retries=route_num_retries,
+                    routing_strategy=_route_strategy_value(r),
                 )
             )
     return deployments
@@ -529,6 +561,7 @@ def _grants_to_virtual_deployments(
                     via_route=route.virtual_model,
                     pricing_lookup=pricing_lookup,
                     num_retries=route_num_retries,
+                    routing_strategy=_route_strategy_value(route),
                 )
             )
     return deployments
@@ -644,29 +677,102 @@ def _routes_to_fallbacks(
     return general, cp, cw
 
 
-def _litellm_routing_strategy(strategy: str | None) -> str:
-    """将项目策略字面量映射为 LiteLLM Router 原生支持的 ``routing_strategy``。"""
-    if strategy == RoutingStrategy.WEIGHTED_PICK.value:
-        return RoutingStrategy.SIMPLE_SHUFFLE.value
-    return strategy or RoutingStrategy.SIMPLE_SHUFFLE.value
+def _route_strategy_value(route: GatewayRoute | SystemGatewayRoute) -> str | None:
+    raw = getattr(route, "strategy", None)
+    value = raw.value if isinstance(raw, RoutingStrategy) else str(raw or "").strip()
+    return value or None
+
 
+def _strategies_by_model_name(model_list: list[dict[str, Any]]) -> dict[str, str]:
+    """从 deployment ``model_info.gateway_routing_strategy`` 还原 ``{model_name: 策略}``。"""
+    out: dict[str, str] = {}
+    for dep in model_list:
+        info = dep.get("model_info") if isinstance(dep, dict) else None
+        strategy = info.get("gateway_routing_strategy") if isinstance(info, dict) else None
+        if strategy and dep.get("model_name"):
+            out.setdefault(str(dep["model_name"]), str(strategy))
+    return out
 
-def _resolve_strategy(routes: list[GatewayRoute | SystemGatewayRoute]) -> str:
+
+@functools.cache
+def router_supports_routing_groups(router_cls: type) -> bool:
+    """LiteLLM Router 构造参数是否含 ``routing_groups``（较新版本才有；旧版传入会 TypeError）。"""
+    supported = "routing_groups" in inspect.signature(router_cls.__init__).parameters
+    if not supported:
+        logger.warning(
+            "LiteLLM Router has no routing_groups support; "
+            "routes share one majority-vote routing_strategy"
+        )
+    return supported
+
+
+def _router_class() -> type:
+    from litellm.router import Router
+
+    return Router
+
+
+def _resolve_strategy(strategies: Iterable[str | None]) -> str:
     """全局策略选取：取最高频；如果都没设置默认 simple-shuffle
 
-    （LiteLLM Router 单例只能一个 routing_strategy；
-    不同路由可通过 model_list weight 体现差异；weighted-pick 映射为
-    simple-shuffle，由 LiteLLM deployment weight 执行加权随机）
+    （仅用于不支持 ``routing_groups`` 的 LiteLLM 版本：Router 单例只能一个
+    routing_strategy；weighted-pick 映射为 simple-shuffle，由 deployment weight 执行加权随机）
     """
     counts: dict[str, int] = {}
-    for r in routes:
-        strategy = _litellm_routing_strategy(str(r.strategy or "").strip())
-        counts[strategy] = counts.get(strategy, 0) + 1
+    for strategy in strategies:
+        litellm_strategy = litellm_routing_strategy(strategy)
+        counts[litellm_strategy] = counts.get(litellm_strategy, 0) + 1
     if not counts:
         return RoutingStrategy.SIMPLE_SHUFFLE.value
     return max(counts.items(), key=lambda kv: kv[1])[0]
 
 
+# 已下发给各 Router 的 routing_groups（分组未变化时跳过 update_settings）
+_applied_routing_groups: weakref.WeakKeyDictionary[Router, list[dict]] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _warn_unhonoured_strategies(router: Router, strategies: dict[str, str]) -> None:
+    top_level = getattr(router, "routing_strategy", None) or RoutingStrategy.SIMPLE_SHUFFLE.value
+    for model_name, strategy in sorted(strategies.items()):
+        if strategy in GATEWAY_NATIVE_STRATEGIES or litellm_routing_strategy(strategy) == top_level:
+            continue
+        logger.warning(
+            "Route strategy %s for %s cannot be honoured without LiteLLM routing_groups; "
+            "using top-level %s",
+            strategy,
+            model_name,
+            top_level,
+        )
+
+
+def _apply_route_strategies(router: Router, model_list: list[dict[str, Any]]) -> None:
+    """按路由策略刷新 LiteLLM ``routing_groups`` 与网关原生选路扩展。
+
+    LiteLLM 重建 ``routing_groups`` 会重置各组 selector 状态（延迟 / 用量统计），
+    故分组未变化时跳过。不支持 ``routing_groups`` 的 LiteLLM 版本上，与顶层多数票策略
+    不一致的路由逐条告警。
+    """
+    strategies = _strategies_by_model_name(model_list)
+    if router_supports_routing_groups(type(router)):
+        groups = routing_groups_for_strategies(strategies)
+        if _applied_routing_groups.get(router) != groups:
+            router.update_settings(routing_groups=groups or None)
+            _applied_routing_groups[router] = groups
+    else:
+        _warn_unhonoured_strategies(router, strategies)
+    affinity_models = cache_affinity_model_names(
+        {str(dep["model_name"]) for dep in model_list if dep.get("model_name")},
+        strategies,
+        default_strategy=getattr(router, "routing_strategy", None)
+        or RoutingStrategy.SIMPLE_SHUFFLE.value,
+    )
+    install_gateway_routing_strategy(
+        router, native_strategy_model_names(strategies), affinity_models
+    )
+
+
 async def _load_upstream_pricing_lookup(db: AsyncSession) -> PricingLookup:
     """预取 active 上游单价表，形成 ``(provider, upstream_model, capability) → 单价`` lookup。"""
     from domains.gateway.infrastructure.repositories.pricing_repository import (
@@ -791,9 +897,15 @@ async def _build_router_kwargs(
         settings.gateway_router_redis_url or settings.redis_url
     )
 
+    groups_supported = router_supports_routing_groups(_router_class())
     kwargs: dict[str, Any] = {
         "model_list": deployments,
-        "routing_strategy": _resolve_strategy(routes),
+        # 支持 routing_groups 时顶层策略只作用于未分组的 model_name（直连模型、加权路由）
+        "routing_strategy": (
+            RoutingStrategy.SIMPLE_SHUFFLE.value
+            if groups_supported
+            else _resolve_strategy(_route_strategy_value(r) for r in routes)
+        ),
         "num_retries": DEFAULT_ROUTER_NUM_RETRIES,
         "allowed_fails": settings.gateway_router_cooldown_threshold,
         "cooldown_time": settings.gateway_router_cooldown_seconds,
@@ -801,6 +913,9 @@ async def _build_router_kwargs(
         "redis_url": redis_url,
         "set_verbose": False,
     }
+    routing_groups = routing_groups_for_strategies(_strategies_by_model_name(deployments))
+    if routing_groups and groups_supported:
+        kwargs["routing_groups"] = routing_groups
     if model_group_retry_policy:
         kwargs["model_group_retry_policy"] = model_group_retry_policy
     if fb_general:
@@ -812,9 +927,92 @@ async def _build_router_kwargs(
     return kwargs
 
 
+async def _build_router_kwargs_and_snapshot(db: AsyncSession) -> dict[str, Any]:
+    """全量装配 Router 构造参数，并在后台写入冷启动快照。
+
+    版本号在查库前读取：装配期间若有新的写入广播，快照记录的是旧版本，下次冷启动会对账。
+    """
+    from domains.gateway.infrastructure.litellm.router_reload_notifier import (
+        current_router_version,
+    )
+
+    version = await current_router_version() if settings.gateway_router_snapshot_enabled else None
+    kwargs = await _build_router_kwargs(db)
+    schedule_router_snapshot_save(kwargs, version)
+    return kwargs
+
+
+def _router_from_snapshot(snapshot: RouterSnapshot) -> Router:
+    """按快照构造 Router（凭据已在快照中，无需查库 / 解密）。"""
+    from litellm.router import Router
+
+    kwargs = dict(snapshot.router_kwargs)
+    if not router_supports_routing_groups(Router) and kwargs.pop("routing_groups", None):
+        # 快照由支持 routing_groups 的版本写入：顶层策略改回多数票
+        kwargs["routing_strategy"] = _resolve_strategy(
+            _strategies_by_model_name(kwargs["model_list"]).values()
+        )
+    kwargs["redis_url"] = build_authenticated_redis_url(
+        settings.gateway_router_redis_url or settings.redis_url
+    )
+    register_router_deployments_in_litellm_registry(kwargs["model_list"])
+    router = Router(**kwargs)
+    _apply_route_strategies(router, kwargs["model_list"])
+    return router
+
+
+async def _snapshot_needs_reconcile(snapshot: RouterSnapshot) -> bool:
+    from domains.gateway.infrastructure.litellm.router_reload_notifier import (
+        current_router_version,
+    )
+
+    if snapshot.age_seconds > settings.gateway_router_snapshot_max_age_seconds:
+        return True
+    current = await current_router_version()
+    return snapshot.version is None or current is None or snapshot.version != current
+
+
+async def _reconcile_router_with_db() -> None:
+    """后台以 DB 为准全量重载（快照启动后的对账），独立 DB 会话。"""
+    from libs.db.database import get_session_factory
+
+    try:
+        async with get_session_factory()() as session:
+            await reload_router(session)
+    except Exception:
+        logger.warning("Router reconcile after snapshot start failed", exc_info=True)
+
+
+async def _init_router_from_snapshot() -> Router | None:
+    snapshot = await load_router_snapshot()
+    if snapshot is None:
+        return None
+    try:
+        router = _router_from_snapshot(snapshot)
+    except Exception:
+        logger.warning("Router snapshot rejected; building from DB", exc_info=True)
+        return None
+    reconcile = await _snapshot_needs_reconcile(snapshot)
+    if reconcile:
+        task = asyncio.create_task(_reconcile_router_with_db(), name="router_snapshot_reconcile")
+        _reconcile_tasks.add(task)
+        task.add_done_callback(_reconcile_tasks.discard)
+    logger.info(
+        "LiteLLM Router initialized from snapshot: %d deployments, version=%s, "
+        "age=%.0fs, reconcile=%s",
+        len(snapshot.router_kwargs.get("model_list") or []),
+        snapshot.version,
+        snapshot.age_seconds,
+        reconcile,
+    )
+    return router
+
+
 async def get_router(db: AsyncSession | None = None) -> Router:
     """获取全局 Router 单例（懒加载）
 
+    冷启动优先加载快照（见 ``router_snapshot``），按需后台与 DB 对账；无可用快照时从 DB 全量装配。
+
     Args:
         db: 仅初始化阶段使用；后续调用可不传
     """
@@ -834,12 +1032,24 @@ async def get_router(db: AsyncSession | None = None) -> Router:
         # 注册全局回调（仅注册一次）
         ensure_gateway_callbacks()
 
-        kwargs = await _build_router_kwargs(db)
-        _router_instance = Router(**kwargs)
-        logger.info(
-            "LiteLLM Router initialized: %d deployments, strategy=%s",
-            len(kwargs.get("model_list") or []),
-            kwargs.get("routing_strategy"),
+        started = time.perf_counter()
+        router = await _init_router_from_snapshot()
+        source = "snapshot"
+        if router is None:
+            source = "db"
+            kwargs = await _build_router_kwargs_and_snapshot(db)
+            router = Router(**kwargs)
+            _apply_route_strategies(router, kwargs["model_list"])
+            logger.info(
+                "LiteLLM Router initialized: %d deployments, routing_groups=%d",
+                len(kwargs.get("model_list") or []),
+                len(kwargs.get("routing_groups") or []),
+            )
+        _router_instance = router
+        _metrics.record_timer(
+            "gateway_router_init_ms",
+            (time.perf_counter() - started) * 1000,
+            tags={"source": source},
         )
     return _router_instance
 
@@ -851,12 +1061,13 @@ async def reload_router(db: AsyncSession) -> Router:
     fallback 列表通过属性赋值更新。
     """
     global _router_instance
-    kwargs = await _build_router_kwargs(db)
+    kwargs = await _build_router_kwargs_and_snapshot(db)
     ensure_gateway_callbacks()
     if _router_instance is None:
         from litellm.router import Router
 
         _router_instance = Router(**kwargs)
+        _apply_route_strategies(_router_instance, kwargs["model_list"])
         logger.info(
             "LiteLLM Router (cold-init) reloaded: %d deployments",
             len(kwargs.get("model_list") or []),
@@ -879,6 +1090,7 @@ async def reload_router(db: AsyncSession) -> Router:
         _router_instance.model_group_retry_policy = kwargs["model_group_retry_policy"]
     _router_instance.num_retries = kwargs.get("num_retries", DEFAULT_ROUTER_NUM_RETRIES)
     _router_instance.routing_strategy = kwargs["routing_strategy"]
+    _apply_route_strategies(_router_instance, kwargs["model_list"])
     logger.info("LiteLLM Router hot-reloaded: %d deployments", len(kwargs["model_list"]))
     return _router_instance
 
@@ -945,6 +1157,10 @@ async def _try_incremental_router_deployment(db: AsyncSession, encoded: str) ->
             exc_info=True,
         )
         return False
+    if any(
+        (dep.get("model_info") or {}).get("gateway_routing_strategy") for dep in deployments
+    ):
+        _apply_route_strategies(router, list(getattr(router, "model_list", None) or []))
     return True
 
 
@@ -1015,6 +1231,7 @@ async def _build_lazy_virtual_route_deployments(
                 via_route=route.virtual_model,
                 pricing_lookup=pricing_lookup,
                 num_retries=route_num_retries,
+                routing_strategy=_route_strategy_value(route),
             )
         )
     return deployments
@@ -0,0 +1,173 @@
+"""Router 冷启动快照
+
+全量装配 Router 需要查询全部模型 / 路由 / 凭据 / 上游价目、逐个解密凭据，再构造 LiteLLM
+``Router``；扩容高峰时新 worker 在此期间要么阻塞、要么只能走直连兜底。本模块在每次全量
+装配成功后，把 Router 构造参数（含已解密凭据的 ``model_list``）序列化、压缩并用应用密钥
+派生的 Fernet 密钥加密，写入 Redis 或本地文件；新 worker 启动时直接加载快照构造 Router，
+再由调用方在后台与 DB 对账。
+
+- 快照记录构建时的 Router 配置版本号（见 ``router_reload_notifier.current_router_version``），
+  加载方据此与年龄判断是否需要对账；
+- ``redis_url`` 等随部署环境变化的参数不入快照，加载时按当前配置注入；
+- 格式版本 / 密钥不匹配 / 数据损坏时视为无快照，退回 DB 全量装配。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any
+import zlib
+
+from cryptography.fernet import Fernet, InvalidToken
+
+from bootstrap.config import settings
+from libs.crypto import derive_encryption_key
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_REDIS_KEY = "gateway:router:snapshot"
+_FORMAT = 1
+# 环境相关的构造参数：不入快照，加载时由调用方按当前配置注入
+_ENVIRONMENT_KEYS: frozenset[str] = frozenset({"redis_url"})
+
+_save_tasks: set[asyncio.Task[None]] = set()
+
+
+@dataclass(frozen=True)
+class RouterSnapshot:
+    """一次全量装配的 Router 构造参数。"""
+
+    version: int | None
+    built_at: float
+    router_kwargs: dict[str, Any]
+
+    @property
+    def age_seconds(self) -> float:
+        return max(0.0, time.time() - self.built_at)
+
+
+def _fernet() -> Fernet:
+    return Fernet(derive_encryption_key(settings.secret_key.get_secret_value()).encode())
+
+
+def encode_router_snapshot(router_kwargs: dict[str, Any], version: int | None) -> str:
+    """序列化 + 压缩 + 加密；返回 Fernet token（ASCII，可直接存入 Redis 字符串）。"""
+    body = {
+        "format": _FORMAT,
+        "version": version,
+        "built_at": time.time(),
+        "router_kwargs": {k: v for k, v in router_kwargs.items() if k not in _ENVIRONMENT_KEYS},
+    }
+    raw = json.dumps(body, ensure_ascii=False, separators=(",", ":"), default=str)
+    return _fernet().encrypt(zlib.compress(raw.encode("utf-8"), 6)).decode("ascii")
+
+
+def decode_router_snapshot(token: str | bytes) -> RouterSnapshot | None:
+    """解密并还原快照；密钥不匹配 / 损坏 / 格式不兼容返回 None。"""
+    try:
+        data = _fernet().decrypt(token if isinstance(token, bytes) else token.encode("ascii"))
+        body = json.loads(zlib.decompress(data))
+    except (InvalidToken, ValueError, zlib.error):
+        logger.warning("Router snapshot unreadable (key rotated or corrupted); ignoring")
+        return None
+    if not isinstance(body, dict) or body.get("format") != _FORMAT:
+        return None
+    router_kwargs = body.get("router_kwargs")
+    if not isinstance(router_kwargs, dict) or not isinstance(router_kwargs.get("model_list"), list):
+        return None
+    version = body.get("version")
+    return RouterSnapshot(
+        version=int(version) if isinstance(version, int) else None,
+        built_at=float(body.get("built_at") or 0.0),
+        router_kwargs=router_kwargs,
+    )
+
+
+def _snapshot_path() -> Path:
+    return Path(settings.gateway_router_snapshot_path)
+
+
+def _write_file(token: str) -> None:
+    path = _snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(token, encoding="ascii")
+    tmp.replace(path)
+
+
+def _read_file() -> str | None:
+    try:
+        return _snapshot_path().read_text(encoding="ascii")
+    except FileNotFoundError:
+        return None
+
+
+async def _store(token: str) -> None:
+    if settings.gateway_router_snapshot_backend == "file":
+        await asyncio.to_thread(_write_file, token)
+        return
+    from libs.db.redis import get_redis_client
+
+    client = await get_redis_client()
+    await client.set(_REDIS_KEY, token)
+
+
+async def load_router_snapshot() -> RouterSnapshot | None:
+    """读取快照；未开启 / 不存在 / 存储不可用时返回 None。"""
+    if not settings.gateway_router_snapshot_enabled:
+        return None
+    try:
+        if settings.gateway_router_snapshot_backend == "file":
+            token = await asyncio.to_thread(_read_file)
+        else:
+            from libs.db.redis import get_redis_client
+
+            client = await get_redis_client()
+            token = await client.get(_REDIS_KEY)
+    except Exception:
+        logger.warning("Router snapshot load failed; building from DB", exc_info=True)
+        return None
+    if not token:
+        return None
+    return decode_router_snapshot(token)
+
+
+def schedule_router_snapshot_save(router_kwargs: dict[str, Any], version: int | None) -> None:
+    """后台写入快照（不阻塞 Router 装配）。
+
+    须在 ``Router(**kwargs)`` 之前调用：此处同步完成序列化，LiteLLM 构造时对 ``model_list``
+    的原地改写不会进入快照。
+    """
+    if not settings.gateway_router_snapshot_enabled:
+        return
+    try:
+        token = encode_router_snapshot(router_kwargs, version)
+    except Exception:
+        logger.warning("Router snapshot encode failed", exc_info=True)
+        return
+
+    async def _save() -> None:
+        try:
+            await _store(token)
+            logger.debug("Router snapshot saved: version=%s bytes=%d", version, len(token))
+        except Exception:
+            logger.warning("Router snapshot save failed", exc_info=True)
+
+    task = asyncio.create_task(_save(), name="router_snapshot_save")
+    _save_tasks.add(task)
+    task.add_done_callback(_save_tasks.discard)
+
+
+__all__ = [
+    "RouterSnapshot",
+    "decode_router_snapshot",
+    "encode_router_snapshot",
+    "load_router_snapshot",
+    "schedule_router_snapshot_save",
+]
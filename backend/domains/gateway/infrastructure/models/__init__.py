@@ -13,6 +13,7 @@ from .gateway_rollup_state import GatewayRollupState
 from .gateway_route import GatewayRoute
 from .gateway_route_team_grant import GatewayRouteTeamGrant
 from .metrics_hourly import GatewayMetricsHourly
+from .metrics_rollup_tiers import GatewayMetricsDaily, GatewayMetricsMonthly
 from .pricing_downstream import DownstreamModelPricing
 from .pricing_upstream import UpstreamModelPricing
 from .provider_credential import ProviderCredential
@@ -29,7 +30,9 @@ __all__ = [
     "GatewayAlertEvent",
     "GatewayAlertRule",
     "GatewayBudget",
+    "GatewayMetricsDaily",
     "GatewayMetricsHourly",
+    "GatewayMetricsMonthly",
     "GatewayModel",
     "GatewayRequestLog",
     "GatewayResourceGrant",
@@ -13,13 +13,18 @@ _ROLLUP_STATE_SINGLETON_ID = 1
 
 
 class GatewayRollupState(Base):
-    """记录 ``gateway_metrics_hourly`` 增量 rollup 水位。"""
+    """记录 ``gateway_metrics_hourly`` 增量 rollup 水位及日 / 月级聚合水位。"""
 
     __tablename__ = "gateway_rollup_state"
     __table_args__ = (CheckConstraint("id = 1", name="ck_gateway_rollup_state_singleton"),)
 
     id: Mapped[int] = mapped_column(SmallInteger, primary_key=True, default=_ROLLUP_STATE_SINGLETON_ID)
     last_rolled_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # 日 / 月级聚合水位：其前的整日 / 整月已由下一级重建完成（NULL = 尚未初始化，读路径仅用 hourly）
+    daily_rolled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    monthly_rolled_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
         nullable=False,
@@ -0,0 +1,105 @@
+"""
+GatewayMetricsDaily / GatewayMetricsMonthly - 日 / 月级聚合表
+
+由 rollup job 从下一级（hourly → daily → monthly）按 UTC 自然日 / 自然月整段重建；
+长时间窗 Dashboard/Statistics 读路径按水位拼接 monthly + daily + hourly，避免扫描上万行小时桶。
+计数列使用 BIGINT：月度累计 token / 延迟总和会超出 INTEGER 范围。
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+import uuid
+
+from sqlalchemy import BigInteger, DateTime, Index, Numeric, String
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+
+from libs.orm.base import BaseModel
+
+
+class _MetricsRollupTierColumns:
+    """日 / 月聚合表共用列（维度与 ``GatewayMetricsHourly`` 一致）。"""
+
+    bucket_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        nullable=False,
+        comment="桶起始时刻（UTC 自然日 / 自然月零点）",
+    )
+
+    # 维度
+    tenant_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    resource_owner_user_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), nullable=True
+    )
+    vkey_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    credential_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    entitlement_plan_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    provider_plan_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    provider: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    real_model: Mapped[str | None] = mapped_column(String(200), nullable=True)
+    model_key: Mapped[str] = mapped_column(String(200), nullable=False)
+    capability: Mapped[str | None] = mapped_column(String(40), nullable=True)
+
+    # 指标
+    requests: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    success_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    error_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    input_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    output_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    cached_tokens: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+    cache_creation_tokens: Mapped[int] = mapped_column(
+        BigInteger, nullable=False, server_default="0"
+    )
+    cost_usd: Mapped[Decimal] = mapped_column(
+        Numeric(18, 6), nullable=False, server_default="0", default=Decimal("0")
+    )
+    revenue_usd: Mapped[Decimal] = mapped_column(
+        Numeric(18, 6), nullable=False, server_default="0", default=Decimal("0")
+    )
+    total_latency_ms: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default="0",
+        comment="累计 latency_ms，用于计算平均",
+    )
+    ttfb_total_ms: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        server_default="0",
+        comment="累计 ttfb_ms，用于计算平均",
+    )
+    cache_hit_count: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+
+class GatewayMetricsDaily(_MetricsRollupTierColumns, BaseModel):
+    """日级聚合（由 hourly 重建）"""
+
+    __tablename__ = "gateway_metrics_daily"
+    __table_args__ = (
+        Index("ix_gateway_metrics_daily_bucket", "bucket_at"),
+        Index("ix_gateway_metrics_daily_tenant_bucket", "tenant_id", "bucket_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<GatewayMetricsDaily {self.bucket_at} tenant={self.tenant_id} req={self.requests}>"
+
+
+class GatewayMetricsMonthly(_MetricsRollupTierColumns, BaseModel):
+    """月级聚合（由 daily 重建）"""
+
+    __tablename__ = "gateway_metrics_monthly"
+    __table_args__ = (
+        Index("ix_gateway_metrics_monthly_bucket", "bucket_at"),
+        Index("ix_gateway_metrics_monthly_tenant_bucket", "tenant_id", "bucket_at"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<GatewayMetricsMonthly {self.bucket_at} tenant={self.tenant_id} req={self.requests}>"
+        )
+
+
+__all__ = ["GatewayMetricsDaily", "GatewayMetricsMonthly"]
@@ -8,6 +8,7 @@ GatewayRequestLog - 调用日志（按月分区）
 - 主表 `gateway_request_logs` 由 alembic 创建为按 created_at 月分区的 PARTITION BY RANGE 表
 - 子分区表由 `gateway_partition_job` 后台任务每月维护
 - 早于 ``gateway_request_log_retention_days`` 的整月分区由 `gateway_request_log_retention_loop` 删除（若配置）
+  开启 ``gateway_request_log_archive_enabled`` 时先归档为 zstd Parquet 并校验，再 DETACH + DROP
 """
 
 from __future__ import annotations
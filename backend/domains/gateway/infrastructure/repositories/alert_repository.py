@@ -2,20 +2,21 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
 from decimal import Decimal
 from typing import TYPE_CHECKING, Any
 
-from sqlalchemy import func, select
+from sqlalchemy import case, func, or_, select
 
-from domains.gateway.domain.alert.alert_metric_aggregates import AlertMetricAggregates
+from domains.gateway.domain.alert.alert_metric_aggregates import AlertWindowTotals
 from domains.gateway.domain.alert.alert_rule_snapshot import AlertRuleSnapshot
 from domains.gateway.infrastructure.models.alert import GatewayAlertEvent, GatewayAlertRule
+from domains.gateway.infrastructure.models.metrics_hourly import GatewayMetricsHourly
 from domains.gateway.infrastructure.models.request_log import GatewayRequestLog
 from domains.gateway.infrastructure.models.system_gateway import SystemGatewayAlertRule
 from libs.db.base_repository import TenantScopedRepositoryBase
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
     from datetime import datetime
     import uuid
 
@@ -148,70 +149,99 @@ class GatewayAlertRepository(TenantScopedRepositoryBase[GatewayAlertRule]):
         )
         return snapshots
 
-    async def fetch_rule_metric_aggregates(
+    async def aggregate_log_window_totals(
         self,
-        snapshot: AlertRuleSnapshot,
-        now: datetime,
-    ) -> AlertMetricAggregates:
-        """按窗口聚合 request log，返回原始指标（评估在 domain）。"""
-        window_start = now - timedelta(minutes=snapshot.window_minutes)
-        base_q = select(GatewayRequestLog).where(
-            GatewayRequestLog.created_at >= window_start,
-            GatewayRequestLog.created_at <= now,
-        )
-        if snapshot.tenant_id is not None:
-            base_q = base_q.where(GatewayRequestLog.tenant_id == snapshot.tenant_id)
+        since: datetime,
+        until: datetime,
+        *,
+        tenant_ids: Collection[uuid.UUID],
+        include_global: bool,
+        with_p95: bool,
+        exclude_range: tuple[datetime, datetime] | None = None,
+    ) -> dict[uuid.UUID | None, AlertWindowTotals]:
+        """明细表 ``[since, until]`` 一次按租户分组聚合；``include_global`` 时另查一次全局（键 None）。
 
-        metric = snapshot.metric
-        if metric == "error_rate":
-            cnt_total = (
-                await self._session.execute(select(func.count()).select_from(base_q.subquery()))
-            ).scalar_one()
-            cnt_err = (
-                await self._session.execute(
-                    select(func.count()).select_from(
-                        base_q.where(GatewayRequestLog.status != "success").subquery()
-                    )
-                )
-            ).scalar_one()
-            return AlertMetricAggregates(
-                metric=metric,
-                total_count=int(cnt_total),
-                error_count=int(cnt_err),
-                window_minutes=snapshot.window_minutes,
-            )
-        if metric == "request_rate":
-            cnt = (
-                await self._session.execute(select(func.count()).select_from(base_q.subquery()))
-            ).scalar_one()
-            return AlertMetricAggregates(
-                metric=metric,
-                request_count=int(cnt),
-                window_minutes=snapshot.window_minutes,
+        ``exclude_range`` 为已由 hourly 覆盖的 ``[start, end)``，从明细扫描中剔除。
+        只有窗口内存在 latency 规则时才计算 ``percentile_cont``（排序代价远高于计数）。
+        """
+        columns = [
+            func.count(GatewayRequestLog.id).label("total"),
+            func.sum(case((GatewayRequestLog.status != "success", 1), else_=0)).label("errors"),
+            func.sum(GatewayRequestLog.cost_usd).label("cost"),
+        ]
+        if with_p95:
+            columns.append(
+                func.percentile_cont(0.95)
+                .within_group(GatewayRequestLog.latency_ms.asc())
+                .label("p95")
             )
-        if metric == "latency_p95":
-            sub = base_q.subquery()
-            stmt = select(
-                func.percentile_cont(0.95).within_group(sub.c.latency_ms.asc()).label("p95")
+        time_clauses: tuple[Any, ...] = (
+            GatewayRequestLog.created_at >= since,
+            GatewayRequestLog.created_at <= until,
+        )
+        if exclude_range is not None:
+            time_clauses = (
+                *time_clauses,
+                or_(
+                    GatewayRequestLog.created_at < exclude_range[0],
+                    GatewayRequestLog.created_at >= exclude_range[1],
+                ),
             )
-            row = (await self._session.execute(stmt)).one()
-            p95 = float(row.p95) if row.p95 is not None else None
-            return AlertMetricAggregates(
-                metric=metric,
-                latency_p95_ms=p95,
-                window_minutes=snapshot.window_minutes,
+        out: dict[uuid.UUID | None, AlertWindowTotals] = {}
+        if tenant_ids:
+            stmt = (
+                select(GatewayRequestLog.tenant_id, *columns)
+                .where(*time_clauses, GatewayRequestLog.tenant_id.in_(list(tenant_ids)))
+                .group_by(GatewayRequestLog.tenant_id)
             )
-        if metric == "budget_usage":
-            sub = base_q.subquery()
-            total = (
-                await self._session.execute(select(func.sum(sub.c.cost_usd)))
-            ).scalar_one() or 0
-            return AlertMetricAggregates(
-                metric=metric,
-                cost_sum=float(total),
-                window_minutes=snapshot.window_minutes,
+            for row in (await self._session.execute(stmt)).all():
+                out[row.tenant_id] = self._log_totals_from_row(row, with_p95=with_p95)
+        if include_global:
+            row = (await self._session.execute(select(*columns).where(*time_clauses))).one()
+            out[None] = self._log_totals_from_row(row, with_p95=with_p95)
+        return out
+
+    @staticmethod
+    def _log_totals_from_row(row: Any, *, with_p95: bool) -> AlertWindowTotals:
+        p95 = row.p95 if with_p95 else None
+        return AlertWindowTotals(
+            total_count=int(row.total or 0),
+            error_count=int(row.errors or 0),
+            cost_sum=float(row.cost or 0),
+            latency_p95_ms=float(p95) if p95 is not None else None,
+        )
+
+    async def aggregate_hourly_window_totals(
+        self,
+        bucket_start: datetime,
+        bucket_end_exclusive: datetime,
+        *,
+        tenant_ids: Collection[uuid.UUID],
+        include_global: bool,
+    ) -> dict[uuid.UUID | None, AlertWindowTotals]:
+        """``gateway_metrics_hourly`` 冷段按租户分组求和（不含 p95）。"""
+        columns = (
+            func.sum(GatewayMetricsHourly.requests).label("total"),
+            func.sum(GatewayMetricsHourly.error_count).label("errors"),
+            func.sum(GatewayMetricsHourly.cost_usd).label("cost"),
+        )
+        time_clauses = (
+            GatewayMetricsHourly.bucket_at >= bucket_start,
+            GatewayMetricsHourly.bucket_at < bucket_end_exclusive,
+        )
+        out: dict[uuid.UUID | None, AlertWindowTotals] = {}
+        if tenant_ids:
+            stmt = (
+                select(GatewayMetricsHourly.tenant_id, *columns)
+                .where(*time_clauses, GatewayMetricsHourly.tenant_id.in_(list(tenant_ids)))
+                .group_by(GatewayMetricsHourly.tenant_id)
             )
-        return AlertMetricAggregates(metric=metric, window_minutes=snapshot.window_minutes)
+            for row in (await self._session.execute(stmt)).all():
+                out[row.tenant_id] = self._log_totals_from_row(row, with_p95=False)
+        if include_global:
+            row = (await self._session.execute(select(*columns).where(*time_clauses))).one()
+            out[None] = self._log_totals_from_row(row, with_p95=False)
+        return out
 
     async def record_trigger(
         self,
@@ -0,0 +1,195 @@
+"""已归档月份的请求明细只读查询（Parquet 分片）。
+
+分区 DROP 后明细只存在于归档对象存储。列表语义与 ``RequestLogRepository.list_by_axis`` 对齐：
+axis 可见性与筛选条件翻译为 Arrow 表达式逐片过滤，``created_at`` 倒序 + probe 分页。
+归档按 ``created_at`` 升序分片，因此从最后一片往前读，凑满当前页即停，翻页越靠前读得越少。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from datetime import UTC
+from typing import TYPE_CHECKING, Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from domains.gateway.infrastructure.repositories.request_log_archive_format import (
+    build_request_log_archive_store,
+    load_archive_manifest,
+    record_to_request_log,
+)
+from domains.gateway.infrastructure.repositories.request_log_repository import RequestLogListPage
+from domains.gateway.infrastructure.repositories.usage_axis_sql import (
+    own_non_system_vkey_ids_subquery,
+)
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from uuid import UUID
+
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+    from domains.gateway.domain.usage.usage_axis import UsageAxis
+    from libs.storage.archive_store import ArchiveObjectStore
+
+# 与 ``_request_log_list_defer_options`` 一致：列表不返回大 JSONB
+_LIST_DEFERRED_COLUMNS = frozenset(
+    {"prompt_redacted", "response_summary", "metadata_extra", "team_snapshot", "route_snapshot"}
+)
+_TIMESTAMP = pa.timestamp("us", tz="UTC")
+
+
+def _ids(values: list[UUID]) -> pa.Array:
+    return pa.array([str(v) for v in values], type=pa.string())
+
+
+class ArchivedRequestLogRepository:
+    def __init__(self, session: AsyncSession, store: ArchiveObjectStore | None = None) -> None:
+        self._session = session
+        self._store = store
+
+    @property
+    def store(self) -> ArchiveObjectStore:
+        if self._store is None:
+            self._store = build_request_log_archive_store()
+        return self._store
+
+    async def _own_vkey_ids(self, user_id: UUID, tenant_id: UUID | None = None) -> list[UUID]:
+        stmt = own_non_system_vkey_ids_subquery(user_id=user_id, tenant_id=tenant_id)
+        return list((await self._session.execute(stmt)).scalars().all())
+
+    async def _axis_expression(self, axis: UsageAxis) -> pc.Expression | None:
+        """与 ``usage_axis_base_clauses`` 同语义；本人非系统 vkey 集合仍从线上表读取。"""
+        vkey, user = pc.field("vkey_id"), pc.field("user_id")
+        if axis.kind == "platform":
+            return None
+        if axis.kind == "workspace":
+            if axis.team_id is None:
+                raise ValueError("UsageAxis.workspace requires team_id")
+            expr = pc.field("tenant_id") == str(axis.team_id)
+            if axis.member_user_id is not None:
+                own = await self._own_vkey_ids(axis.member_user_id, axis.team_id)
+                platform_inbound = vkey.is_null() & (user == str(axis.member_user_id))
+                vkey_owned = vkey.is_valid() & vkey.isin(_ids(own))
+                expr = expr & (platform_inbound | vkey_owned)
+            return expr
+        if axis.kind == "user":
+            if axis.user_id is None:
+                raise ValueError("UsageAxis.user requires user_id")
+            own = await self._own_vkey_ids(axis.user_id)
+            platform_inbound = vkey.is_null() & (user == str(axis.user_id))
+            vkey_attributed = vkey.is_valid() & ((user == str(axis.user_id)) | vkey.isin(_ids(own)))
+            return platform_inbound | vkey_attributed
+        raise ValueError(f"Unknown UsageAxis.kind: {axis.kind!r}")
+
+    @staticmethod
+    def _filter_expressions(
+        *,
+        start: datetime | None,
+        end: datetime | None,
+        status: str | None,
+        capability: str | None,
+        vkey_id: UUID | None,
+        credential_id: UUID | None,
+        user_id: UUID | None,
+        model: str | None,
+        client_type: str | None,
+    ) -> list[pc.Expression]:
+        """与 ``RequestLogRepository._list_filter_clauses`` 保持一致。"""
+        f = pc.field
+        exprs: list[pc.Expression] = []
+        if start:
+            exprs.append(f("created_at") >= pa.scalar(start.astimezone(UTC), type=_TIMESTAMP))
+        if end:
+            exprs.append(f("created_at") <= pa.scalar(end.astimezone(UTC), type=_TIMESTAMP))
+        if status:
+            exprs.append(f("status") == status)
+        if capability:
+            exprs.append(f("capability") == capability)
+        if vkey_id:
+            exprs.append(f("vkey_id") == str(vkey_id))
+        if credential_id:
+            exprs.append(f("credential_id") == str(credential_id))
+        if user_id:
+            exprs.append(f("user_id") == str(user_id))
+        if model:
+            exprs.append(
+                (f("deployment_model_name") == model)
+                | (f("route_name") == model)
+                | (f("real_model") == model)
+            )
+        if client_type:
+            exprs.append(f("client_type") == client_type)
+        return exprs
+
+    async def list_month_by_axis(
+        self,
+        axis: UsageAxis,
+        year: int,
+        month: int,
+        *,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        status: str | None = None,
+        capability: str | None = None,
+        vkey_id: UUID | None = None,
+        credential_id: UUID | None = None,
+        user_id: UUID | None = None,
+        model: str | None = None,
+        client_type: str | None = None,
+        page: int = 1,
+        page_size: int = 50,
+    ) -> RequestLogListPage | None:
+        """``None`` 表示该月没有（完整的）归档。"""
+        manifest = await load_archive_manifest(self.store, year, month)
+        if manifest is None:
+            return None
+
+        exprs = self._filter_expressions(
+            start=start,
+            end=end,
+            status=status,
+            capability=capability,
+            vkey_id=vkey_id,
+            credential_id=credential_id,
+            user_id=user_id,
+            model=model,
+            client_type=client_type,
+        )
+        axis_expr = await self._axis_expression(axis)
+        if axis_expr is not None:
+            exprs.insert(0, axis_expr)
+        predicate = None
+        for expr in exprs:
+            predicate = expr if predicate is None else predicate & expr
+        columns = [c for c in manifest.columns if c not in _LIST_DEFERRED_COLUMNS]
+
+        offset = max(0, (page - 1) * page_size)
+        wanted = offset + page_size + 1
+        collected: list[dict[str, Any]] = []
+        for archived in reversed(manifest.files):
+            content = await self.store.get_bytes(archived.key)
+            if content is None:
+                raise FileNotFoundError(self.store.describe(archived.key))
+            matched = await asyncio.to_thread(_read_filtered, content, columns, predicate)
+            collected.extend(matched)
+            if len(collected) >= wanted:
+                break
+
+        rows = collected[offset:wanted]
+        has_next = len(rows) > page_size
+        items = [record_to_request_log(r, columns=columns) for r in rows[:page_size]]
+        return RequestLogListPage(items=items, has_next=has_next)
+
+
+def _read_filtered(
+    content: bytes, columns: list[str], predicate: pc.Expression | None
+) -> list[dict[str, Any]]:
+    """单个分片：谓词过滤（行组统计可裁剪）后按 ``created_at`` 倒序返回。"""
+    matched = pq.read_table(pa.BufferReader(content), columns=columns, filters=predicate)
+    return matched.sort_by([("created_at", "descending"), ("id", "descending")]).to_pylist()
+
+
+__all__ = ["ArchivedRequestLogRepository"]
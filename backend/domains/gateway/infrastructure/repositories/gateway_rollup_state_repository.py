@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
 from typing import TYPE_CHECKING
 
@@ -16,6 +17,15 @@ if TYPE_CHECKING:
     from sqlalchemy.ext.asyncio import AsyncSession
 
 
+@dataclass(frozen=True)
+class RollupTierWatermarks:
+    """各层水位：hourly 为增量 rollup 水位，daily / monthly 为整段重建水位（None = 未初始化）。"""
+
+    hourly: datetime
+    daily: datetime | None
+    monthly: datetime | None
+
+
 class GatewayRollupStateRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
@@ -32,9 +42,7 @@ class GatewayRollupStateRepository:
         initial = now.replace(minute=0, second=0, microsecond=0) - timedelta(
             hours=default_lookback_hours
         )
-        self._session.add(
-            GatewayRollupState(id=_ROLLUP_STATE_SINGLETON_ID, last_rolled_at=initial)
-        )
+        self._session.add(GatewayRollupState(id=_ROLLUP_STATE_SINGLETON_ID, last_rolled_at=initial))
         await self._session.flush()
         return initial
 
@@ -48,6 +56,34 @@ class GatewayRollupStateRepository:
             row.last_rolled_at = value
         await self._session.flush()
 
+    async def get_calendar_tier_watermarks(self) -> tuple[datetime | None, datetime | None]:
+        """读路径用：``(daily_rolled_at, monthly_rolled_at)``，不加锁。"""
+        stmt = select(
+            GatewayRollupState.daily_rolled_at, GatewayRollupState.monthly_rolled_at
+        ).where(GatewayRollupState.id == _ROLLUP_STATE_SINGLETON_ID)
+        row = (await self._session.execute(stmt)).one_or_none()
+        if row is None:
+            return None, None
+        return row.daily_rolled_at, row.monthly_rolled_at
+
+    async def read_tier_watermarks_for_update(self) -> RollupTierWatermarks:
+        """锁定水位行并返回各层水位（与增量 rollup 串行，避免并发重建同一区间）。"""
+        hourly = await self.read_for_update()
+        row = await self._session.get(GatewayRollupState, _ROLLUP_STATE_SINGLETON_ID)
+        return RollupTierWatermarks(
+            hourly=hourly,
+            daily=row.daily_rolled_at if row is not None else None,
+            monthly=row.monthly_rolled_at if row is not None else None,
+        )
+
+    async def set_calendar_tier_watermarks(self, *, daily: datetime, monthly: datetime) -> None:
+        row = await self._session.get(GatewayRollupState, _ROLLUP_STATE_SINGLETON_ID)
+        if row is None:
+            raise RuntimeError("gateway_rollup_state row missing; hourly watermark not initialized")
+        row.daily_rolled_at = daily
+        row.monthly_rolled_at = monthly
+        await self._session.flush()
+
     async def read_for_update(self) -> datetime:
         stmt = (
             select(GatewayRollupState)
@@ -60,4 +96,4 @@ class GatewayRollupStateRepository:
         return row.last_rolled_at
 
 
-__all__ = ["GatewayRollupStateRepository"]
+__all__ = ["GatewayRollupStateRepository", "RollupTierWatermarks"]
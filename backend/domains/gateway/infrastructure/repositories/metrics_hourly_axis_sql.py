@@ -1,8 +1,8 @@
-"""UsageAxis → gateway_metrics_hourly WHERE 子句。"""
+"""UsageAxis → gateway_metrics_*（hourly 或分层拼接子查询）WHERE 子句。"""
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import ColumnElement, and_, true
 
@@ -13,22 +13,23 @@ if TYPE_CHECKING:
     from datetime import datetime
 
 
-def metrics_hourly_axis_clauses(axis: UsageAxis) -> list[ColumnElement[bool]]:
+def metrics_hourly_axis_clauses(axis: UsageAxis, m: Any = None) -> list[ColumnElement[bool]]:
+    """``m``：列来源（hourly 模型或 ``metrics_tier_source(...).c``），默认 hourly 表。"""
+    if m is None:
+        m = GatewayMetricsHourly
     if axis.kind == "platform":
         return []
     if axis.kind == "workspace":
         if axis.team_id is None:
             raise ValueError("UsageAxis.workspace requires team_id")
-        clauses: list[ColumnElement[bool]] = [
-            GatewayMetricsHourly.tenant_id == axis.team_id
-        ]
+        clauses: list[ColumnElement[bool]] = [m.tenant_id == axis.team_id]
         if axis.member_user_id is not None:
-            clauses.append(GatewayMetricsHourly.user_id == axis.member_user_id)
+            clauses.append(m.user_id == axis.member_user_id)
         return clauses
     if axis.kind == "user":
         if axis.user_id is None:
             raise ValueError("UsageAxis.user requires user_id")
-        return [GatewayMetricsHourly.user_id == axis.user_id]
+        return [m.user_id == axis.user_id]
     raise ValueError(f"Unknown UsageAxis.kind: {axis.kind!r}")
 
 
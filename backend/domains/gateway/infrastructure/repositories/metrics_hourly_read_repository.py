@@ -1,4 +1,8 @@
-"""gateway_metrics_hourly 读路径仓储（Dashboard/Statistics hybrid 冷段）。"""
+"""gateway_metrics_* 读路径仓储（Dashboard/Statistics hybrid 冷段）。
+
+冷段按 ``gateway_rollup_state`` 中的日 / 月水位拼接 monthly + daily + hourly 三层
+（见 ``metrics_tier_source``），长时间窗只扫描数百行整月 / 整日聚合。
+"""
 
 from __future__ import annotations
 
@@ -7,28 +11,37 @@ from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import case, func, literal, or_, select
 
+from bootstrap.config import settings
 from domains.gateway.domain.usage.usage_read_model import (
     UsageStatisticsFilters,
     UsageStatisticsGroupBy,
     UsageStatisticsParentScope,
 )
-from domains.gateway.infrastructure.models.metrics_hourly import GatewayMetricsHourly
+from domains.gateway.infrastructure.models.gateway_rollup_state import (
+    _ROLLUP_STATE_SINGLETON_ID,
+    GatewayRollupState,
+)
 from domains.gateway.infrastructure.repositories.metrics_hourly_axis_sql import (
     metrics_hourly_and,
     metrics_hourly_axis_clauses,
-    metrics_hourly_time_clauses,
+)
+from domains.gateway.infrastructure.repositories.metrics_tier_source import (
+    metrics_tier_source,
+    plan_metrics_tier_segments,
 )
 from domains.gateway.infrastructure.repositories.request_log_repository import (
     BreakdownPairRow,
     RequestLogUsageAggregateRow,
     RequestLogUsageTotals,
 )
+from libs.db.database import replica_reads
 
 if TYPE_CHECKING:
     from datetime import datetime
     from uuid import UUID
 
     from sqlalchemy.ext.asyncio import AsyncSession
+    from sqlalchemy.sql import ColumnCollection
 
     from domains.gateway.domain.usage.usage_axis import UsageAxis
 
@@ -36,16 +49,43 @@ if TYPE_CHECKING:
 class MetricsHourlyReadRepository:
     def __init__(self, session: AsyncSession) -> None:
         self._session = session
+        self._tier_watermarks: tuple[datetime | None, datetime | None] | None = None
 
-    @staticmethod
-    def _model_filter_clause(model: str):
-        return or_(
-            GatewayMetricsHourly.model_key == model,
-            GatewayMetricsHourly.real_model == model,
+    async def _read(self, stmt: Any) -> Any:
+        """管理面只读查询：副本延迟在 ``gateway_usage_read_max_staleness_seconds`` 内时走只读副本。"""
+        with replica_reads(settings.gateway_usage_read_max_staleness_seconds):
+            return await self._session.execute(stmt)
+
+    async def _source_columns(
+        self,
+        bucket_start: datetime,
+        bucket_end_exclusive: datetime,
+    ) -> ColumnCollection:
+        """``[bucket_start, bucket_end_exclusive)`` 的分层拼接子查询列（水位按仓储实例缓存）。"""
+        if self._tier_watermarks is None:
+            stmt = select(
+                GatewayRollupState.daily_rolled_at, GatewayRollupState.monthly_rolled_at
+            ).where(GatewayRollupState.id == _ROLLUP_STATE_SINGLETON_ID)
+            row = (await self._read(stmt)).one_or_none()
+            self._tier_watermarks = (
+                (row.daily_rolled_at, row.monthly_rolled_at) if row is not None else (None, None)
+            )
+        daily_until, monthly_until = self._tier_watermarks
+        segments = plan_metrics_tier_segments(
+            bucket_start,
+            bucket_end_exclusive,
+            daily_until=daily_until,
+            monthly_until=monthly_until,
         )
+        return metrics_tier_source(segments).c
+
+    @staticmethod
+    def _model_filter_clause(m: ColumnCollection, model: str):
+        return or_(m.model_key == model, m.real_model == model)
 
     @staticmethod
     def _list_filter_clauses(
+        m: ColumnCollection,
         *,
         capability: str | None = None,
         vkey_id: UUID | None = None,
@@ -55,52 +95,52 @@ class MetricsHourlyReadRepository:
     ) -> list:
         clauses: list = []
         if capability is not None:
-            clauses.append(GatewayMetricsHourly.capability == capability)
+            clauses.append(m.capability == capability)
         if vkey_id is not None:
-            clauses.append(GatewayMetricsHourly.vkey_id == vkey_id)
+            clauses.append(m.vkey_id == vkey_id)
         if credential_id is not None:
-            clauses.append(GatewayMetricsHourly.credential_id == credential_id)
+            clauses.append(m.credential_id == credential_id)
         if user_id is not None:
-            clauses.append(GatewayMetricsHourly.user_id == user_id)
+            clauses.append(m.user_id == user_id)
         if model is not None:
-            clauses.append(MetricsHourlyReadRepository._model_filter_clause(model))
+            clauses.append(MetricsHourlyReadRepository._model_filter_clause(m, model))
         return clauses
 
     @staticmethod
-    def _statistics_filter_clauses(filters: UsageStatisticsFilters) -> list:
+    def _statistics_filter_clauses(m: ColumnCollection, filters: UsageStatisticsFilters) -> list:
         clauses: list = []
         if filters.credential_id is not None:
-            clauses.append(GatewayMetricsHourly.credential_id == filters.credential_id)
+            clauses.append(m.credential_id == filters.credential_id)
         if filters.user_id is not None:
-            clauses.append(GatewayMetricsHourly.user_id == filters.user_id)
+            clauses.append(m.user_id == filters.user_id)
         if filters.team_id is not None:
-            clauses.append(GatewayMetricsHourly.tenant_id == filters.team_id)
+            clauses.append(m.tenant_id == filters.team_id)
         if filters.vkey_id is not None:
-            clauses.append(GatewayMetricsHourly.vkey_id == filters.vkey_id)
+            clauses.append(m.vkey_id == filters.vkey_id)
         if filters.model is not None:
-            clauses.append(MetricsHourlyReadRepository._model_filter_clause(filters.model))
+            clauses.append(MetricsHourlyReadRepository._model_filter_clause(m, filters.model))
         if filters.provider is not None:
-            clauses.append(GatewayMetricsHourly.provider == filters.provider)
+            clauses.append(m.provider == filters.provider)
         if filters.capability is not None:
-            clauses.append(GatewayMetricsHourly.capability == filters.capability)
+            clauses.append(m.capability == filters.capability)
         return clauses
 
     @staticmethod
-    def _group_exprs(group_by: UsageStatisticsGroupBy) -> list:
+    def _group_exprs(m: ColumnCollection, group_by: UsageStatisticsGroupBy) -> list:
         if group_by == UsageStatisticsGroupBy.CREDENTIAL:
-            return [GatewayMetricsHourly.credential_id]
+            return [m.credential_id]
         if group_by == UsageStatisticsGroupBy.USER:
-            return [GatewayMetricsHourly.user_id]
+            return [m.user_id]
         if group_by == UsageStatisticsGroupBy.TEAM:
-            return [GatewayMetricsHourly.tenant_id]
+            return [m.tenant_id]
         if group_by == UsageStatisticsGroupBy.MODEL:
-            return [GatewayMetricsHourly.model_key]
+            return [m.model_key]
         if group_by == UsageStatisticsGroupBy.VKEY:
-            return [GatewayMetricsHourly.vkey_id]
+            return [m.vkey_id]
         if group_by == UsageStatisticsGroupBy.PROVIDER:
-            return [GatewayMetricsHourly.provider]
+            return [m.provider]
         if group_by == UsageStatisticsGroupBy.CAPABILITY:
-            return [GatewayMetricsHourly.capability]
+            return [m.capability]
         if group_by == UsageStatisticsGroupBy.STATUS:
             raise ValueError("status group_by not supported on metrics_hourly")
         if group_by == UsageStatisticsGroupBy.USER_MODEL_CREDENTIAL:
@@ -119,10 +159,11 @@ class MetricsHourlyReadRepository:
         user_id: UUID | None = None,
         model: str | None = None,
     ) -> dict[str, Any]:
+        m = await self._source_columns(bucket_start, bucket_end_exclusive)
         clauses = [
-            *metrics_hourly_axis_clauses(axis),
-            *metrics_hourly_time_clauses(bucket_start, bucket_end_exclusive),
+            *metrics_hourly_axis_clauses(axis, m),
             *self._list_filter_clauses(
+                m,
                 capability=capability,
                 vkey_id=vkey_id,
                 credential_id=credential_id,
@@ -130,26 +171,22 @@ class MetricsHourlyReadRepository:
                 model=model,
             ),
         ]
-        latency_weight = func.sum(
-            case((GatewayMetricsHourly.success_count > 0, GatewayMetricsHourly.total_latency_ms), else_=0)
-        )
-        ttfb_weight = func.sum(
-            case((GatewayMetricsHourly.success_count > 0, GatewayMetricsHourly.ttfb_total_ms), else_=0)
-        )
-        success_weight = func.sum(GatewayMetricsHourly.success_count)
+        latency_weight = func.sum(case((m.success_count > 0, m.total_latency_ms), else_=0))
+        ttfb_weight = func.sum(case((m.success_count > 0, m.ttfb_total_ms), else_=0))
+        success_weight = func.sum(m.success_count)
         stmt = select(
-            func.sum(GatewayMetricsHourly.requests).label("total"),
-            func.sum(GatewayMetricsHourly.input_tokens).label("input_tokens"),
-            func.sum(GatewayMetricsHourly.output_tokens).label("output_tokens"),
-            func.sum(GatewayMetricsHourly.cached_tokens).label("cached_tokens"),
-            func.sum(GatewayMetricsHourly.cache_creation_tokens).label("cache_creation_tokens"),
-            func.sum(GatewayMetricsHourly.cost_usd).label("cost_usd"),
-            func.sum(GatewayMetricsHourly.success_count).label("success"),
-            func.sum(GatewayMetricsHourly.error_count).label("failure"),
+            func.sum(m.requests).label("total"),
+            func.sum(m.input_tokens).label("input_tokens"),
+            func.sum(m.output_tokens).label("output_tokens"),
+            func.sum(m.cached_tokens).label("cached_tokens"),
+            func.sum(m.cache_creation_tokens).label("cache_creation_tokens"),
+            func.sum(m.cost_usd).label("cost_usd"),
+            func.sum(m.success_count).label("success"),
+            func.sum(m.error_count).label("failure"),
             (latency_weight / func.nullif(success_weight, 0)).label("avg_latency"),
             (ttfb_weight / func.nullif(success_weight, 0)).label("avg_ttfb"),
         ).where(metrics_hourly_and(*clauses))
-        row = (await self._session.execute(stmt)).one()
+        row = (await self._read(stmt)).one()
         return {
             "total": int(row.total or 0),
             "input_tokens": int(row.input_tokens or 0),
@@ -176,66 +213,63 @@ class MetricsHourlyReadRepository:
         parent_scope: UsageStatisticsParentScope | None = None,
         fetch_all_groups: bool = False,
     ) -> tuple[list[RequestLogUsageAggregateRow], RequestLogUsageTotals, int]:
-        group_exprs = self._group_exprs(group_by)
+        m = await self._source_columns(bucket_start, bucket_end_exclusive)
+        group_exprs = self._group_exprs(m, group_by)
         clauses = [
-            *metrics_hourly_axis_clauses(axis),
-            *metrics_hourly_time_clauses(bucket_start, bucket_end_exclusive),
-            *self._statistics_filter_clauses(filters),
+            *metrics_hourly_axis_clauses(axis, m),
+            *self._statistics_filter_clauses(m, filters),
         ]
         if parent_scope is not None:
-            clauses.append(self._parent_clause(parent_scope, parent_scope.group_by))
+            clauses.append(self._parent_clause(m, parent_scope, parent_scope.group_by))
 
         offset = max(0, (page - 1) * page_size)
         grouped_subq = (
             select(
                 group_exprs[0].label("group_key"),
                 literal(None).label("label_snapshot"),
-                func.sum(GatewayMetricsHourly.requests).label("requests"),
-                func.sum(GatewayMetricsHourly.success_count).label("success_count"),
-                func.sum(GatewayMetricsHourly.error_count).label("failure_count"),
-                func.sum(GatewayMetricsHourly.input_tokens).label("input_tokens"),
-                func.sum(GatewayMetricsHourly.output_tokens).label("output_tokens"),
-                func.sum(GatewayMetricsHourly.cached_tokens).label("cached_tokens"),
-                func.sum(GatewayMetricsHourly.cache_creation_tokens).label("cache_creation_tokens"),
-                func.sum(GatewayMetricsHourly.cost_usd).label("cost_usd"),
+                func.sum(m.requests).label("requests"),
+                func.sum(m.success_count).label("success_count"),
+                func.sum(m.error_count).label("failure_count"),
+                func.sum(m.input_tokens).label("input_tokens"),
+                func.sum(m.output_tokens).label("output_tokens"),
+                func.sum(m.cached_tokens).label("cached_tokens"),
+                func.sum(m.cache_creation_tokens).label("cache_creation_tokens"),
+                func.sum(m.cost_usd).label("cost_usd"),
                 (
                     func.sum(
                         case(
                             (
-                                GatewayMetricsHourly.success_count > 0,
-                                GatewayMetricsHourly.total_latency_ms,
+                                m.success_count > 0,
+                                m.total_latency_ms,
                             ),
                             else_=0,
                         )
                     )
-                    / func.nullif(func.sum(GatewayMetricsHourly.success_count), 0)
+                    / func.nullif(func.sum(m.success_count), 0)
                 ).label("avg_latency_ms"),
                 (
                     func.sum(
                         case(
                             (
-                                GatewayMetricsHourly.success_count > 0,
-                                GatewayMetricsHourly.ttfb_total_ms,
+                                m.success_count > 0,
+                                m.ttfb_total_ms,
                             ),
                             else_=0,
                         )
                     )
-                    / func.nullif(func.sum(GatewayMetricsHourly.success_count), 0)
+                    / func.nullif(func.sum(m.success_count), 0)
                 ).label("avg_ttfb_ms"),
-                func.sum(GatewayMetricsHourly.cache_hit_count).label("cache_hit_count"),
+                func.sum(m.cache_hit_count).label("cache_hit_count"),
             )
             .where(metrics_hourly_and(*clauses))
             .group_by(*group_exprs)
             .subquery("hourly_grouped")
         )
-        rows_stmt = (
-            select(grouped_subq)
-            .order_by(grouped_subq.c.requests.desc())
-        )
+        rows_stmt = select(grouped_subq).order_by(grouped_subq.c.requests.desc())
         if not fetch_all_groups:
             rows_stmt = rows_stmt.offset(offset).limit(page_size)
         items: list[RequestLogUsageAggregateRow] = []
-        for row in (await self._session.execute(rows_stmt)).all():
+        for row in (await self._read(rows_stmt)).all():
             items.append(
                 RequestLogUsageAggregateRow(
                     group_key=row.group_key,
@@ -257,30 +291,30 @@ class MetricsHourlyReadRepository:
         group_total_subq = select(func.count()).select_from(grouped_subq).scalar_subquery()
         totals_stmt = select(
             group_total_subq.label("group_total"),
-            func.sum(GatewayMetricsHourly.requests).label("requests"),
-            func.sum(GatewayMetricsHourly.success_count).label("success_count"),
-            func.sum(GatewayMetricsHourly.error_count).label("failure_count"),
-            func.sum(GatewayMetricsHourly.input_tokens).label("input_tokens"),
-            func.sum(GatewayMetricsHourly.output_tokens).label("output_tokens"),
-            func.sum(GatewayMetricsHourly.cached_tokens).label("cached_tokens"),
-            func.sum(GatewayMetricsHourly.cache_creation_tokens).label("cache_creation_tokens"),
-            func.sum(GatewayMetricsHourly.cost_usd).label("cost_usd"),
+            func.sum(m.requests).label("requests"),
+            func.sum(m.success_count).label("success_count"),
+            func.sum(m.error_count).label("failure_count"),
+            func.sum(m.input_tokens).label("input_tokens"),
+            func.sum(m.output_tokens).label("output_tokens"),
+            func.sum(m.cached_tokens).label("cached_tokens"),
+            func.sum(m.cache_creation_tokens).label("cache_creation_tokens"),
+            func.sum(m.cost_usd).label("cost_usd"),
             func.sum(
                 case(
-                    (GatewayMetricsHourly.success_count > 0, GatewayMetricsHourly.total_latency_ms),
+                    (m.success_count > 0, m.total_latency_ms),
                     else_=0,
                 )
             ).label("latency_weight"),
             func.sum(
                 case(
-                    (GatewayMetricsHourly.success_count > 0, GatewayMetricsHourly.ttfb_total_ms),
+                    (m.success_count > 0, m.ttfb_total_ms),
                     else_=0,
                 )
             ).label("ttfb_weight"),
-            func.sum(GatewayMetricsHourly.success_count).label("success_weight"),
-            func.sum(GatewayMetricsHourly.cache_hit_count).label("cache_hit_count"),
+            func.sum(m.success_count).label("success_weight"),
+            func.sum(m.cache_hit_count).label("cache_hit_count"),
         ).where(metrics_hourly_and(*clauses))
-        total_row = (await self._session.execute(totals_stmt)).one()
+        total_row = (await self._read(totals_stmt)).one()
         group_total = int(total_row.group_total or 0)
         totals = self._totals_from_row(total_row)
         return items, totals, group_total
@@ -294,15 +328,15 @@ class MetricsHourlyReadRepository:
         filters: UsageStatisticsFilters,
         parent_scope: UsageStatisticsParentScope | None = None,
     ) -> int:
+        m = await self._source_columns(bucket_start, bucket_end_exclusive)
         clauses = [
-            *metrics_hourly_axis_clauses(axis),
-            *metrics_hourly_time_clauses(bucket_start, bucket_end_exclusive),
-            *self._statistics_filter_clauses(filters),
+            *metrics_hourly_axis_clauses(axis, m),
+            *self._statistics_filter_clauses(m, filters),
         ]
         if parent_scope is not None:
-            clauses.append(self._parent_clause(parent_scope, parent_scope.group_by))
-        stmt = select(func.sum(GatewayMetricsHourly.requests)).where(metrics_hourly_and(*clauses))
-        return int((await self._session.execute(stmt)).scalar_one() or 0)
+            clauses.append(self._parent_clause(m, parent_scope, parent_scope.group_by))
+        stmt = select(func.sum(m.requests)).where(metrics_hourly_and(*clauses))
+        return int((await self._read(stmt)).scalar_one() or 0)
 
     @staticmethod
     def _totals_from_row(row: object) -> RequestLogUsageTotals:
@@ -325,10 +359,11 @@ class MetricsHourlyReadRepository:
 
     @staticmethod
     def _parent_in_clause(
+        m: ColumnCollection,
         parent_group_by: UsageStatisticsGroupBy,
         parent_keys: list[str],
     ):
-        expr = MetricsHourlyReadRepository._group_exprs(parent_group_by)[0]
+        expr = MetricsHourlyReadRepository._group_exprs(m, parent_group_by)[0]
         keys = [k.strip() for k in parent_keys if k and k.strip()]
         if not keys:
             return literal(False)
@@ -355,24 +390,24 @@ class MetricsHourlyReadRepository:
         filters: UsageStatisticsFilters,
     ) -> list[BreakdownPairRow]:
         """hourly 冷段：按 ``(父维度, 二次维度)`` 聚合本页所有父行的分布（仅请求数）。"""
-        parent_expr = self._group_exprs(parent_group_by)[0]
-        breakdown_expr = self._group_exprs(breakdown_group_by)[0]
+        m = await self._source_columns(bucket_start, bucket_end_exclusive)
+        parent_expr = self._group_exprs(m, parent_group_by)[0]
+        breakdown_expr = self._group_exprs(m, breakdown_group_by)[0]
         clauses = [
-            *metrics_hourly_axis_clauses(axis),
-            *metrics_hourly_time_clauses(bucket_start, bucket_end_exclusive),
-            *self._statistics_filter_clauses(filters),
-            self._parent_in_clause(parent_group_by, parent_keys),
+            *metrics_hourly_axis_clauses(axis, m),
+            *self._statistics_filter_clauses(m, filters),
+            self._parent_in_clause(m, parent_group_by, parent_keys),
         ]
         stmt = (
             select(
                 parent_expr.label("parent_key"),
                 breakdown_expr.label("breakdown_key"),
-                func.sum(GatewayMetricsHourly.requests).label("requests"),
+                func.sum(m.requests).label("requests"),
             )
             .where(metrics_hourly_and(*clauses))
             .group_by(parent_expr, breakdown_expr)
         )
-        result = await self._session.execute(stmt)
+        result = await self._read(stmt)
         return [
             BreakdownPairRow(
                 parent_key="" if row.parent_key is None else str(row.parent_key),
@@ -385,12 +420,13 @@ class MetricsHourlyReadRepository:
 
     @staticmethod
     def _parent_clause(
+        m: ColumnCollection,
         parent: UsageStatisticsParentScope,
         group_by: UsageStatisticsGroupBy,
     ):
         key = parent.group_key.strip()
         if group_by == UsageStatisticsGroupBy.MODEL:
-            return GatewayMetricsHourly.model_key == key
+            return m.model_key == key
         if group_by in (
             UsageStatisticsGroupBy.CREDENTIAL,
             UsageStatisticsGroupBy.USER,
@@ -400,13 +436,13 @@ class MetricsHourlyReadRepository:
             from uuid import UUID as _UUID
 
             if not key:
-                return MetricsHourlyReadRepository._group_exprs(group_by)[0].is_(None)
-            return MetricsHourlyReadRepository._group_exprs(group_by)[0] == _UUID(key)
+                return MetricsHourlyReadRepository._group_exprs(m, group_by)[0].is_(None)
+            return MetricsHourlyReadRepository._group_exprs(m, group_by)[0] == _UUID(key)
         if group_by in (
             UsageStatisticsGroupBy.PROVIDER,
             UsageStatisticsGroupBy.CAPABILITY,
         ):
-            expr = MetricsHourlyReadRepository._group_exprs(group_by)[0]
+            expr = MetricsHourlyReadRepository._group_exprs(m, group_by)[0]
             return expr.is_(None) if not key else expr == key
         raise ValueError(f"Unknown parent group_by: {parent.group_by!r}")
 
@@ -1,4 +1,4 @@
-"""Gateway 请求日志 → 小时指标 rollup（基础设施写路径）"""
+"""Gateway 请求日志 → 小时指标 rollup，及 hourly → daily → monthly 分层重建（基础设施写路径）"""
 
 from __future__ import annotations
 
@@ -12,6 +12,12 @@ from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 from domains.gateway.infrastructure.models.metrics_hourly import GatewayMetricsHourly
 from domains.gateway.infrastructure.models.request_log import GatewayRequestLog
+from domains.gateway.infrastructure.repositories.metrics_tier_source import (
+    METRICS_DIMENSION_COLUMNS,
+    METRICS_SUM_COLUMNS,
+    TIER_MODELS,
+    MetricsRollupTier,
+)
 
 if TYPE_CHECKING:
     from datetime import datetime
@@ -198,6 +204,56 @@ class GatewayMetricsRollupRepository:
         await self._session.flush()
         return len(values_list)
 
+    async def rebuild_calendar_tier(
+        self,
+        tier: MetricsRollupTier,
+        since: datetime,
+        until: datetime,
+    ) -> int:
+        """用下一级整段重建 ``tier``（daily ← hourly，monthly ← daily）在 [since, until) 的桶。
+
+        先删后插（同事务，不 commit），迟到修正与 repair 后重跑即可覆盖；``since`` / ``until``
+        须对齐到 UTC 自然日 / 自然月。返回插入行数。
+        """
+        if tier is MetricsRollupTier.DAILY:
+            source, unit = TIER_MODELS[MetricsRollupTier.HOURLY], "day"
+        elif tier is MetricsRollupTier.MONTHLY:
+            source, unit = TIER_MODELS[MetricsRollupTier.DAILY], "month"
+        else:
+            raise ValueError(f"hourly tier is rolled up from request logs, not rebuilt: {tier!r}")
+        target = TIER_MODELS[tier]
+        await self._session.execute(
+            delete(target).where(target.bucket_at >= since, target.bucket_at < until)
+        )
+
+        bucket = func.date_trunc(unit, source.bucket_at, "UTC")
+        dimensions = [getattr(source, col) for col in METRICS_DIMENSION_COLUMNS]
+        aggregated = (
+            select(
+                func.gen_random_uuid(),
+                bucket,
+                *dimensions,
+                func.max(source.real_model),
+                *(func.sum(getattr(source, col)) for col in METRICS_SUM_COLUMNS),
+            )
+            .where(source.bucket_at >= since, source.bucket_at < until)
+            .group_by(bucket, *dimensions)
+        )
+        result = await self._session.execute(
+            target.__table__.insert().from_select(
+                ["id", "bucket_at", *METRICS_DIMENSION_COLUMNS, "real_model", *METRICS_SUM_COLUMNS],
+                aggregated,
+            )
+        )
+        return int(getattr(result, "rowcount", 0) or 0)
+
+    async def earliest_hourly_bucket(self) -> datetime | None:
+        """hourly 最早的桶（分层首次初始化时确定回填起点）。"""
+        hourly = TIER_MODELS[MetricsRollupTier.HOURLY]
+        return (
+            await self._session.execute(select(func.min(hourly.bucket_at)))
+        ).scalar_one_or_none()
+
     async def _delete_hourly_in_window(self, since: datetime, until: datetime) -> None:
         await self._session.execute(
             delete(GatewayMetricsHourly).where(
@@ -0,0 +1,177 @@
+"""指标聚合分层（hourly / daily / monthly）时间窗拼接。
+
+日 / 月级聚合按 UTC 自然日 / 自然月由下一级整段重建，水位记录在 ``gateway_rollup_state``。
+读路径把 ``[start, end)`` 切成「整月走 monthly、其余整日走 daily、零头走 hourly」的若干段，
+再以 ``UNION ALL`` 拼成与 ``gateway_metrics_hourly`` 同列名的子查询，上层聚合 SQL 不感知分层。
+水位之后（尚未重建）的日 / 月一律回落到下一级，保证结果与纯 hourly 聚合一致。
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from enum import Enum
+from typing import TYPE_CHECKING
+
+from sqlalchemy import false, select, union_all
+
+from domains.gateway.infrastructure.models.metrics_hourly import GatewayMetricsHourly
+from domains.gateway.infrastructure.models.metrics_rollup_tiers import (
+    GatewayMetricsDaily,
+    GatewayMetricsMonthly,
+)
+
+if TYPE_CHECKING:
+    from sqlalchemy.sql import Subquery
+
+
+class MetricsRollupTier(str, Enum):
+    HOURLY = "hourly"
+    DAILY = "daily"
+    MONTHLY = "monthly"
+
+
+TIER_MODELS = {
+    MetricsRollupTier.HOURLY: GatewayMetricsHourly,
+    MetricsRollupTier.DAILY: GatewayMetricsDaily,
+    MetricsRollupTier.MONTHLY: GatewayMetricsMonthly,
+}
+
+# 各层共有的维度列与可累加指标列（p95 不可跨桶合并，不入高层聚合）
+METRICS_DIMENSION_COLUMNS = (
+    "tenant_id",
+    "user_id",
+    "resource_owner_user_id",
+    "vkey_id",
+    "credential_id",
+    "entitlement_plan_id",
+    "provider_plan_id",
+    "provider",
+    "model_key",
+    "capability",
+)
+METRICS_SUM_COLUMNS = (
+    "requests",
+    "success_count",
+    "error_count",
+    "input_tokens",
+    "output_tokens",
+    "cached_tokens",
+    "cache_creation_tokens",
+    "cost_usd",
+    "revenue_usd",
+    "total_latency_ms",
+    "ttfb_total_ms",
+    "cache_hit_count",
+)
+_SOURCE_COLUMNS = ("bucket_at", *METRICS_DIMENSION_COLUMNS, "real_model", *METRICS_SUM_COLUMNS)
+
+
+def floor_day(value: datetime) -> datetime:
+    return value.astimezone(UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def floor_month(value: datetime) -> datetime:
+    return floor_day(value).replace(day=1)
+
+
+def next_month(value: datetime) -> datetime:
+    month_start = floor_month(value)
+    return (month_start + timedelta(days=32)).replace(day=1)
+
+
+def _ceil_day(value: datetime) -> datetime:
+    floored = floor_day(value)
+    return floored if floored == value else floored + timedelta(days=1)
+
+
+def _ceil_month(value: datetime) -> datetime:
+    floored = floor_month(value)
+    return floored if floored == value else next_month(floored)
+
+
+@dataclass(frozen=True)
+class MetricsTierSegment:
+    """``tier`` 表上 ``bucket_at ∈ [start, end)`` 的一段。"""
+
+    tier: MetricsRollupTier
+    start: datetime
+    end: datetime
+
+
+def plan_metrics_tier_segments(
+    start: datetime,
+    end: datetime,
+    *,
+    daily_until: datetime | None,
+    monthly_until: datetime | None,
+) -> list[MetricsTierSegment]:
+    """把 ``[start, end)`` 切成按时间升序、互不重叠的分层段。
+
+    ``daily_until`` / ``monthly_until`` 为对应层的重建水位（其前的整日 / 整月可用），
+    ``None`` 表示该层不可用。
+    """
+    segments: list[MetricsTierSegment] = []
+
+    def _hourly(seg_start: datetime, seg_end: datetime) -> None:
+        if seg_start < seg_end:
+            segments.append(MetricsTierSegment(MetricsRollupTier.HOURLY, seg_start, seg_end))
+
+    def _days_then_hours(seg_start: datetime, seg_end: datetime) -> None:
+        if daily_until is not None:
+            day_start = _ceil_day(seg_start)
+            day_end = min(floor_day(seg_end), daily_until)
+            if day_start < day_end:
+                _hourly(seg_start, day_start)
+                segments.append(MetricsTierSegment(MetricsRollupTier.DAILY, day_start, day_end))
+                _hourly(day_end, seg_end)
+                return
+        _hourly(seg_start, seg_end)
+
+    if start >= end:
+        return segments
+    if monthly_until is not None:
+        month_start = _ceil_month(start)
+        month_end = min(floor_month(end), monthly_until)
+        if month_start < month_end:
+            _days_then_hours(start, month_start)
+            segments.append(MetricsTierSegment(MetricsRollupTier.MONTHLY, month_start, month_end))
+            _days_then_hours(month_end, end)
+            return segments
+    _days_then_hours(start, end)
+    return segments
+
+
+def metrics_tier_source(segments: list[MetricsTierSegment]) -> Subquery:
+    """按分层段拼出与 hourly 同列名的 ``UNION ALL`` 子查询（过滤条件由 PG 下推到各分支）。"""
+    selects = []
+    for segment in segments:
+        model = TIER_MODELS[segment.tier]
+        selects.append(
+            select(*(getattr(model, name).label(name) for name in _SOURCE_COLUMNS)).where(
+                model.bucket_at >= segment.start,
+                model.bucket_at < segment.end,
+            )
+        )
+    if not selects:
+        hourly = GatewayMetricsHourly
+        selects.append(
+            select(*(getattr(hourly, name).label(name) for name in _SOURCE_COLUMNS)).where(false())
+        )
+    if len(selects) == 1:
+        return selects[0].subquery("metrics")
+    return union_all(*selects).subquery("metrics")
+
+
+__all__ = [
+    "METRICS_DIMENSION_COLUMNS",
+    "METRICS_SUM_COLUMNS",
+    "TIER_MODELS",
+    "MetricsRollupTier",
+    "MetricsTierSegment",
+    "floor_day",
+    "floor_month",
+    "metrics_tier_source",
+    "next_month",
+    "plan_metrics_tier_segments",
+]
@@ -0,0 +1,203 @@
+"""请求明细归档格式：Parquet 列映射、对象 key 布局与 manifest。
+
+过期整月分区由 ``RequestLogPartitionArchiver`` 导出为 zstd Parquet 分片，写入归档对象存储：
+
+    {key_prefix}/y2026m01/part-00000.parquet
+    {key_prefix}/y2026m01/part-00001.parquet
+    {key_prefix}/y2026m01/manifest.json
+
+manifest 最后写入、且只在全部分片回读校验（sha256 + 行数）通过后写入，因此「manifest 存在」
+即表示该月归档完整可读。列类型映射：UUID → string、JSONB → JSON 字符串、Numeric → decimal128、
+时间 → ``timestamp[us, UTC]``，与 ``GatewayRequestLog`` 列一一对应，读回时还原为 ORM 实例。
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime
+from functools import lru_cache
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+import uuid
+
+import pyarrow as pa
+from sqlalchemy import ARRAY, JSON, Boolean, DateTime, Integer, Numeric
+from sqlalchemy.dialects.postgresql import UUID
+
+from bootstrap.config import settings
+from domains.gateway.infrastructure.models.request_log import GatewayRequestLog
+from libs.storage.archive_store import ArchiveObjectStore, LocalArchiveStore, S3ArchiveStore
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping, Sequence
+
+    from sqlalchemy import Column
+
+ARCHIVE_FORMAT_VERSION = 1
+ARCHIVE_COMPRESSION = "zstd"
+MANIFEST_FILENAME = "manifest.json"
+
+
+def build_request_log_archive_store() -> ArchiveObjectStore:
+    """按 ``gateway_request_log_archive_*`` 配置构造归档存储。"""
+    if settings.gateway_request_log_archive_backend == "s3":
+        secret = settings.gateway_request_log_archive_s3_secret_key
+        return S3ArchiveStore(
+            bucket=settings.gateway_request_log_archive_s3_bucket or "",
+            region=settings.gateway_request_log_archive_s3_region,
+            endpoint_url=settings.gateway_request_log_archive_s3_endpoint_url,
+            access_key=settings.gateway_request_log_archive_s3_access_key,
+            secret_key=secret.get_secret_value() if secret else None,
+        )
+    return LocalArchiveStore(Path(settings.gateway_request_log_archive_local_path))
+
+
+def archive_month_prefix(year: int, month: int) -> str:
+    prefix = settings.gateway_request_log_archive_key_prefix.strip("/")
+    return f"{prefix}/y{year:04d}m{month:02d}"
+
+
+def archive_manifest_key(year: int, month: int) -> str:
+    return f"{archive_month_prefix(year, month)}/{MANIFEST_FILENAME}"
+
+
+def archive_part_key(year: int, month: int, index: int) -> str:
+    return f"{archive_month_prefix(year, month)}/part-{index:05d}.parquet"
+
+
+def _arrow_type(column: Column[Any]) -> pa.DataType:
+    col_type = column.type
+    if isinstance(col_type, UUID):
+        return pa.string()
+    if isinstance(col_type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(col_type, Numeric):
+        return pa.decimal128(col_type.precision or 18, col_type.scale or 0)
+    if isinstance(col_type, Boolean):
+        return pa.bool_()
+    if isinstance(col_type, Integer):
+        return pa.int64()
+    if isinstance(col_type, ARRAY):
+        return pa.list_(pa.string())
+    return pa.string()
+
+
+def request_log_columns() -> list[Column[Any]]:
+    return list(GatewayRequestLog.__table__.columns)
+
+
+@lru_cache(maxsize=1)
+def request_log_arrow_schema() -> pa.Schema:
+    return pa.schema(
+        [pa.field(c.name, _arrow_type(c), nullable=bool(c.nullable)) for c in request_log_columns()]
+    )
+
+
+def _json_columns() -> frozenset[str]:
+    return frozenset(c.name for c in request_log_columns() if isinstance(c.type, JSON))
+
+
+def _uuid_columns() -> frozenset[str]:
+    return frozenset(c.name for c in request_log_columns() if isinstance(c.type, UUID))
+
+
+def rows_to_record_batch(rows: Sequence[Mapping[str, Any]]) -> pa.RecordBatch:
+    """DB 行（列名 → 值）→ Arrow RecordBatch。"""
+    json_cols, uuid_cols = _json_columns(), _uuid_columns()
+    data: dict[str, list[Any]] = {}
+    for field in request_log_arrow_schema():
+        name = field.name
+        values = [row[name] for row in rows]
+        if name in uuid_cols:
+            values = [None if v is None else str(v) for v in values]
+        elif name in json_cols:
+            values = [
+                None if v is None else json.dumps(v, ensure_ascii=False, default=str)
+                for v in values
+            ]
+        data[name] = values
+    return pa.RecordBatch.from_pydict(data, schema=request_log_arrow_schema())
+
+
+def record_to_request_log(
+    record: Mapping[str, Any], *, columns: Sequence[str] | None = None
+) -> GatewayRequestLog:
+    """Arrow 行（``to_pylist`` 结果）→ 未绑定会话的只读 ``GatewayRequestLog``。"""
+    json_cols, uuid_cols = _json_columns(), _uuid_columns()
+    values: dict[str, Any] = {}
+    for name in columns or record.keys():
+        value = record.get(name)
+        if value is not None and name in uuid_cols:
+            value = uuid.UUID(value)
+        elif value is not None and name in json_cols:
+            value = json.loads(value)
+        values[name] = value
+    return GatewayRequestLog(**values)
+
+
+@dataclass(frozen=True)
+class ArchivedFile:
+    key: str
+    rows: int
+    bytes: int
+    sha256: str
+
+
+@dataclass(frozen=True)
+class RequestLogArchiveManifest:
+    """单个月分区的归档清单。"""
+
+    partition: str
+    year: int
+    month: int
+    rows: int
+    files: tuple[ArchivedFile, ...]
+    columns: tuple[str, ...]
+    archived_at: datetime
+    min_created_at: datetime | None = None
+    max_created_at: datetime | None = None
+    compression: str = ARCHIVE_COMPRESSION
+    format_version: int = ARCHIVE_FORMAT_VERSION
+
+    def to_json(self) -> bytes:
+        payload = asdict(self)
+        for key in ("archived_at", "min_created_at", "max_created_at"):
+            value = payload[key]
+            payload[key] = value.astimezone(UTC).isoformat() if value else None
+        return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+    @classmethod
+    def from_json(cls, raw: bytes) -> RequestLogArchiveManifest:
+        payload = json.loads(raw)
+        for key in ("archived_at", "min_created_at", "max_created_at"):
+            if payload.get(key):
+                payload[key] = datetime.fromisoformat(payload[key])
+        payload["files"] = tuple(ArchivedFile(**f) for f in payload["files"])
+        payload["columns"] = tuple(payload["columns"])
+        return cls(**payload)
+
+
+async def load_archive_manifest(
+    store: ArchiveObjectStore, year: int, month: int
+) -> RequestLogArchiveManifest | None:
+    raw = await store.get_bytes(archive_manifest_key(year, month))
+    if raw is None:
+        return None
+    return RequestLogArchiveManifest.from_json(raw)
+
+
+__all__ = [
+    "ARCHIVE_COMPRESSION",
+    "ArchivedFile",
+    "RequestLogArchiveManifest",
+    "archive_manifest_key",
+    "archive_month_prefix",
+    "archive_part_key",
+    "build_request_log_archive_store",
+    "load_archive_manifest",
+    "record_to_request_log",
+    "request_log_arrow_schema",
+    "request_log_columns",
+    "rows_to_record_batch",
+]
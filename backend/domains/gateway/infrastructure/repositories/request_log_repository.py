@@ -14,6 +14,7 @@ from typing import TYPE_CHECKING, Any
 from sqlalchemy import and_, case, func, literal, or_, select, true
 from sqlalchemy.orm import defer
 
+from bootstrap.config import settings
 from domains.gateway.domain.usage.usage_read_model import (
     UsageStatisticsFilters,
     UsageStatisticsGroupBy,
@@ -24,6 +25,7 @@ from domains.gateway.infrastructure.repositories.usage_axis_sql import (
     usage_axis_base_clauses,
     usage_axis_count_disjuncts,
 )
+from libs.db.database import replica_reads
 
 if TYPE_CHECKING:
     from sqlalchemy.sql import ColumnElement
@@ -122,6 +124,11 @@ class RequestLogRepository:
     def __init__(self, session: AsyncSession):
         self._session = session
 
+    async def _read(self, stmt: Any) -> Any:
+        """管理面只读查询：副本延迟在 ``gateway_usage_read_max_staleness_seconds`` 内时走只读副本。"""
+        with replica_reads(settings.gateway_usage_read_max_staleness_seconds):
+            return await self._session.execute(stmt)
+
     @staticmethod
     def _clause_variants_for_axis(
         axis: UsageAxis,
@@ -145,7 +152,7 @@ class RequestLogRepository:
         total = 0
         for variant in self._clause_variants_for_axis(axis, clauses):
             stmt = select(func.count()).select_from(GatewayRequestLog).where(_sql_and(*variant))
-            total += int((await self._session.execute(stmt)).scalar_one())
+            total += int((await self._read(stmt)).scalar_one())
         return total
 
     async def insert(
@@ -281,7 +288,7 @@ class RequestLogRepository:
             .offset(offset)
             .limit(probe_limit)
         )
-        result = await self._session.execute(stmt)
+        result = await self._read(stmt)
         rows = list(result.scalars().all())
         has_next = len(rows) > page_size
         return RequestLogListPage(items=rows[:page_size], has_next=has_next)
@@ -302,7 +309,7 @@ class RequestLogRepository:
         # 分区表主键为 (id, created_at)，不可用 session.get 单单传入 id
         clauses = [*usage_axis_base_clauses(axis), GatewayRequestLog.id == log_id]
         stmt = select(GatewayRequestLog).where(_sql_and(*clauses)).limit(1)
-        result = await self._session.execute(stmt)
+        result = await self._read(stmt)
         return result.scalar_one_or_none()
 
     @staticmethod
@@ -388,7 +395,7 @@ class RequestLogRepository:
                 func.avg(_success_only_metric(GatewayRequestLog.latency_ms)).label("avg_latency"),
                 func.avg(_success_only_metric(GatewayRequestLog.ttfb_ms)).label("avg_ttfb"),
             ).where(_sql_and(*variant))
-            row = (await self._session.execute(stmt)).one()
+            row = (await self._read(stmt)).one()
             partial = {
                 "total": int(row.total or 0),
                 "input_tokens": int(row.input_tokens or 0),
@@ -444,7 +451,7 @@ class RequestLogRepository:
             .group_by(client_type_expr)
             .order_by(func.count(GatewayRequestLog.id).desc())
         )
-        rows = (await self._session.execute(stmt)).all()
+        rows = (await self._read(stmt)).all()
         return [
             {
                 "client_type": str(row.client_type),
@@ -470,7 +477,7 @@ class RequestLogRepository:
             func.sum(GatewayRequestLog.cost_usd).label("cost_usd"),
             func.sum(GatewayRequestLog.revenue_usd).label("revenue_usd"),
         ).where(_sql_and(*clauses))
-        row = (await self._session.execute(stmt)).one()
+        row = (await self._read(stmt)).one()
         cost = Decimal(row.cost_usd or 0)
         revenue = Decimal(row.revenue_usd or 0)
         return {
@@ -505,7 +512,7 @@ class RequestLogRepository:
             .order_by(func.sum(GatewayRequestLog.revenue_usd).desc())
             .limit(limit)
         )
-        rows = (await self._session.execute(stmt)).all()
+        rows = (await self._read(stmt)).all()
         out: list[dict[str, Any]] = []
         for r in rows:
             cost = Decimal(r.cost_usd or 0)
@@ -552,7 +559,7 @@ class RequestLogRepository:
             .where(_sql_and(*clauses))
             .group_by(GatewayRequestLog.route_name)
         )
-        rows = (await self._session.execute(stmt)).all()
+        rows = (await self._read(stmt)).all()
         out: dict[str, dict[str, Any]] = {
             n: {
                 "requests": 0,
@@ -608,7 +615,7 @@ class RequestLogRepository:
             .where(_sql_and(*clauses))
             .group_by(GatewayRequestLog.deployment_gateway_model_id)
         )
-        rows = (await self._session.execute(stmt)).all()
+        rows = (await self._read(stmt)).all()
         out: dict[UUID, dict[str, Any]] = {
             mid: {
                 "requests": 0,
@@ -667,7 +674,7 @@ class RequestLogRepository:
             .where(_sql_and(*clauses))
             .group_by(GatewayRequestLog.credential_id)
         )
-        rows = (await self._session.execute(stmt)).all()
+        rows = (await self._read(stmt)).all()
         out: dict[UUID, dict[str, Any]] = {}
         for row in rows:
             cid = row.credential_id
@@ -919,7 +926,7 @@ class RequestLogRepository:
             .group_by(*group_exprs)
             .order_by(func.count(GatewayRequestLog.id).desc())
         )
-        result = await self._session.execute(stmt)
+        result = await self._read(stmt)
         return [self._usage_statistics_row_to_item(row, group_exprs) for row in result.all()]
 
     async def _fetch_usage_statistics_totals_dict(
@@ -943,7 +950,7 @@ class RequestLogRepository:
             func.avg(_success_only_metric(GatewayRequestLog.ttfb_ms)).label("avg_ttfb_ms"),
             func.sum(cache_hit_case).label("cache_hit_count"),
         ).where(_sql_and(*clauses))
-        row = (await self._session.execute(stmt)).one()
+        row = (await self._read(stmt)).one()
         return {
             "requests": int(row.requests or 0),
             "success_count": int(row.success_count or 0),
@@ -1023,7 +1030,7 @@ class RequestLogRepository:
             rows_stmt = select(grouped_subq).order_by(grouped_subq.c.requests.desc())
             if not fetch_all_groups:
                 rows_stmt = rows_stmt.offset(offset).limit(page_size)
-            result = await self._session.execute(rows_stmt)
+            result = await self._read(rows_stmt)
             items = [self._usage_statistics_row_to_item(row, group_exprs) for row in result.all()]
             group_total_subq = select(func.count()).select_from(grouped_subq).scalar_subquery()
             totals_stmt = select(
@@ -1042,7 +1049,7 @@ class RequestLogRepository:
                 func.avg(_success_only_metric(GatewayRequestLog.ttfb_ms)).label("avg_ttfb_ms"),
                 func.sum(cache_hit_case).label("cache_hit_count"),
             ).where(_sql_and(*variant))
-            total_row = (await self._session.execute(totals_stmt)).one()
+            total_row = (await self._read(totals_stmt)).one()
             group_total = int(total_row.group_total or 0)
             totals = RequestLogUsageTotals(
                 requests=int(total_row.requests or 0),
@@ -1151,7 +1158,7 @@ class RequestLogRepository:
             .where(_sql_and(*clauses))
             .group_by(parent_expr, breakdown_expr)
         )
-        result = await self._session.execute(stmt)
+        result = await self._read(stmt)
         return [
             BreakdownPairRow(
                 parent_key=self._group_key_to_str(row.parent_key),
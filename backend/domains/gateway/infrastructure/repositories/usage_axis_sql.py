@@ -16,7 +16,7 @@ if TYPE_CHECKING:
     from sqlalchemy.sql import ColumnElement
 
 
-def _own_non_system_vkey_ids_subquery(
+def own_non_system_vkey_ids_subquery(
     *,
     user_id: UUID,
     tenant_id: UUID | None = None,
@@ -35,7 +35,7 @@ def usage_axis_user_visibility_disjuncts(
     user_id: UUID,
 ) -> tuple[ColumnElement[bool], ColumnElement[bool]]:
     """user 轴可见性：两段互斥子条件（vkey_id IS NULL vs IS NOT NULL）。"""
-    own_vkeys = _own_non_system_vkey_ids_subquery(user_id=user_id)
+    own_vkeys = own_non_system_vkey_ids_subquery(user_id=user_id)
     platform_inbound = and_(
         GatewayRequestLog.vkey_id.is_(None),
         GatewayRequestLog.user_id == user_id,
@@ -55,7 +55,7 @@ def usage_axis_workspace_member_visibility_disjuncts(
     member_user_id: UUID,
 ) -> tuple[ColumnElement[bool], ColumnElement[bool]]:
     """workspace member 子约束：两段互斥子条件。"""
-    own_vkeys = _own_non_system_vkey_ids_subquery(
+    own_vkeys = own_non_system_vkey_ids_subquery(
         user_id=member_user_id,
         tenant_id=team_id,
     )
@@ -127,6 +127,7 @@ def usage_axis_base_clauses(axis: UsageAxis) -> list[ColumnElement[bool]]:
 
 
 __all__ = [
+    "own_non_system_vkey_ids_subquery",
     "usage_axis_base_clauses",
     "usage_axis_count_disjuncts",
     "usage_axis_user_visibility_disjuncts",
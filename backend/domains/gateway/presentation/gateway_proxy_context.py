@@ -63,6 +63,7 @@ def proxy_context_from_gateway_principal(
     *,
     client_ua: str | None = None,
     client_type: str = "unknown",
+    session_id: str | None = None,
 ) -> ProxyContext:
     """单次对外代理调用的 ``ProxyContext``（虚拟 Key 与业务 API Key 共用）。"""
     vkey = principal.vkey
@@ -91,6 +92,7 @@ def proxy_context_from_gateway_principal(
         tpm_limit=vkey.tpm_limit if vkey else grant.tpm_limit if grant else None,
         client_ua=client_ua,
         client_type=client_type,
+        session_id=session_id,
         user_display_snapshot=principal.user_display_snapshot,
     )
 
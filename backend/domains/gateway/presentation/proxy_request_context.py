@@ -9,6 +9,7 @@ from domains.gateway.application.proxy.proxy_rate_limit_headers import (
     build_proxy_rate_limit_headers,
 )
 from domains.gateway.domain.catalog.client_type import infer_client_type, truncate_client_ua
+from domains.gateway.domain.route.prompt_cache_affinity import session_id_from_headers
 from domains.gateway.domain.types import GatewayCapability
 from domains.gateway.presentation.deps import VkeyOrApikeyPrincipal
 from domains.gateway.presentation.gateway_proxy_context import proxy_context_from_gateway_principal
@@ -40,6 +41,7 @@ def proxy_context_from_request(
         capability,
         client_ua=client_ua,
         client_type=client_type,
+        session_id=session_id_from_headers(request.headers),
     )
 
 
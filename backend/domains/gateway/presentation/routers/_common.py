@@ -4,7 +4,7 @@
 
 约定：
 
-- ``MgmtReads`` / ``MgmtWrites`` / ``CatalogSvc`` 等 ``Annotated`` 别名给子 router 装配 ``Depends`` 用。
+- ``MgmtReads`` / ``DashboardReads`` / ``MgmtWrites`` / ``CatalogSvc`` 等 ``Annotated`` 别名给子 router 装配 ``Depends`` 用。
 - 跨 router 共享的 helper（``vkey_to_response``、``credential_probe_to_response``、
   ``validate_*_provider``、``encryption_key`` 等）走"无前导下划线"对外公开；
 - 仅本模块内部消费的 ``Depends`` 工厂保留 ``_`` 前缀，避免泄漏到子 router。
@@ -27,6 +27,9 @@ from domains.gateway.application.management import (
     GatewayManagementReadService,
     GatewayManagementWriteService,
 )
+from domains.gateway.application.usage.management.dashboard_tiles import (
+    build_dashboard_tile_runner,
+)
 from domains.gateway.application.vkey.management.virtual_key_read_model import VirtualKeyReadModel
 from domains.gateway.domain.credential.credential_probe import CredentialProbeResult
 from domains.gateway.domain.errors import VirtualKeyDecryptError
@@ -121,6 +124,13 @@ def _gateway_management_reads(
     return GatewayManagementReadService(db)
 
 
+def _gateway_dashboard_reads(
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> GatewayManagementReadService:
+    """Dashboard 聚合端点：各分片另取池化会话并发执行并走分片缓存。"""
+    return GatewayManagementReadService(db, dashboard_tiles=build_dashboard_tile_runner())
+
+
 def _gateway_management_writes(
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> GatewayManagementWriteService:
@@ -134,6 +144,7 @@ def _credential_upstream_catalog(
 
 
 MgmtReads = Annotated[GatewayManagementReadService, Depends(_gateway_management_reads)]
+DashboardReads = Annotated[GatewayManagementReadService, Depends(_gateway_dashboard_reads)]
 MgmtWrites = Annotated[GatewayManagementWriteService, Depends(_gateway_management_writes)]
 CatalogSvc = Annotated[CredentialUpstreamCatalogService, Depends(_credential_upstream_catalog)]
 
@@ -181,6 +192,7 @@ def vkey_to_response(record: VirtualKeyReadModel) -> VirtualKeyResponse:
 
 __all__ = [
     "CatalogSvc",
+    "DashboardReads",
     "MgmtReads",
     "MgmtWrites",
     "credential_probe_to_response",
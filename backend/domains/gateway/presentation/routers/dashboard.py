@@ -50,7 +50,7 @@ from domains.gateway.presentation.schemas.gateway_usage_list_response import (
 from libs.api.pagination import PageParams, page_query_params
 from libs.exceptions import PermissionDeniedError, ValidationError
 
-from ._common import MgmtReads
+from ._common import DashboardReads
 
 router = APIRouter()
 PageDep = Annotated[PageParams, Depends(page_query_params)]
@@ -131,7 +131,7 @@ def _usage_statistics_item_response(
 @router.get("/dashboard/summary", response_model=DashboardSummaryResponse)
 async def dashboard_summary(
     team: CurrentTeam,
-    reads: MgmtReads,
+    reads: DashboardReads,
     days: int = Query(7, ge=1, le=90),
     usage_aggregation: UsageAggregation = Query(
         UsageAggregation.WORKSPACE,
@@ -192,7 +192,7 @@ async def dashboard_summary(
 @router.get("/dashboard/statistics", response_model=UsageStatisticsResponse)
 async def dashboard_statistics(
     team: CurrentTeam,
-    reads: MgmtReads,
+    reads: DashboardReads,
     page: PageDep,
     days: int = Query(7, ge=1, le=365),
     usage_aggregation: UsageAggregation = Query(
@@ -275,7 +275,7 @@ def _breakdown_response(
 )
 async def dashboard_statistics_breakdown(
     team: CurrentTeam,
-    reads: MgmtReads,
+    reads: DashboardReads,
     days: int = Query(7, ge=1, le=365),
     usage_aggregation: UsageAggregation = Query(
         UsageAggregation.WORKSPACE,
@@ -354,7 +354,7 @@ def _breakdown_batch_response(
 )
 async def dashboard_statistics_breakdown_batch(
     team: CurrentTeam,
-    reads: MgmtReads,
+    reads: DashboardReads,
     parent_group_by: UsageStatisticsGroupBy = Query(...),
     parent_group_keys: list[str] = Query(...),
     breakdown_by: UsageStatisticsBreakdownBy = Query(...),
@@ -408,7 +408,7 @@ async def dashboard_statistics_breakdown_batch(
 )
 async def dashboard_margin(
     team: CurrentTeam,
-    reads: MgmtReads,
+    reads: DashboardReads,
     days: int = Query(30, ge=1, le=365),
     group_by: MarginGroupBy = Query("credential"),
 ) -> MarginSummaryResponse:
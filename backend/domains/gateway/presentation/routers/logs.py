@@ -35,6 +35,13 @@ router = APIRouter()
 PageDep = Annotated[PageParams, Depends(page_query_params)]
 
 
+def _parse_archived_month(value: str | None) -> tuple[int, int] | None:
+    if not value:
+        return None
+    year, month = value.split("-")
+    return int(year), int(month)
+
+
 @router.get("/logs", response_model=RequestLogListResponse)
 async def list_logs(
     team: CurrentTeam,
@@ -53,6 +60,11 @@ async def list_logs(
     user_id: uuid.UUID | None = None,
     model: str | None = Query(default=None, min_length=1, max_length=200),
     client_type: str | None = Query(default=None, min_length=1, max_length=100),
+    archived_month: str | None = Query(
+        default=None,
+        pattern=r"^\d{4}-(0[1-9]|1[0-2])$",
+        description="已归档月份（YYYY-MM）：只读查询已转存 Parquet 并删除分区的明细",
+    ),
 ) -> RequestLogListResponse:
     page_result = await reads.list_request_logs(
         team,
@@ -68,7 +80,10 @@ async def list_logs(
         user_id=user_id,
         model=model.strip() if model else None,
         client_type=client_type.strip() if client_type else None,
+        archived_month=_parse_archived_month(archived_month),
     )
+    if page_result is None:
+        raise NotFoundError("Archived log month", archived_month)
     log_items = [
         RequestLogResponse.model_validate(request_log_to_dict(i, team)) for i in page_result.items
     ]
@@ -27,7 +27,10 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from domains.gateway.application.proxy.proxy_allowed_models import resolve_proxy_allowed_model_names
 from domains.gateway.application.proxy.proxy_timing import timing_response_headers
 from domains.gateway.application.proxy.proxy_use_case import ProxyUseCase
-from domains.gateway.application.vkey.virtual_key_proxy_model_list import list_openai_proxy_models
+from domains.gateway.application.vkey.proxy_model_list_cache import etag_matches
+from domains.gateway.application.vkey.virtual_key_proxy_model_list import (
+    get_openai_proxy_model_list_response,
+)
 from domains.gateway.domain.proxy.stream_utils import safe_aclose_stream
 from domains.gateway.domain.types import GatewayCapability
 from domains.gateway.presentation.deps import (
@@ -308,16 +311,21 @@ async def videos(
 # =============================================================================
 
 
+# 客户端可缓存但每次须带 If-None-Match 复核（内容随授权/用量变化）
+_MODELS_CACHE_CONTROL = "private, no-cache"
+
+
 @router.get("/models")
 async def list_models(
+    request: Request,
     principal: Annotated[VkeyOrApikeyPrincipal, Depends(bearer_vkey_or_apikey_auth)],
     db: Annotated[AsyncSession, Depends(get_db)],
-) -> dict[str, object]:
+) -> Response:
     allowed = resolve_proxy_allowed_model_names(
         vkey_allowed=principal.vkey.allowed_models if principal.vkey else None,
         grant_allowed=(principal.api_key_grant.allowed_models if principal.api_key_grant else None),
     )
-    data = await list_openai_proxy_models(
+    listing = await get_openai_proxy_model_list_response(
         db,
         team_id=principal.team_id,
         user_id=principal.user_id,
@@ -325,7 +333,10 @@ async def list_models(
         api_key_grant_id=(principal.api_key_grant.grant_id if principal.api_key_grant else None),
         allowed=allowed,
     )
-    return {"object": "list", "data": data}
+    headers = {"ETag": listing.etag, "Cache-Control": _MODELS_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), listing.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=listing.body, media_type="application/json", headers=headers)
 
 
 __all__ = ["router"]
@@ -11,8 +11,10 @@ from dataclasses import dataclass
 from typing import TYPE_CHECKING, Any, Protocol
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
     import uuid
 
+    from domains.agent.domain.interfaces.message_repository import NewMessage
     from domains.session.domain.entities import SessionOwner
 
 
@@ -103,6 +105,10 @@ class SessionApplicationPort(Protocol):
         """添加消息"""
         ...
 
+    async def append_messages(self, messages: Sequence[NewMessage]) -> None:
+        """批量写入消息并累加会话计数（调用方须已校验会话访问权限）"""
+        ...
+
     async def count_messages(self, session_id: str) -> int:
         """统计会话的消息数量"""
         ...
@@ -127,7 +133,9 @@ class SessionApplicationPort(Protocol):
         """列出指定用户的会话 ID"""
         ...
 
-    async def update_session_mcp_config(self, session_id: str, enabled_servers: list[str]) -> dict:
+    async def update_session_mcp_config(
+        self, session_id: str, enabled_servers: list[str], *, flush: bool = True
+    ) -> dict:
         """更新会话的 MCP 配置"""
         ...
 
@@ -19,10 +19,12 @@ from libs.exceptions import NotFoundError, PermissionDeniedError
 from utils.logging import get_logger
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from sqlalchemy.ext.asyncio import AsyncSession
 
     from domains.agent.application.ports.message_port import MessageApplicationPort
-    from domains.agent.domain.interfaces.message_repository import MessageEntity
+    from domains.agent.domain.interfaces.message_repository import MessageEntity, NewMessage
     from domains.agent.domain.services.sandbox_lifecycle import SandboxLifecycleService
     from domains.session.domain.interfaces.session_repository import (
         SessionRepository as SessionRepositoryInterface,
@@ -214,12 +216,15 @@ class SessionUseCase:
             enabled = []
         return {"enabled_servers": [str(s) for s in enabled]}
 
-    async def update_session_mcp_config(self, session_id: str, enabled_servers: list[str]) -> dict:
+    async def update_session_mcp_config(
+        self, session_id: str, enabled_servers: list[str], *, flush: bool = True
+    ) -> dict:
         """更新会话的 MCP 配置（enabled_servers）。"""
         await self.get_session_or_raise(session_id)  # 校验存在
         await self.session_repo.update_config(
             uuid.UUID(session_id),
             {"mcp_config": {"enabled_servers": enabled_servers}},
+            flush=flush,
         )
         return {"enabled_servers": enabled_servers}
 
@@ -391,19 +396,28 @@ class SessionUseCase:
     ) -> MessageEntity:
         """添加消息
 
-        同时更新会话的消息计数和 Token 计数。
+        同时更新会话的消息计数和 Token 计数。计数自增（``UPDATE ... RETURNING``，带租户过滤）
+        兼作会话存在性校验，已加载的会话对象的 ``message_count`` 随之更新。
         """
-        # 验证会话存在
-        session = await self.get_session(session_id)
-        if not session:
+        session_uuid = _safe_uuid(session_id)
+        if session_uuid is None:
+            raise NotFoundError("Session", session_id)
+
+        # 更新会话统计（会话不存在 / 不可见时无行命中）
+        new_count = await self.session_repo.increment_message_count(
+            session_id=session_uuid,
+            message_count=1,
+            token_count=token_count or 0,
+        )
+        if new_count is None:
             raise NotFoundError("Session", session_id)
 
         # 支持枚举和字符串
         role_value = role.value if isinstance(role, MessageRole) else role
 
         # 创建消息
-        message = await self.message_service.create(
-            session_id=uuid.UUID(session_id),
+        return await self.message_service.create(
+            session_id=session_uuid,
             role=role_value,
             content=content,
             tool_calls=tool_calls,
@@ -412,14 +426,22 @@ class SessionUseCase:
             token_count=token_count,
         )
 
-        # 更新会话统计
-        await self.session_repo.increment_message_count(
-            session_id=uuid.UUID(session_id),
-            message_count=1,
-            token_count=token_count or 0,
-        )
+    async def append_messages(self, messages: Sequence[NewMessage]) -> None:
+        """批量写入消息并累加会话计数（不做租户过滤，调用方须已校验会话访问权限）。
 
-        return message
+        供响应结束后的批量写入器使用：一个事务内多行 INSERT + 每会话一条计数 UPDATE。
+        """
+        if not messages:
+            return
+        await self.message_service.create_many(messages)
+        totals: dict[uuid.UUID, list[int]] = {}
+        for item in messages:
+            entry = totals.setdefault(item.session_id, [0, 0])
+            entry[0] += 1
+            entry[1] += item.token_count or 0
+        await self.session_repo.bulk_increment_message_counts(
+            [(sid, counts[0], counts[1]) for sid, counts in totals.items()]
+        )
 
     async def count_messages(self, session_id: str) -> int:
         """统计会话的消息数量"""
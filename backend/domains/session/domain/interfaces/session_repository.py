@@ -6,6 +6,7 @@ Infrastructure 层提供具体实现。
 """
 
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 from typing import Protocol
 import uuid
 
@@ -118,13 +119,28 @@ class SessionRepository(ABC):
         session_id: uuid.UUID,
         message_count: int = 1,
         token_count: int = 0,
-    ) -> None:
+    ) -> int | None:
         """增加消息计数
 
         Args:
             session_id: 会话 ID
             message_count: 消息增量
             token_count: Token 增量
+
+        Returns:
+            增加后的消息数；会话不存在或不可见时为 None
+        """
+        ...
+
+    @abstractmethod
+    async def bulk_increment_message_counts(
+        self,
+        entries: Sequence[tuple[uuid.UUID, int, int]],
+    ) -> None:
+        """批量增加消息 / Token 计数（不做租户过滤，调用方须已校验会话访问权限）
+
+        Args:
+            entries: ``(会话 ID, 消息增量, Token 增量)`` 列表
         """
         ...
 
@@ -4,10 +4,11 @@ Session Repository - 会话仓储实现
 实现会话数据访问，支持自动权限过滤。
 """
 
+from collections.abc import Sequence
 from datetime import UTC, datetime
 import uuid
 
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from domains.session.domain.interfaces.session_repository import (
@@ -16,6 +17,8 @@ from domains.session.domain.interfaces.session_repository import (
 from domains.session.infrastructure.models.session import Session
 from domains.tenancy.application.personal_team_provisioner import PersonalTeamProvisioner
 from libs.db.base_repository import TenantScopedRepositoryBase
+from libs.db.data_scope_clause import DataScopeEnforcer
+from libs.iam.data_scope_policy import require_permission_context
 from libs.iam.permission_context import get_permission_context
 
 
@@ -45,8 +48,8 @@ class SessionRepository(TenantScopedRepositoryBase[Session], SessionRepositoryIn
             title=title,
         )
         self.db.add(session)
+        # 主键、时间戳与计数列均为 Python 侧默认值，flush 后即完整，无需 refresh 回读
         await self.db.flush()
-        await self.db.refresh(session)
         return session
 
     async def get_by_id(self, session_id: uuid.UUID) -> Session | None:
@@ -108,7 +111,6 @@ class SessionRepository(TenantScopedRepositoryBase[Session], SessionRepositoryIn
 
         if flush:
             await self.db.flush()
-            await self.db.refresh(session)
         return session
 
     async def delete(self, session_id: uuid.UUID) -> bool:
@@ -124,13 +126,40 @@ class SessionRepository(TenantScopedRepositoryBase[Session], SessionRepositoryIn
         session_id: uuid.UUID,
         message_count: int = 1,
         token_count: int = 0,
+    ) -> int | None:
+        # 单条 UPDATE ... RETURNING：相对自增不丢并发增量，省去先 SELECT 再回读；
+        # ORM 同步策略会把新值同步到身份映射中已加载的会话对象
+        require_permission_context()
+        stmt = (
+            update(Session)
+            .where(Session.id == session_id)
+            .values(
+                message_count=Session.message_count + message_count,
+                token_count=Session.token_count + token_count,
+            )
+            .returning(Session.message_count)
+        )
+        scope = DataScopeEnforcer.visibility_clause(Session)
+        if scope is not None:
+            stmt = stmt.where(scope)
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def bulk_increment_message_counts(
+        self,
+        entries: Sequence[tuple[uuid.UUID, int, int]],
     ) -> None:
-        session = await self.get_by_id(session_id)
-        if session:
-            session.message_count += message_count
-            if token_count:
-                session.token_count += token_count
-            await self.db.flush()
+        for session_id, message_delta, token_delta in entries:
+            if message_delta <= 0 and token_delta <= 0:
+                continue
+            await self.db.execute(
+                update(Session)
+                .where(Session.id == session_id)
+                .values(
+                    message_count=Session.message_count + message_delta,
+                    token_count=Session.token_count + token_delta,
+                )
+            )
 
     async def increment_video_task_count(
         self,
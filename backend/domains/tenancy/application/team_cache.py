@@ -7,6 +7,7 @@ import time
 from uuid import UUID
 
 from domains.tenancy.infrastructure.models.team import Team
+from libs.observability.metrics import record_cache_lookup
 
 _TTL_SEC = 60.0
 _MAX_ENTRIES = 2048
@@ -56,11 +57,14 @@ def team_from_snapshot(snapshot: CachedTeamSnapshot) -> Team:
 def peek_cached_team_snapshot(team_id: UUID) -> CachedTeamSnapshot | None | object:
     hit = _team_cache.get(team_id)
     if hit is None:
+        record_cache_lookup("team", hit=False)
         return CACHE_MISS
     snapshot, ts = hit
     if time.monotonic() - ts >= _TTL_SEC:
         _team_cache.pop(team_id, None)
+        record_cache_lookup("team", hit=False)
         return CACHE_MISS
+    record_cache_lookup("team", hit=True)
     return snapshot
 
 
@@ -74,11 +78,14 @@ def peek_cached_member_role(team_id: UUID, user_id: UUID) -> str | None | object
     key = (team_id, user_id)
     hit = _member_role_cache.get(key)
     if hit is None:
+        record_cache_lookup("team_member_role", hit=False)
         return CACHE_MISS
     role, ts = hit
     if time.monotonic() - ts >= _TTL_SEC:
         _member_role_cache.pop(key, None)
+        record_cache_lookup("team_member_role", hit=False)
         return CACHE_MISS
+    record_cache_lookup("team_member_role", hit=True)
     return role
 
 
@@ -0,0 +1,54 @@
+"""
+评估断点文件
+
+每完成一条评估结果即以一行 JSON 追加写入（JSONL），进程崩溃后重跑时读回已完成的条目跳过。
+崩溃可能留下半行，读取时忽略无法解析的行。
+"""
+
+import asyncio
+import json
+import logging
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlCheckpoint:
+    """追加写的 JSONL 断点文件"""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._lock = asyncio.Lock()
+
+    def load(self) -> list[dict[str, Any]]:
+        """读取全部完整记录；文件不存在时返回空列表"""
+        if not self.path.exists():
+            return []
+
+        records: list[dict[str, Any]] = []
+        with self.path.open(encoding="utf-8") as f:
+            for lineno, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Skipping truncated checkpoint line %s:%d", self.path, lineno)
+                    continue
+                if isinstance(record, dict):
+                    records.append(record)
+        return records
+
+    async def append(self, record: dict[str, Any]) -> None:
+        """追加一条记录；并发任务串行写入，保证每行完整"""
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        async with self._lock:
+            await asyncio.to_thread(self._write, line)
+
+    def _write(self, line: str) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(line)
+            f.flush()
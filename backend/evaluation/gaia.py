@@ -5,6 +5,7 @@ GAIA (General AI Assistant) 是一个真实世界的 AI Agent 评估基准
 包含需要多步骤推理、工具使用和真实世界知识的任务
 """
 
+import asyncio
 import json
 from pathlib import Path
 import time
@@ -13,6 +14,10 @@ from typing import Any
 from pydantic import BaseModel
 import yaml
 
+from evaluation.checkpoint import JsonlCheckpoint
+
+DEFAULT_TASK_TIMEOUT_SECONDS = 300.0
+
 
 class GAIAQuestion(BaseModel):
     """GAIA 问题"""
@@ -97,30 +102,81 @@ class GAIAEvaluator:
         self,
         agent: Any,
         questions: list[GAIAQuestion] | None = None,
+        *,
+        concurrency: int = 1,
+        task_timeout: float = DEFAULT_TASK_TIMEOUT_SECONDS,
+        checkpoint_path: str | Path | None = None,
     ) -> GAIAReport:
-        """评估 Agent 在 GAIA 基准上的表现"""
+        """评估 Agent 在 GAIA 基准上的表现
+
+        Args:
+            concurrency: 同时执行的任务数上限
+            task_timeout: 单个任务超时（秒），超时记为错误结果
+            checkpoint_path: 断点文件；已记录的任务直接复用结果，新结果逐条追加
+        """
         questions = questions or self.questions
 
         if not questions:
             raise ValueError("No questions to evaluate")
-
-        for question in questions:
-            result = await self._evaluate_single(agent, question)
-            self.results.append(result)
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+
+        checkpoint = JsonlCheckpoint(checkpoint_path) if checkpoint_path else None
+        done = self._load_checkpoint(checkpoint, questions) if checkpoint else {}
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(question: GAIAQuestion) -> GAIAResult:
+            if question.task_id in done:
+                return done[question.task_id]
+            async with semaphore:
+                result = await self._evaluate_single(agent, question, timeout=task_timeout)
+            if checkpoint:
+                await checkpoint.append(result.model_dump(mode="json"))
+            return result
+
+        # gather 保持题目顺序，报告与顺序执行一致
+        results = await asyncio.gather(*(run_one(q) for q in questions))
+        self.results.extend(results)
 
         return self._generate_report()
 
+    @staticmethod
+    def _load_checkpoint(
+        checkpoint: JsonlCheckpoint,
+        questions: list[GAIAQuestion],
+    ) -> dict[str, GAIAResult]:
+        """读回断点中与当前题目一致的结果（题面或答案变化的条目重新评估）"""
+        by_id = {q.task_id: q for q in questions}
+        done: dict[str, GAIAResult] = {}
+        for record in checkpoint.load():
+            try:
+                result = GAIAResult.model_validate(record)
+            except ValueError:
+                continue
+            question = by_id.get(result.task_id)
+            if (
+                question is not None
+                and question.question == result.question
+                and question.final_answer == result.expected_answer
+            ):
+                done[result.task_id] = result
+        return done
+
     async def _evaluate_single(
         self,
         agent: Any,
         question: GAIAQuestion,
+        timeout: float = DEFAULT_TASK_TIMEOUT_SECONDS,
     ) -> GAIAResult:
         """评估单个问题"""
         start_time = time.time()
 
         try:
-            # 执行 Agent
-            response = await agent.run(question.question, timeout=300)
+            # 执行 Agent，使用 asyncio.wait_for 兜底超时
+            response = await asyncio.wait_for(
+                agent.run(question.question, timeout=timeout),
+                timeout=timeout,
+            )
 
             # 提取答案
             actual_answer = self._extract_answer(response)
@@ -153,20 +209,26 @@ class GAIAEvaluator:
                 },
             )
 
+        except TimeoutError:
+            return self._failed_result(question, start_time, f"Timeout after {timeout}s")
         except Exception as e:
-            return GAIAResult(
-                task_id=question.task_id,
-                question=question.question,
-                expected_answer=question.final_answer,
-                actual_answer="",
-                correct=False,
-                score=0.0,
-                time_taken_ms=int((time.time() - start_time) * 1000),
-                steps_taken=0,
-                tokens_used=0,
-                tool_calls_count=0,
-                metadata={"error": str(e)},
-            )
+            return self._failed_result(question, start_time, str(e))
+
+    def _failed_result(self, question: GAIAQuestion, start_time: float, error: str) -> GAIAResult:
+        """超时或异常时的零分结果"""
+        return GAIAResult(
+            task_id=question.task_id,
+            question=question.question,
+            expected_answer=question.final_answer,
+            actual_answer="",
+            correct=False,
+            score=0.0,
+            time_taken_ms=int((time.time() - start_time) * 1000),
+            steps_taken=0,
+            tokens_used=0,
+            tool_calls_count=0,
+            metadata={"error": error},
+        )
 
     def _extract_answer(self, response: Any) -> str:
         """从响应中提取答案"""
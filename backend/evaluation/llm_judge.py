@@ -4,12 +4,17 @@ LLM-as-Judge 评估
 使用 LLM 评估 Agent 响应质量
 """
 
+import asyncio
+from collections import OrderedDict
+import hashlib
 import json
+from pathlib import Path
 from typing import Any, ClassVar
 
 from pydantic import BaseModel
 
 from domains.agent.infrastructure.llm.agent_llm_facade import AgentLlmFacade
+from evaluation.checkpoint import JsonlCheckpoint
 
 
 class JudgeScore(BaseModel):
@@ -23,6 +28,59 @@ class JudgeScore(BaseModel):
     reasoning: str  # 评分理由
 
 
+class JudgeSample(BaseModel):
+    """批量评估的单条样本"""
+
+    query: str
+    response: str
+    expected: str | None = None
+
+
+def judge_cache_key(judge_model: str, prompt: str, candidate: str, reference: str | None) -> str:
+    """裁判结论缓存键：sha256(模型, 裁判 prompt, 候选回答, 参考答案)"""
+    payload = json.dumps([judge_model, prompt, candidate, reference], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class JudgeVerdictCache:
+    """裁判结论缓存
+
+    进程内 LRU；指定 ``path`` 时同时追加写入 JSONL，重启后读回，中断的评估重跑不再重复调用 LLM。
+    """
+
+    def __init__(self, path: str | Path | None = None, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, JudgeScore] = OrderedDict()
+        self._file = JsonlCheckpoint(path) if path else None
+        if self._file:
+            for record in self._file.load():
+                try:
+                    self._put(record["key"], JudgeScore.model_validate(record["score"]))
+                except (KeyError, ValueError):
+                    continue
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> JudgeScore | None:
+        score = self._entries.get(key)
+        if score is None:
+            return None
+        self._entries.move_to_end(key)
+        return score.model_copy()
+
+    async def set(self, key: str, score: JudgeScore) -> None:
+        self._put(key, score.model_copy())
+        if self._file:
+            await self._file.append({"key": key, "score": score.model_dump()})
+
+    def _put(self, key: str, score: JudgeScore) -> None:
+        self._entries[key] = score
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
 class LLMJudge:
     """LLM-as-Judge 评估器"""
 
@@ -59,9 +117,15 @@ Return a JSON object:
 
 Evaluate now:"""
 
-    def __init__(self, llm_gateway: AgentLlmFacade, judge_model: str = "gpt-4"):
+    def __init__(
+        self,
+        llm_gateway: AgentLlmFacade,
+        judge_model: str = "gpt-4",
+        cache: JudgeVerdictCache | None = None,
+    ):
         self.llm = llm_gateway
         self.judge_model = judge_model
+        self.cache = cache
 
     async def evaluate(
         self,
@@ -77,6 +141,12 @@ Evaluate now:"""
             response=response,
         )
 
+        cache_key = None
+        if self.cache is not None:
+            cache_key = judge_cache_key(self.judge_model, prompt, response, expected)
+            if (cached := self.cache.get(cache_key)) is not None:
+                return cached
+
         result = await self.llm.chat(
             messages=[{"role": "user", "content": prompt}],
             model=self.judge_model,
@@ -92,7 +162,7 @@ Evaluate now:"""
 
         try:
             data = json.loads(content)
-            return JudgeScore(**data)
+            score = JudgeScore(**data)
         except Exception:
             # 如果解析失败，返回默认值
             return JudgeScore(
@@ -104,6 +174,31 @@ Evaluate now:"""
                 reasoning="Failed to parse judge response",
             )
 
+        # 解析失败的默认分不缓存，下次重新评估
+        if self.cache is not None and cache_key is not None:
+            await self.cache.set(cache_key, score)
+        return score
+
+    async def evaluate_many(
+        self,
+        samples: list[JudgeSample],
+        concurrency: int = 4,
+    ) -> list[JudgeScore]:
+        """并发评估多条样本，结果与输入顺序一致"""
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run_one(sample: JudgeSample) -> JudgeScore:
+            async with semaphore:
+                return await self.evaluate(
+                    query=sample.query,
+                    response=sample.response,
+                    expected=sample.expected,
+                )
+
+        return list(await asyncio.gather(*(run_one(s) for s in samples)))
+
     async def compare(
         self,
         query: str,
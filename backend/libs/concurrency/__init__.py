@@ -4,11 +4,20 @@
 
 - ``CoalescingFlusher``：进程内按键合并增量、单 flusher 周期批量落库，消除写热点行锁串行化。
 - ``DeferredDbTaskRunner``：有界队列 + 固定 worker 池，治理无上限 fire-and-forget 写入。
+- ``DeferredJobJournal``：延迟任务的本地追加式预写日志，崩溃后启动重放。
 """
 
 from __future__ import annotations
 
 from libs.concurrency.coalescing_flusher import CoalescingFlusher
-from libs.concurrency.deferred_task_runner import DeferredDbTaskRunner, JobFactory
+from libs.concurrency.deferred_job_journal import DeferredJobJournal, JournalRecord
+from libs.concurrency.deferred_task_runner import DeferredDbTaskRunner, JobFactory, ReplayHandler
 
-__all__ = ["CoalescingFlusher", "DeferredDbTaskRunner", "JobFactory"]
+__all__ = [
+    "CoalescingFlusher",
+    "DeferredDbTaskRunner",
+    "DeferredJobJournal",
+    "JobFactory",
+    "JournalRecord",
+    "ReplayHandler",
+]
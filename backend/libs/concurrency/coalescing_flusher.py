@@ -9,7 +9,10 @@
 - ``merge``：把新增量并入已累计值（须可结合/可交换，如「相加」「取较大时间戳」），失败并回时复用；
 - ``flush``：把一批 ``(key, value)`` 原子落库；
 - ``interval`` / ``max_pending``：实时读配置（0 间隔由调用方负责降级，不在此处理）；
-- ``register_task``（可选）：登记内部 flusher / 一次性刷写任务，便于进程/测试 teardown 收口。
+- ``register_task``（可选）：登记内部 flusher / 一次性刷写任务，便于进程/测试 teardown 收口；
+- ``max_attempts``（可选）：批量失败后逐键拆开重刷，单键连续失败按指数退避推迟重试，达到上限后
+  交给 ``on_give_up`` 并丢弃，避免一条坏数据阻塞后续全部写入、pending 无限增长。
+  不设置时失败整体并回、下个窗口无限重试（计数类增量的最终一致语义）。
 
 单线程事件循环下，``add`` 与 ``_flush`` 的字典换出均不跨 ``await``，无需额外加锁。
 """
@@ -18,6 +21,7 @@ from __future__ import annotations
 
 import asyncio
 from collections.abc import Awaitable, Callable, Hashable
+import time
 from typing import Generic, TypeVar
 
 from utils.logging import get_logger
@@ -29,6 +33,8 @@ V = TypeVar("V")
 
 TaskRegister = Callable[[asyncio.Task[None]], None]
 
+_MAX_RETRY_BACKOFF_SECONDS = 60.0
+
 
 class CoalescingFlusher(Generic[K, V]):
     """按键合并增量、单 flusher 周期批量刷写。"""
@@ -42,6 +48,9 @@ class CoalescingFlusher(Generic[K, V]):
         interval_seconds: Callable[[], float],
         max_pending: Callable[[], int],
         register_task: TaskRegister | None = None,
+        max_attempts: int | None = None,
+        retry_backoff_seconds: float = 1.0,
+        on_give_up: Callable[[K, V], Awaitable[None]] | None = None,
     ) -> None:
         self._name = name
         self._merge = merge
@@ -49,7 +58,12 @@ class CoalescingFlusher(Generic[K, V]):
         self._interval_seconds = interval_seconds
         self._max_pending = max_pending
         self._register_task = register_task
+        self._max_attempts = max_attempts
+        self._retry_backoff_seconds = retry_backoff_seconds
+        self._on_give_up = on_give_up
         self._pending: dict[K, V] = {}
+        # 失败键 -> (连续失败次数, 下次可重试的 monotonic 时刻)
+        self._failures: dict[K, tuple[int, float]] = {}
         self._flusher: asyncio.Task[None] | None = None
 
     def add(self, key: K, value: V) -> None:
@@ -79,6 +93,10 @@ class CoalescingFlusher(Generic[K, V]):
         """请求立即补刷一次（关闭合并时由调用方触发，等价即时落库）。"""
         self._schedule_oneoff_flush()
 
+    async def flush_now(self) -> None:
+        """立即刷写当前全部待刷增量并等待完成（读路径需要读己之写时使用；忽略退避）。"""
+        await self._flush(force=True)
+
     def _schedule_oneoff_flush(self) -> None:
         """待刷规模超阈值时立即补一次刷写（并发 flush 因原子换出而安全）。"""
         try:
@@ -96,26 +114,82 @@ class CoalescingFlusher(Generic[K, V]):
                 await self._flush()
         finally:
             # 关停 / 取消时排空，避免丢失增量。
-            await self._flush()
+            await self._flush(force=True)
 
-    async def _flush(self) -> None:
+    async def _flush(self, *, force: bool = False) -> None:
         if not self._pending:
             return
         # 原子换出：读取与置空之间无 await，单线程下并发 flush 仅一方拿到快照。
         snapshot = self._pending
         self._pending = {}
+        if self._failures and not force:
+            now = time.monotonic()
+            held = {k: v for k, v in snapshot.items() if self._retry_at(k) > now}
+            if held:
+                self._merge_back(held)
+                snapshot = {k: v for k, v in snapshot.items() if k not in held}
         entries = list(snapshot.items())
+        if not entries:
+            return
         try:
             await self._flush_batch(entries)
         except Exception:
             logger.exception("Coalescing flush failed name=%s keys=%d", self._name, len(entries))
-            self._merge_back(snapshot)
+            if self._max_attempts is None:
+                self._merge_back(snapshot)
+            elif len(entries) == 1:
+                await self._record_failure(*entries[0])
+            else:
+                await self._flush_each(entries)
+            return
+        self._clear_failures(snapshot)
+
+    async def _flush_each(self, entries: list[tuple[K, V]]) -> None:
+        """批量失败后逐键重刷：隔离坏键，其余键照常落库。"""
+        for key, value in entries:
+            try:
+                await self._flush_batch([(key, value)])
+            except Exception:
+                logger.warning("Coalescing flush failed name=%s key=%r", self._name, key)
+                await self._record_failure(key, value)
+            else:
+                self._failures.pop(key, None)
+
+    def _retry_at(self, key: K) -> float:
+        failure = self._failures.get(key)
+        return failure[1] if failure is not None else 0.0
+
+    def _clear_failures(self, snapshot: dict[K, V]) -> None:
+        if self._failures:
+            for key in snapshot:
+                self._failures.pop(key, None)
+
+    async def _record_failure(self, key: K, value: V) -> None:
+        """记一次失败：未达上限则退避后重试，达到上限交给 ``on_give_up`` 并丢弃。"""
+        attempts = (self._failures[key][0] if key in self._failures else 0) + 1
+        if self._max_attempts is not None and attempts >= self._max_attempts:
+            self._failures.pop(key, None)
+            logger.error(
+                "Coalescing flush giving up name=%s key=%r attempts=%d",
+                self._name,
+                key,
+                attempts,
+            )
+            if self._on_give_up is not None:
+                try:
+                    await self._on_give_up(key, value)
+                except Exception:
+                    logger.exception("Coalescing give-up hook failed name=%s", self._name)
+            return
+        delay = min(self._retry_backoff_seconds * 2 ** (attempts - 1), _MAX_RETRY_BACKOFF_SECONDS)
+        self._failures[key] = (attempts, time.monotonic() + delay)
+        self._merge_back({key: value})
 
     def _merge_back(self, snapshot: dict[K, V]) -> None:
-        """落库失败时把增量并回 pending，下个窗口重试，保证最终一致。"""
+        """落库失败时把增量并回 pending（旧值在前），下个窗口重试，保证最终一致。"""
         for key, value in snapshot.items():
             existing = self._pending.get(key)
-            self._pending[key] = value if existing is None else self._merge(existing, value)
+            self._pending[key] = value if existing is None else self._merge(value, existing)
 
 
 __all__ = ["CoalescingFlusher", "TaskRegister"]
@@ -0,0 +1,253 @@
+"""延迟任务预写日志（WAL）：本地追加式 segment 文件，进程崩溃后由下次启动重放。
+
+``DeferredDbTaskRunner`` 的队列只在内存里；worker 重启 / OOM 时排队中的结算随进程消失，
+Redis 预扣泄漏、用量少记。本 journal 在任务 **入队前** 追加一条 ``add`` 记录，任务结束后
+追加 ``done``；下次启动时扫描「属主已退出」的 segment，把没有 ``done`` 的任务交回执行器。
+
+- **segment**：每个进程独占一个 ``<name>-<pid>-<rand>.wal``，JSON Lines 追加写；超过
+  ``segment_max_bytes`` 即滚动到新 segment，旧 segment 在其任务全部 ``done`` 后删除
+  （即压缩：已完成任务不会无限累积）；
+- **属主判定**：属主进程对自己的 segment 持有 ``flock`` 排他锁，进程退出（含崩溃）后由
+  内核释放——能拿到锁即为孤儿 segment；多 worker 并发启动时只有一个能接管同一 segment；
+  无 ``fcntl`` 的平台（Windows 开发机）退化为 pid 存活判定；
+- **持久性**：默认只 ``flush`` 到内核页缓存（覆盖进程崩溃 / OOM / 重启）；``fsync=True``
+  额外覆盖主机掉电，代价是每条记录一次磁盘同步；
+- **语义**：至少一次。任务已生效但 ``done`` 未落盘的极小窗口内崩溃会被重放，重放处理器应
+  尽量幂等（按 request_id 去重的部分天然幂等）。
+"""
+
+from __future__ import annotations
+
+from contextlib import suppress
+from dataclasses import dataclass, field
+import json
+import os
+from pathlib import Path
+import threading
+from typing import IO, Any
+import uuid
+
+from utils.logging import get_logger
+
+try:  # pragma: no cover - 平台分支
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+logger = get_logger(__name__)
+
+_SEGMENT_SUFFIX = ".wal"
+_DEFAULT_SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class JournalRecord:
+    """一条待重放任务：``kind`` 决定重放处理器，``payload`` 为其 JSON 参数。"""
+
+    job_id: str
+    kind: str
+    payload: dict[str, Any]
+
+
+@dataclass
+class OrphanSegment:
+    """已接管（持锁）的孤儿 segment；重放登记完成后调用 :meth:`DeferredJobJournal.discard`。"""
+
+    path: Path
+    records: list[JournalRecord]
+    _handle: IO[bytes] | None = field(default=None, repr=False)
+
+
+@dataclass
+class _Segment:
+    path: Path
+    handle: IO[bytes]
+    pending: set[str] = field(default_factory=set)
+
+
+def _try_lock(handle: IO[bytes]) -> bool:
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _segment_pid(path: Path) -> int | None:
+    parts = path.stem.rsplit("-", 2)
+    if len(parts) != 3:
+        return None
+    with suppress(ValueError):
+        return int(parts[1])
+    return None
+
+
+def _read_pending(handle: IO[bytes]) -> list[JournalRecord]:
+    handle.seek(0)
+    pending: dict[str, JournalRecord] = {}
+    for raw in handle:
+        try:
+            entry = json.loads(raw)
+        except ValueError:
+            # 崩溃时写了一半的尾行：丢弃
+            continue
+        job_id = entry.get("id")
+        if entry.get("op") == "add" and isinstance(job_id, str):
+            payload = entry.get("payload")
+            pending[job_id] = JournalRecord(
+                job_id=job_id,
+                kind=str(entry.get("kind") or ""),
+                payload=payload if isinstance(payload, dict) else {},
+            )
+        elif entry.get("op") == "done" and isinstance(job_id, str):
+            pending.pop(job_id, None)
+    return list(pending.values())
+
+
+class DeferredJobJournal:
+    """单进程写入的追加式任务日志（线程安全；写入为同步小块 I/O）。"""
+
+    def __init__(
+        self,
+        *,
+        directory: str | Path,
+        name: str,
+        segment_max_bytes: int = _DEFAULT_SEGMENT_MAX_BYTES,
+        fsync: bool = False,
+    ) -> None:
+        self._directory = Path(directory)
+        self._name = name
+        self._segment_max_bytes = max(1, segment_max_bytes)
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._active: _Segment | None = None
+        self._sealed: dict[Path, _Segment] = {}
+        self._job_segment: dict[str, _Segment] = {}
+
+    @property
+    def directory(self) -> Path:
+        return self._directory
+
+    def _open_segment(self) -> _Segment:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        path = self._directory / (
+            f"{self._name}-{os.getpid()}-{uuid.uuid4().hex[:8]}{_SEGMENT_SUFFIX}"
+        )
+        handle = path.open("ab")
+        _try_lock(handle)
+        return _Segment(path=path, handle=handle)
+
+    def _write(self, segment: _Segment, entry: dict[str, Any]) -> None:
+        segment.handle.write(
+            json.dumps(entry, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+        )
+        segment.handle.flush()
+        if self._fsync:
+            os.fsync(segment.handle.fileno())
+
+    def _close_if_drained(self, segment: _Segment) -> None:
+        if segment is self._active or segment.pending:
+            return
+        self._sealed.pop(segment.path, None)
+        with suppress(OSError):
+            segment.path.unlink()
+        with suppress(OSError):
+            segment.handle.close()
+
+    def append(self, kind: str, payload: dict[str, Any]) -> str:
+        """追加 ``add`` 记录并返回 job_id；序列化失败时抛 ``TypeError`` / ``ValueError``。"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            segment = self._active
+            if segment is None or segment.handle.tell() >= self._segment_max_bytes:
+                if segment is not None:
+                    self._sealed[segment.path] = segment
+                    self._active = None
+                    self._close_if_drained(segment)
+                segment = self._active = self._open_segment()
+            self._write(segment, {"op": "add", "id": job_id, "kind": kind, "payload": payload})
+            segment.pending.add(job_id)
+            self._job_segment[job_id] = segment
+        return job_id
+
+    def complete(self, job_id: str) -> None:
+        with self._lock:
+            segment = self._job_segment.pop(job_id, None)
+            if segment is None:
+                return
+            segment.pending.discard(job_id)
+            try:
+                self._write(segment, {"op": "done", "id": job_id})
+            except (OSError, ValueError):
+                logger.warning("Deferred journal %s: failed to mark %s done", self._name, job_id)
+            self._close_if_drained(segment)
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._job_segment)
+
+    def claim_orphans(self) -> list[OrphanSegment]:
+        """接管属主已退出的 segment（持锁至 :meth:`discard`），返回其中未完成的任务。"""
+        if not self._directory.is_dir():
+            return []
+        own = {s.path for s in self._sealed.values()}
+        if self._active is not None:
+            own.add(self._active.path)
+        claimed: list[OrphanSegment] = []
+        for path in sorted(self._directory.glob(f"{self._name}-*{_SEGMENT_SUFFIX}")):
+            if path in own:
+                continue
+            if fcntl is None:
+                pid = _segment_pid(path)
+                if pid is not None and _pid_alive(pid):
+                    continue
+            try:
+                handle = path.open("r+b")
+            except OSError:
+                continue
+            if not _try_lock(handle) or os.fstat(handle.fileno()).st_nlink == 0:
+                # 属主仍存活，或已被并发启动的另一进程接管并删除
+                handle.close()
+                continue
+            claimed.append(OrphanSegment(path=path, records=_read_pending(handle), _handle=handle))
+        return claimed
+
+    def discard(self, orphan: OrphanSegment) -> None:
+        """孤儿 segment 的任务已重新登记（写入本进程 segment）后删除之。"""
+        with suppress(OSError):
+            orphan.path.unlink()
+        if orphan._handle is not None:
+            with suppress(OSError):
+                orphan._handle.close()
+            orphan._handle = None
+
+    def close(self) -> None:
+        """关停：已全部完成的 segment 删除；仍有未完成任务的保留给下次启动重放。"""
+        with self._lock:
+            segments = list(self._sealed.values())
+            if self._active is not None:
+                segments.append(self._active)
+            self._active = None
+            self._sealed.clear()
+            self._job_segment.clear()
+            for segment in segments:
+                if not segment.pending:
+                    with suppress(OSError):
+                        segment.path.unlink()
+                with suppress(OSError):
+                    segment.handle.close()
+
+
+__all__ = ["DeferredJobJournal", "JournalRecord", "OrphanSegment"]
@@ -11,6 +11,10 @@
 
 worker / 队列惰性绑定到当前事件循环，循环变更（多 worker 进程、测试逐用例换循环）时自动重建。
 本类为纯技术原语：配置（worker 数 / 队列容量 / 阻塞超时）以可调用形式注入，实时读取。
+
+可选 **预写日志**（``DeferredJobJournal``）：以 ``journal_kind`` + JSON ``journal_payload``
+提交的任务在入队前落 journal、结束后标记完成；进程崩溃遗留的任务由 :meth:`replay_journal`
+按 ``register_replay_handler`` 登记的处理器在下次启动时重放。
 """
 
 from __future__ import annotations
@@ -18,12 +22,22 @@ from __future__ import annotations
 import asyncio
 from collections.abc import Awaitable, Callable
 from contextlib import suppress
+from typing import TYPE_CHECKING, Any
 
+from libs.observability.metrics import get_metrics_collector
 from utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from libs.concurrency.deferred_job_journal import DeferredJobJournal
+
 logger = get_logger(__name__)
+_metrics = get_metrics_collector()
+_metrics.describe("deferred_queue_depth", "Jobs waiting in a deferred task runner queue")
+_metrics.describe("deferred_jobs_total", "Deferred jobs by runner and outcome")
+_metrics.describe("deferred_jobs_replayed_total", "Journaled deferred jobs replayed at startup")
 
 JobFactory = Callable[[], Awaitable[None]]
+ReplayHandler = Callable[[dict[str, Any]], Awaitable[None]]
 
 
 class DeferredDbTaskRunner:
@@ -37,6 +51,7 @@ class DeferredDbTaskRunner:
         max_queue: Callable[[], int],
         submit_block_timeout_seconds: Callable[[], float],
         shutdown_drain_timeout_seconds: float = 10.0,
+        journal: Callable[[], DeferredJobJournal | None] | None = None,
     ) -> None:
         self._name = name
         self._max_workers = max_workers
@@ -46,6 +61,39 @@ class DeferredDbTaskRunner:
         self._queue: asyncio.Queue[JobFactory] | None = None
         self._workers: list[asyncio.Task[None]] = []
         self._loop: asyncio.AbstractEventLoop | None = None
+        self._journal_factory = journal
+        self._replay_handlers: dict[str, ReplayHandler] = {}
+
+    def register_replay_handler(self, kind: str, handler: ReplayHandler) -> None:
+        """登记 ``journal_kind`` 的重放处理器（入参为提交时的 ``journal_payload``）。"""
+        self._replay_handlers[kind] = handler
+
+    def _journal(self) -> DeferredJobJournal | None:
+        return self._journal_factory() if self._journal_factory is not None else None
+
+    def _journaled(self, job: JobFactory, kind: str, payload: dict[str, Any]) -> JobFactory:
+        journal = self._journal()
+        if journal is None:
+            return job
+        try:
+            job_id = journal.append(kind, payload)
+        except Exception:
+            # 日志不可写（磁盘满 / 不可序列化）不阻断结算，仅失去崩溃保护
+            logger.warning("Deferred journal append failed runner=%s kind=%s", self._name, kind)
+            _metrics.increment(
+                "deferred_jobs_total", tags={"runner": self._name, "result": "journal_error"}
+            )
+            return job
+
+        async def _run_and_complete() -> None:
+            try:
+                await job()
+            finally:
+                # 取消（关停超时强杀）时不标记完成，留给下次启动重放
+                if not _current_task_cancelling():
+                    journal.complete(job_id)
+
+        return _run_and_complete
 
     def _ensure_started(self) -> asyncio.Queue[JobFactory]:
         """惰性在当前事件循环上建队列与 worker；循环变更或 worker 退出则重建。"""
@@ -62,11 +110,23 @@ class DeferredDbTaskRunner:
         ]
         return self._queue
 
-    async def submit(self, job: JobFactory) -> None:
-        """登记一个延迟任务：快路径入队；满载时阻塞短超时→仍满则 inline 执行。"""
+    async def submit(
+        self,
+        job: JobFactory,
+        *,
+        journal_kind: str | None = None,
+        journal_payload: dict[str, Any] | None = None,
+    ) -> None:
+        """登记一个延迟任务：快路径入队；满载时阻塞短超时→仍满则 inline 执行。
+
+        带 ``journal_kind`` 时先写预写日志（需已 ``register_replay_handler``），崩溃后可重放。
+        """
+        if journal_kind is not None:
+            job = self._journaled(job, journal_kind, journal_payload or {})
         queue = self._ensure_started()
         try:
             queue.put_nowait(job)
+            self._report_depth(queue)
             return
         except asyncio.QueueFull:
             pass
@@ -74,11 +134,16 @@ class DeferredDbTaskRunner:
         if timeout > 0:
             with suppress(asyncio.TimeoutError):
                 await asyncio.wait_for(queue.put(job), timeout)
+                self._report_depth(queue)
                 return
         # 背压兜底：当场执行，宁可拖慢调用方也不丢任务。
         logger.warning("DeferredDbTaskRunner %s saturated; running inline", self._name)
+        _metrics.increment("deferred_jobs_total", tags={"runner": self._name, "result": "inline"})
         await self._run_job(job)
 
+    def _report_depth(self, queue: asyncio.Queue[JobFactory]) -> None:
+        _metrics.set_gauge("deferred_queue_depth", float(queue.qsize()), {"runner": self._name})
+
     async def _worker(self, queue: asyncio.Queue[JobFactory]) -> None:
         while True:
             job = await queue.get()
@@ -86,12 +151,50 @@ class DeferredDbTaskRunner:
                 await self._run_job(job)
             finally:
                 queue.task_done()
+                self._report_depth(queue)
 
     async def _run_job(self, job: JobFactory) -> None:
         try:
             await job()
         except Exception:
             logger.exception("Deferred task failed name=%s", self._name)
+            _metrics.increment(
+                "deferred_jobs_total", tags={"runner": self._name, "result": "error"}
+            )
+        else:
+            _metrics.increment("deferred_jobs_total", tags={"runner": self._name, "result": "ok"})
+
+    async def replay_journal(self) -> int:
+        """启动时重放崩溃进程遗留的未完成任务；返回重新登记的任务数。"""
+        journal = self._journal()
+        if journal is None:
+            return 0
+        replayed = 0
+        for orphan in journal.claim_orphans():
+            for record in orphan.records:
+                handler = self._replay_handlers.get(record.kind)
+                if handler is None:
+                    logger.warning(
+                        "Deferred journal %s: no replay handler for kind=%s, drop job %s",
+                        self._name,
+                        record.kind,
+                        record.job_id,
+                    )
+                    continue
+                # 先写入本进程 segment 再删孤儿：重放途中再次崩溃也不丢
+                await self.submit(
+                    _replay_job(handler, record.payload),
+                    journal_kind=record.kind,
+                    journal_payload=record.payload,
+                )
+                replayed += 1
+            journal.discard(orphan)
+        if replayed:
+            logger.warning("Deferred journal %s: replayed %d pending jobs", self._name, replayed)
+            _metrics.increment(
+                "deferred_jobs_replayed_total", value=replayed, tags={"runner": self._name}
+            )
+        return replayed
 
     async def shutdown(self) -> None:
         """优雅关停：等 worker 把在途与排队任务跑完（限时），再取消空闲 worker。
@@ -111,6 +214,21 @@ class DeferredDbTaskRunner:
         self._workers = []
         self._queue = None
         self._loop = None
+        journal = self._journal()
+        if journal is not None:
+            journal.close()
+
+
+def _replay_job(handler: ReplayHandler, payload: dict[str, Any]) -> JobFactory:
+    async def _job() -> None:
+        await handler(payload)
+
+    return _job
+
+
+def _current_task_cancelling() -> bool:
+    task = asyncio.current_task()
+    return bool(task is not None and task.cancelling())
 
 
-__all__ = ["DeferredDbTaskRunner", "JobFactory"]
+__all__ = ["DeferredDbTaskRunner", "JobFactory", "ReplayHandler"]
@@ -4,13 +4,14 @@ Database Connection Management
 使用 SQLAlchemy 2.0 异步模式
 """
 
+import asyncio
 from collections.abc import AsyncGenerator, Iterator
 from contextlib import asynccontextmanager, contextmanager, suppress
 import contextvars
 import time
 from typing import Any, cast
 
-from sqlalchemy import event
+from sqlalchemy import event, text
 from sqlalchemy import exc as sa_exc
 from sqlalchemy.engine.interfaces import ExceptionContext
 from sqlalchemy.ext.asyncio import (
@@ -20,8 +21,10 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from bootstrap.config import settings
+from libs.observability.metrics import MetricsCollector, get_metrics_collector
 
 
 class Base(DeclarativeBase):
@@ -38,6 +41,18 @@ _session_factory: async_sessionmaker[AsyncSession] | None = None
 _background_engine: AsyncEngine | None = None
 _background_session_factory: async_sessionmaker[AsyncSession] | None = None
 
+# LangGraph checkpointer 专用 psycopg 连接池（有界、惰性打开）：saver 基于 psycopg，
+# 无法复用 SQLAlchemy/asyncpg 引擎；集中在此与另两个池一同计入连接预算与指标。
+_checkpoint_pool: Any | None = None
+
+# 只读副本引擎（可选，``database_replica_url``）：仅承接显式声明了延迟容忍度的只读查询，
+# 见 ``replica_reads`` 与 ``_ReplicaRoutingSession``。
+_replica_engine: AsyncEngine | None = None
+# 最近一次探测到的副本复制延迟（秒）；None = 未知（未探测 / 探测失败），读一律回退主库
+_replica_lag: float | None = None
+_replica_lag_checked_at: float = 0.0
+_replica_lag_task: asyncio.Task[None] | None = None
+
 # 响应后结算作用域开关：置位时 ``get_session_context`` 自动改用后台小池，
 # 把 fire-and-forget 的回写（vkey 用量、请求日志、预算结算）与 /v1/* 热路径物理隔离，
 # 避免突发流量下后台写入抢占主池连接、拖垮事件循环导致 /health 探活超时。
@@ -58,6 +73,29 @@ def prefer_background_pool() -> Iterator[None]:
         _prefer_background_pool.reset(token)
 
 
+# 只读副本路由作用域：值为本作用域可容忍的最大复制延迟（秒）。仅在作用域内、且满足
+# 读己之写等条件的纯 SELECT 才会路由到副本；作用域外一律走主库（路由必须显式声明）。
+_replica_max_staleness: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "ai_agent_replica_max_staleness",
+    default=None,
+)
+
+
+@contextmanager
+def replica_reads(max_staleness_seconds: float | None) -> Iterator[None]:
+    """声明本作用域内的只读查询可容忍 ``max_staleness_seconds`` 秒的复制延迟。
+
+    ``None`` / ``0`` 表示不接受任何延迟（等同于不声明，始终读主库）。
+    """
+    token = _replica_max_staleness.set(
+        max_staleness_seconds if max_staleness_seconds and max_staleness_seconds > 0 else None
+    )
+    try:
+        yield
+    finally:
+        _replica_max_staleness.reset(token)
+
+
 # 触发 pool 回收的 asyncpg 异常文本片段（这些场景说明连接已脏，无法再复用）。
 # 当 pool_pre_ping 或正常查询遇到这些错误时，应判为 disconnect 让 pool 重建连接，
 # 而不是把 500 抛到应用层。
@@ -77,6 +115,9 @@ _ASYNCPG_DIRTY_CONNECTION_MARKERS: tuple[str, ...] = (
     "connection was closed",
 )
 _SESSION_HAS_WRITES_KEY = "_ai_agent_has_writes"
+# 读己之写：会话一旦写过（ORM flush 或 DML 语句），此后全部读固定走主库，
+# 与 ``_SESSION_HAS_WRITES_KEY`` 不同，提交后也不清除。
+_PINNED_PRIMARY_KEY = "_ai_agent_pinned_primary"
 
 
 @event.listens_for(Session, "before_flush")
@@ -88,6 +129,7 @@ def _mark_session_has_writes(
     """标记本事务做过 ORM 写入，避免 flush 后 new/dirty/deleted 被清空而误判。"""
     if session.new or session.dirty or session.deleted:
         session.info[_SESSION_HAS_WRITES_KEY] = True
+        session.info[_PINNED_PRIMARY_KEY] = True
 
 
 def _is_dirty_connection_error(exc: BaseException) -> bool:
@@ -251,6 +293,187 @@ def _register_slow_query_logging(engine: AsyncEngine) -> None:
             log.warning("Slow SQL (%.1f ms): %s", elapsed_ms, preview)
 
 
+_metrics = get_metrics_collector()
+_metrics.describe(
+    "db_pool_checkout_ms",
+    "Time to obtain a pooled DB connection (queue wait plus overflow connect) in milliseconds",
+)
+_metrics.describe("db_statements_total", "SQL statements sent to the database")
+_metrics.describe(
+    "db_read_route_total", "Session statement routing decisions between primary and read replica"
+)
+_metrics.describe("db_replica_lag_seconds", "Last observed read-replica replication lag in seconds")
+
+
+def _replica_route_reason(session: Session, clause: Any) -> str | None:
+    """返回不走副本的原因；``None`` 表示可以路由到副本。"""
+    tolerance = _replica_max_staleness.get()
+    if tolerance is None:
+        return "undeclared"
+    if (
+        not getattr(clause, "is_select", False)
+        or getattr(clause, "_for_update_arg", None) is not None
+    ):
+        return "not_select"
+    if session.info.get(_PINNED_PRIMARY_KEY) or session.new or session.dirty or session.deleted:
+        return "pinned"
+    lag = _replica_lag
+    interval = float(settings.database_replica_lag_check_interval_seconds)
+    if lag is None or time.monotonic() - _replica_lag_checked_at > 3 * interval:
+        return "lag_unknown"
+    if lag > tolerance:
+        return "lag_exceeded"
+    return None
+
+
+class _ReplicaRoutingSession(Session):
+    """主池会话：在 ``replica_reads`` 作用域内把纯 SELECT 路由到只读副本。
+
+    - 未配置副本 / 作用域外：行为与普通 ``Session`` 一致，不计数；
+    - DML 语句或 ORM flush 后会话固定到主库（读己之写）；
+    - 副本延迟未知或超过作用域声明的容忍度时回退主库。
+    """
+
+    def get_bind(self, mapper: Any = None, *, clause: Any = None, **kw: Any) -> Any:
+        replica = _replica_engine
+        if clause is not None and getattr(clause, "is_dml", False):
+            self.info[_PINNED_PRIMARY_KEY] = True
+        if replica is None or _replica_max_staleness.get() is None:
+            return super().get_bind(mapper, clause=clause, **kw)
+        reason = _replica_route_reason(self, clause)
+        if reason is None:
+            _metrics.increment("db_read_route_total", 1, {"target": "replica", "reason": "ok"})
+            return replica.sync_engine
+        _metrics.increment("db_read_route_total", 1, {"target": "primary", "reason": reason})
+        return super().get_bind(mapper, clause=clause, **kw)
+
+
+def _timed_pool_class(pool_name: str) -> type[AsyncAdaptedQueuePool]:
+    """返回记录连接获取耗时的连接池类：池满时排队等待即体现为该直方图的长尾。"""
+    tags = {"pool": pool_name}
+
+    class _TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+        def _do_get(self) -> Any:
+            started = time.perf_counter()
+            try:
+                return super()._do_get()
+            finally:
+                _metrics.record_timer(
+                    "db_pool_checkout_ms", (time.perf_counter() - started) * 1000, tags
+                )
+
+    return _TimedAsyncAdaptedQueuePool
+
+
+def _register_statement_counter(engine: AsyncEngine, pool_name: str) -> None:
+    """按池计数实际下发的 SQL 语句（压测「每请求 DB 次数」的数据来源）。"""
+    tags = {"pool": pool_name}
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count_statement(*_args: object) -> None:
+        _metrics.increment("db_statements_total", 1, tags)
+
+
+def _report_pool_gauges(collector: MetricsCollector) -> None:
+    for pool_name, engine in (
+        ("main", _engine),
+        ("background", _background_engine),
+        ("replica", _replica_engine),
+    ):
+        if engine is None:
+            continue
+        pool = cast("Any", engine.pool)
+        tags = {"pool": pool_name}
+        collector.set_gauge("db_pool_checked_out", float(pool.checkedout()), tags)
+        collector.set_gauge("db_pool_size", float(pool.size()), tags)
+        collector.set_gauge("db_pool_overflow", float(max(0, pool.overflow())), tags)
+    if _checkpoint_pool is not None:
+        stats = _checkpoint_pool.get_stats()
+        size = float(stats.get("pool_size", 0))
+        tags = {"pool": "checkpoint"}
+        collector.set_gauge(
+            "db_pool_checked_out", size - float(stats.get("pool_available", 0)), tags
+        )
+        collector.set_gauge("db_pool_size", size, tags)
+    if _replica_engine is not None and _replica_lag is not None:
+        collector.set_gauge("db_replica_lag_seconds", _replica_lag)
+
+
+_metrics.add_collect_hook(_report_pool_gauges)
+
+# 主库返回 0；备库在已回放全部已接收 WAL 时视为无延迟（空闲主库不产生新事务时
+# ``pg_last_xact_replay_timestamp`` 不前进，直接相减会误报延迟）。
+_REPLICA_LAG_SQL = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+async def _probe_replica_lag(engine: AsyncEngine) -> float:
+    async with engine.connect() as conn:
+        value = (await conn.execute(_REPLICA_LAG_SQL)).scalar()
+    return max(0.0, float(value or 0.0))
+
+
+async def _replica_lag_monitor(engine: AsyncEngine) -> None:
+    """周期探测副本复制延迟；失败时置为未知，读自动回退主库。"""
+    global _replica_lag, _replica_lag_checked_at
+    from utils.logging import get_logger
+
+    log = get_logger(__name__)
+    while True:
+        try:
+            _replica_lag = await _probe_replica_lag(engine)
+            _replica_lag_checked_at = time.monotonic()
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            if _replica_lag is not None:
+                log.warning("Read replica lag probe failed; reads fall back to primary: %s", exc)
+            _replica_lag = None
+        await asyncio.sleep(float(settings.database_replica_lag_check_interval_seconds))
+
+
+def _init_replica_engine() -> None:
+    global _replica_engine, _replica_lag_task
+
+    if not settings.database_replica_url:
+        return
+    _replica_engine = create_async_engine(
+        settings.database_replica_url,
+        echo=settings.database_echo,
+        pool_size=settings.database_replica_pool_size,
+        max_overflow=settings.database_replica_max_overflow,
+        poolclass=_timed_pool_class("replica"),
+        pool_pre_ping=True,
+        pool_recycle=300,
+        connect_args={"command_timeout": 30},
+    )
+    _register_dirty_connection_recycle(_replica_engine)
+    _register_slow_query_logging(_replica_engine)
+    _register_statement_counter(_replica_engine, "replica")
+    _replica_lag_task = asyncio.create_task(
+        _replica_lag_monitor(_replica_engine), name="db_replica_lag_monitor"
+    )
+
+
+async def _close_replica_engine() -> None:
+    global _replica_engine, _replica_lag_task, _replica_lag
+
+    if _replica_lag_task is not None:
+        task, _replica_lag_task = _replica_lag_task, None
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    if _replica_engine is not None:
+        engine, _replica_engine = _replica_engine, None
+        _replica_lag = None
+        await engine.dispose()
+
+
 async def init_db() -> None:
     """初始化数据库连接"""
     global _engine, _session_factory, _background_engine, _background_session_factory
@@ -260,6 +483,7 @@ async def init_db() -> None:
         echo=settings.database_echo,
         pool_size=settings.database_pool_size,
         max_overflow=settings.database_max_overflow,
+        poolclass=_timed_pool_class("main"),
         pool_pre_ping=True,
         # 周期性回收长时间空闲的连接，进一步降低脏连接概率。
         pool_recycle=300,
@@ -267,10 +491,13 @@ async def init_db() -> None:
     )
     _register_dirty_connection_recycle(_engine)
     _register_slow_query_logging(_engine)
+    _register_statement_counter(_engine, "main")
 
+    _init_replica_engine()
     _session_factory = async_sessionmaker(
         bind=_engine,
         class_=AsyncSession,
+        sync_session_class=_ReplicaRoutingSession,
         expire_on_commit=False,
         autocommit=False,
         autoflush=False,
@@ -282,11 +509,13 @@ async def init_db() -> None:
         echo=False,
         pool_size=settings.database_background_pool_size,
         max_overflow=settings.database_background_max_overflow,
+        poolclass=_timed_pool_class("background"),
         pool_pre_ping=True,
         pool_recycle=300,
         connect_args={"command_timeout": 30},
     )
     _register_dirty_connection_recycle(_background_engine)
+    _register_statement_counter(_background_engine, "background")
     # 后台池不记录慢 SQL（避免日志洪水）
     _background_session_factory = async_sessionmaker(
         bind=_background_engine,
@@ -297,10 +526,49 @@ async def init_db() -> None:
     )
 
 
+async def get_checkpoint_pool() -> Any:
+    """获取 LangGraph checkpointer 共享的 psycopg ``AsyncConnectionPool``（首次调用时打开）。
+
+    连接参数与 ``AsyncPostgresSaver`` 要求一致：autocommit、禁用服务端 prepare、dict 行。
+    """
+    global _checkpoint_pool
+
+    if _checkpoint_pool is None:
+        from psycopg.rows import dict_row
+        from psycopg_pool import AsyncConnectionPool
+
+        pool = AsyncConnectionPool(
+            settings.database_url.replace("+asyncpg", ""),
+            min_size=settings.database_checkpoint_pool_min_size,
+            max_size=settings.database_checkpoint_pool_max_size,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            name="checkpoint",
+            timeout=30.0,
+            max_idle=300.0,
+            check=AsyncConnectionPool.check_connection,
+            open=False,
+        )
+        await pool.open()
+        _checkpoint_pool = pool
+    return _checkpoint_pool
+
+
+async def close_checkpoint_pool() -> None:
+    """关闭 checkpointer 连接池（应在 checkpointer 排空写回之后调用）。"""
+    global _checkpoint_pool
+
+    if _checkpoint_pool is not None:
+        pool, _checkpoint_pool = _checkpoint_pool, None
+        await pool.close()
+
+
 async def close_db() -> None:
     """关闭数据库连接"""
     global _engine, _session_factory, _background_engine, _background_session_factory
 
+    await close_checkpoint_pool()
+    await _close_replica_engine()
+
     if _background_engine:
         await _background_engine.dispose()
         _background_engine = None
@@ -51,6 +51,10 @@ def register_all_orm_models() -> None:
     from domains.gateway.infrastructure.models.metrics_hourly import (  # noqa: F401
         GatewayMetricsHourly,
     )
+    from domains.gateway.infrastructure.models.metrics_rollup_tiers import (  # noqa: F401
+        GatewayMetricsDaily,
+        GatewayMetricsMonthly,
+    )
     from domains.gateway.infrastructure.models.pricing_downstream import (  # noqa: F401
         DownstreamModelPricing,
     )
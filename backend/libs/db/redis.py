@@ -4,12 +4,33 @@ Redis Connection Management
 
 import contextlib
 import json
+import time
 from typing import Any
 from urllib.parse import quote, urlsplit, urlunsplit
 
 import redis.asyncio as redis
 
 from bootstrap.config import settings
+from libs.observability.metrics import get_metrics_collector
+
+_metrics = get_metrics_collector()
+_metrics.describe("redis_command_duration_ms", "Redis command latency in milliseconds")
+
+
+class _InstrumentedRedis(redis.Redis):
+    """按命令名记录往返耗时（``redis_command_duration_ms{command}``）。"""
+
+    async def execute_command(self, *args: Any, **options: Any) -> Any:
+        started = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            command = str(args[0]).upper() if args else "UNKNOWN"
+            _metrics.record_timer(
+                "redis_command_duration_ms",
+                (time.perf_counter() - started) * 1000,
+                tags={"command": command},
+            )
 
 
 def build_authenticated_redis_url(base_url: str) -> str:
@@ -33,6 +54,7 @@ def build_authenticated_redis_url(base_url: str) -> str:
         netloc += f":{parts.port}"
     return urlunsplit((parts.scheme, netloc, parts.path, parts.query, parts.fragment))
 
+
 # 全局 Redis 客户端（decode_responses=True 时 value 为 str）
 # 注：redis.asyncio.client.Redis 在部分版本不支持泛型，使用 Any
 _redis_client: Any | None = None
@@ -55,7 +77,7 @@ async def init_redis() -> None:
     """初始化 Redis 连接"""
     global _redis_client
 
-    _redis_client = redis.from_url(
+    _redis_client = _InstrumentedRedis.from_url(
         settings.redis_url,
         **_redis_connect_kwargs(),
     )
@@ -106,7 +128,7 @@ async def get_redis_client() -> Any:
     if _redis_client is None:
         import asyncio
 
-        _redis_client = redis.from_url(
+        _redis_client = _InstrumentedRedis.from_url(
             settings.redis_url,
             **_redis_connect_kwargs(),
         )
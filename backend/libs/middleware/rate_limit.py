@@ -1,87 +1,349 @@
 """
 限流中间件
 
-实现请求速率限制
+纯 ASGI 实现（与 SSE/StreamingResponse 兼容），按 user/IP 做分钟 + 小时双窗口限流：
+
+- **算法**：GCRA（通用信元速率算法），每个 key 每个窗口只存一个 TAT（理论到达时间），
+  内存 O(1)，无需按请求保存时间戳列表；
+- **跨 worker**：计数存 Redis，Lua 脚本原子地同时校验并推进两个窗口，使用 Redis 服务器
+  时钟避免 worker 间时钟漂移；
+- **本地预过滤**：每个 worker 维护同参数的本地 GCRA——单个 worker 已超限时必然全局超限，
+  直接 429 不打 Redis；放行时一次从 Redis 预取一小批配额（lease），批内请求本地放行，
+  把 Redis 调用降为每 ``lease_size`` 个请求一次；
+- **fail-open**：Redis 不可用时仅依赖本地限流放行，并在冷却期内跳过 Redis，避免每请求超时；
+- **响应头**：``RateLimit-Limit`` / ``RateLimit-Remaining`` / ``RateLimit-Reset`` /
+  ``RateLimit-Policy``，429 时附 ``Retry-After``。
 """
 
-from collections import defaultdict
-import time
-from typing import Any
+from __future__ import annotations
 
-from fastapi import Request, status
-from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import json
+import math
+import time
+from typing import TYPE_CHECKING, Any
 
 from utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
 logger = get_logger(__name__)
 
+RedisClientFactory = Callable[[], Awaitable[Any]]
+
+# KEYS: 各窗口 key；ARGV[1]=申请配额数，其后每窗口 (period_ms, limit)。
+# 返回 {granted, 每窗口 remaining, reset_ms, retry_ms}；granted 可能小于申请数（部分批）。
+_GCRA_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local cost = tonumber(ARGV[1])
+local granted = cost
+local tats = {}
+for i, key in ipairs(KEYS) do
+  local period = tonumber(ARGV[2 * i])
+  local limit = tonumber(ARGV[2 * i + 1])
+  local emission = period / limit
+  local tat = tonumber(redis.call('GET', key) or now)
+  if tat < now then tat = now end
+  tats[i] = tat
+  local available = math.floor((now - (tat - period)) / emission + 1e-9)
+  if available < granted then granted = available end
+end
+if granted < 0 then granted = 0 end
+local out = {granted}
+for i, key in ipairs(KEYS) do
+  local period = tonumber(ARGV[2 * i])
+  local limit = tonumber(ARGV[2 * i + 1])
+  local emission = period / limit
+  local tat = tats[i]
+  if granted > 0 then
+    tat = tat + granted * emission
+    redis.call('SET', key, tostring(tat), 'PX', math.max(1, math.ceil(tat - now)))
+  end
+  local remaining = math.floor((now - (tat - period)) / emission + 1e-9)
+  if remaining < 0 then remaining = 0 end
+  local retry = math.ceil(tat - period + emission - now)
+  if retry < 0 then retry = 0 end
+  table.insert(out, remaining)
+  table.insert(out, math.ceil(tat - now))
+  table.insert(out, retry)
+end
+return out
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitWindow:
+    """单个限流窗口：``period_seconds`` 内最多 ``limit`` 次。"""
+
+    limit: int
+    period_seconds: int
+
+    @property
+    def emission_seconds(self) -> float:
+        return self.period_seconds / self.limit
+
+
+@dataclass(frozen=True, slots=True)
+class WindowState:
+    """某窗口在本次判定后的状态（秒）。"""
+
+    window: RateLimitWindow
+    remaining: int
+    reset_seconds: float
+    retry_after_seconds: float
+
+
+@dataclass(frozen=True, slots=True)
+class RateLimitDecision:
+    allowed: bool
+    windows: tuple[WindowState, ...]
+
+    def binding(self) -> WindowState:
+        """决定响应头的窗口：剩余最少者（被拒时取需等待最久者）。"""
+        if not self.allowed:
+            return max(self.windows, key=lambda w: w.retry_after_seconds)
+        return min(self.windows, key=lambda w: (w.remaining, -w.reset_seconds))
+
+
+class LocalGcraLimiter:
+    """进程内 GCRA：每 key 每窗口一个 TAT，按 LRU 限制 key 总数。"""
+
+    def __init__(self, windows: tuple[RateLimitWindow, ...], *, max_keys: int = 100_000) -> None:
+        self._windows = windows
+        self._max_keys = max_keys
+        self._tats: OrderedDict[str, list[float]] = OrderedDict()
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """限流中间件"""
+    def acquire(self, key: str, *, now: float | None = None) -> RateLimitDecision:
+        now = time.monotonic() if now is None else now
+        tats = self._tats.get(key)
+        if tats is None:
+            tats = [now] * len(self._windows)
+        else:
+            self._tats.move_to_end(key)
+        tats = [max(tat, now) for tat in tats]
+        allowed = all(
+            now >= tat + w.emission_seconds - w.period_seconds
+            for tat, w in zip(tats, self._windows, strict=True)
+        )
+        if allowed:
+            tats = [tat + w.emission_seconds for tat, w in zip(tats, self._windows, strict=True)]
+            self._tats[key] = tats
+            self._tats.move_to_end(key)
+            while len(self._tats) > self._max_keys:
+                self._tats.popitem(last=False)
+        return RateLimitDecision(
+            allowed=allowed,
+            windows=tuple(
+                WindowState(
+                    window=w,
+                    remaining=max(
+                        0, math.floor((now - (tat - w.period_seconds)) / w.emission_seconds)
+                    ),
+                    reset_seconds=max(0.0, tat - now),
+                    retry_after_seconds=max(0.0, tat - w.period_seconds + w.emission_seconds - now),
+                )
+                for tat, w in zip(tats, self._windows, strict=True)
+            ),
+        )
+
+
+@dataclass(slots=True)
+class _Lease:
+    """从 Redis 预取的本地配额批次。"""
+
+    tokens: int
+    expires_at: float
+    windows: tuple[WindowState, ...]
+    used: int = 0
+
+
+class RateLimitMiddleware:
+    """分布式 GCRA 限流（纯 ASGI）。"""
 
     def __init__(
         self,
-        app: Any,
+        app: ASGIApp,
         requests_per_minute: int = 60,
         requests_per_hour: int = 1000,
+        *,
+        key_prefix: str = "ratelimit",
+        lease_size: int | None = None,
+        lease_ttl_seconds: float = 1.0,
+        redis_retry_cooldown_seconds: float = 5.0,
+        redis_client_factory: RedisClientFactory | None = None,
+        exempt_paths: tuple[str, ...] = (),
+        max_local_keys: int = 100_000,
     ) -> None:
-        super().__init__(app)
+        self.app = app
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
-        self._minute_requests: dict[str, list[float]] = defaultdict(list)
-        self._hour_requests: dict[str, list[float]] = defaultdict(list)
-
-    async def dispatch(self, request: Request, call_next: Any) -> Any:
-        """处理请求"""
-        # 获取客户端标识
-        client_id = request.client.host if request.client else "unknown"
-        user_id = getattr(request.state, "user_id", None)
-        identifier = user_id or client_id
-
-        current_time = time.time()
-
-        # 清理过期记录
-        self._cleanup_old_requests(identifier, current_time)
-
-        # 检查分钟限制
-        minute_requests = self._minute_requests[identifier]
-        if len(minute_requests) >= self.requests_per_minute:
-            logger.warning("Rate limit exceeded (per minute) for %s", identifier)
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
-                    "detail": "Rate limit exceeded",
-                    "retry_after": 60,
-                },
-                headers={"Retry-After": "60"},
-            )
+        self._windows = (
+            RateLimitWindow(limit=requests_per_minute, period_seconds=60),
+            RateLimitWindow(limit=requests_per_hour, period_seconds=3600),
+        )
+        self._key_prefix = key_prefix
+        # 默认每批取分钟额度的 1/20：多 worker 间最多"预占"少量配额，换取 Redis 调用数 ÷N
+        self._lease_size = max(1, lease_size or requests_per_minute // 20)
+        self._lease_ttl_seconds = lease_ttl_seconds
+        self._redis_retry_cooldown_seconds = redis_retry_cooldown_seconds
+        self._redis_client_factory = redis_client_factory
+        self._exempt_paths = exempt_paths
+        self._local = LocalGcraLimiter(self._windows, max_keys=max_local_keys)
+        self._leases: OrderedDict[str, _Lease] = OrderedDict()
+        self._max_local_keys = max_local_keys
+        self._redis_down_until = 0.0
+        self._script: Any | None = None
+        self._script_client: Any | None = None
+        self._policy_header = ", ".join(f"{w.limit};w={w.period_seconds}" for w in self._windows)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("path", "") in self._exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        identifier = self._identifier(scope)
+        decision = await self.check(identifier)
+        headers = self._headers(decision)
+        if not decision.allowed:
+            logger.warning("Rate limit exceeded for %s", identifier)
+            await self._reject(send, headers)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                raw = list(message.get("headers", []))
+                raw.extend(
+                    (k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()
+                )
+                message = {**message, "headers": raw}
+            await send(message)
 
-        # 检查小时限制
-        hour_requests = self._hour_requests[identifier]
-        if len(hour_requests) >= self.requests_per_hour:
-            logger.warning("Rate limit exceeded (per hour) for %s", identifier)
-            return JSONResponse(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                content={
-                    "detail": "Rate limit exceeded",
-                    "retry_after": 3600,
-                },
-                headers={"Retry-After": "3600"},
+        await self.app(scope, receive, send_with_headers)
+
+    @staticmethod
+    def _identifier(scope: Scope) -> str:
+        state = scope.get("state") or {}
+        user_id = state.get("user_id") if isinstance(state, dict) else None
+        if user_id:
+            return f"user:{user_id}"
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def check(self, identifier: str) -> RateLimitDecision:
+        """判定一次请求：本地预过滤 → 本地 lease → Redis 预取。"""
+        local = self._local.acquire(identifier)
+        if not local.allowed:
+            return local
+
+        now = time.monotonic()
+        lease = self._leases.get(identifier)
+        if lease is not None and lease.tokens > 0 and now < lease.expires_at:
+            lease.tokens -= 1
+            lease.used += 1
+            return self._lease_decision(lease)
+
+        if now < self._redis_down_until:
+            return local
+        try:
+            granted, windows = await self._acquire_remote(identifier, self._lease_size)
+        except Exception as exc:
+            self._redis_down_until = now + self._redis_retry_cooldown_seconds
+            logger.warning("Rate limit Redis unavailable, failing open: %s", exc)
+            return local
+
+        if granted <= 0:
+            self._leases.pop(identifier, None)
+            return RateLimitDecision(allowed=False, windows=windows)
+        lease = _Lease(
+            tokens=granted - 1,
+            expires_at=now + self._lease_ttl_seconds,
+            windows=windows,
+        )
+        self._leases[identifier] = lease
+        self._leases.move_to_end(identifier)
+        while len(self._leases) > self._max_local_keys:
+            self._leases.popitem(last=False)
+        return self._lease_decision(lease)
+
+    @staticmethod
+    def _lease_decision(lease: _Lease) -> RateLimitDecision:
+        # Redis 返回的 remaining 已扣除整批，批内未用部分仍属于本请求方
+        return RateLimitDecision(
+            allowed=True,
+            windows=tuple(
+                WindowState(
+                    window=w.window,
+                    remaining=w.remaining + lease.tokens,
+                    reset_seconds=w.reset_seconds,
+                    retry_after_seconds=0.0,
+                )
+                for w in lease.windows
+            ),
+        )
+
+    async def _acquire_remote(
+        self, identifier: str, cost: int
+    ) -> tuple[int, tuple[WindowState, ...]]:
+        client = await self._get_redis_client()
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(_GCRA_LUA)
+            self._script_client = client
+        keys = [f"{self._key_prefix}:{identifier}:{w.period_seconds}" for w in self._windows]
+        args: list[int] = [cost]
+        for w in self._windows:
+            args.extend((w.period_seconds * 1000, w.limit))
+        raw = await self._script(keys=keys, args=args)
+        values = [int(v) for v in raw]
+        windows = tuple(
+            WindowState(
+                window=w,
+                remaining=values[1 + 3 * i],
+                reset_seconds=values[2 + 3 * i] / 1000,
+                retry_after_seconds=values[3 + 3 * i] / 1000,
             )
+            for i, w in enumerate(self._windows)
+        )
+        return values[0], windows
+
+    async def _get_redis_client(self) -> Any:
+        if self._redis_client_factory is not None:
+            return await self._redis_client_factory()
+        from libs.db.redis import get_redis_client
+
+        return await get_redis_client()
 
-        # 记录请求
-        minute_requests.append(current_time)
-        hour_requests.append(current_time)
+    def _headers(self, decision: RateLimitDecision) -> dict[str, str]:
+        state = decision.binding()
+        headers = {
+            "RateLimit-Limit": str(state.window.limit),
+            "RateLimit-Remaining": str(max(0, state.remaining)),
+            "RateLimit-Reset": str(math.ceil(state.reset_seconds)),
+            "RateLimit-Policy": self._policy_header,
+        }
+        if not decision.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(state.retry_after_seconds)))
+        return headers
 
-        return await call_next(request)
+    @staticmethod
+    async def _reject(send: Send, headers: dict[str, str]) -> None:
+        retry_after = int(headers["Retry-After"])
+        body = json.dumps({"detail": "Rate limit exceeded", "retry_after": retry_after}).encode()
+        raw_headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *((k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers.items()),
+        ]
+        await send({"type": "http.response.start", "status": 429, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": body})
 
-    def _cleanup_old_requests(self, identifier: str, current_time: float) -> None:
-        """清理过期请求记录"""
-        # 清理1分钟前的记录
-        minute_requests = self._minute_requests[identifier]
-        self._minute_requests[identifier] = [t for t in minute_requests if current_time - t < 60]
 
-        # 清理1小时前的记录
-        hour_requests = self._hour_requests[identifier]
-        self._hour_requests[identifier] = [t for t in hour_requests if current_time - t < 3600]
+__all__ = [
+    "LocalGcraLimiter",
+    "RateLimitDecision",
+    "RateLimitMiddleware",
+    "RateLimitWindow",
+]
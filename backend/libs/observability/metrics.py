@@ -1,33 +1,156 @@
 """
 指标收集
 
-收集系统指标和业务指标
+收集系统指标和业务指标，支持标签（label）与固定桶直方图：
+
+- 计数器 / 仪表 / 直方图均按 ``(指标名, 标签集)`` 维护序列；
+- 直方图只保存各桶累计计数、总和与样本数，内存与样本量无关（不再保存原始样本列表）；
+- 分位数按桶内线性插值估算（与 Prometheus ``histogram_quantile`` 一致）；
+- ``snapshot`` / ``merge_snapshots`` / ``render_prometheus`` 支持多 worker 聚合后
+  以 Prometheus text exposition 格式导出（跨进程存储见 ``metrics_store``）。
 """
 
-from collections import defaultdict
+from __future__ import annotations
+
+from bisect import bisect_left
+import math
+import threading
 import time
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Mapping
+
 logger = get_logger(__name__)
 
+# 毫秒级延迟的默认桶（覆盖 1ms ~ 2min），适用于 HTTP / DB / Redis / 上游耗时
+DEFAULT_BUCKETS_MS: tuple[float, ...] = (
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    25.0,
+    50.0,
+    100.0,
+    250.0,
+    500.0,
+    1000.0,
+    2500.0,
+    5000.0,
+    10000.0,
+    30000.0,
+    60000.0,
+    120000.0,
+)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(tags: Mapping[str, str] | None) -> LabelKey:
+    if not tags:
+        return ()
+    return tuple(sorted((str(k), str(v)) for k, v in tags.items()))
+
+
+class _Histogram:
+    """固定桶直方图：``counts[i]`` 为落入 ``(buckets[i-1], buckets[i]]`` 的样本数，末位为 +Inf。"""
+
+    __slots__ = ("buckets", "count", "counts", "max", "min", "sum")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if cumulative + bucket_count >= rank and bucket_count > 0:
+                lower = self.buckets[idx - 1] if idx > 0 else min(self.min, self.buckets[0])
+                upper = self.buckets[idx] if idx < len(self.buckets) else self.max
+                fraction = (rank - cumulative) / bucket_count
+                return min(max(lower + (upper - lower) * fraction, self.min), self.max)
+            cumulative += bucket_count
+        return self.max
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": self.sum,
+            "count": self.count,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> _Histogram:
+        hist = cls(tuple(float(b) for b in data["buckets"]))
+        hist.counts = [int(c) for c in data["counts"]]
+        hist.sum = float(data["sum"])
+        hist.count = int(data["count"])
+        if data.get("min") is not None:
+            hist.min = float(data["min"])
+        if data.get("max") is not None:
+            hist.max = float(data["max"])
+        return hist
+
+    def merge(self, other: _Histogram) -> None:
+        if other.buckets != self.buckets:
+            raise ValueError("cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts, strict=True)]
+        self.sum += other.sum
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
 
 class MetricsCollector:
     """
     指标收集器
 
-    收集和管理系统指标
+    收集和管理系统指标；线程安全（DB 连接池事件可能在 greenlet/线程上下文中回调）。
     """
 
-    def __init__(self) -> None:
-        self._counters: dict[str, int] = defaultdict(int)
-        self._gauges: dict[str, float] = {}
-        self._histograms: dict[str, list[float]] = defaultdict(list)
-        self._timers: dict[str, list[float]] = defaultdict(list)
+    def __init__(self, *, default_buckets: tuple[float, ...] = DEFAULT_BUCKETS_MS) -> None:
+        self._lock = threading.Lock()
+        self._default_buckets = default_buckets
+        self._counters: dict[str, dict[LabelKey, float]] = {}
+        self._gauges: dict[str, dict[LabelKey, float]] = {}
+        self._histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+        self._bucket_overrides: dict[str, tuple[float, ...]] = {}
+        self._help: dict[str, str] = {}
+        self._collect_hooks: list[Callable[[MetricsCollector], None]] = []
+
+    def describe(
+        self, metric_name: str, help_text: str, *, buckets: Iterable[float] | None = None
+    ) -> None:
+        """登记指标说明（导出为 ``# HELP``），直方图可指定自定义桶。"""
+        self._help[metric_name] = help_text
+        if buckets is not None:
+            self._bucket_overrides[metric_name] = tuple(sorted(float(b) for b in buckets))
+
+    def add_collect_hook(self, hook: Callable[[MetricsCollector], None]) -> None:
+        """登记导出前回调：用于按需采样的仪表（连接池占用、队列深度等）。"""
+        self._collect_hooks.append(hook)
 
     def increment(
-        self, metric_name: str, value: int = 1, tags: dict[str, str] | None = None
+        self, metric_name: str, value: float = 1, tags: dict[str, str] | None = None
     ) -> None:
         """
         增加计数器
@@ -35,9 +158,12 @@ class MetricsCollector:
         Args:
             metric_name: 指标名称
             value: 增加值
-            tags: 标签（暂未使用）
+            tags: 标签
         """
-        self._counters[metric_name] += value
+        key = _label_key(tags)
+        with self._lock:
+            series = self._counters.setdefault(metric_name, {})
+            series[key] = series.get(key, 0) + value
 
     def set_gauge(self, metric_name: str, value: float, tags: dict[str, str] | None = None) -> None:
         """
@@ -46,9 +172,11 @@ class MetricsCollector:
         Args:
             metric_name: 指标名称
             value: 值
-            tags: 标签（暂未使用）
+            tags: 标签
         """
-        self._gauges[metric_name] = value
+        key = _label_key(tags)
+        with self._lock:
+            self._gauges.setdefault(metric_name, {})[key] = value
 
     def record_histogram(
         self, metric_name: str, value: float, tags: dict[str, str] | None = None
@@ -59,71 +187,226 @@ class MetricsCollector:
         Args:
             metric_name: 指标名称
             value: 值
-            tags: 标签（暂未使用）
+            tags: 标签
         """
-        self._histograms[metric_name].append(value)
+        key = _label_key(tags)
+        with self._lock:
+            series = self._histograms.setdefault(metric_name, {})
+            hist = series.get(key)
+            if hist is None:
+                buckets = self._bucket_overrides.get(metric_name, self._default_buckets)
+                hist = series[key] = _Histogram(buckets)
+            hist.observe(value)
 
     def record_timer(
         self, metric_name: str, duration_ms: float, tags: dict[str, str] | None = None
     ) -> None:
         """
-        记录计时器值
+        记录计时器值（毫秒直方图）
 
         Args:
             metric_name: 指标名称
             duration_ms: 持续时间（毫秒）
-            tags: 标签（暂未使用）
+            tags: 标签
         """
-        self._timers[metric_name].append(duration_ms)
+        self.record_histogram(metric_name, duration_ms, tags)
 
-    def get_counter(self, metric_name: str) -> int:
-        """获取计数器值"""
-        return self._counters.get(metric_name, 0)
+    def get_counter(self, metric_name: str, tags: dict[str, str] | None = None) -> float:
+        """获取计数器值；``tags`` 为 None 时返回所有标签序列之和"""
+        with self._lock:
+            series = self._counters.get(metric_name, {})
+            if tags is None:
+                return sum(series.values())
+            return series.get(_label_key(tags), 0)
 
-    def get_gauge(self, metric_name: str) -> float | None:
+    def get_gauge(self, metric_name: str, tags: dict[str, str] | None = None) -> float | None:
         """获取仪表值"""
-        return self._gauges.get(metric_name)
+        with self._lock:
+            return self._gauges.get(metric_name, {}).get(_label_key(tags))
 
-    def get_histogram_stats(self, metric_name: str) -> dict[str, float] | None:
-        """获取直方图统计"""
-        values = self._histograms.get(metric_name)
-        if not values:
-            return None
-
-        return {
-            "count": len(values),
-            "min": min(values),
-            "max": max(values),
-            "avg": sum(values) / len(values),
-            "p50": sorted(values)[len(values) // 2],
-            "p95": sorted(values)[int(len(values) * 0.95)],
-            "p99": sorted(values)[int(len(values) * 0.99)],
-        }
+    def get_histogram_stats(
+        self, metric_name: str, tags: dict[str, str] | None = None
+    ) -> dict[str, float] | None:
+        """获取直方图统计（分位数为桶内插值估算）；``tags`` 为 None 时合并所有标签序列"""
+        with self._lock:
+            series = self._histograms.get(metric_name)
+            if not series:
+                return None
+            if tags is None:
+                hists = list(series.values())
+                merged = _Histogram(hists[0].buckets)
+                for hist in hists:
+                    merged.merge(hist)
+            else:
+                found = series.get(_label_key(tags))
+                if found is None:
+                    return None
+                merged = found
+            if merged.count == 0:
+                return None
+            return {
+                "count": merged.count,
+                "min": merged.min,
+                "max": merged.max,
+                "avg": merged.sum / merged.count,
+                "p50": merged.quantile(0.5),
+                "p95": merged.quantile(0.95),
+                "p99": merged.quantile(0.99),
+            }
 
-    def get_timer_stats(self, metric_name: str) -> dict[str, float] | None:
+    def get_timer_stats(
+        self, metric_name: str, tags: dict[str, str] | None = None
+    ) -> dict[str, float] | None:
         """获取计时器统计"""
-        return self.get_histogram_stats(metric_name)
+        return self.get_histogram_stats(metric_name, tags)
 
     def export_metrics(self) -> dict[str, Any]:
         """
-        导出所有指标（用于监控系统）
+        导出所有指标的汇总视图（各指标跨标签合并）
 
         Returns:
             dict: 指标数据
         """
+        with self._lock:
+            counter_names = list(self._counters)
+            gauges = {name: sum(series.values()) for name, series in self._gauges.items() if series}
+            histogram_names = list(self._histograms)
         return {
-            "counters": dict(self._counters),
-            "gauges": dict(self._gauges),
-            "histograms": {name: self.get_histogram_stats(name) for name in self._histograms},
-            "timers": {name: self.get_timer_stats(name) for name in self._timers},
+            "counters": {name: self.get_counter(name) for name in counter_names},
+            "gauges": gauges,
+            "histograms": {name: self.get_histogram_stats(name) for name in histogram_names},
         }
 
+    def snapshot(self) -> dict[str, Any]:
+        """可 JSON 序列化的完整快照（含标签与桶），供跨 worker 聚合。"""
+        for hook in list(self._collect_hooks):
+            try:
+                hook(self)
+            except Exception:
+                logger.debug("metrics collect hook failed", exc_info=True)
+        with self._lock:
+            return {
+                "counters": {
+                    name: [[list(map(list, key)), value] for key, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+                "gauges": {
+                    name: [[list(map(list, key)), value] for key, value in series.items()]
+                    for name, series in self._gauges.items()
+                },
+                "histograms": {
+                    name: [[list(map(list, key)), hist.to_dict()] for key, hist in series.items()]
+                    for name, series in self._histograms.items()
+                },
+                "help": dict(self._help),
+            }
+
+    def render_prometheus(self, snapshots: Iterable[Mapping[str, Any]] | None = None) -> str:
+        """Prometheus text exposition（0.0.4）；传入其他 worker 快照时与本进程合并后导出。"""
+        merged = merge_snapshots([self.snapshot(), *(snapshots or ())])
+        return render_prometheus_text(merged)
+
     def reset(self) -> None:
         """重置所有指标"""
-        self._counters.clear()
-        self._gauges.clear()
-        self._histograms.clear()
-        self._timers.clear()
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+def merge_snapshots(snapshots: Iterable[Mapping[str, Any]]) -> dict[str, Any]:
+    """合并多个 worker 快照：计数器与直方图相加，仪表按同标签求和（队列深度、在用连接等可加）。"""
+    counters: dict[str, dict[LabelKey, float]] = {}
+    gauges: dict[str, dict[LabelKey, float]] = {}
+    histograms: dict[str, dict[LabelKey, _Histogram]] = {}
+    help_texts: dict[str, str] = {}
+    for snap in snapshots:
+        help_texts.update(snap.get("help") or {})
+        for target, section in ((counters, "counters"), (gauges, "gauges")):
+            for name, series in (snap.get(section) or {}).items():
+                bucket = target.setdefault(name, {})
+                for raw_key, value in series:
+                    key = tuple((str(k), str(v)) for k, v in raw_key)
+                    bucket[key] = bucket.get(key, 0) + float(value)
+        for name, series in (snap.get("histograms") or {}).items():
+            bucket_h = histograms.setdefault(name, {})
+            for raw_key, data in series:
+                key = tuple((str(k), str(v)) for k, v in raw_key)
+                hist = _Histogram.from_dict(data)
+                existing = bucket_h.get(key)
+                if existing is None:
+                    bucket_h[key] = hist
+                else:
+                    try:
+                        existing.merge(hist)
+                    except ValueError:
+                        logger.warning("metrics merge skipped %s: bucket layout mismatch", name)
+    return {"counters": counters, "gauges": gauges, "histograms": histograms, "help": help_texts}
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key: LabelKey, extra: tuple[tuple[str, str], ...] = ()) -> str:
+    pairs = [*key, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label_value(v)}"' for k, v in pairs) + "}"
+
+
+def _format_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_prometheus_text(merged: Mapping[str, Any]) -> str:
+    """把 ``merge_snapshots`` 的结果渲染为 Prometheus text exposition。"""
+    help_texts: Mapping[str, str] = merged.get("help") or {}
+    lines: list[str] = []
+
+    def _header(name: str, metric_type: str) -> None:
+        if name in help_texts:
+            lines.append(f"# HELP {name} {help_texts[name]}")
+        lines.append(f"# TYPE {name} {metric_type}")
+
+    for name in sorted(merged["counters"]):
+        _header(name, "counter")
+        for key, value in sorted(merged["counters"][name].items()):
+            lines.append(f"{name}{_format_labels(key)} {_format_number(value)}")
+    for name in sorted(merged["gauges"]):
+        _header(name, "gauge")
+        for key, value in sorted(merged["gauges"][name].items()):
+            lines.append(f"{name}{_format_labels(key)} {_format_number(value)}")
+    for name in sorted(merged["histograms"]):
+        _header(name, "histogram")
+        for key, hist in sorted(merged["histograms"][name].items()):
+            cumulative = 0
+            for bound, bucket_count in zip((*hist.buckets, math.inf), hist.counts, strict=True):
+                cumulative += bucket_count
+                labels = _format_labels(key, (("le", _format_number(bound)),))
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(key)} {_format_number(hist.sum)}")
+            lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+    return "\n".join(lines) + "\n"
+
+
+_collector = MetricsCollector()
+
+
+def get_metrics_collector() -> MetricsCollector:
+    """进程级指标收集器单例。"""
+    return _collector
+
+
+def record_cache_lookup(cache: str, *, hit: bool) -> None:
+    """进程内缓存命中/未命中计数（``cache_requests_total{cache,result}``）。"""
+    _collector.increment(
+        "cache_requests_total", tags={"cache": cache, "result": "hit" if hit else "miss"}
+    )
 
 
 class Timer:
@@ -137,11 +420,22 @@ class Timer:
         self.tags = tags
         self.start_time: float | None = None
 
-    def __enter__(self) -> "Timer":
-        self.start_time = time.time()
+    def __enter__(self) -> Timer:
+        self.start_time = time.perf_counter()
         return self
 
     def __exit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         if self.start_time:
-            duration_ms = (time.time() - self.start_time) * 1000
+            duration_ms = (time.perf_counter() - self.start_time) * 1000
             self.collector.record_timer(self.metric_name, duration_ms, self.tags)
+
+
+__all__ = [
+    "DEFAULT_BUCKETS_MS",
+    "MetricsCollector",
+    "Timer",
+    "get_metrics_collector",
+    "merge_snapshots",
+    "record_cache_lookup",
+    "render_prometheus_text",
+]
@@ -0,0 +1,95 @@
+"""跨 worker 指标聚合（Redis）。
+
+每个 worker 进程周期性把 ``MetricsCollector.snapshot()`` 写入
+``obs:metrics:<host>:<pid>``（带 TTL，进程退出后自动过期）；``/metrics`` 抓取时
+读取同一主机下所有 worker 的快照合并导出。按主机隔离，避免 Prometheus 逐实例
+抓取时把其他实例的数据重复计入。
+
+Redis 不可用时退化为仅导出本进程指标。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import socket
+from typing import Any
+
+from libs.observability.metrics import MetricsCollector, get_metrics_collector
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+_KEY_PREFIX = "obs:metrics:"
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _host_pattern() -> str:
+    return f"{_KEY_PREFIX}{socket.gethostname()}:*"
+
+
+async def publish_snapshot(
+    redis_client: Any, collector: MetricsCollector, *, ttl_seconds: int
+) -> None:
+    """写入本进程快照。"""
+    payload = json.dumps(collector.snapshot(), separators=(",", ":"))
+    await redis_client.set(f"{_KEY_PREFIX}{worker_id()}", payload, ex=ttl_seconds)
+
+
+async def collect_peer_snapshots(redis_client: Any) -> list[dict[str, Any]]:
+    """读取同主机其他 worker 的快照（不含本进程，本进程以实时数据为准）。"""
+    own_key = f"{_KEY_PREFIX}{worker_id()}"
+    keys = [key async for key in redis_client.scan_iter(match=_host_pattern(), count=100)]
+    keys = [k for k in keys if (k.decode() if isinstance(k, bytes) else k) != own_key]
+    if not keys:
+        return []
+    raw_values = await redis_client.mget(keys)
+    snapshots: list[dict[str, Any]] = []
+    for raw in raw_values:
+        if not raw:
+            continue
+        try:
+            snapshots.append(json.loads(raw))
+        except (TypeError, ValueError):
+            logger.debug("skip malformed metrics snapshot")
+    return snapshots
+
+
+async def render_aggregated_metrics(collector: MetricsCollector | None = None) -> str:
+    """导出本主机所有 worker 合并后的 Prometheus 文本；Redis 异常时只导出本进程。"""
+    collector = collector or get_metrics_collector()
+    peers: list[dict[str, Any]] = []
+    try:
+        from libs.db.redis import get_redis_client
+
+        peers = await collect_peer_snapshots(await get_redis_client())
+    except Exception as exc:
+        logger.debug("metrics peer snapshots unavailable: %s", exc)
+    return collector.render_prometheus(peers)
+
+
+async def metrics_publish_loop(interval_seconds: float) -> None:
+    """周期性发布本进程快照（TTL 为 3 个周期）。"""
+    ttl = max(int(interval_seconds * 3), 5)
+    collector = get_metrics_collector()
+    while True:
+        try:
+            from libs.db.redis import get_redis_client
+
+            await publish_snapshot(await get_redis_client(), collector, ttl_seconds=ttl)
+        except Exception as exc:
+            logger.debug("metrics snapshot publish failed: %s", exc)
+        await asyncio.sleep(interval_seconds)
+
+
+__all__ = [
+    "collect_peer_snapshots",
+    "metrics_publish_loop",
+    "publish_snapshot",
+    "render_aggregated_metrics",
+    "worker_id",
+]
@@ -2,8 +2,8 @@
 Gateway 按资源速率限制
 
 提供基于 Redis 的固定窗口限流。注意：本项目 ``libs.middleware.rate_limit`` 中的
-``RateLimitMiddleware`` 是**内存型、按 user/IP 全局限流**，运行于 ASGI 中间件层，
-无法满足"按 ``user_id + model_id`` 维度、跨进程共享计数"的要求，因此探活接口使用
+``RateLimitMiddleware`` 是**按 user/IP 全局限流**（GCRA + 本地批量配额），运行于 ASGI
+中间件层，粒度无法满足"按 ``user_id + model_id`` 维度"的要求，因此探活接口使用
 本模块的 Redis 固定窗口实现。
 """
 
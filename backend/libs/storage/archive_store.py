@@ -0,0 +1,139 @@
+"""
+Archive Store - 按 key 读写的归档对象存储
+
+与图片存储（随机文件名 + 公开 URL）不同，归档需要调用方决定 key（分区 / 分片路径），
+并能回读校验与只读查询。本地实现先写临时文件再原子替换，避免半截文件被当作归档。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any, Protocol
+import uuid
+
+import aioboto3
+from botocore.exceptions import ClientError
+
+from utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+logger = get_logger(__name__)
+
+
+class ArchiveObjectStore(Protocol):
+    """归档对象存储端口：key 为 ``/`` 分隔的相对路径。"""
+
+    async def put_bytes(self, key: str, content: bytes, *, content_type: str | None = None) -> None:
+        """写入（覆盖）对象。"""
+        ...
+
+    async def get_bytes(self, key: str) -> bytes | None:
+        """读取对象；不存在时返回 ``None``。"""
+        ...
+
+    def describe(self, key: str) -> str:
+        """对象位置（日志 / manifest 展示用）。"""
+        ...
+
+
+class LocalArchiveStore:
+    """本地目录归档存储。"""
+
+    def __init__(self, root: Path) -> None:
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _path(self, key: str) -> Path:
+        path = (self._root / key).resolve()
+        if not path.is_relative_to(self._root.resolve()):
+            raise ValueError(f"归档 key 越界: {key!r}")
+        return path
+
+    def _write(self, path: Path, content: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with tmp.open("wb") as fh:
+                fh.write(content)
+                fh.flush()
+                os.fsync(fh.fileno())
+            tmp.replace(path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    async def put_bytes(self, key: str, content: bytes, *, content_type: str | None = None) -> None:
+        del content_type
+        path = self._path(key)
+        await asyncio.to_thread(self._write, path, content)
+        logger.info("Saved local archive object %s (%d bytes)", key, len(content))
+
+    async def get_bytes(self, key: str) -> bytes | None:
+        path = self._path(key)
+        if not path.is_file():
+            return None
+        return await asyncio.to_thread(path.read_bytes)
+
+    def describe(self, key: str) -> str:
+        return str(self._path(key))
+
+
+class S3ArchiveStore:
+    """S3 兼容对象存储（R2 / OSS / AWS）归档实现。"""
+
+    def __init__(
+        self,
+        *,
+        bucket: str,
+        region: str | None,
+        endpoint_url: str | None,
+        access_key: str | None,
+        secret_key: str | None,
+    ) -> None:
+        self._bucket = bucket
+        self._region = region or "auto"
+        self._endpoint_url = endpoint_url
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._session = aioboto3.Session()
+
+    def _client(self) -> Any:
+        return self._session.client(
+            "s3",
+            region_name=self._region,
+            endpoint_url=self._endpoint_url,
+            aws_access_key_id=self._access_key,
+            aws_secret_access_key=self._secret_key,
+        )
+
+    async def put_bytes(self, key: str, content: bytes, *, content_type: str | None = None) -> None:
+        put_kwargs: dict[str, str | bytes] = {"Bucket": self._bucket, "Key": key, "Body": content}
+        if content_type:
+            put_kwargs["ContentType"] = content_type
+        async with self._client() as client:
+            await client.put_object(**put_kwargs)
+        logger.info(
+            "Uploaded S3 archive object s3://%s/%s (%d bytes)", self._bucket, key, len(content)
+        )
+
+    async def get_bytes(self, key: str) -> bytes | None:
+        async with self._client() as client:
+            try:
+                response = await client.get_object(Bucket=self._bucket, Key=key)
+            except ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") in {"NoSuchKey", "404"}:
+                    return None
+                raise
+            async with response["Body"] as body:
+                return await body.read()
+
+    def describe(self, key: str) -> str:
+        return f"s3://{self._bucket}/{key}"
+
+
+__all__ = ["ArchiveObjectStore", "LocalArchiveStore", "S3ArchiveStore"]
@@ -0,0 +1,59 @@
+"""内容寻址与 base64 增量解码辅助。
+
+图片 / 视频对象以内容 SHA-256 命名：相同字节只存一份，重复上传可在写入前跳过。
+base64 载荷按 4 字符对齐分块解码，单次驻留内存的解码字节不超过一个分块。
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# 每次解码的 base64 字符数（4 的倍数），约解码为 3 MiB
+B64_CHUNK_CHARS = 4 * 1024 * 1024
+
+_WHITESPACE = re.compile(r"\s")
+
+
+def content_filename(digest: str, ext: str) -> str:
+    """内容寻址文件名：``<sha256>.<ext>``。"""
+    return f"{digest}.{ext.lstrip('.')}"
+
+
+def _compact_b64(data: str) -> str:
+    # b64decode 默认丢弃非字母表字符；分块前去掉空白，保证块边界与 4 字符对齐
+    if _WHITESPACE.search(data):
+        return "".join(data.split())
+    return data
+
+
+def iter_b64decode(data: str, chunk_chars: int = B64_CHUNK_CHARS) -> Iterator[bytes]:
+    """按块解码 base64，依次产出解码后的字节。"""
+    if chunk_chars <= 0 or chunk_chars % 4:
+        raise ValueError("chunk_chars must be a positive multiple of 4")
+    data = _compact_b64(data)
+    for offset in range(0, len(data), chunk_chars):
+        yield base64.b64decode(data[offset : offset + chunk_chars])
+
+
+def b64_sha256(data: str, chunk_chars: int = B64_CHUNK_CHARS) -> tuple[str, int]:
+    """增量解码计算 (SHA-256 hex, 解码后字节数)，不保留解码结果。"""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter_b64decode(data, chunk_chars):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+__all__ = [
+    "B64_CHUNK_CHARS",
+    "b64_sha256",
+    "content_filename",
+    "iter_b64decode",
+]
@@ -2,17 +2,24 @@
 Local Image Store - 本地图片存储
 
 实现 ImageStorePort，将图片保存到本地目录并返回可访问 URL。
+与 S3 实现相同按内容 SHA-256 命名：文件已存在则跳过写入；新文件先写临时文件再原子改名。
 """
 
 from __future__ import annotations
 
-import base64
-from pathlib import Path
+import asyncio
+import hashlib
+from typing import TYPE_CHECKING
 import uuid
 
 from libs.api.paths import listing_studio_images_serve_prefix
+from libs.storage.content_addressing import content_filename, iter_b64decode
 from utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from pathlib import Path
+
 logger = get_logger(__name__)
 
 
@@ -40,6 +47,26 @@ class LocalImageStore:
             return f"{self._public_base_url}{path}"
         return path
 
+    def _write_content_addressed(self, chunks: Iterable[bytes], ext: str) -> tuple[str, int, bool]:
+        """边写临时文件边算摘要，再改名为 ``<sha256>.<ext>``；返回 (文件名, 字节数, 是否新写入)。"""
+        digest = hashlib.sha256()
+        size = 0
+        tmp = self._storage_dir / f".{uuid.uuid4().hex}.tmp"
+        try:
+            with tmp.open("wb") as fh:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    size += len(chunk)
+                    fh.write(chunk)
+            filename = content_filename(digest.hexdigest(), ext)
+            target = self._storage_dir / filename
+            if target.is_file():
+                return filename, size, False
+            tmp.replace(target)
+            return filename, size, True
+        finally:
+            tmp.unlink(missing_ok=True)
+
     async def save_bytes(
         self,
         content: bytes,
@@ -47,16 +74,25 @@ class LocalImageStore:
         ext: str,
         content_type: str | None = None,
     ) -> str:
-        filename = f"{uuid.uuid4().hex}.{ext.lstrip('.')}"
-        filepath = self._storage_dir / filename
-        filepath.write_bytes(content)
-        logger.info("Saved local image %s (%d bytes)", filename, len(content))
+        filename = content_filename(hashlib.sha256(content).hexdigest(), ext)
+        if (self._storage_dir / filename).is_file():
+            logger.info("Local image already stored %s", filename)
+            return self._build_url(filename)
+        filename, size, _ = await asyncio.to_thread(self._write_content_addressed, [content], ext)
+        logger.info("Saved local image %s (%d bytes)", filename, size)
         return self._build_url(filename)
 
     async def persist_image_data(self, image_data: str, *, ext: str = "png") -> str:
         if image_data.startswith(("http://", "https://", "/")):
             return image_data
-        return await self.save_bytes(base64.b64decode(image_data), ext=ext)
+        filename, size, created = await asyncio.to_thread(
+            self._write_content_addressed, iter_b64decode(image_data), ext
+        )
+        if created:
+            logger.info("Saved local image %s (%d bytes)", filename, size)
+        else:
+            logger.info("Local image already stored %s", filename)
+        return self._build_url(filename)
 
     def get_local_path(self, filename: str) -> Path | None:
         path = (self._storage_dir / filename).resolve()
@@ -0,0 +1,96 @@
+"""S3 兼容对象存储客户端池。
+
+按（region, endpoint, access key, secret 摘要）维护长生命周期的 aioboto3 client，
+避免每次上传都重新建立 client 与 TLS 连接；client 内部连接池大小由 ``max_pool_connections`` 控制。
+检测到 event loop 切换时丢弃旧 client 并重建（pytest-asyncio 等场景）。
+由 bootstrap/main.py lifespan 在关闭时调用 ``close_s3_clients``。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import AsyncExitStack
+import hashlib
+from typing import Any
+
+import aioboto3
+from botocore.config import Config
+
+from utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# 单个 client 的 HTTP 连接池上限（botocore 默认 10）
+MAX_POOL_CONNECTIONS = 32
+
+_ClientKey = tuple[str, str | None, str | None, str]
+
+_session: aioboto3.Session | None = None
+# client key -> (client, 退出栈, loop_id)
+_clients: dict[_ClientKey, tuple[Any, AsyncExitStack, int]] = {}
+_client_lock = asyncio.Lock()
+
+
+def _client_key(
+    region: str, endpoint_url: str | None, access_key: str | None, secret_key: str | None
+) -> _ClientKey:
+    secret_digest = hashlib.sha256((secret_key or "").encode("utf-8")).hexdigest()
+    return (region, endpoint_url or None, access_key or None, secret_digest)
+
+
+async def _close_entry(key: _ClientKey, stack: AsyncExitStack) -> None:
+    try:
+        await stack.aclose()
+    except Exception:
+        logger.warning("Error closing S3 client endpoint=%s", key[1], exc_info=True)
+
+
+async def get_s3_client(
+    *,
+    region: str,
+    endpoint_url: str | None,
+    access_key: str | None,
+    secret_key: str | None,
+) -> Any:
+    """获取当前 event loop 内共享的 S3 client（同一凭据返回同一实例）。"""
+    global _session  # pylint: disable=global-statement
+    key = _client_key(region, endpoint_url, access_key, secret_key)
+    loop_id = id(asyncio.get_running_loop())
+    async with _client_lock:
+        entry = _clients.get(key)
+        if entry is not None and entry[2] == loop_id:
+            return entry[0]
+        if entry is not None:
+            _clients.pop(key, None)
+            await _close_entry(key, entry[1])
+
+        if _session is None:
+            _session = aioboto3.Session()
+        stack = AsyncExitStack()
+        client = await stack.enter_async_context(
+            _session.client(
+                "s3",
+                region_name=region,
+                endpoint_url=endpoint_url or None,
+                aws_access_key_id=access_key or None,
+                aws_secret_access_key=secret_key or None,
+                config=Config(max_pool_connections=MAX_POOL_CONNECTIONS),
+            )
+        )
+        _clients[key] = (client, stack, loop_id)
+        logger.debug("S3 client created: endpoint=%s loop_id=%s", endpoint_url, loop_id)
+        return client
+
+
+async def close_s3_clients() -> None:
+    """关闭全部池化 client；由 lifespan 关闭阶段调用。"""
+    async with _client_lock:
+        entries = list(_clients.items())
+        _clients.clear()
+    for key, (_client, stack, _loop_id) in entries:
+        await _close_entry(key, stack)
+    if entries:
+        logger.info("Closed %d pooled S3 client(s)", len(entries))
+
+
+__all__ = ["MAX_POOL_CONNECTIONS", "close_s3_clients", "get_s3_client"]
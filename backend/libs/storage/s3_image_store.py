@@ -1,18 +1,60 @@
-"""S3 兼容对象存储（R2 / OSS / AWS）图片实现。"""
+"""S3 兼容对象存储（R2 / OSS / AWS）图片实现。
+
+对象 key 按内容 SHA-256 寻址（``images/<sha256>.<ext>``）：写入前先查进程内已知对象索引，
+再 HEAD 检查，已存在则直接返回 URL（HEAD 失败时照常上传）。client 取自 ``s3_client_pool`` 的长生命周期池。
+大对象走分片上传；base64 载荷增量解码，单次上传驻留内存不超过一个分片。
+"""
 
 from __future__ import annotations
 
-import base64
-import uuid
+from collections import OrderedDict
+import hashlib
+from typing import TYPE_CHECKING, Any
 
-import aioboto3
+from botocore.exceptions import ClientError
 
+from libs.storage.content_addressing import b64_sha256, content_filename, iter_b64decode
+from libs.storage.s3_client_pool import get_s3_client
 from utils.logging import get_logger
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
 logger = get_logger(__name__)
 
 OBJECT_KEY_PREFIX = "images"
 
+# 超过该大小走分片上传；S3 要求除最后一片外每片 >= 5 MiB
+MULTIPART_THRESHOLD = 8 * 1024 * 1024
+MULTIPART_PART_SIZE = 8 * 1024 * 1024
+
+# 已确认存在的对象（endpoint, bucket, key），跳过重复 HEAD
+_KNOWN_OBJECTS_MAX = 10_000
+_known_objects: OrderedDict[tuple[str, str, str], None] = OrderedDict()
+
+
+def _remember(entry: tuple[str, str, str]) -> None:
+    _known_objects[entry] = None
+    _known_objects.move_to_end(entry)
+    while len(_known_objects) > _KNOWN_OBJECTS_MAX:
+        _known_objects.popitem(last=False)
+
+
+def clear_known_s3_objects_for_tests() -> None:
+    _known_objects.clear()
+
+
+def _rechunk(chunks: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """把任意大小的块重组为 ``size`` 字节的分片（最后一片可更小）。"""
+    buffer = bytearray()
+    for chunk in chunks:
+        buffer += chunk
+        while len(buffer) >= size:
+            yield bytes(buffer[:size])
+            del buffer[:size]
+    if buffer:
+        yield bytes(buffer)
+
 
 class S3ImageStore:
     """S3 兼容图片存储。"""
@@ -33,14 +75,83 @@ class S3ImageStore:
         self._access_key = access_key
         self._secret_key = secret_key
         self._public_base_url = public_base_url.rstrip("/")
-        self._session = aioboto3.Session()
 
-    def _object_key(self, ext: str) -> str:
-        return f"{OBJECT_KEY_PREFIX}/{uuid.uuid4().hex}.{ext.lstrip('.')}"
+    async def _client(self) -> Any:
+        return await get_s3_client(
+            region=self._region,
+            endpoint_url=self._endpoint_url,
+            access_key=self._access_key,
+            secret_key=self._secret_key,
+        )
+
+    def _object_key(self, digest: str, ext: str) -> str:
+        return f"{OBJECT_KEY_PREFIX}/{content_filename(digest, ext)}"
 
     def _public_url(self, key: str) -> str:
         return f"{self._public_base_url}/{key}"
 
+    async def _exists(self, client: Any, key: str) -> bool:
+        """本地索引命中或 HEAD 200 视为已存在。
+
+        其余 HEAD 结果一律按「未知」处理并继续 PUT：仅有写权限（无 ``s3:ListBucket``）的凭据
+        对不存在的 key 返回 403；key 按内容寻址，重复 PUT 幂等。
+        """
+        entry = (self._endpoint_url, self._bucket, key)
+        if entry in _known_objects:
+            _known_objects.move_to_end(entry)
+            return True
+        try:
+            await client.head_object(Bucket=self._bucket, Key=key)
+        except ClientError as exc:
+            code = exc.response.get("Error", {}).get("Code")
+            if code not in {"404", "NoSuchKey", "NotFound"}:
+                logger.debug("S3 HEAD %s failed (%s); uploading anyway", key, code)
+            return False
+        except Exception:
+            logger.debug("S3 HEAD %s failed; uploading anyway", key, exc_info=True)
+            return False
+        _remember(entry)
+        return True
+
+    async def _put(self, client: Any, key: str, content: bytes, content_type: str | None) -> None:
+        put_kwargs: dict[str, str | bytes] = {"Bucket": self._bucket, "Key": key, "Body": content}
+        if content_type:
+            put_kwargs["ContentType"] = content_type
+        await client.put_object(**put_kwargs)
+
+    async def _put_multipart(
+        self, client: Any, key: str, parts: Iterable[bytes], content_type: str | None
+    ) -> None:
+        create_kwargs: dict[str, str] = {"Bucket": self._bucket, "Key": key}
+        if content_type:
+            create_kwargs["ContentType"] = content_type
+        upload_id = (await client.create_multipart_upload(**create_kwargs))["UploadId"]
+        try:
+            completed: list[dict[str, Any]] = []
+            for number, body in enumerate(parts, start=1):
+                response = await client.upload_part(
+                    Bucket=self._bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=number,
+                    Body=body,
+                )
+                completed.append({"ETag": response["ETag"], "PartNumber": number})
+            await client.complete_multipart_upload(
+                Bucket=self._bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": completed},
+            )
+        except BaseException:
+            try:
+                await client.abort_multipart_upload(
+                    Bucket=self._bucket, Key=key, UploadId=upload_id
+                )
+            except Exception:
+                logger.warning("Failed to abort multipart upload %s", key, exc_info=True)
+            raise
+
     async def save_bytes(
         self,
         content: bytes,
@@ -48,65 +159,80 @@ class S3ImageStore:
         ext: str,
         content_type: str | None = None,
     ) -> str:
-        key = self._object_key(ext)
-
-        async with self._session.client(
-            "s3",
-            region_name=self._region,
-            endpoint_url=self._endpoint_url,
-            aws_access_key_id=self._access_key,
-            aws_secret_access_key=self._secret_key,
-        ) as client:
-            put_kwargs: dict[str, str | bytes] = {
-                "Bucket": self._bucket,
-                "Key": key,
-                "Body": content,
-            }
-            if content_type:
-                put_kwargs["ContentType"] = content_type
-            await client.put_object(**put_kwargs)
+        key = self._object_key(hashlib.sha256(content).hexdigest(), ext)
+        client = await self._client()
+        if await self._exists(client, key):
+            logger.info("S3 object already stored s3://%s/%s", self._bucket, key)
+            return self._public_url(key)
+
+        if len(content) > MULTIPART_THRESHOLD:
+            view = memoryview(content)
+            parts = (
+                bytes(view[i : i + MULTIPART_PART_SIZE])
+                for i in range(0, len(view), MULTIPART_PART_SIZE)
+            )
+            await self._put_multipart(client, key, parts, content_type)
+        else:
+            await self._put(client, key, content, content_type)
+        _remember((self._endpoint_url, self._bucket, key))
         logger.info("Uploaded S3 object s3://%s/%s (%d bytes)", self._bucket, key, len(content))
         return self._public_url(key)
 
     async def persist_image_data(self, image_data: str, *, ext: str = "png") -> str:
         if image_data.startswith(("http://", "https://", "/")):
             return image_data
-        return await self.save_bytes(base64.b64decode(image_data), ext=ext)
+
+        # 第一遍增量解码只算摘要；已存在则不再解码上传
+        digest, size = b64_sha256(image_data)
+        key = self._object_key(digest, ext)
+        client = await self._client()
+        if await self._exists(client, key):
+            logger.info("S3 object already stored s3://%s/%s", self._bucket, key)
+            return self._public_url(key)
+
+        if size > MULTIPART_THRESHOLD:
+            parts = _rechunk(iter_b64decode(image_data), MULTIPART_PART_SIZE)
+            await self._put_multipart(client, key, parts, None)
+        else:
+            await self._put(client, key, b"".join(iter_b64decode(image_data)), None)
+        _remember((self._endpoint_url, self._bucket, key))
+        logger.info("Uploaded S3 object s3://%s/%s (%d bytes)", self._bucket, key, size)
+        return self._public_url(key)
 
     def get_local_path(self, filename: str) -> None:
         return None
 
     async def test_connection(self, *, verify_public: bool = True) -> None:
         """验证 bucket 可访问；verify_public 时上传探针并 HEAD 公开 URL。"""
-        async with self._session.client(
-            "s3",
-            region_name=self._region,
-            endpoint_url=self._endpoint_url,
-            aws_access_key_id=self._access_key,
-            aws_secret_access_key=self._secret_key,
-        ) as client:
-            await client.head_bucket(Bucket=self._bucket)
-
-            if not verify_public:
-                return
-
-            probe_key = f"{OBJECT_KEY_PREFIX}/.connection_probe"
-            await client.put_object(
-                Bucket=self._bucket,
-                Key=probe_key,
-                Body=b"ok",
-                ContentType="text/plain",
-            )
-            try:
-                import httpx  # pylint: disable=import-outside-toplevel
-
-                probe_url = self._public_url(probe_key)
-                async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as http:
-                    response = await http.head(probe_url)
-                    if response.status_code >= 400:
-                        raise OSError(f"公开 URL 不可访问 ({response.status_code}): {probe_url}")
-            finally:
-                await client.delete_object(Bucket=self._bucket, Key=probe_key)
-
-
-__all__ = ["OBJECT_KEY_PREFIX", "S3ImageStore"]
+        client = await self._client()
+        await client.head_bucket(Bucket=self._bucket)
+
+        if not verify_public:
+            return
+
+        probe_key = f"{OBJECT_KEY_PREFIX}/.connection_probe"
+        await client.put_object(
+            Bucket=self._bucket,
+            Key=probe_key,
+            Body=b"ok",
+            ContentType="text/plain",
+        )
+        try:
+            import httpx  # pylint: disable=import-outside-toplevel
+
+            probe_url = self._public_url(probe_key)
+            async with httpx.AsyncClient(timeout=10.0, follow_redirects=True) as http:
+                response = await http.head(probe_url)
+                if response.status_code >= 400:
+                    raise OSError(f"公开 URL 不可访问 ({response.status_code}): {probe_url}")
+        finally:
+            await client.delete_object(Bucket=self._bucket, Key=probe_key)
+
+
+__all__ = [
+    "MULTIPART_PART_SIZE",
+    "MULTIPART_THRESHOLD",
+    "OBJECT_KEY_PREFIX",
+    "S3ImageStore",
+    "clear_known_s3_objects_for_tests",
+]
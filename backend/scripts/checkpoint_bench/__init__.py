@@ -0,0 +1 @@
+"""LangGraph 检查点存储基准（完整值 vs 增量 + zstd，写入字节与 aput / aget_tuple 延迟）。"""
@@ -0,0 +1,227 @@
+"""检查点存储基准：模拟 N 轮对话线程，对比每步完整存储与增量 + zstd 存储。
+
+每轮向 ``messages`` channel 追加一条用户消息与一条助手回复并 ``aput`` 一次，随后
+``aget_tuple`` 读最新检查点（LangGraph 每次 invoke 开头的读路径）；结束后另起一个
+冷缓存的 saver 实例读最新检查点（另一 worker 接手线程时的最坏情况，需沿基准链回源）。
+
+统计：序列化写入字节数（经 serde 计数，含检查点本体与 blob）、``aput`` / ``aget_tuple``
+延迟分位。默认后端为进程内 ``InMemorySaver``（只测序列化 + 增量开销）；``--database-url``
+指定 PG 时使用 ``AsyncPostgresSaver``（含真实往返，基准线程结束后删除）。
+
+用法（backend 目录）：
+  uv run python -m scripts.checkpoint_bench --turns 10,100,1000
+  uv run python -m scripts.checkpoint_bench --database-url postgresql://user:pw@localhost/db
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import AsyncIterator, Callable
+import contextlib
+from datetime import UTC, datetime
+import json
+from pathlib import Path
+import time
+from typing import Any
+import uuid
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.base import BaseCheckpointSaver, empty_checkpoint
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from domains.agent.infrastructure.engine.checkpoint_serde import ZstdCompressedSerializer
+from domains.agent.infrastructure.engine.delta_checkpoint_saver import DeltaCheckpointSaver
+from scripts.gateway_loadtest.report import summarize
+
+_BACKEND = Path(__file__).resolve().parents[2]
+_DEFAULT_OUTPUT = _BACKEND / "reports" / "checkpoint_bench" / "latest.json"
+
+
+class _CountingSerializer(SerializerProtocol):
+    """统计经 serde 写出的字节数（saver 写入存储的全部值都经过 ``dumps_typed``）。"""
+
+    def __init__(self, serde: SerializerProtocol) -> None:
+        self.serde = serde
+        self.bytes_written = 0
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        self.bytes_written += len(data)
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        return self.serde.loads_typed(data)
+
+
+_SaverFactory = Callable[[SerializerProtocol], contextlib.AbstractAsyncContextManager[Any]]
+
+
+def _memory_factory() -> _SaverFactory:
+    @contextlib.asynccontextmanager
+    async def _open(serde: SerializerProtocol) -> AsyncIterator[Any]:
+        yield InMemorySaver(serde=serde)
+
+    return _open
+
+
+def _postgres_factory(database_url: str) -> _SaverFactory:
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+    @contextlib.asynccontextmanager
+    async def _open(serde: SerializerProtocol) -> AsyncIterator[Any]:
+        async with AsyncPostgresSaver.from_conn_string(database_url, serde=serde) as saver:
+            await saver.setup()
+            yield saver
+
+    return _open
+
+
+def _message_text(turn: int, role: str, chars: int) -> str:
+    seed = f"[{role} turn {turn}] 这是一条用于检查点基准的对话内容。"
+    return (seed * (chars // len(seed) + 1))[:chars]
+
+
+async def _drive_thread(
+    saver: BaseCheckpointSaver,
+    *,
+    turns: int,
+    message_chars: int,
+) -> tuple[str, list[float], list[float]]:
+    thread_id = f"ckpt-bench-{uuid.uuid4().hex[:12]}"
+    config: dict[str, Any] = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+    messages: list[Any] = []
+    version: Any = None
+    put_ms: list[float] = []
+    get_ms: list[float] = []
+    for turn in range(turns):
+        messages = [
+            *messages,
+            HumanMessage(content=_message_text(turn, "user", message_chars), id=f"h{turn}"),
+            AIMessage(content=_message_text(turn, "assistant", message_chars), id=f"a{turn}"),
+        ]
+        version = saver.get_next_version(version, None)
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"messages": messages}
+        checkpoint["channel_versions"] = {"messages": version}
+        started = time.perf_counter()
+        config = await saver.aput(
+            config,
+            checkpoint,
+            {"source": "loop", "step": turn, "parents": {}},
+            {"messages": version},
+        )
+        put_ms.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        latest = await saver.aget_tuple({"configurable": {"thread_id": thread_id}})
+        get_ms.append((time.perf_counter() - started) * 1000)
+        assert latest is not None and len(latest.checkpoint["channel_values"]["messages"]) == len(
+            messages
+        )
+    return thread_id, put_ms, get_ms
+
+
+async def _bench_variant(
+    factory: _SaverFactory,
+    *,
+    delta: bool,
+    turns: int,
+    message_chars: int,
+    zstd_level: int,
+    snapshot_every: int,
+) -> dict[str, Any]:
+    base: SerializerProtocol = (
+        ZstdCompressedSerializer(level=zstd_level) if delta else JsonPlusSerializer()
+    )
+    serde = _CountingSerializer(base)
+    async with factory(serde) as inner:
+        saver: BaseCheckpointSaver = (
+            DeltaCheckpointSaver(inner, snapshot_every=snapshot_every) if delta else inner
+        )
+        thread_id, put_ms, get_ms = await _drive_thread(
+            saver, turns=turns, message_chars=message_chars
+        )
+        bytes_written = serde.bytes_written
+
+        # 冷读：新 saver 实例无进程内缓存
+        cold = DeltaCheckpointSaver(inner, snapshot_every=snapshot_every) if delta else inner
+        started = time.perf_counter()
+        await cold.aget_tuple({"configurable": {"thread_id": thread_id}})
+        cold_ms = (time.perf_counter() - started) * 1000
+
+        with contextlib.suppress(NotImplementedError):
+            await inner.adelete_thread(thread_id)
+    return {
+        "bytes_written": bytes_written,
+        "bytes_per_turn": round(bytes_written / turns, 1),
+        "aput_ms": summarize(put_ms),
+        "aget_tuple_ms": summarize(get_ms),
+        "cold_aget_tuple_ms": round(cold_ms, 2),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    factory = _postgres_factory(args.database_url) if args.database_url else _memory_factory()
+    results: list[dict[str, Any]] = []
+    for turns in args.turns:
+        row: dict[str, Any] = {"turns": turns}
+        for name, delta in (("full", False), ("delta_zstd", True)):
+            row[name] = await _bench_variant(
+                factory,
+                delta=delta,
+                turns=turns,
+                message_chars=args.message_chars,
+                zstd_level=args.zstd_level,
+                snapshot_every=args.snapshot_every,
+            )
+        full_bytes = row["full"]["bytes_written"] or 1
+        row["bytes_ratio"] = round(row["delta_zstd"]["bytes_written"] / full_bytes, 4)
+        results.append(row)
+        print(
+            f"turns={turns:>5}  bytes full={row['full']['bytes_written']:>12,} "
+            f"delta+zstd={row['delta_zstd']['bytes_written']:>10,} (x{row['bytes_ratio']})  "
+            f"aput p50 {row['full']['aput_ms']['p50']}ms -> "
+            f"{row['delta_zstd']['aput_ms']['p50']}ms  "
+            f"aget p50 {row['full']['aget_tuple_ms']['p50']}ms -> "
+            f"{row['delta_zstd']['aget_tuple_ms']['p50']}ms"
+        )
+    return {
+        "meta": {
+            "at": datetime.now(UTC).isoformat(),
+            "backend": "postgres" if args.database_url else "memory",
+            "message_chars": args.message_chars,
+            "zstd_level": args.zstd_level,
+            "snapshot_every": args.snapshot_every,
+        },
+        "results": results,
+    }
+
+
+def _parse_turns(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="LangGraph checkpoint storage benchmark")
+    parser.add_argument("--turns", type=_parse_turns, default=[10, 100, 1000])
+    parser.add_argument("--message-chars", type=int, default=200)
+    parser.add_argument("--zstd-level", type=int, default=3)
+    parser.add_argument("--snapshot-every", type=int, default=16)
+    parser.add_argument("--database-url", default=None, help="psycopg DSN；缺省使用内存 saver")
+    parser.add_argument("--output", type=Path, default=_DEFAULT_OUTPUT)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    report = asyncio.run(run(args))
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"report written to {args.output}")
+    return 0
+
+
+__all__ = ["main", "run"]
@@ -0,0 +1 @@
+"""网关代理自包含压测（本地假上游 + 子进程应用 + JSON 报告）。"""
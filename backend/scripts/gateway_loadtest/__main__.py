@@ -0,0 +1,15 @@
+"""``python -m scripts.gateway_loadtest`` 入口（backend 目录执行）。"""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+_BACKEND = Path(__file__).resolve().parents[2]
+if str(_BACKEND) not in sys.path:
+    sys.path.insert(0, str(_BACKEND))
+
+from scripts.gateway_loadtest.harness import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
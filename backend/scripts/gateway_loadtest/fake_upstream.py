@@ -0,0 +1,141 @@
+"""本地 OpenAI 兼容假上游：可配置延迟、抖动、流式分片形状与错误率。
+
+网关凭据以 ``provider=openai`` + ``api_base=http://127.0.0.1:<port>/v1`` 指向本服务，
+LiteLLM Router 即按真实 OpenAI 协议调用，代理全链路（鉴权 → ProxyGuard → 元数据 →
+Router → 回调日志）都会被执行，只有上游被替换。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import json
+import random
+import time
+from typing import TYPE_CHECKING, Any
+import uuid
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+
+
+@dataclass(frozen=True, slots=True)
+class FakeUpstreamConfig:
+    """假上游行为参数（毫秒）。
+
+    非流式：``latency_ms`` 为整体响应耗时；流式：``latency_ms`` 为首包耗时，
+    随后每隔 ``chunk_interval_ms`` 发送一个内容分片，共 ``stream_chunks`` 片。
+    """
+
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    stream_chunks: int = 8
+    chunk_interval_ms: float = 5.0
+    chunk_chars: int = 16
+    completion_tokens_per_chunk: int = 4
+    error_rate: float = 0.0
+
+
+def _usage(prompt_tokens: int, completion_tokens: int) -> dict[str, int]:
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _estimate_prompt_tokens(body: dict[str, Any]) -> int:
+    chars = sum(len(str(m.get("content") or "")) for m in body.get("messages") or [])
+    return max(1, chars // 4)
+
+
+def create_fake_upstream_app(config: FakeUpstreamConfig, *, seed: int | None = None) -> Starlette:
+    """构建假上游 ASGI 应用。"""
+    rng = random.Random(seed)
+
+    def _delay_seconds() -> float:
+        jitter = rng.uniform(-config.jitter_ms, config.jitter_ms) if config.jitter_ms else 0.0
+        return max(0.0, config.latency_ms + jitter) / 1000.0
+
+    async def chat_completions(request: Request) -> Response:
+        body = await request.json()
+        model = str(body.get("model") or "fake-model")
+        if config.error_rate and rng.random() < config.error_rate:
+            await asyncio.sleep(_delay_seconds())
+            return JSONResponse(
+                {"error": {"message": "injected upstream error", "type": "server_error"}},
+                status_code=500,
+            )
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        prompt_tokens = _estimate_prompt_tokens(body)
+        chunk_text = "x" * config.chunk_chars
+        completion_tokens = config.stream_chunks * config.completion_tokens_per_chunk
+
+        if not body.get("stream"):
+            await asyncio.sleep(_delay_seconds())
+            return JSONResponse(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {
+                                "role": "assistant",
+                                "content": chunk_text * config.stream_chunks,
+                            },
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": _usage(prompt_tokens, completion_tokens),
+                }
+            )
+
+        def _chunk(delta: dict[str, Any], finish_reason: str | None, **extra: Any) -> bytes:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                **extra,
+            }
+            return f"data: {json.dumps(payload, separators=(',', ':'))}\n\n".encode()
+
+        async def stream() -> Any:
+            await asyncio.sleep(_delay_seconds())
+            yield _chunk({"role": "assistant", "content": ""}, None)
+            for _ in range(config.stream_chunks):
+                if config.chunk_interval_ms:
+                    await asyncio.sleep(config.chunk_interval_ms / 1000.0)
+                yield _chunk({"content": chunk_text}, None)
+            yield _chunk({}, "stop", usage=_usage(prompt_tokens, completion_tokens))
+            yield b"data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    async def list_models(_request: Request) -> Response:
+        return JSONResponse(
+            {
+                "object": "list",
+                "data": [{"id": "fake-model", "object": "model", "owned_by": "local"}],
+            }
+        )
+
+    return Starlette(
+        routes=[
+            Route("/v1/chat/completions", chat_completions, methods=["POST"]),
+            Route("/v1/models", list_models, methods=["GET"]),
+        ]
+    )
+
+
+__all__ = ["FakeUpstreamConfig", "create_fake_upstream_app"]
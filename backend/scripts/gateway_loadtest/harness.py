@@ -0,0 +1,383 @@
+"""网关 ``/v1/chat/completions`` 自包含压测。
+
+流程：启动本地假上游 → 以子进程启动应用（本地 Postgres/Redis）→ 经管理 API 注册压测
+用户并创建指向假上游的凭据 / 模型 / 虚拟 Key → 固定并发驱动 → 采集吞吐、延迟分位、
+``X-Gateway-Timing`` 分段耗时与 ``/metrics`` 差分（每请求 DB 语句数、Redis 命令数）
+→ 写 JSON 报告，可 ``--compare`` 与历史报告对比。
+
+用法（backend 目录）：
+  uv run python -m scripts.gateway_loadtest --concurrency 32 --requests 2000 --stream
+  uv run python -m scripts.gateway_loadtest --compare reports/loadtest/<旧commit>.json
+
+``--base-url`` 指定已运行实例时不再启动应用子进程（该实例的上游仍需可达本机假上游）。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+from dataclasses import asdict
+from datetime import UTC, datetime
+import json
+import os
+from pathlib import Path
+import socket
+import subprocess
+import sys
+import time
+from typing import Any
+import uuid
+
+import httpx
+
+from scripts.gateway_loadtest.fake_upstream import FakeUpstreamConfig, create_fake_upstream_app
+from scripts.gateway_loadtest.report import (
+    RequestSample,
+    build_report,
+    compare_reports,
+    parse_prometheus_text,
+    parse_timing_header,
+)
+
+_BACKEND = Path(__file__).resolve().parents[2]
+_DEFAULT_OUTPUT_DIR = _BACKEND / "reports" / "loadtest"
+_PROMPT = "压测请求：请简短回复。"
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=_BACKEND, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _api_base(base_url: str, root_path: str) -> str:
+    return f"{base_url.rstrip('/')}{root_path.rstrip('/')}/api/v1"
+
+
+async def _start_fake_upstream(config: FakeUpstreamConfig, port: int) -> tuple[Any, asyncio.Task]:
+    import uvicorn
+
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_fake_upstream_app(config),
+            host="127.0.0.1",
+            port=port,
+            log_level="warning",
+            access_log=False,
+        )
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+def _start_app(port: int, env_overrides: dict[str, str]) -> subprocess.Popen[bytes]:
+    env = {**os.environ, **env_overrides}
+    return subprocess.Popen(
+        [
+            sys.executable,
+            str(_BACKEND / "scripts" / "run_server.py"),
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=_BACKEND,
+        env=env,
+    )
+
+
+async def _wait_healthy(client: httpx.AsyncClient, url: str, timeout_seconds: float) -> None:
+    deadline = time.monotonic() + timeout_seconds
+    while time.monotonic() < deadline:
+        with contextlib.suppress(httpx.HTTPError):
+            if (await client.get(url)).status_code == 200:
+                return
+        await asyncio.sleep(0.5)
+    raise RuntimeError(f"app not healthy after {timeout_seconds:.0f}s: {url}")
+
+
+async def _provision(
+    client: httpx.AsyncClient, api: str, *, upstream_base: str, email: str, password: str
+) -> tuple[str, str]:
+    """注册/登录压测用户，在其 personal team 下创建假上游凭据、模型与虚拟 Key。"""
+    await client.post(
+        f"{api}/auth/register",
+        json={"email": email, "password": password, "name": "loadtest"},
+    )
+    token = await client.post(f"{api}/auth/token", json={"email": email, "password": password})
+    token.raise_for_status()
+    headers = {"Authorization": f"Bearer {token.json()['access_token']}"}
+
+    teams = await client.get(
+        f"{api}/gateway/teams", params={"membership_only": "true"}, headers=headers
+    )
+    teams.raise_for_status()
+    team = next((t for t in teams.json() if t.get("kind") == "personal"), None)
+    if team is None:
+        raise RuntimeError("personal team not found for load-test user")
+    team_api = f"{api}/gateway/teams/{team['id']}"
+    suffix = uuid.uuid4().hex[:8]
+
+    cred = await client.post(
+        f"{team_api}/credentials",
+        headers=headers,
+        json={
+            "provider": "openai",
+            "name": f"loadtest-cred-{suffix}",
+            "api_key": "sk-loadtest-fake-upstream-0000000000",
+            "api_base": upstream_base,
+            "scope": "team",
+        },
+    )
+    cred.raise_for_status()
+    model_name = f"loadtest-{suffix}"
+    model = await client.post(
+        f"{team_api}/models",
+        headers=headers,
+        json={
+            "name": model_name,
+            "capability": "chat",
+            "real_model": "fake-model",
+            "credential_id": cred.json()["id"],
+            "provider": "openai",
+        },
+    )
+    model.raise_for_status()
+    key = await client.post(
+        f"{team_api}/keys", headers=headers, json={"name": f"loadtest-vkey-{suffix}"}
+    )
+    key.raise_for_status()
+    return model_name, key.json()["plain_key"]
+
+
+async def _scrape_metrics(client: httpx.AsyncClient, url: str) -> dict[str, float]:
+    try:
+        response = await client.get(url)
+        response.raise_for_status()
+    except httpx.HTTPError as exc:
+        print(f"warning: /metrics unavailable ({exc}); per-request ops will be 0", file=sys.stderr)
+        return {}
+    return parse_prometheus_text(response.text)
+
+
+async def _one_request(
+    client: httpx.AsyncClient, url: str, headers: dict[str, str], payload: dict[str, Any]
+) -> RequestSample:
+    started = time.perf_counter()
+    ttfb_ms: float | None = None
+    try:
+        if payload.get("stream"):
+            async with client.stream("POST", url, headers=headers, json=payload) as response:
+                async for _chunk in response.aiter_raw():
+                    if ttfb_ms is None:
+                        ttfb_ms = (time.perf_counter() - started) * 1000
+                status = response.status_code
+                resp_headers = response.headers
+        else:
+            response = await client.post(url, headers=headers, json=payload)
+            ttfb_ms = (time.perf_counter() - started) * 1000
+            status = response.status_code
+            resp_headers = response.headers
+    except httpx.HTTPError as exc:
+        return RequestSample(
+            ok=False,
+            status=0,
+            latency_ms=(time.perf_counter() - started) * 1000,
+            error=type(exc).__name__,
+        )
+    preflight = resp_headers.get("x-gateway-preflight-ms")
+    return RequestSample(
+        ok=200 <= status < 300,
+        status=status,
+        latency_ms=(time.perf_counter() - started) * 1000,
+        ttfb_ms=ttfb_ms,
+        preflight_ms=float(preflight) if preflight and preflight.isdigit() else None,
+        stages=parse_timing_header(resp_headers.get("x-gateway-timing")),
+    )
+
+
+async def _drive(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, str],
+    payload: dict[str, Any],
+    *,
+    total: int,
+    concurrency: int,
+) -> tuple[list[RequestSample], float]:
+    """固定并发（闭环）：``concurrency`` 个 worker 从共享计数器领取请求直到 ``total``。"""
+    samples: list[RequestSample] = []
+    remaining = total
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            samples.append(await _one_request(client, url, headers, payload))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    upstream_config = FakeUpstreamConfig(
+        latency_ms=args.upstream_latency_ms,
+        jitter_ms=args.upstream_jitter_ms,
+        stream_chunks=args.stream_chunks,
+        chunk_interval_ms=args.chunk_interval_ms,
+        error_rate=args.upstream_error_rate,
+    )
+    upstream_port = args.upstream_port or _free_port()
+    upstream_server, upstream_task = await _start_fake_upstream(upstream_config, upstream_port)
+    upstream_base = f"http://127.0.0.1:{upstream_port}/v1"
+
+    app_proc: subprocess.Popen[bytes] | None = None
+    base_url = args.base_url
+    if base_url is None:
+        app_port = _free_port()
+        env = {
+            "METRICS_ENABLED": "true",
+            "METRICS_PUBLISH_INTERVAL_SECONDS": "1",
+            "ROOT_PATH": args.root_path,
+        }
+        if args.database_url:
+            env["DATABASE_URL"] = args.database_url
+        if args.redis_url:
+            env["REDIS_URL"] = args.redis_url
+        app_proc = _start_app(app_port, env)
+        base_url = f"http://127.0.0.1:{app_port}"
+
+    root = args.root_path.rstrip("/")
+    api = _api_base(base_url, root)
+    limits = httpx.Limits(
+        max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency
+    )
+    try:
+        async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+            await _wait_healthy(client, f"{base_url}{root}/health", args.startup_timeout)
+            if args.token and args.model:
+                model_name, token = args.model, args.token
+            else:
+                model_name, token = await _provision(
+                    client,
+                    api,
+                    upstream_base=upstream_base,
+                    email=args.email,
+                    password=args.password,
+                )
+
+            url = f"{api}/openai/v1/chat/completions"
+            headers = {"Authorization": f"Bearer {token}"}
+            payload: dict[str, Any] = {
+                "model": model_name,
+                "messages": [{"role": "user", "content": _PROMPT}],
+                "stream": args.stream,
+            }
+            if args.stream:
+                payload["stream_options"] = {"include_usage": True}
+
+            if args.warmup:
+                await _drive(
+                    client, url, headers, payload, total=args.warmup, concurrency=args.concurrency
+                )
+            metrics_url = f"{base_url}{root}/metrics"
+            # 等 worker 快照发布一轮，保证差分前后基于同一口径
+            await asyncio.sleep(args.metrics_settle_seconds)
+            before = await _scrape_metrics(client, metrics_url)
+            samples, wall = await _drive(
+                client, url, headers, payload, total=args.requests, concurrency=args.concurrency
+            )
+            await asyncio.sleep(args.metrics_settle_seconds)
+            after = await _scrape_metrics(client, metrics_url)
+    finally:
+        if app_proc is not None:
+            app_proc.terminate()
+            with contextlib.suppress(subprocess.TimeoutExpired):
+                app_proc.wait(timeout=15)
+            if app_proc.poll() is None:
+                app_proc.kill()
+        upstream_server.should_exit = True
+        await upstream_task
+
+    return build_report(
+        samples,
+        wall_seconds=wall,
+        metrics_before=before,
+        metrics_after=after,
+        meta={
+            "commit": _git_commit(),
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "concurrency": args.concurrency,
+            "stream": args.stream,
+            "upstream": asdict(upstream_config),
+        },
+    )
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Gateway chat proxy load test (fake upstream)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--stream-chunks", type=int, default=8)
+    parser.add_argument("--chunk-interval-ms", type=float, default=5.0)
+    parser.add_argument("--upstream-error-rate", type=float, default=0.0)
+    parser.add_argument("--upstream-port", type=int, default=0)
+    parser.add_argument("--base-url", default=None, help="复用已运行实例，不启动子进程")
+    parser.add_argument("--root-path", default=os.getenv("ROOT_PATH", "/ai-agent"))
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--startup-timeout", type=float, default=90.0)
+    parser.add_argument("--metrics-settle-seconds", type=float, default=1.5)
+    parser.add_argument("--email", default="loadtest@example.com")
+    parser.add_argument("--password", default="loadtest-password-123")
+    parser.add_argument("--token", default=None, help="已有 sk-gw- 虚拟 Key（需同时给 --model）")
+    parser.add_argument("--model", default=None)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None, help="基线报告 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    report = asyncio.run(run(args))
+
+    output = args.output or _DEFAULT_OUTPUT_DIR / f"{report['meta']['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"report written to {output}")
+
+    if args.compare is not None:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_reports(baseline, report, tolerance=args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0 if report["ok"] == report["requests"] else 2
+
+
+__all__ = ["main", "run"]
@@ -0,0 +1,196 @@
+"""压测结果统计：分位数、分段耗时、``/metrics`` 差分与跨 commit 对比（纯函数，可单测）。"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+import math
+import re
+from typing import Any
+
+# X-Gateway-Timing 中的短名 → ProxyPrepareTimings 字段
+TIMING_STAGE_NAMES: dict[str, str] = {
+    "guard": "guard_ms",
+    "meta": "metadata_ms",
+    "pricing": "pricing_ms",
+    "vision": "vision_ms",
+    "direct": "direct_decide_ms",
+    "upstream": "upstream_ms",
+}
+
+_SAMPLE_RE = re.compile(r"^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{[^}]*\})?\s+(\S+)$")
+
+# 报告中对比时「越大越差」的指标路径
+_REGRESSION_KEYS: tuple[tuple[str, ...], ...] = (
+    ("latency_ms", "p50"),
+    ("latency_ms", "p95"),
+    ("latency_ms", "p99"),
+    ("preflight_ms", "p95"),
+    ("per_request", "db_statements"),
+    ("per_request", "redis_commands"),
+)
+
+
+@dataclass(slots=True)
+class RequestSample:
+    ok: bool
+    status: int
+    latency_ms: float
+    ttfb_ms: float | None = None
+    preflight_ms: float | None = None
+    stages: dict[str, int] = field(default_factory=dict)
+    error: str | None = None
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """线性插值分位数（``q`` ∈ [0, 100]）；空序列返回 0。"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * (q / 100.0)
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    if lower == upper:
+        return float(ordered[lower])
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(values: Iterable[float]) -> dict[str, float]:
+    data = list(values)
+    if not data:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": len(data),
+        "mean": round(sum(data) / len(data), 2),
+        "p50": round(percentile(data, 50), 2),
+        "p95": round(percentile(data, 95), 2),
+        "p99": round(percentile(data, 99), 2),
+        "max": round(max(data), 2),
+    }
+
+
+def parse_timing_header(value: str | None) -> dict[str, int]:
+    """解析 ``guard=1;meta=2;upstream=30`` 为 ``{"guard_ms": 1, ...}``。"""
+    stages: dict[str, int] = {}
+    for part in (value or "").split(";"):
+        name, sep, raw = part.partition("=")
+        field_name = TIMING_STAGE_NAMES.get(name.strip())
+        if not sep or field_name is None:
+            continue
+        try:
+            stages[field_name] = int(raw)
+        except ValueError:
+            continue
+    return stages
+
+
+def parse_prometheus_text(text: str) -> dict[str, float]:
+    """Prometheus 文本 → ``{"name{labels}": value}``（忽略注释行）。"""
+    samples: dict[str, float] = {}
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        match = _SAMPLE_RE.match(line)
+        if match is None:
+            continue
+        name, labels, raw = match.groups()
+        try:
+            samples[f"{name}{labels or ''}"] = float(raw)
+        except ValueError:
+            continue
+    return samples
+
+
+def metric_total(samples: Mapping[str, float], name: str) -> float:
+    """某指标所有标签组合之和（如 ``redis_command_duration_ms_count``）。"""
+    return sum(v for k, v in samples.items() if k == name or k.startswith(name + "{"))
+
+
+def metric_delta(before: Mapping[str, float], after: Mapping[str, float], name: str) -> float:
+    return max(0.0, metric_total(after, name) - metric_total(before, name))
+
+
+def build_report(
+    samples: list[RequestSample],
+    *,
+    wall_seconds: float,
+    metrics_before: Mapping[str, float],
+    metrics_after: Mapping[str, float],
+    meta: Mapping[str, Any],
+) -> dict[str, Any]:
+    """汇总一轮压测为可 JSON 序列化的报告。"""
+    ok = [s for s in samples if s.ok]
+    errors: dict[str, int] = {}
+    for s in samples:
+        if not s.ok:
+            key = str(s.status) if s.status else (s.error or "error")
+            errors[key] = errors.get(key, 0) + 1
+
+    stage_names = sorted({name for s in ok for name in s.stages})
+    denominator = max(1, len(samples))
+    db_statements = metric_delta(metrics_before, metrics_after, "db_statements_total")
+    redis_commands = metric_delta(metrics_before, metrics_after, "redis_command_duration_ms_count")
+    db_checkouts = metric_delta(metrics_before, metrics_after, "db_pool_checkout_ms_count")
+    return {
+        "meta": dict(meta),
+        "requests": len(samples),
+        "ok": len(ok),
+        "errors": errors,
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(ok) / wall_seconds, 2) if wall_seconds > 0 else 0.0,
+        "latency_ms": summarize(s.latency_ms for s in ok),
+        "ttfb_ms": summarize(s.ttfb_ms for s in ok if s.ttfb_ms is not None),
+        "preflight_ms": summarize(s.preflight_ms for s in ok if s.preflight_ms is not None),
+        "stages_ms": {
+            name: summarize(s.stages[name] for s in ok if name in s.stages) for name in stage_names
+        },
+        "per_request": {
+            "db_statements": round(db_statements / denominator, 3),
+            "db_checkouts": round(db_checkouts / denominator, 3),
+            "redis_commands": round(redis_commands / denominator, 3),
+        },
+    }
+
+
+def _lookup(report: Mapping[str, Any], path: tuple[str, ...]) -> float | None:
+    node: Any = report
+    for key in path:
+        if not isinstance(node, Mapping) or key not in node:
+            return None
+        node = node[key]
+    return float(node) if isinstance(node, int | float) else None
+
+
+def compare_reports(
+    baseline: Mapping[str, Any], current: Mapping[str, Any], *, tolerance: float = 0.10
+) -> list[str]:
+    """返回超过 ``tolerance`` 相对阈值的退化项描述（吞吐下降同样计入）。"""
+    regressions: list[str] = []
+    for path in _REGRESSION_KEYS:
+        old, new = _lookup(baseline, path), _lookup(current, path)
+        if old is None or new is None or old <= 0:
+            continue
+        if new > old * (1 + tolerance):
+            regressions.append(f"{'.'.join(path)}: {old:g} -> {new:g} (+{(new / old - 1):.0%})")
+    old_rps = _lookup(baseline, ("throughput_rps",))
+    new_rps = _lookup(current, ("throughput_rps",))
+    if old_rps and new_rps is not None and new_rps < old_rps * (1 - tolerance):
+        regressions.append(
+            f"throughput_rps: {old_rps:g} -> {new_rps:g} ({(new_rps / old_rps - 1):.0%})"
+        )
+    return regressions
+
+
+__all__ = [
+    "TIMING_STAGE_NAMES",
+    "RequestSample",
+    "build_report",
+    "compare_reports",
+    "metric_delta",
+    "metric_total",
+    "parse_prometheus_text",
+    "parse_timing_header",
+    "percentile",
+    "summarize",
+]
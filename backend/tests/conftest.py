@@ -48,6 +48,14 @@ os.environ.setdefault("FAST_MODEL", "dashscope/qwen-turbo")
 os.environ.setdefault("VISION_MODEL", "dashscope/qwen-vl-max")
 os.environ.setdefault("EMBEDDING_MODEL", "dashscope/text-embedding-v3")
 os.environ.setdefault("EMBEDDING_DIMENSION", "1024")
+# 结算预写日志写本地磁盘；单测默认关闭，journal 专项用例显式注入临时目录
+os.environ.setdefault("GATEWAY_DEFERRED_TASK_JOURNAL_ENABLED", "false")
+# 助手消息批量写入走独立后台会话；单测默认同步写入，断言可立即读到消息
+os.environ.setdefault("CHAT_MESSAGE_WRITE_BATCH_INTERVAL_SECONDS", "0")
+# Router 冷启动快照读写共享存储；单测默认关闭，快照专项用例直接注入快照
+os.environ.setdefault("GATEWAY_ROUTER_SNAPSHOT_ENABLED", "false")
+# Dashboard 分片另取池化会话并跨请求缓存；集成用例在未提交的测试会话里造数，默认关闭
+os.environ.setdefault("GATEWAY_DASHBOARD_TILES_ENABLED", "false")
 
 
 def api_v1_url(path: str = "") -> str:
@@ -3,6 +3,7 @@ GAIA 评估测试
 """
 # pylint: disable=protected-access  # 测试代码需要访问私有方法
 
+import asyncio
 from unittest.mock import AsyncMock
 
 import pytest
@@ -177,3 +178,89 @@ questions:
         assert report.total_questions == 2
         assert report.accuracy > 0.0
         assert "simple" in report.results_by_difficulty
+
+
+class _FakeResponse:
+    def __init__(self, content: str):
+        self.content = content
+        self.iterations = 1
+        self.total_tokens = 10
+
+
+class _FakeAgent:
+    """本地假 Agent：按题面返回答案，可指定挂起的题目"""
+
+    def __init__(self, answers: dict[str, str], hang: set[str] | None = None):
+        self.answers = answers
+        self.hang = hang or set()
+        self.calls: list[str] = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def run(self, question: str, timeout: float = 300) -> _FakeResponse:
+        self.calls.append(question)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            if question in self.hang:
+                await asyncio.sleep(3600)
+            await asyncio.sleep(0.01)
+            return _FakeResponse(self.answers[question])
+        finally:
+            self.in_flight -= 1
+
+
+class TestGAIAConcurrentRun:
+    """并发、超时与断点续跑"""
+
+    @pytest.fixture
+    def questions(self):
+        return [
+            GAIAQuestion(
+                task_id=f"t{i}", question=f"q{i}", final_answer=str(i), difficulty="simple"
+            )
+            for i in range(6)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency_keeps_question_order(self, questions):
+        agent = _FakeAgent({q.question: q.final_answer for q in questions})
+
+        report = await GAIAEvaluator().evaluate_agent(agent, questions, concurrency=2)
+
+        assert agent.peak == 2
+        assert [r.task_id for r in report.results] == [q.task_id for q in questions]
+        assert report.accuracy == 1.0
+
+    @pytest.mark.asyncio
+    async def test_task_timeout_scores_zero(self, questions):
+        agent = _FakeAgent({q.question: q.final_answer for q in questions}, hang={"q1"})
+
+        report = await GAIAEvaluator().evaluate_agent(
+            agent, questions, concurrency=3, task_timeout=0.05
+        )
+
+        timed_out = report.results[1]
+        assert timed_out.correct is False
+        assert "Timeout" in timed_out.metadata["error"]
+        assert report.correct_count == 5
+
+    @pytest.mark.asyncio
+    async def test_resume_from_checkpoint_skips_finished_tasks(self, questions, tmp_path):
+        checkpoint = tmp_path / "run.jsonl"
+        answers = {q.question: q.final_answer for q in questions}
+        await GAIAEvaluator().evaluate_agent(
+            _FakeAgent(answers), questions[:4], checkpoint_path=checkpoint
+        )
+        # 模拟崩溃时写了一半的行
+        with checkpoint.open("a", encoding="utf-8") as f:
+            f.write('{"task_id": "t4", "quest')
+
+        agent = _FakeAgent(answers)
+        report = await GAIAEvaluator().evaluate_agent(
+            agent, questions, concurrency=4, checkpoint_path=checkpoint
+        )
+
+        assert agent.calls == ["q4", "q5"]
+        assert report.total_questions == 6
+        assert report.correct_count == 6
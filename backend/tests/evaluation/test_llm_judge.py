@@ -4,12 +4,13 @@ LLM-as-Judge 测试
 测试 LLM 评估功能
 """
 
+import asyncio
 from unittest.mock import AsyncMock
 
 import pytest
 
 from domains.agent.infrastructure.llm.agent_llm_facade import AgentLlmResponse
-from evaluation.llm_judge import LLMJudge, MultiDimensionJudge
+from evaluation.llm_judge import JudgeSample, JudgeVerdictCache, LLMJudge, MultiDimensionJudge
 
 
 class TestLLMJudge:
@@ -145,3 +146,71 @@ class TestMultiDimensionJudge:
         assert "coherence" in scores
         assert "overall" in scores
         assert all(0 <= score <= 10 for score in scores.values())
+
+
+class _FakeJudgeLlm:
+    """本地假裁判 LLM：统计调用次数与并发峰值"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def chat(self, messages, model):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return AgentLlmResponse(content=self.content)
+
+
+_VERDICT = '{"overall_score": 7, "relevance": 7, "accuracy": 7, "completeness": 7, "clarity": 7, "reasoning": "ok"}'
+
+
+class TestJudgeVerdictCache:
+    """裁判结论缓存与批量评估"""
+
+    @pytest.mark.asyncio
+    async def test_evaluate_many_is_concurrent_and_cached(self):
+        llm = _FakeJudgeLlm(_VERDICT)
+        judge = LLMJudge(llm_gateway=llm, cache=JudgeVerdictCache())
+        samples = [JudgeSample(query=f"q{i}", response="r", expected="e") for i in range(6)]
+
+        scores = await judge.evaluate_many(samples, concurrency=3)
+        again = await judge.evaluate(query="q0", response="r", expected="e")
+
+        assert len(scores) == 6
+        assert llm.peak == 3
+        assert llm.calls == 6
+        assert again.overall_score == 7
+
+    @pytest.mark.asyncio
+    async def test_cache_key_covers_candidate_and_reference(self):
+        llm = _FakeJudgeLlm(_VERDICT)
+        judge = LLMJudge(llm_gateway=llm, cache=JudgeVerdictCache())
+
+        await judge.evaluate(query="q", response="a", expected="x")
+        await judge.evaluate(query="q", response="b", expected="x")
+        await judge.evaluate(query="q", response="a", expected="y")
+        await judge.evaluate(query="q", response="a", expected="x")
+
+        assert llm.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_persisted_cache_survives_restart_and_skips_parse_failures(self, tmp_path):
+        path = tmp_path / "verdicts.jsonl"
+        await LLMJudge(_FakeJudgeLlm(_VERDICT), cache=JudgeVerdictCache(path)).evaluate(
+            query="q", response="r"
+        )
+        broken = _FakeJudgeLlm("not json")
+        await LLMJudge(broken, cache=JudgeVerdictCache(path)).evaluate(query="q2", response="r")
+
+        llm = _FakeJudgeLlm(_VERDICT)
+        judge = LLMJudge(llm, cache=JudgeVerdictCache(path))
+        await judge.evaluate(query="q", response="r")
+        await judge.evaluate(query="q2", response="r")
+
+        assert len(judge.cache) == 2
+        assert llm.calls == 1
@@ -0,0 +1,101 @@
+"""上下文文本分析：关键词自动机、消息特征缓存与 MinHash LSH 去重。"""
+
+from unittest.mock import patch
+
+import pytest
+
+from domains.agent.domain.types import Message, MessageRole
+from domains.agent.infrastructure.context import text_analysis
+from domains.agent.infrastructure.context.key_detector import (
+    KeyMessageDetector,
+    KeyMessageDetectorConfig,
+)
+from domains.agent.infrastructure.context.smart_compressor import SmartContextCompressor
+from domains.agent.infrastructure.context.text_analysis import (
+    KeywordAutomaton,
+    MinHashLSH,
+    TextAnalyzer,
+    minhash_signature,
+)
+
+_MESSAGES = [
+    Message(role=MessageRole.USER, content="请帮我实现一个文件上传接口，必须支持断点续传"),
+    Message(role=MessageRole.ASSISTANT, content="最终决定采用分片方案：\n1. 切片\n2. 合并"),
+    Message(role=MessageRole.USER, content="I need you to FIX the error, don't touch the API"),
+    Message(role=MessageRole.ASSISTANT, content="```python\nprint('ok')\n```"),
+    Message(role=MessageRole.USER, content="ok"),
+]
+
+
+@pytest.mark.unit
+class TestKeywordAutomaton:
+    def test_reports_overlapping_hits_per_group(self):
+        automaton = KeywordAutomaton({"a": ["he", "she", "hers"], "b": ["his", "e"]})
+
+        hits = automaton.scan("ushers")
+
+        assert hits == {"a": frozenset({"he", "she", "hers"}), "b": frozenset({"e"})}
+        assert automaton.scan("xyz") == {}
+
+
+@pytest.mark.unit
+class TestMessageFeatures:
+    def test_features_are_cached_per_message(self):
+        analyzer = TextAnalyzer({"g": ["帮我"]})
+        msg = _MESSAGES[0]
+
+        with patch.object(text_analysis, "estimate_message_tokens", return_value=7) as estimate:
+            first = analyzer.features(msg)
+            second = analyzer.features(msg.model_copy())
+            analyzer.features(Message(role=MessageRole.USER, content=msg.content))
+
+        assert first is second
+        assert first.tokens == 7
+        assert first.text.hits("g") == frozenset({"帮我"})
+        # 不同时间戳的同文消息是另一条消息
+        assert estimate.call_count == 2
+
+    def test_detector_matches_substring_semantics(self):
+        config = KeyMessageDetectorConfig()
+        detector = KeyMessageDetector(config)
+        for msg in _MESSAGES:
+            lower = (msg.content or "").lower()
+            features = detector._analyzer.features(msg).text
+            for group, keywords in (
+                ("key.task", config.task_keywords),
+                ("key.constraint", config.constraint_keywords),
+                ("key.decision", config.decision_keywords),
+                ("key.code", config.code_keywords),
+            ):
+                expected = sum(1 for k in keywords if k.lower() in lower)
+                assert detector._count_keyword_matches(features.hits(group), keywords) == expected
+
+        result = detector.detect(_MESSAGES[2], 5, 10, {"task_type": "code"})
+        assert result.should_pin
+
+
+@pytest.mark.unit
+class TestMinHashLsh:
+    def test_near_duplicates_share_a_bucket(self):
+        base = [f"w{i}" for i in range(40)]
+        near = [*base[:36], "x1", "x2", "x3", "x4"]
+        other = [f"z{i}" for i in range(40)]
+        lsh = MinHashLSH()
+        lsh.insert("near", minhash_signature(near))
+        lsh.insert("other", minhash_signature(other))
+
+        assert lsh.query(minhash_signature(base)) == {"near"}
+        assert minhash_signature([]) == ()
+
+    def test_compressor_memory_overlap_uses_candidates(self):
+        compressor = SmartContextCompressor()
+        content = "the deploy uses blue green rollout with canary checks first"
+        memories = [
+            "the deploy uses blue green rollout with canary checks",
+            "completely unrelated note about lunch",
+        ]
+
+        overlap = compressor._calculate_memory_overlap(content, memories)
+
+        assert overlap == pytest.approx(9 / 10)
+        assert compressor._calculate_memory_overlap("too short", memories) == 0.0
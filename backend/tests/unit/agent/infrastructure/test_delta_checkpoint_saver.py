@@ -0,0 +1,119 @@
+"""DeltaCheckpointSaver / ZstdCompressedSerializer：增量存储透明还原、周期快照与压缩往返。"""
+
+from __future__ import annotations
+
+from typing import Annotated, Any, TypedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langgraph.graph import END, START, StateGraph
+import pytest
+
+from domains.agent.infrastructure.engine.checkpoint_serde import (
+    ZSTD_SUFFIX,
+    ZstdCompressedSerializer,
+)
+from domains.agent.infrastructure.engine.delta_checkpoint_saver import (
+    DELTA_MARKER,
+    DeltaCheckpointSaver,
+)
+
+
+def _append_or_reset(left: list[str], right: list[str]) -> list[str]:
+    if right and right[0] == "__reset__":
+        return right[1:]
+    return left + right
+
+
+class _State(TypedDict):
+    messages: Annotated[list[str], _append_or_reset]
+    turn: int
+
+
+def _graph(checkpointer: Any) -> Any:
+    builder = StateGraph(_State)
+    builder.add_node("agent", lambda s: {"messages": [f"reply-{s['turn']}"]})
+    builder.add_node("tool", lambda s: {"messages": [f"tool-{s['turn']}"]})
+    builder.add_edge(START, "agent")
+    builder.add_edge("agent", "tool")
+    builder.add_edge("tool", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id: str) -> dict[str, Any]:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+async def _run_turns(saver: Any, thread_id: str, turns: int) -> None:
+    graph = _graph(saver)
+    for turn in range(turns):
+        await graph.ainvoke({"messages": [f"user-{turn}"], "turn": turn}, _config(thread_id))
+
+
+async def _raw_messages(inner: InMemorySaver, thread_id: str) -> list[Any]:
+    return [
+        t.checkpoint["channel_values"].get("messages")
+        async for t in inner.alist(_config(thread_id))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_history_matches_plain_saver_and_most_steps_are_deltas() -> None:
+    plain, inner = InMemorySaver(), InMemorySaver()
+    await _run_turns(plain, "t", 6)
+    await _run_turns(DeltaCheckpointSaver(inner, snapshot_every=4), "t", 6)
+
+    # 冷缓存的新实例（模拟另一 worker）沿基准链还原全部历史
+    delta = DeltaCheckpointSaver(inner, snapshot_every=4)
+    expected = [t.checkpoint["channel_values"] async for t in plain.alist(_config("t"))]
+    actual = [t.checkpoint["channel_values"] async for t in delta.alist(_config("t"))]
+    assert actual == expected
+
+    state = await _graph(delta).aget_state(_config("t"))
+    assert state.values["messages"][-3:] == ["user-5", "reply-5", "tool-5"]
+
+    raw = [v for v in await _raw_messages(inner, "t") if v is not None]
+    markers = [v for v in raw if isinstance(v, dict) and v.get(DELTA_MARKER) == 1]
+    assert markers and all(m["d"] < 4 and len(m["tail"]) == 1 for m in markers)
+    # 每 4 步至少一次完整快照，链深有界
+    assert len(raw) - len(markers) >= len(raw) // 4
+
+
+@pytest.mark.asyncio
+async def test_non_prefix_rewrite_falls_back_to_full_snapshot() -> None:
+    inner = InMemorySaver()
+    saver = DeltaCheckpointSaver(inner, snapshot_every=16)
+    graph = _graph(saver)
+    await graph.ainvoke({"messages": ["a"], "turn": 0}, _config("r"))
+
+    # 摘要式改写历史：新值不以父值为前缀
+    await graph.aupdate_state(_config("r"), {"messages": ["__reset__", "summary"]})
+
+    latest = await inner.aget_tuple(_config("r"))
+    assert latest is not None
+    assert latest.checkpoint["channel_values"]["messages"] == ["summary"]
+    restored = await DeltaCheckpointSaver(inner).aget_tuple(_config("r"))
+    assert restored is not None
+    assert restored.checkpoint["channel_values"]["messages"] == ["summary"]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_interval_zero_disables_deltas() -> None:
+    inner = InMemorySaver()
+    await _run_turns(DeltaCheckpointSaver(inner, snapshot_every=0), "z", 2)
+
+    assert all(not isinstance(v, dict) for v in await _raw_messages(inner, "z") if v is not None)
+
+
+def test_zstd_serializer_compresses_large_values_and_reads_plain_blobs() -> None:
+    serde = ZstdCompressedSerializer(level=3, min_size=64)
+    value = {"messages": [f"message {i} " * 8 for i in range(50)]}
+
+    type_, data = serde.dumps_typed(value)
+    plain = JsonPlusSerializer().dumps_typed(value)
+
+    assert type_.endswith(ZSTD_SUFFIX)
+    assert len(data) < len(plain[1])
+    assert serde.loads_typed((type_, data)) == value
+    assert serde.loads_typed(plain) == value
+    assert not serde.dumps_typed("tiny")[0].endswith(ZSTD_SUFFIX)
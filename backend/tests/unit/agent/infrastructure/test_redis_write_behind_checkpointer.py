@@ -0,0 +1,167 @@
+"""RedisWriteBehindCheckpointer：Redis 提供最新检查点、写回批量落库与 Redis 故障写穿。"""
+
+from __future__ import annotations
+
+import fnmatch
+import operator
+from typing import Annotated, Any, TypedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+import pytest
+
+from domains.agent.infrastructure.engine.redis_write_behind_checkpointer import (
+    RedisWriteBehindCheckpointer,
+)
+
+
+class _FakePipeline:
+    def __init__(self, redis: _FakeRedis) -> None:
+        self._redis = redis
+        self._ops: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        def _queue(*args: Any, **kwargs: Any) -> _FakePipeline:
+            self._ops.append((name, args, kwargs))
+            return self
+
+        return _queue
+
+    async def execute(self) -> list[Any]:
+        return [await getattr(self._redis, n)(*a, **kw) for n, a, kw in self._ops]
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.strings: dict[str, str] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.down = False
+
+    def pipeline(self, transaction: bool = True) -> _FakePipeline:
+        if self.down:
+            raise ConnectionError("redis down")
+        return _FakePipeline(self)
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> bool:
+        self.strings[key] = value
+        return True
+
+    async def get(self, key: str) -> str | None:
+        return self.strings.get(key)
+
+    async def hset(self, key: str, mapping: dict[str, str]) -> int:
+        self.hashes.setdefault(key, {}).update(mapping)
+        return len(mapping)
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self.hashes.get(key, {}))
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        for key in keys:
+            self.strings.pop(key, None)
+            self.hashes.pop(key, None)
+        return len(keys)
+
+    async def scan_iter(self, match: str):
+        for key in [*self.strings, *self.hashes]:
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+
+class _State(TypedDict):
+    steps: Annotated[list[str], operator.add]
+
+
+def _graph(checkpointer: Any) -> Any:
+    builder = StateGraph(_State)
+    builder.add_node("plan", lambda _s: {"steps": ["plan"]})
+    builder.add_node("act", lambda _s: {"steps": ["act"]})
+    builder.add_edge(START, "plan")
+    builder.add_edge("plan", "act")
+    builder.add_edge("act", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _saver(redis: _FakeRedis, inner: InMemorySaver, interval: float = 60.0):
+    async def _client() -> _FakeRedis:
+        return redis
+
+    return RedisWriteBehindCheckpointer(
+        inner, interval_seconds=lambda: interval, redis_client_factory=_client
+    )
+
+
+async def _history(saver: Any, thread_id: str) -> list[Any]:
+    return [t async for t in saver.alist({"configurable": {"thread_id": thread_id}})]
+
+
+@pytest.mark.asyncio
+async def test_steps_are_written_behind_and_latest_served_from_redis() -> None:
+    redis, inner = _FakeRedis(), InMemorySaver()
+    saver = _saver(redis, inner)
+    config = {"configurable": {"thread_id": "t1"}}
+
+    await _graph(saver).ainvoke({"steps": ["in"]}, config)
+    assert await _history(inner, "t1") == []  # 尚未写回
+
+    # 另一 worker：共享 Redis、本地无任何 PG 数据，仍可恢复最新状态
+    other = _saver(redis, InMemorySaver())
+    state = await _graph(other).aget_state(config)
+    assert state.values["steps"] == ["in", "plan", "act"]
+
+    await saver.aclose()
+    history = await _history(inner, "t1")
+    assert len(history) == 4  # input + 3 个 super-step
+    assert history[0].checkpoint["channel_values"]["steps"] == ["in", "plan", "act"]
+
+
+@pytest.mark.asyncio
+async def test_historical_read_drains_pending_writes_first() -> None:
+    redis, inner = _FakeRedis(), InMemorySaver()
+    saver = _saver(redis, inner)
+    config = {"configurable": {"thread_id": "t2"}}
+
+    await _graph(saver).ainvoke({"steps": ["in"]}, config)
+    history = await _history(saver, "t2")
+
+    assert len(history) == 4
+    parent = await saver.aget_tuple(history[1].config)
+    assert parent is not None
+    assert parent.checkpoint["channel_values"]["steps"] == ["in", "plan"]
+    await saver.aclose()
+
+
+@pytest.mark.asyncio
+async def test_redis_outage_writes_through_to_inner_saver() -> None:
+    redis, inner = _FakeRedis(), InMemorySaver()
+    redis.down = True
+    saver = _saver(redis, inner)
+    config = {"configurable": {"thread_id": "t3"}}
+
+    await _graph(saver).ainvoke({"steps": ["in"]}, config)
+
+    assert len(await _history(inner, "t3")) == 4
+    state = await _graph(saver).aget_state(config)
+    assert state.values["steps"] == ["in", "plan", "act"]
+    await saver.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_cache_write_evicts_stale_latest() -> None:
+    redis, inner = _FakeRedis(), InMemorySaver()
+    saver = _saver(redis, inner)
+    config = {"configurable": {"thread_id": "t4"}}
+
+    await _graph(saver).ainvoke({"steps": ["in"]}, config)
+    # 第二轮缓存写失败（pipeline 不可用，单条 delete 仍可用），写穿到 PG
+    redis.down = True
+    await _graph(saver).ainvoke({"steps": ["again"]}, config)
+    redis.down = False
+
+    state = await _graph(saver).aget_state(config)
+    assert state.values["steps"][-3:] == ["again", "plan", "act"]
+    assert len(state.values["steps"]) == 6
+    await saver.aclose()
@@ -0,0 +1,192 @@
+"""工具结果缓存：命中 / 未命中、作用域隔离、并发合并与不可缓存工具。"""
+
+import asyncio
+from typing import Any
+
+from langchain_core.tools import StructuredTool
+import pytest
+
+from domains.agent.domain.types import ToolResult
+from domains.agent.infrastructure.engine.langgraph_agent import LangGraphAgentEngine
+from domains.agent.infrastructure.tools.base import BaseTool
+from domains.agent.infrastructure.tools.mcp.wrapper import MCPToolWrapper
+from domains.agent.infrastructure.tools.registry import ToolRegistry
+from domains.agent.infrastructure.tools.result_cache import (
+    ToolCacheScope,
+    ToolResultCache,
+    clear_tool_result_cache_for_tests,
+    is_cacheable,
+    tool_cache_key,
+)
+
+
+class _CountingTool(BaseTool):
+    """记录真实执行次数；可模拟耗时与失败。"""
+
+    name = "lookup"
+    description = "test lookup"
+    cacheable = True
+    cache_scope = ToolCacheScope.SESSION
+    cache_ttl_seconds = 60
+
+    def __init__(self, *, delay: float = 0.0, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def execute(self, **kwargs: Any) -> ToolResult:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            return ToolResult(tool_call_id="", success=False, output="", error="boom")
+        return ToolResult(tool_call_id="", success=True, output=f"result {self.calls}")
+
+
+def _runner(cache: ToolResultCache, tool: BaseTool, **ids: str):
+    async def run(**arguments: Any) -> ToolResult:
+        return await cache.run(tool, arguments, lambda: tool.execute(**arguments), **ids)
+
+    return run
+
+
+@pytest.mark.unit
+class TestToolResultCache:
+    @pytest.mark.asyncio
+    async def test_second_call_hits_cache(self):
+        tool = _CountingTool()
+        run = _runner(ToolResultCache(use_redis=False), tool, session_id="s1")
+
+        first = await run(q="x", n=1)
+        second = await run(n=1, q="x")  # 参数顺序不同，键相同
+
+        assert tool.calls == 1
+        assert second.output == first.output == "result 1"
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_execute_once(self):
+        tool = _CountingTool(delay=0.02)
+        run = _runner(ToolResultCache(use_redis=False), tool, session_id="s1")
+
+        results = await asyncio.gather(run(q="x"), run(q="x"), run(q="y"))
+
+        assert tool.calls == 2
+        assert results[0].output == results[1].output
+
+    @pytest.mark.asyncio
+    async def test_scope_isolation(self):
+        cache = ToolResultCache(use_redis=False)
+        tool = _CountingTool()
+
+        await _runner(cache, tool, user_id="u1", session_id="s1")(q="x")
+        await _runner(cache, tool, user_id="u1", session_id="s2")(q="x")
+        assert tool.calls == 2  # SESSION：不同会话不共享
+
+        tool.cache_scope = ToolCacheScope.USER
+        await _runner(cache, tool, user_id="u1", session_id="s1")(q="x")
+        await _runner(cache, tool, user_id="u1", session_id="s2")(q="x")
+        await _runner(cache, tool, user_id="u2", session_id="s3")(q="x")
+        assert tool.calls == 4  # USER：同用户跨会话共享，跨用户不共享
+
+    @pytest.mark.asyncio
+    async def test_failed_results_are_not_cached(self):
+        tool = _CountingTool(fail=True)
+        run = _runner(ToolResultCache(use_redis=False), tool, session_id="s1")
+
+        await run(q="x")
+        await run(q="x")
+
+        assert tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_non_idempotent_tools_bypass_cache(self):
+        tool = _CountingTool()
+        tool.requires_confirmation = True
+        run = _runner(ToolResultCache(use_redis=False), tool, session_id="s1")
+
+        await asyncio.gather(run(q="x"), run(q="x"))
+
+        assert not is_cacheable(tool)
+        assert tool.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_refetched(self, monkeypatch: pytest.MonkeyPatch):
+        from domains.agent.infrastructure.tools import result_cache
+
+        now = [1000.0]
+        monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+        tool = _CountingTool()
+        run = _runner(ToolResultCache(use_redis=False), tool, session_id="s1")
+
+        await run(q="x")
+        now[0] += 61
+        await run(q="x")
+
+        assert tool.calls == 2
+
+    def test_missing_scope_owner_disables_caching(self):
+        assert tool_cache_key("t", {}, ToolCacheScope.SESSION, user_id="u1") is None
+        assert tool_cache_key("t", {}, ToolCacheScope.USER, session_id="s1") is None
+        assert tool_cache_key("t", {}, ToolCacheScope.GLOBAL) is not None
+
+
+@pytest.mark.unit
+class TestToolCacheDeclarations:
+    def test_builtin_declarations(self):
+        registry = ToolRegistry()
+
+        assert is_cacheable(registry.get("web_search"))
+        assert registry.get("web_search").cache_scope is ToolCacheScope.GLOBAL
+        for name in ("run_shell", "run_python", "write_file"):
+            assert not is_cacheable(registry.get(name))
+
+    def test_mcp_read_only_hint(self):
+        def _echo(text: str) -> str:
+            return text
+
+        read_only = StructuredTool.from_function(
+            _echo, name="read", description="d", metadata={"readOnlyHint": True}
+        )
+        mutating = StructuredTool.from_function(_echo, name="write", description="d")
+
+        wrapped = MCPToolWrapper(langchain_tool=read_only)
+        assert is_cacheable(wrapped)
+        assert wrapped.cache_scope is ToolCacheScope.USER
+        assert not is_cacheable(MCPToolWrapper(langchain_tool=mutating))
+        assert is_cacheable(
+            MCPToolWrapper(
+                server_name="srv",
+                tool_name="read",
+                tool_definition={"annotations": {"readOnlyHint": True}},
+            )
+        )
+
+
+@pytest.mark.unit
+class TestEngineToolCaching:
+    @pytest.mark.asyncio
+    async def test_duplicate_calls_in_one_turn_share_execution(self):
+        clear_tool_result_cache_for_tests()
+        tool = _CountingTool(delay=0.02)
+        tool.cache_scope = ToolCacheScope.SESSION
+        registry = ToolRegistry()
+        registry.register(tool)
+        engine = LangGraphAgentEngine.__new__(LangGraphAgentEngine)
+        engine.tools = registry
+        state = {
+            "messages": [],
+            "user_id": "u1",
+            "session_id": "engine-cache-test",
+            "pending_tool_calls": [
+                {"id": "call_1", "name": "lookup", "args": {"q": "x"}},
+                {"id": "call_2", "name": "lookup", "args": {"q": "x"}},
+            ],
+        }
+
+        try:
+            result = await engine._execute_tools(state)
+        finally:
+            clear_tool_result_cache_for_tests()
+
+        assert tool.calls == 1
+        assert [m.tool_call_id for m in result["messages"]] == ["call_1", "call_2"]
+        assert all(r["success"] and r["output"] == "result 1" for r in result["tool_results"])
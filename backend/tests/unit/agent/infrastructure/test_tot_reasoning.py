@@ -0,0 +1,188 @@
+"""Tree-of-Thought 束搜索：并发扩展、批量评估、剪枝与预算截断。"""
+
+import asyncio
+from dataclasses import dataclass
+import json
+import re
+
+import pytest
+
+from domains.agent.domain.types import AgentState, Message, MessageRole
+from domains.agent.infrastructure.reasoning.tot import TreeOfThoughtMode
+
+
+@dataclass
+class _Response:
+    content: str
+    usage: dict | None
+
+
+class _FakeLLM:
+    """确定性 LLM：扩展时按路径生成 a/b/c 子思路，评估时按思路名打分。"""
+
+    def __init__(
+        self,
+        *,
+        delay: float | list[float] = 0.0,
+        tokens: int | None = 10,
+        terminal: str | None = None,
+    ):
+        # 列表时按调用次序轮流取用，制造交错完成；用量不超过 max_tokens，None 时每次用满
+        self.delays = delay if isinstance(delay, list) else [delay]
+        self.tokens = tokens
+        self.terminal = terminal
+        self.in_flight = 0
+        self.peak = 0
+        self.expand_calls = 0
+        self.evaluate_calls = 0
+        self.started = 0
+        self.completed = 0
+
+    @staticmethod
+    def score(thought: str) -> float:
+        # 越靠后的字母分数越高：c > b > a
+        return {"a": 0.1, "b": 0.5, "c": 0.8}[thought[-1]]
+
+    async def chat(self, messages, model=None, max_tokens=4096, **_):
+        prompt = messages[-1]["content"]
+        delay = self.delays[self.started % len(self.delays)]
+        self.started += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+        self.completed += 1
+        usage = {"total_tokens": min(max_tokens, self.tokens or max_tokens)}
+        if "候选推理路径" in prompt:
+            self.evaluate_calls += 1
+            paths = re.findall(r"^\[\d+\] (.+)$", prompt, re.MULTILINE)
+            verdicts = [
+                {
+                    "score": self.score(p.split(" -> ")[-1]),
+                    "terminal": p.endswith(self.terminal or "\0"),
+                }
+                for p in paths
+            ]
+            return _Response(json.dumps(verdicts), usage)
+        self.expand_calls += 1
+        path = re.findall(r"^\d+\. (.+)$", prompt.split("已有思路：")[1], re.MULTILINE)
+        prefix = path[-1] if path else "t"
+        return _Response(json.dumps([f"{prefix}{s}" for s in "abc"]), usage)
+
+
+@pytest.mark.unit
+class TestTreeOfThoughtSearch:
+    @pytest.mark.asyncio
+    async def test_beam_pruning_and_batched_evaluation(self):
+        llm = _FakeLLM()
+        mode = TreeOfThoughtMode({"max_depth": 3, "beam_width": 2}, llm_gateway=llm)
+
+        result = await mode.search("问题")
+
+        assert result.stop_reason == "max_depth"
+        assert [len(beam) for beam in result.beams] == [2, 2, 2]
+        assert [n.path[-1] for n in result.beams[0]] == ["tc", "tb"]
+        assert result.best.path == ["tc", "tcc", "tccc"]
+        # 1 + 2 + 2 次扩展；每层候选一次评估调用
+        assert llm.expand_calls == result.expansions == 5
+        assert llm.evaluate_calls == result.evaluations == 3
+        assert result.tokens_used == 80
+
+    @pytest.mark.asyncio
+    async def test_expansion_concurrency_is_bounded(self):
+        llm = _FakeLLM(delay=0.01)
+        mode = TreeOfThoughtMode(
+            {"max_depth": 2, "beam_width": 3, "max_concurrency": 2}, llm_gateway=llm
+        )
+
+        await mode.search("问题")
+
+        assert llm.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_terminal_branch_stops_early(self):
+        llm = _FakeLLM(terminal="tcb")
+        mode = TreeOfThoughtMode({"max_depth": 5, "beam_width": 2}, llm_gateway=llm)
+
+        result = await mode.search("问题")
+
+        assert result.stop_reason == "terminal"
+        assert result.depth_reached == 2
+        assert result.best.path == ["tc", "tcb"]
+
+    @pytest.mark.asyncio
+    async def test_token_budget_cuts_off_search(self):
+        llm = _FakeLLM(tokens=100)
+        mode = TreeOfThoughtMode({"max_depth": 5, "max_tokens": 250}, llm_gateway=llm)
+
+        result = await mode.search("问题")
+
+        assert result.stop_reason == "token_budget"
+        assert result.depth_reached == 1
+        assert result.best.path == ["tc"]
+        # 第 1 层扩展、评估各用 100；第 2 层首个扩展预占剩余 50 后，其余扩展在预占时即停止
+        assert llm.expand_calls + llm.evaluate_calls == 3
+        assert result.tokens_used == 250
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_cannot_overshoot_budget(self):
+        llm = _FakeLLM(delay=0.01, tokens=None)
+        mode = TreeOfThoughtMode(
+            {"max_depth": 5, "beam_width": 3, "max_concurrency": 3, "max_tokens": 700},
+            llm_gateway=llm,
+        )
+
+        result = await mode.search("问题")
+
+        assert result.stop_reason == "token_budget"
+        assert result.tokens_used <= 700
+
+    @pytest.mark.asyncio
+    async def test_budget_stop_leaves_no_calls_in_flight(self):
+        llm = _FakeLLM(delay=[0.01, 0.05, 0.02, 0.04], tokens=100)
+        mode = TreeOfThoughtMode(
+            {"max_depth": 5, "beam_width": 3, "max_concurrency": 2, "max_tokens": 250},
+            llm_gateway=llm,
+        )
+
+        result = await mode.search("问题")
+        completed = llm.completed
+        await asyncio.sleep(0.1)
+
+        assert result.stop_reason == "token_budget"
+        assert llm.in_flight == 0
+        assert llm.completed == completed  # 返回后不再有调用完成
+        assert result.tokens_used <= 250
+
+    @pytest.mark.asyncio
+    async def test_time_limit_returns_best_so_far(self):
+        llm = _FakeLLM(delay=0.05)
+        mode = TreeOfThoughtMode({"max_depth": 10, "time_limit_seconds": 0.17}, llm_gateway=llm)
+
+        result = await mode.search("问题")
+
+        assert result.stop_reason == "time_limit"
+        assert 1 <= result.depth_reached < 10
+        assert result.best.path[0] == "tc"
+
+    @pytest.mark.asyncio
+    async def test_reason_uses_last_user_message(self):
+        llm = _FakeLLM(terminal="tc")
+        mode = TreeOfThoughtMode(llm_gateway=llm)
+        state = AgentState(session_id="s")
+        context = [Message(role=MessageRole.USER, content="怎么做？")]
+
+        result = await mode.reason(state, context, [])
+
+        assert result.plan == ["tc"]
+        assert result.confidence == pytest.approx(0.8)
+        assert state.total_tokens == 20
+
+    @pytest.mark.asyncio
+    async def test_reason_without_llm_keeps_stub(self):
+        result = await TreeOfThoughtMode().reason(AgentState(session_id="s"), [], [])
+
+        assert result.plan is None
+        assert result.confidence == 0.75
@@ -0,0 +1,155 @@
+"""WebSearchTool 上游访问：长连接复用、规范化查询缓存与 provider 并发上限（本地 stub 服务）。"""
+
+import asyncio
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from bootstrap.config import settings
+from domains.agent.infrastructure.tools import web_search_client
+from domains.agent.infrastructure.tools.search_tools import WebSearchTool
+
+
+class _StubSearchServer(ThreadingHTTPServer):
+    """模拟 DuckDuckGo Instant Answer API，记录请求、客户端端口与并发峰值。"""
+
+    daemon_threads = True
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.delay = delay
+        self.queries: list[str] = []
+        self.client_ports: set[int] = set()
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 支持 keep-alive
+    server: _StubSearchServer
+
+    def do_GET(self) -> None:
+        server = self.server
+        query = parse_qs(urlparse(self.path).query)["q"][0]
+        with server.lock:
+            server.queries.append(query)
+            server.client_ports.add(self.client_address[1])
+            server.in_flight += 1
+            server.peak = max(server.peak, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        body = json.dumps(
+            {
+                "Heading": query,
+                "Abstract": f"about {query}",
+                "AbstractURL": "https://example.com/",
+                "RelatedTopics": [],
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def _start(delay: float = 0.0) -> _StubSearchServer:
+    server = _StubSearchServer(delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def stub_server(monkeypatch: pytest.MonkeyPatch) -> Iterator[_StubSearchServer]:
+    server = _start()
+    monkeypatch.setattr(settings, "web_search_duckduckgo_url", server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+async def _reset_clients():
+    await web_search_client.close_web_search_clients()
+    yield
+    await web_search_client.close_web_search_clients()
+
+
+@pytest.mark.unit
+class TestWebSearchClient:
+    @pytest.mark.asyncio
+    async def test_connections_are_reused_across_searches(self, stub_server):
+        tool = WebSearchTool()
+
+        for query in ("alpha", "beta", "gamma"):
+            result = await tool.execute(query=query)
+            assert result.success, result.error
+            assert f"about {query}" in result.output
+
+        assert stub_server.queries == ["alpha", "beta", "gamma"]
+        assert len(stub_server.client_ports) == 1
+
+    @pytest.mark.asyncio
+    async def test_normalized_queries_share_cached_results(self, stub_server):
+        tool = WebSearchTool()
+
+        await tool.execute(query="Python  asyncio")
+        await tool.execute(query=" python asyncio ")
+        await tool.execute(query="python asyncio", num_results=3)  # 结果数不同，单独缓存
+
+        assert stub_server.queries == ["Python  asyncio", "python asyncio"]
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled_with_zero_ttl(self, stub_server, monkeypatch):
+        monkeypatch.setattr(settings, "web_search_cache_ttl_seconds", 0)
+        tool = WebSearchTool()
+
+        await tool.execute(query="same")
+        await tool.execute(query="same")
+
+        assert len(stub_server.queries) == 2
+
+    @pytest.mark.asyncio
+    async def test_parallel_calls_respect_provider_concurrency(self, monkeypatch):
+        server = _start(delay=0.05)
+        monkeypatch.setattr(settings, "web_search_duckduckgo_url", server.url)
+        monkeypatch.setattr(settings, "web_search_max_concurrency", 2)
+        tool = WebSearchTool()
+
+        try:
+            results = await asyncio.gather(*[tool.execute(query=f"q{i}") for i in range(6)])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert all(r.success for r in results)
+        assert len(server.queries) == 6
+        assert server.peak == 2
+
+    @pytest.mark.asyncio
+    async def test_close_releases_clients(self, stub_server):
+        await WebSearchTool().execute(query="x")
+        client = web_search_client._clients["duckduckgo"]
+
+        await web_search_client.close_web_search_clients()
+
+        assert client.is_closed
+        assert not web_search_client._clients
+
+    def test_normalize_query(self):
+        assert web_search_client.normalize_query("  Foo\tBAR  baz ") == "foo bar baz"
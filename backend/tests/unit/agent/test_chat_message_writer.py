@@ -0,0 +1,128 @@
+"""ChatMessageWriter：助手消息按窗口合并为一个后台事务批量落库。"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+import uuid
+
+import pytest
+
+from domains.agent.application import chat_message_writer as mod
+from domains.agent.application.chat_message_writer import ChatMessageWriter
+
+
+class _DummySessionCM:
+    def __init__(self, sessions: list[object]) -> None:
+        self._sessions = sessions
+
+    async def __aenter__(self) -> object:
+        db = object()
+        self._sessions.append(db)
+        return db
+
+    async def __aexit__(self, *args: object) -> None:
+        return None
+
+
+class _RecordingSessionUseCase:
+    def __init__(self, batches: list[list[Any]], *, fail: bool = False) -> None:
+        self._batches = batches
+        self._fail = fail
+
+    async def append_messages(self, messages: list[Any]) -> None:
+        if self._fail:
+            raise RuntimeError("db down")
+        if any(m.content == "poison" for m in messages):
+            raise ValueError("constraint violation")
+        self._batches.append(list(messages))
+
+
+def _writer(
+    monkeypatch: pytest.MonkeyPatch,
+    batches: list[list[Any]],
+    sessions: list[object],
+    *,
+    interval: float = 60.0,
+    fail: bool = False,
+    **kwargs: Any,
+) -> ChatMessageWriter:
+    monkeypatch.setattr(mod, "get_session_context", lambda: _DummySessionCM(sessions))
+    return ChatMessageWriter(
+        lambda _db: _RecordingSessionUseCase(batches, fail=fail),
+        interval_seconds=lambda: interval,
+        max_pending=lambda: 64,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_messages_for_many_sessions_share_one_transaction(monkeypatch) -> None:
+    batches: list[list[Any]] = []
+    sessions: list[object] = []
+    writer = _writer(monkeypatch, batches, sessions)
+    sid_a, sid_b = str(uuid.uuid4()), str(uuid.uuid4())
+
+    writer.enqueue(sid_a, role="assistant", content="a1", metadata={"k": 1}, token_count=3)
+    writer.enqueue(sid_b, role="assistant", content="b1")
+    writer.enqueue(sid_a, role="assistant", content="a2")
+    await writer.aclose()
+
+    assert len(sessions) == 1 and len(batches) == 1
+    by_content = {m.content: m for m in batches[0]}
+    assert set(by_content) == {"a1", "a2", "b1"}
+    assert by_content["a1"].metadata == {"k": 1} and by_content["a1"].token_count == 3
+    # created_at 在入队时固定：同会话内保持入队顺序
+    assert by_content["a1"].created_at <= by_content["a2"].created_at
+    assert by_content["b1"].session_id == uuid.UUID(sid_b)
+
+
+@pytest.mark.asyncio
+async def test_interval_window_flushes_in_background(monkeypatch) -> None:
+    batches: list[list[Any]] = []
+    writer = _writer(monkeypatch, batches, [], interval=0.01)
+
+    writer.enqueue(str(uuid.uuid4()), role="assistant", content="hello")
+    for _ in range(100):
+        if batches:
+            break
+        await asyncio.sleep(0.01)
+
+    assert [m.content for m in batches[0]] == ["hello"]
+    await writer.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_messages_for_retry(monkeypatch) -> None:
+    batches: list[list[Any]] = []
+    sessions: list[object] = []
+    writer = _writer(monkeypatch, batches, sessions, fail=True)
+    sid = str(uuid.uuid4())
+    writer.enqueue(sid, role="assistant", content="keep me")
+
+    await writer.flush_now()
+    assert batches == []
+
+    writer._session_use_case_factory = lambda _db: _RecordingSessionUseCase(batches)
+    await writer.flush_now()
+    assert [m.content for m in batches[0]] == ["keep me"]
+
+
+@pytest.mark.asyncio
+async def test_poison_message_is_isolated_then_dropped(monkeypatch) -> None:
+    batches: list[list[Any]] = []
+    writer = _writer(monkeypatch, batches, [], max_attempts=3, retry_backoff_seconds=0)
+    sid_bad, sid_good = str(uuid.uuid4()), str(uuid.uuid4())
+    writer.enqueue(sid_bad, role="assistant", content="poison")
+    writer.enqueue(sid_bad, role="assistant", content="same session")
+    writer.enqueue(sid_good, role="assistant", content="fine")
+
+    # 批量失败后逐会话拆开：其他会话不受阻塞
+    await writer.flush_now()
+    assert [[m.content for m in b] for b in batches] == [["fine"]]
+
+    # 坏会话重试耗尽后逐条写入，仅丢弃坏消息
+    await writer.flush_now()
+    await writer.flush_now()
+    assert [m.content for b in batches for m in b] == ["fine", "same session"]
+    assert not writer._flusher._pending
@@ -214,6 +214,64 @@ class TestSessionUseCase:
         finally:
             clear_permission_context()
 
+    @pytest.mark.asyncio
+    async def test_add_message_updates_counts_and_keeps_metadata(self, db_session):
+        """Test: add_message bumps session counters in one UPDATE and stores metadata."""
+        user = await self._create_test_user(db_session)
+        ctx = await self._permission_ctx_for_user(db_session, user)
+        set_permission_context(ctx)
+        try:
+            use_case = SessionUseCase(db_session, message_service=MessageUseCase(db_session))
+            session = await use_case.create_session(user_id=str(user.id), title="Counts")
+
+            await use_case.add_message(
+                session_id=str(session.id),
+                role="user",
+                content="hi",
+                metadata={"creative_mode": "chat"},
+                token_count=5,
+            )
+
+            assert session.message_count == 1
+            assert session.token_count == 5
+            messages = await use_case.get_messages(str(session.id))
+            assert messages[0].extra_data == {"creative_mode": "chat"}
+
+            with pytest.raises(NotFoundError):
+                await use_case.add_message(session_id=str(uuid.uuid4()), role="user", content="x")
+        finally:
+            clear_permission_context()
+
+    @pytest.mark.asyncio
+    async def test_append_messages_batches_rows_and_counts(self, db_session):
+        """Test: append_messages inserts all rows and aggregates counters per session."""
+        from domains.agent.domain.interfaces.message_repository import NewMessage
+
+        user = await self._create_test_user(db_session)
+        ctx = await self._permission_ctx_for_user(db_session, user)
+        set_permission_context(ctx)
+        try:
+            use_case = SessionUseCase(db_session, message_service=MessageUseCase(db_session))
+            first = await use_case.create_session(user_id=str(user.id), title="A")
+            second = await use_case.create_session(user_id=str(user.id), title="B")
+
+            await use_case.append_messages(
+                [
+                    NewMessage(session_id=first.id, role="assistant", content="a1", token_count=2),
+                    NewMessage(session_id=first.id, role="assistant", content="a2", token_count=3),
+                    NewMessage(session_id=second.id, role="assistant", content="b1"),
+                ]
+            )
+
+            await db_session.refresh(first)
+            await db_session.refresh(second)
+            assert (first.message_count, first.token_count) == (2, 5)
+            assert second.message_count == 1
+            contents = sorted(m.content for m in await use_case.get_messages(str(first.id)))
+            assert contents == ["a1", "a2"]
+        finally:
+            clear_permission_context()
+
     @pytest.mark.asyncio
     async def test_get_messages(self, db_session):
         """Test: Get session messages."""
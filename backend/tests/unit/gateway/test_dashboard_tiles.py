@@ -0,0 +1,233 @@
+"""Dashboard 分片：同键合并、已完成 / 未完成分片缓存、冷热段并发与 margin 分段。"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+import uuid
+
+import pytest
+
+from domains.gateway.application.usage.management import dashboard_tiles, usage_reads
+from domains.gateway.application.usage.management.dashboard_tiles import (
+    DashboardTile,
+    DashboardTileRunner,
+    UsageReadRepos,
+    clear_all_local_dashboard_tiles_for_tests,
+    decode_tile_value,
+    encode_tile_value,
+)
+from domains.gateway.application.usage.management.usage_metrics_router import UsageMetricsRouter
+from domains.gateway.application.usage.management.usage_reads import (
+    GatewayPlanUsageReadService,
+    MarginTileRow,
+)
+from domains.gateway.domain.usage.usage_axis import UsageAxis
+from domains.gateway.infrastructure.repositories.request_log_repository import (
+    RequestLogUsageAggregateRow,
+    RequestLogUsageTotals,
+)
+
+TEAM = uuid.uuid4()
+WATERMARK = datetime(2026, 3, 10, 12, tzinfo=UTC)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache(monkeypatch: pytest.MonkeyPatch) -> Any:
+    clear_all_local_dashboard_tiles_for_tests()
+    monkeypatch.setattr(dashboard_tiles, "_get_redis_client", AsyncMock(return_value=None))
+    yield
+    clear_all_local_dashboard_tiles_for_tests()
+
+
+@asynccontextmanager
+async def _fake_session() -> Any:
+    yield MagicMock()
+
+
+def _runner(concurrency: int = 4) -> DashboardTileRunner:
+    runner = DashboardTileRunner(session_scope=_fake_session, concurrency=concurrency)
+    runner.watermark = AsyncMock(return_value=WATERMARK)  # type: ignore[method-assign]
+    return runner
+
+
+def test_codec_round_trip_returns_equal_values() -> None:
+    value = (
+        [RequestLogUsageAggregateRow(group_key=TEAM, label_snapshot="a", requests=3)],
+        RequestLogUsageTotals(3, 3, 0, 10, 5, 0, 0, Decimal("0.125"), 12.5, 3.0, 1),
+        {"total": 3, "cost_usd": Decimal("1.50"), "by_client_type": [{"client_type": "cli"}]},
+    )
+    assert decode_tile_value(encode_tile_value(value)) == value
+
+
+def test_completed_tiles_need_hour_aligned_range_before_watermark() -> None:
+    body = DashboardTile("k", (TEAM,), WATERMARK - timedelta(hours=5), WATERMARK)
+    assert body.is_completed(WATERMARK)
+    # 含端 end（整点前 1µs）同样视为整点
+    assert DashboardTile(
+        "k", (TEAM,), WATERMARK - timedelta(hours=5), WATERMARK - timedelta(microseconds=1)
+    ).is_completed(WATERMARK)
+    assert not body.is_completed(WATERMARK - timedelta(hours=1))
+    assert not body.is_completed(None)
+    sliding = DashboardTile("k", (TEAM,), WATERMARK - timedelta(hours=5, seconds=7), WATERMARK)
+    assert not sliding.is_completed(WATERMARK)
+
+    # 未完成分片：键内时间按 open TTL 取整，同一粒度内的刷新共享一份
+    now = datetime(2026, 3, 10, 13, 0, 1, tzinfo=UTC)
+    a = DashboardTile("k", (TEAM,), WATERMARK, now)
+    b = DashboardTile("k", (TEAM,), WATERMARK, now + timedelta(seconds=5))
+    c = DashboardTile("k", (TEAM,), WATERMARK, now + timedelta(seconds=30))
+    key = a.cache_key(completed=False, open_ttl_seconds=15)
+    assert key == b.cache_key(completed=False, open_ttl_seconds=15)
+    assert key != c.cache_key(completed=False, open_ttl_seconds=15)
+    assert key != DashboardTile("k", (uuid.uuid4(),), WATERMARK, now).cache_key(
+        completed=False, open_ttl_seconds=15
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_viewers_share_one_computation() -> None:
+    calls = 0
+    release = asyncio.Event()
+
+    async def compute(_repos: UsageReadRepos) -> dict[str, Any]:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"total": 7, "cost_usd": Decimal("0.5")}
+
+    tile = DashboardTile("summary", (TEAM,), WATERMARK - timedelta(hours=24), WATERMARK)
+    viewers = [asyncio.create_task(_runner().run(tile, compute)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*viewers)
+
+    assert calls == 1
+    assert all(r == {"total": 7, "cost_usd": Decimal("0.5")} for r in results)
+    # 每个调用方拿到独立副本
+    results[0]["total"] = 0
+    assert results[1]["total"] == 7
+
+    # 已完成分片再次读取命中缓存
+    assert (await _runner().run(tile, compute))["total"] == 7
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_leader_does_not_fail_followers() -> None:
+    release = asyncio.Event()
+
+    async def compute(_repos: UsageReadRepos) -> int:
+        await release.wait()
+        return 42
+
+    tile = DashboardTile("count", (TEAM,), WATERMARK, WATERMARK + timedelta(minutes=30))
+    leader = asyncio.create_task(_runner().run(tile, compute))
+    follower = asyncio.create_task(_runner().run(tile, compute))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+
+    assert await follower == 42
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+
+
+@pytest.mark.asyncio
+async def test_router_runs_cold_and_hot_segments_concurrently() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def segment(result: Any) -> Any:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return result
+
+    summary = {
+        "total": 1,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cached_tokens": 0,
+        "cache_creation_tokens": 0,
+        "cost_usd": Decimal("0"),
+        "success": 1,
+        "failure": 0,
+        "avg_latency_ms": 0.0,
+        "avg_ttfb_ms": 0.0,
+    }
+
+    async def summary_segment(*_args: Any, **_kwargs: Any) -> dict[str, Any]:
+        return await segment(dict(summary))
+
+    async def client_type_segment(*_args: Any, **_kwargs: Any) -> list[dict[str, Any]]:
+        return await segment([])
+
+    logs, hourly = MagicMock(), MagicMock()
+    logs.aggregate_summary_by_axis = summary_segment
+    logs.aggregate_by_client_type = client_type_segment
+    hourly.aggregate_summary_by_axis = summary_segment
+
+    router = UsageMetricsRouter(MagicMock(), MagicMock(), tiles=_runner())
+    now = datetime(2026, 3, 10, 13, 20, tzinfo=UTC)
+    with (
+        patch.object(
+            UsageReadRepos,
+            "for_session",
+            return_value=UsageReadRepos(MagicMock(), logs, hourly),
+        ),
+        patch(
+            "domains.gateway.application.usage.management.usage_metrics_router.compute_hot_cutoff",
+            return_value=WATERMARK,
+        ),
+    ):
+        merged = await router.aggregate_summary(
+            UsageAxis.workspace(TEAM), now - timedelta(days=1), now
+        )
+
+    assert merged["total"] == 2
+    # hourly 冷段 + 热段 summary + 热段 client_type 同时在途
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_margin_splits_body_and_edges_and_merges_groups(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    segments: list[tuple[datetime, datetime, bool]] = []
+    cred = uuid.uuid4()
+
+    async def fake_rows(
+        _session: Any,
+        _team_id: uuid.UUID,
+        _group_by: str,
+        start: datetime,
+        end: datetime,
+        *,
+        end_inclusive: bool = True,
+    ) -> list[MarginTileRow]:
+        segments.append((start, end, end_inclusive))
+        return [MarginTileRow(group_key=cred, cost_usd=Decimal("1"), credential_name_snapshot="c")]
+
+    monkeypatch.setattr(usage_reads, "_margin_rows", fake_rows)
+    start = datetime(2026, 3, 1, 8, 15, tzinfo=UTC)
+    end = datetime(2026, 3, 10, 13, 20, tzinfo=UTC)
+
+    rows = await GatewayPlanUsageReadService._margin_rows_tiled(
+        _runner(), TEAM, "credential", start, end
+    )
+
+    assert sorted(segments) == [
+        (start, datetime(2026, 3, 1, 9, tzinfo=UTC), False),
+        (datetime(2026, 3, 1, 9, tzinfo=UTC), datetime(2026, 3, 10, 13, tzinfo=UTC), False),
+        (datetime(2026, 3, 10, 13, tzinfo=UTC), end, True),
+    ]
+    assert rows == [
+        MarginTileRow(group_key=cred, cost_usd=Decimal("3"), credential_name_snapshot="c")
+    ]
@@ -0,0 +1,234 @@
+"""按路由选路策略：EWMA picker、routing_groups 分组与 LiteLLM 自定义策略接管。"""
+
+from __future__ import annotations
+
+import logging
+import random
+from typing import Any
+
+import pytest
+
+from domains.gateway.domain.route.ewma_deployment_picker import (
+    DeploymentLatencyStats,
+    pick_deployment_by_predicted_latency,
+    predicted_latency_ms,
+    update_stats,
+)
+from domains.gateway.domain.route.route_routing_strategy import (
+    litellm_routing_strategy,
+    native_strategy_model_names,
+    routing_groups_for_strategies,
+)
+from domains.gateway.infrastructure.litellm.deployment_latency_stats import (
+    DeploymentLatencyStatsStore,
+)
+from domains.gateway.infrastructure.litellm.router_singleton import (
+    _apply_route_strategies,
+    _resolve_strategy,
+    router_supports_routing_groups,
+)
+
+
+def _dep(
+    dep_id: str, *, model_name: str = "gw/route", weight: int = 1, strategy: str | None = None
+):
+    return {
+        "model_name": model_name,
+        "litellm_params": {"model": f"openai/{dep_id}", "api_key": "sk-test", "weight": weight},
+        "model_info": {"id": dep_id, "gateway_routing_strategy": strategy},
+    }
+
+
+def _share(picks: list[dict[str, Any]], dep_id: str) -> float:
+    return sum(1 for p in picks if p["model_info"]["id"] == dep_id) / len(picks)
+
+
+def test_update_stats_tracks_ewma_and_error_rate() -> None:
+    stats = update_stats(None, ttfb_ms=100, tokens_per_sec=50, failed=False)
+    assert (stats.ttfb_ms, stats.tokens_per_sec, stats.error_rate, stats.samples) == (
+        100,
+        50,
+        0.0,
+        1,
+    )
+
+    stats = update_stats(stats, ttfb_ms=None, tokens_per_sec=None, failed=True, alpha=0.5)
+    assert stats.ttfb_ms == 100
+    assert stats.error_rate == pytest.approx(0.5)
+    assert predicted_latency_ms(stats) == pytest.approx((100 + 256 / 50 * 1000) / 0.5)
+
+
+def test_picker_shifts_traffic_away_from_slow_deployment() -> None:
+    deployments = [_dep("fast"), _dep("slow")]
+    stats = {
+        "fast": DeploymentLatencyStats(ttfb_ms=100, tokens_per_sec=100, samples=10),
+        "slow": DeploymentLatencyStats(ttfb_ms=900, tokens_per_sec=20, samples=10),
+    }
+    rng = random.Random(7)
+
+    picks = [pick_deployment_by_predicted_latency(deployments, stats, rng=rng) for _ in range(2000)]
+
+    assert _share(picks, "fast") > 0.8
+
+
+def test_picker_explores_unknown_deployment_optimistically_and_keeps_weight() -> None:
+    deployments = [_dep("known"), _dep("new", weight=3)]
+    stats = {"known": DeploymentLatencyStats(ttfb_ms=200, samples=5)}
+    rng = random.Random(1)
+
+    picks = [pick_deployment_by_predicted_latency(deployments, stats, rng=rng) for _ in range(4000)]
+
+    assert _share(picks, "new") == pytest.approx(0.75, abs=0.05)
+
+
+def test_routing_groups_partition_route_strategies() -> None:
+    strategies = {
+        "gw/t/a/cheap": "cost-based-routing",
+        "gw/t/b/cheap": "cost-based-routing",
+        "gw/t/a/busy": "least-busy",
+        "gw/t/a/weighted": "weighted-pick",
+        "gw/t/a/fast": "ewma-latency",
+    }
+
+    assert routing_groups_for_strategies(strategies) == [
+        {
+            "group_name": "gw-cost-based-routing",
+            "models": ["gw/t/a/cheap", "gw/t/b/cheap"],
+            "routing_strategy": "cost-based-routing",
+        },
+        {
+            "group_name": "gw-least-busy",
+            "models": ["gw/t/a/busy"],
+            "routing_strategy": "least-busy",
+        },
+    ]
+    assert native_strategy_model_names(strategies) == {"gw/t/a/fast": "ewma-latency"}
+    assert litellm_routing_strategy("ewma-latency") == "simple-shuffle"
+    assert _resolve_strategy(strategies.values()) == "cost-based-routing"
+    assert _resolve_strategy([]) == "simple-shuffle"
+
+
+class _FakeStatsStore:
+    def __init__(self, stats: dict[str, DeploymentLatencyStats]) -> None:
+        self.stats = stats
+        self.requested: list[list[str]] = []
+
+    async def get_many(self, ids: list[str]) -> dict[str, DeploymentLatencyStats]:
+        self.requested.append(ids)
+        return {i: self.stats[i] for i in ids if i in self.stats}
+
+
+@pytest.mark.asyncio
+async def test_litellm_router_uses_ewma_only_for_ewma_routes(monkeypatch) -> None:
+    from litellm.router import Router
+
+    from domains.gateway.infrastructure.litellm import gateway_routing_strategy
+
+    model_list = [
+        _dep("fast", model_name="gw/ewma", strategy="ewma-latency"),
+        _dep("slow", model_name="gw/ewma", strategy="ewma-latency"),
+        _dep("c1", model_name="gw/busy", strategy="least-busy"),
+        _dep("plain", model_name="gw/plain"),
+    ]
+    store = _FakeStatsStore(
+        {
+            "fast": DeploymentLatencyStats(ttfb_ms=50, tokens_per_sec=200, samples=10),
+            "slow": DeploymentLatencyStats(
+                ttfb_ms=5000, tokens_per_sec=5, error_rate=0.9, samples=10
+            ),
+        }
+    )
+    monkeypatch.setattr(
+        gateway_routing_strategy, "get_deployment_latency_stats_store", lambda: store
+    )
+    router = Router(model_list=model_list)
+
+    _apply_route_strategies(router, model_list)
+
+    if router_supports_routing_groups(Router):
+        assert router.get_settings()["routing_groups"][0]["models"] == ["gw/busy"]
+    picks = [
+        await router.async_get_available_deployment(model="gw/ewma", request_kwargs={})
+        for _ in range(50)
+    ]
+    assert _share(picks, "fast") > 0.9
+    plain = await router.async_get_available_deployment(model="gw/plain", request_kwargs={})
+    assert plain["model_info"]["id"] == "plain"
+    assert all(ids and set(ids) <= {"fast", "slow"} for ids in store.requested)
+
+    # 重复应用（热重载）：不重复包裹，分组不变时不重建
+    _apply_route_strategies(router, model_list)
+    picked = await router.async_get_available_deployment(model="gw/busy", request_kwargs={})
+    assert picked["model_info"]["id"] == "c1"
+
+
+@pytest.mark.asyncio
+async def test_router_without_routing_groups_warns_for_unhonoured_routes(
+    monkeypatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    from litellm.router import Router
+
+    from domains.gateway.infrastructure.litellm import gateway_routing_strategy
+
+    class _PinnedRouter(Router):
+        """模拟锁定版本（litellm 1.83.x）：构造参数中没有 ``routing_groups``。"""
+
+        def __init__(self, model_list: list[dict[str, Any]], routing_strategy: str) -> None:
+            super().__init__(model_list=model_list, routing_strategy=routing_strategy)
+
+    model_list = [
+        _dep("b1", model_name="gw/busy", strategy="least-busy"),
+        _dep("b2", model_name="gw/busy2", strategy="least-busy"),
+        _dep("c1", model_name="gw/cheap", strategy="cost-based-routing"),
+        _dep("fast", model_name="gw/ewma", strategy="ewma-latency"),
+        _dep("slow", model_name="gw/ewma", strategy="ewma-latency"),
+    ]
+    store = _FakeStatsStore(
+        {
+            "fast": DeploymentLatencyStats(ttfb_ms=50, tokens_per_sec=200, samples=10),
+            "slow": DeploymentLatencyStats(
+                ttfb_ms=5000, tokens_per_sec=5, error_rate=0.9, samples=10
+            ),
+        }
+    )
+    monkeypatch.setattr(
+        gateway_routing_strategy, "get_deployment_latency_stats_store", lambda: store
+    )
+    router = _PinnedRouter(model_list, routing_strategy="least-busy")
+    update_calls: list[dict[str, Any]] = []
+    monkeypatch.setattr(router, "update_settings", lambda **kw: update_calls.append(kw))
+
+    assert not router_supports_routing_groups(_PinnedRouter)
+    with caplog.at_level(
+        logging.WARNING, logger="domains.gateway.infrastructure.litellm.router_singleton"
+    ):
+        _apply_route_strategies(router, model_list)
+
+    assert update_calls == []
+    unhonoured = [r.getMessage() for r in caplog.records if "cannot be honoured" in r.getMessage()]
+    assert len(unhonoured) == 1
+    assert "cost-based-routing for gw/cheap" in unhonoured[0]
+    assert router.routing_strategy == "least-busy"
+    # 网关原生策略不依赖 routing_groups，仍按路由生效
+    picks = [
+        await router.async_get_available_deployment(model="gw/ewma", request_kwargs={})
+        for _ in range(50)
+    ]
+    assert _share(picks, "fast") > 0.9
+
+
+@pytest.mark.asyncio
+async def test_stats_store_falls_back_to_local_when_redis_unavailable() -> None:
+    async def _no_redis() -> Any:
+        raise ConnectionError("redis down")
+
+    store = DeploymentLatencyStatsStore(redis_client_factory=_no_redis)
+
+    await store.record("d1", ttfb_ms=120, tokens_per_sec=40, failed=False)
+    await store.record("d1", ttfb_ms=None, tokens_per_sec=None, failed=True)
+    stats = await store.get_many(["d1", "d2"])
+
+    assert set(stats) == {"d1"}
+    assert stats["d1"].ttfb_ms == 120
+    assert stats["d1"].samples == 2
+    assert stats["d1"].error_rate > 0
@@ -10,7 +10,7 @@ import pytest
 
 from domains.gateway.application.observability import gateway_alert_job as job_module
 from domains.gateway.domain.alert.alert_evaluation import AlertEvaluationResult
-from domains.gateway.domain.alert.alert_metric_aggregates import AlertMetricAggregates
+from domains.gateway.domain.alert.alert_metric_aggregates import AlertWindowTotals
 from domains.gateway.domain.alert.alert_rule_snapshot import AlertRuleSnapshot
 
 
@@ -34,12 +34,7 @@ async def test_run_gateway_alert_cycle_webhook_after_commit() -> None:
 
     eval_result = AlertEvaluationResult(triggered=True, value=0.9)
 
-    aggregates = AlertMetricAggregates(
-        metric="error_rate",
-        total_count=10,
-        error_count=9,
-        window_minutes=5,
-    )
+    totals = {tenant_id: AlertWindowTotals(total_count=10, error_count=9)}
 
     call_order: list[str] = []
 
@@ -49,7 +44,7 @@ async def test_run_gateway_alert_cycle_webhook_after_commit() -> None:
 
     mock_repo.list_all_enabled_rules = AsyncMock(return_value=[snapshot])
 
-    mock_repo.fetch_rule_metric_aggregates = AsyncMock(return_value=aggregates)
+    mock_repo.aggregate_log_window_totals = AsyncMock(return_value=totals)
 
     async def record_trigger(*_args: object, **_kwargs: object) -> dict[str, str]:
         call_order.append("record")
@@ -58,11 +53,13 @@ async def test_run_gateway_alert_cycle_webhook_after_commit() -> None:
 
     mock_repo.record_trigger = AsyncMock(side_effect=record_trigger)
 
-    async def fake_webhook(url: str, payload: dict[str, str]) -> None:
+    async def fake_webhook(_client: object, url: str, payload: dict[str, str]) -> bool:
         call_order.append("webhook")
 
         assert url == "https://example.com/hook"
 
+        return True
+
     def make_ctx(*_args: object, **_kwargs: object) -> MagicMock:
         nonlocal session_count
 
@@ -81,8 +78,161 @@ async def test_run_gateway_alert_cycle_webhook_after_commit() -> None:
         patch.object(job_module, "GatewayAlertRepository", return_value=mock_repo),
         patch.object(job_module, "_send_webhook", side_effect=fake_webhook),
     ):
-        await job_module.run_gateway_alert_cycle()
+        report = await job_module.run_gateway_alert_cycle()
 
     assert session_count == 2
 
     assert call_order == ["record", "webhook"]
+
+    assert report.triggered == 1
+    assert report.webhooks_sent == 1
+
+
+def _snapshot(
+    *, metric: str, window_minutes: int, tenant_id: uuid.UUID | None
+) -> AlertRuleSnapshot:
+    return AlertRuleSnapshot(
+        rule_id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        is_system=tenant_id is None,
+        name=f"{metric}-{window_minutes}",
+        metric=metric,
+        threshold=Decimal("1"),
+        window_minutes=window_minutes,
+        channels={},
+        last_triggered_at=None,
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_aggregates_batch_one_query_per_window() -> None:
+    t1, t2 = uuid.uuid4(), uuid.uuid4()
+    rules = [
+        _snapshot(metric="error_rate", window_minutes=5, tenant_id=t1),
+        _snapshot(metric="request_rate", window_minutes=5, tenant_id=t2),
+        _snapshot(metric="budget_usage", window_minutes=5, tenant_id=None),
+        _snapshot(metric="latency_p95", window_minutes=15, tenant_id=t1),
+    ]
+    repo = MagicMock()
+    repo.aggregate_log_window_totals = AsyncMock(
+        side_effect=[
+            {
+                t1: AlertWindowTotals(total_count=4, error_count=1),
+                None: AlertWindowTotals(total_count=9, cost_sum=2.5),
+            },
+            {t1: AlertWindowTotals(total_count=3, latency_p95_ms=800.0)},
+        ]
+    )
+    repo.aggregate_hourly_window_totals = AsyncMock()
+
+    from datetime import UTC, datetime
+
+    out = await job_module._fetch_aggregates_batch(repo, rules, datetime.now(UTC))
+
+    assert repo.aggregate_log_window_totals.await_count == 2
+    repo.aggregate_hourly_window_totals.assert_not_awaited()
+    first_kwargs = repo.aggregate_log_window_totals.await_args_list[0].kwargs
+    assert first_kwargs["tenant_ids"] == {t1, t2}
+    assert first_kwargs["include_global"] is True
+    assert first_kwargs["with_p95"] is False
+    assert repo.aggregate_log_window_totals.await_args_list[1].kwargs["with_p95"] is True
+
+    assert out[rules[0].rule_id].error_count == 1
+    assert out[rules[1].rule_id].request_count == 0  # t2 无数据 → 空聚合
+    assert out[rules[2].rule_id].cost_sum == 2.5
+    assert out[rules[3].rule_id].latency_p95_ms == 800.0
+
+
+@pytest.mark.asyncio
+async def test_fetch_aggregates_batch_stitches_hourly_for_long_windows() -> None:
+    from datetime import UTC, datetime
+
+    tenant_id = uuid.uuid4()
+    rule = _snapshot(metric="budget_usage", window_minutes=24 * 60, tenant_id=tenant_id)
+    repo = MagicMock()
+    repo.aggregate_log_window_totals = AsyncMock(
+        return_value={tenant_id: AlertWindowTotals(total_count=2, cost_sum=1.0)}
+    )
+    repo.aggregate_hourly_window_totals = AsyncMock(
+        return_value={tenant_id: AlertWindowTotals(total_count=20, cost_sum=10.0)}
+    )
+    now = datetime(2026, 1, 2, 12, 30, tzinfo=UTC)
+
+    with patch.object(job_module.settings, "gateway_metrics_hybrid_read_enabled", True):
+        out = await job_module._fetch_aggregates_batch(repo, [rule], now)
+
+    cold_start, cold_end = repo.aggregate_hourly_window_totals.await_args.args
+    assert cold_start == datetime(2026, 1, 1, 13, 0, tzinfo=UTC)
+    assert cold_end <= datetime(2026, 1, 2, 12, 0, tzinfo=UTC)
+    assert repo.aggregate_log_window_totals.await_args.kwargs["exclude_range"] == (
+        cold_start,
+        cold_end,
+    )
+    assert out[rule.rule_id].cost_sum == 11.0
+
+
+@pytest.mark.asyncio
+async def test_send_webhook_retries_server_errors() -> None:
+    import httpx
+
+    statuses = iter([503, 500, 200])
+    seen: list[int] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses)
+        seen.append(status)
+        return httpx.Response(status)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        with (
+            patch.object(job_module.settings, "gateway_alert_webhook_max_attempts", 3),
+            patch.object(job_module.settings, "gateway_alert_webhook_retry_backoff_seconds", 0),
+        ):
+            ok = await job_module._send_webhook(client, "https://example.com/h", {"a": 1})
+
+    assert ok is True
+    assert seen == [503, 500, 200]
+
+
+@pytest.mark.asyncio
+async def test_send_webhook_does_not_retry_client_errors() -> None:
+    import httpx
+
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(404)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        ok = await job_module._send_webhook(client, "https://example.com/h", {})
+
+    assert ok is False
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_deliver_webhooks_bounded_concurrency() -> None:
+    import asyncio
+
+    in_flight = 0
+    peak = 0
+
+    async def fake_send(_client: object, _url: str, _payload: dict[str, object]) -> bool:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return True
+
+    queue = [(f"https://example.com/{i}", {}) for i in range(10)]
+    with (
+        patch.object(job_module, "_send_webhook", side_effect=fake_send),
+        patch.object(job_module.settings, "gateway_alert_webhook_concurrency", 3),
+    ):
+        sent, failed = await job_module._deliver_webhooks(queue)
+
+    assert (sent, failed) == (10, 0)
+    assert 1 < peak <= 3
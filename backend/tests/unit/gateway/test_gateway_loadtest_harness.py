@@ -0,0 +1,131 @@
+"""scripts.gateway_loadtest：假上游协议形状与报告统计单测"""
+
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from scripts.gateway_loadtest.fake_upstream import FakeUpstreamConfig, create_fake_upstream_app
+from scripts.gateway_loadtest.report import (
+    RequestSample,
+    build_report,
+    compare_reports,
+    parse_prometheus_text,
+    parse_timing_header,
+    percentile,
+)
+
+
+def _client(config: FakeUpstreamConfig) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=create_fake_upstream_app(config, seed=1))
+    return httpx.AsyncClient(transport=transport, base_url="http://upstream")
+
+
+@pytest.mark.asyncio
+async def test_fake_upstream_non_stream_returns_openai_shape() -> None:
+    async with _client(FakeUpstreamConfig(latency_ms=0, stream_chunks=3, chunk_chars=2)) as client:
+        response = await client.post(
+            "/v1/chat/completions",
+            json={"model": "m", "messages": [{"role": "user", "content": "hello world!"}]},
+        )
+
+    body = response.json()
+    assert response.status_code == 200
+    assert body["choices"][0]["message"]["content"] == "xxxxxx"
+    assert body["usage"] == {"prompt_tokens": 3, "completion_tokens": 12, "total_tokens": 15}
+
+
+@pytest.mark.asyncio
+async def test_fake_upstream_stream_emits_chunks_usage_and_done() -> None:
+    config = FakeUpstreamConfig(latency_ms=0, stream_chunks=4, chunk_interval_ms=0)
+    async with _client(config) as client:
+        response = await client.post(
+            "/v1/chat/completions",
+            json={"model": "m", "stream": True, "messages": [{"role": "user", "content": "hi"}]},
+        )
+
+    events = [line[6:] for line in response.text.split("\n\n") if line.startswith("data: ")]
+    assert events[-1] == "[DONE]"
+    chunks = [json.loads(e) for e in events[:-1]]
+    assert len(chunks) == 1 + 4 + 1
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+    assert chunks[-1]["usage"]["completion_tokens"] == 16
+
+
+@pytest.mark.asyncio
+async def test_fake_upstream_injects_errors() -> None:
+    async with _client(FakeUpstreamConfig(latency_ms=0, error_rate=1.0)) as client:
+        response = await client.post("/v1/chat/completions", json={"messages": []})
+
+    assert response.status_code == 500
+
+
+def test_parse_timing_header_maps_stage_names() -> None:
+    assert parse_timing_header("guard=3;meta=5;direct=1;upstream=40;bogus=9;meta") == {
+        "guard_ms": 3,
+        "metadata_ms": 5,
+        "direct_decide_ms": 1,
+        "upstream_ms": 40,
+    }
+    assert parse_timing_header(None) == {}
+
+
+def test_percentile_interpolates() -> None:
+    assert percentile([], 50) == 0.0
+    assert percentile([10, 20, 30, 40], 50) == pytest.approx(25.0)
+    assert percentile(range(1, 101), 99) == pytest.approx(99.01)
+
+
+def test_build_report_derives_per_request_ops_from_metrics_delta() -> None:
+    before = parse_prometheus_text(
+        "# TYPE db_statements_total counter\n"
+        'db_statements_total{pool="main"} 100\n'
+        'redis_command_duration_ms_count{command="GET"} 10\n'
+    )
+    after = parse_prometheus_text(
+        'db_statements_total{pool="main"} 130\n'
+        'db_statements_total{pool="background"} 10\n'
+        'redis_command_duration_ms_count{command="GET"} 30\n'
+        'redis_command_duration_ms_count{command="INCRBY"} 20\n'
+    )
+    samples = [
+        RequestSample(ok=True, status=200, latency_ms=float(i), stages={"guard_ms": i})
+        for i in range(1, 10)
+    ] + [RequestSample(ok=False, status=502, latency_ms=1.0)]
+
+    report = build_report(
+        samples, wall_seconds=2.0, metrics_before=before, metrics_after=after, meta={"commit": "x"}
+    )
+
+    assert report["ok"] == 9
+    assert report["errors"] == {"502": 1}
+    assert report["throughput_rps"] == 4.5
+    assert report["latency_ms"]["p50"] == 5.0
+    assert report["stages_ms"]["guard_ms"]["max"] == 9
+    assert report["per_request"] == {
+        "db_statements": 4.0,
+        "db_checkouts": 0.0,
+        "redis_commands": 4.0,
+    }
+
+
+def test_compare_reports_flags_latency_and_throughput_regressions() -> None:
+    baseline = {
+        "throughput_rps": 100.0,
+        "latency_ms": {"p50": 10.0, "p95": 20.0, "p99": 30.0},
+        "per_request": {"db_statements": 4.0, "redis_commands": 6.0},
+    }
+    current = {
+        "throughput_rps": 80.0,
+        "latency_ms": {"p50": 10.5, "p95": 25.0, "p99": 30.0},
+        "per_request": {"db_statements": 6.0, "redis_commands": 6.0},
+    }
+
+    regressions = compare_reports(baseline, current, tolerance=0.10)
+
+    assert any(r.startswith("latency_ms.p95") for r in regressions)
+    assert any(r.startswith("per_request.db_statements") for r in regressions)
+    assert any(r.startswith("throughput_rps") for r in regressions)
+    assert not any(r.startswith("latency_ms.p50") for r in regressions)
@@ -9,10 +9,12 @@ from unittest.mock import AsyncMock, MagicMock
 import uuid
 
 import pytest
+from sqlalchemy.dialects import postgresql
 
 from domains.gateway.infrastructure.repositories.metrics_rollup_repository import (
     GatewayMetricsRollupRepository,
 )
+from domains.gateway.infrastructure.repositories.metrics_tier_source import MetricsRollupTier
 
 
 @pytest.mark.unit
@@ -85,3 +87,25 @@ async def test_rollup_window_batches_upsert_in_single_execute() -> None:
     compiled = str(upsert_stmt.compile(compile_kwargs={"literal_binds": True}))
     assert "INSERT INTO gateway_metrics_hourly" in compiled
     assert "ON CONFLICT" in compiled.upper()
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_rebuild_daily_tier_replaces_days_from_hourly() -> None:
+    session = AsyncMock()
+    session.execute = AsyncMock(side_effect=[MagicMock(), MagicMock(rowcount=4)])
+
+    repo = GatewayMetricsRollupRepository(session)
+    since = datetime(2026, 5, 1, tzinfo=UTC)
+    until = datetime(2026, 5, 3, tzinfo=UTC)
+
+    count = await repo.rebuild_calendar_tier(MetricsRollupTier.DAILY, since, until)
+
+    assert count == 4
+    delete_stmt, insert_stmt = (call.args[0] for call in session.execute.await_args_list)
+    assert "DELETE FROM gateway_metrics_daily" in str(delete_stmt)
+    compiled = str(insert_stmt.compile(dialect=postgresql.dialect()))
+    assert "INSERT INTO gateway_metrics_daily" in compiled
+    assert "FROM gateway_metrics_hourly" in compiled
+    assert "date_trunc" in compiled
+    session.commit.assert_not_awaited()
@@ -0,0 +1,131 @@
+"""指标分层拼接：按日 / 月水位切分时间窗，及 rollup job 的分层重建与 repair 级联。"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+from typing import Any, ClassVar
+
+import pytest
+
+from domains.gateway.application import jobs
+from domains.gateway.infrastructure.repositories.gateway_rollup_state_repository import (
+    RollupTierWatermarks,
+)
+from domains.gateway.infrastructure.repositories.metrics_tier_source import (
+    MetricsRollupTier,
+    MetricsTierSegment,
+    metrics_tier_source,
+    plan_metrics_tier_segments,
+)
+
+HOURLY, DAILY, MONTHLY = (
+    MetricsRollupTier.HOURLY,
+    MetricsRollupTier.DAILY,
+    MetricsRollupTier.MONTHLY,
+)
+
+
+def _at(month: int, day: int = 1, hour: int = 0) -> datetime:
+    return datetime(2026, month, day, hour, tzinfo=UTC)
+
+
+def test_long_range_stitches_monthly_daily_and_hourly() -> None:
+    segments = plan_metrics_tier_segments(
+        _at(3, 15, 5),
+        _at(6, 25),
+        daily_until=_at(6, 20),
+        monthly_until=_at(6),
+    )
+
+    assert segments == [
+        MetricsTierSegment(HOURLY, _at(3, 15, 5), _at(3, 16)),
+        MetricsTierSegment(DAILY, _at(3, 16), _at(4)),
+        MetricsTierSegment(MONTHLY, _at(4), _at(6)),
+        MetricsTierSegment(DAILY, _at(6), _at(6, 20)),
+        MetricsTierSegment(HOURLY, _at(6, 20), _at(6, 25)),
+    ]
+
+
+def test_missing_or_lagging_watermarks_fall_back_to_lower_tier() -> None:
+    start, end = _at(1, 1), _at(3, 1)
+
+    assert plan_metrics_tier_segments(start, end, daily_until=None, monthly_until=None) == [
+        MetricsTierSegment(HOURLY, start, end)
+    ]
+    # monthly 只覆盖到 2 月初：2 月回落 daily，daily 水位之后回落 hourly
+    assert plan_metrics_tier_segments(start, end, daily_until=_at(2, 10), monthly_until=_at(2)) == [
+        MetricsTierSegment(MONTHLY, _at(1), _at(2)),
+        MetricsTierSegment(DAILY, _at(2), _at(2, 10)),
+        MetricsTierSegment(HOURLY, _at(2, 10), end),
+    ]
+
+
+def test_tier_source_unions_only_planned_tables() -> None:
+    segments = plan_metrics_tier_segments(_at(1), _at(3), daily_until=_at(3), monthly_until=_at(3))
+    sql = str(metrics_tier_source(segments).compile())
+
+    assert "gateway_metrics_monthly" in sql
+    assert "gateway_metrics_hourly" not in sql and "gateway_metrics_daily" not in sql
+
+
+class _FakeStateRepo:
+    marks: RollupTierWatermarks
+    saved: ClassVar[dict[str, datetime]] = {}
+
+    def __init__(self, _session: object) -> None:
+        pass
+
+    async def read_tier_watermarks_for_update(self) -> RollupTierWatermarks:
+        return self.marks
+
+    async def set_calendar_tier_watermarks(self, *, daily: datetime, monthly: datetime) -> None:
+        type(self).saved = {"daily": daily, "monthly": monthly}
+
+
+class _FakeRollupRepo:
+    rebuilt: ClassVar[list[tuple[MetricsRollupTier, datetime, datetime]]] = []
+
+    def __init__(self, _session: object) -> None:
+        pass
+
+    async def earliest_hourly_bucket(self) -> datetime | None:
+        return _at(1, 20, 7)
+
+    async def rebuild_calendar_tier(
+        self, tier: MetricsRollupTier, since: datetime, until: datetime
+    ) -> int:
+        self.rebuilt.append((tier, since, until))
+        return 1
+
+
+@pytest.fixture
+def fakes(monkeypatch: pytest.MonkeyPatch) -> tuple[type[_FakeStateRepo], type[_FakeRollupRepo]]:
+    _FakeStateRepo.saved = {}
+    _FakeRollupRepo.rebuilt = []
+    monkeypatch.setattr(jobs, "GatewayRollupStateRepository", _FakeStateRepo)
+    monkeypatch.setattr(jobs, "GatewayMetricsRollupRepository", _FakeRollupRepo)
+    return _FakeStateRepo, _FakeRollupRepo
+
+
+@pytest.mark.asyncio
+async def test_first_run_backfills_from_earliest_hourly_month(fakes: Any) -> None:
+    state, rollup = fakes
+    state.marks = RollupTierWatermarks(hourly=_at(3, 4, 9), daily=None, monthly=None)
+
+    await jobs.rebuild_calendar_tiers(object())  # type: ignore[arg-type]
+
+    assert rollup.rebuilt == [(DAILY, _at(1), _at(3, 4)), (MONTHLY, _at(1), _at(3))]
+    assert state.saved == {"daily": _at(3, 4), "monthly": _at(3)}
+
+
+@pytest.mark.asyncio
+async def test_incremental_run_and_repair_cascade(fakes: Any) -> None:
+    state, rollup = fakes
+    state.marks = RollupTierWatermarks(hourly=_at(3, 4, 9), daily=_at(3, 4), monthly=_at(3))
+
+    await jobs.rebuild_calendar_tiers(object())  # type: ignore[arg-type]
+    assert rollup.rebuilt == [] and state.saved == {}
+
+    # repair 覆盖重算了 2 月末的 hourly：已过水位的日 / 月也要重建
+    await jobs.rebuild_calendar_tiers(object(), repair_since=_at(2, 27, 9))  # type: ignore[arg-type]
+    assert rollup.rebuilt == [(DAILY, _at(2, 27), _at(3, 4)), (MONTHLY, _at(2), _at(3))]
@@ -107,3 +107,74 @@ def test_hash_messages_streaming_empty():
     assert hash_messages_streaming(
         [{"role": "user", "content": [{"type": "text", "text": "non-str"}]}]
     ) == hash_original("")
+
+
+def _reference_redact(text: str) -> tuple[str, list[str]]:
+    """逐条 search + sub 的旧实现，作为单次扫描 + 缓存路径的对照。"""
+    from domains.gateway.domain.proxy.pii_redaction_policy import PiiPatterns
+
+    hits: list[str] = []
+    redacted = text
+    for pattern, placeholder in PiiPatterns.REDACTIONS:
+        if pattern.search(redacted):
+            hits.append(placeholder.strip("[]").lower())
+            redacted = pattern.sub(placeholder, redacted)
+    return redacted, hits
+
+
+def test_redact_text_matches_sequential_reference():
+    from domains.gateway.domain.proxy.pii_redaction_policy import clear_redaction_memo
+
+    clear_redaction_memo()
+    samples = [
+        "abc13812345678@x.com",
+        "13812345678@qq.com 以及 192.168.0.1",
+        "卡 6225760080000000 身份证 11010519900101001X",
+        "no pii at all " * 40,
+        "tail " * 60 + "alice@example.com 10.0.0.1",
+        "1.2.3.4.5 and 123456789012",
+    ]
+    for text in samples:
+        assert redact_text(text) == _reference_redact(text)
+        # 第二次走缓存，结果必须一致
+        assert redact_text(text) == _reference_redact(text)
+
+
+def test_redact_text_memo_returns_original_object_when_clean():
+    from domains.gateway.domain.proxy.pii_redaction_policy import clear_redaction_memo
+
+    clear_redaction_memo()
+    text = "plain history message " * 30
+    first, _ = redact_text(text)
+    second, hits = redact_text(text)
+    assert first is text
+    assert second is text
+    assert hits == []
+
+
+def test_redact_messages_benchmark_200_message_context():
+    """200 条消息上下文：重复轮次应命中缓存，明显快于首轮冷扫描。"""
+    import time
+
+    from domains.gateway.domain.proxy.pii_redaction_policy import clear_redaction_memo
+
+    clear_redaction_memo()
+    filler = "agent tool output line with numbers 42 and words; " * 40
+    messages = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"turn {i}: {filler}"}
+        for i in range(200)
+    ]
+    messages[17]["content"] += " 联系 13912345678"
+
+    started = time.perf_counter()
+    cold, cold_hits = redact_messages(messages)
+    cold_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for _ in range(5):
+        warm, warm_hits = redact_messages(messages)
+    warm_s = (time.perf_counter() - started) / 5
+
+    assert cold_hits == warm_hits == ["redacted_phone"]
+    assert warm == cold
+    assert warm_s < cold_s
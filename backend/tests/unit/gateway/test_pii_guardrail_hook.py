@@ -40,3 +40,28 @@ async def test_pre_call_uses_default_enabled_when_metadata_omitted():
     }
     await guard.async_pre_call_hook(None, None, data, "completion")
     assert "13912345678" in data["messages"][0]["content"]
+
+
+@pytest.mark.asyncio
+async def test_pre_call_offloads_large_payload_to_thread(monkeypatch):
+    import asyncio
+
+    from domains.gateway.infrastructure.guardrails import pii_guardrail
+
+    calls: list[object] = []
+    real_to_thread = asyncio.to_thread
+
+    async def _spy_to_thread(func, *args, **kwargs):
+        calls.append(func)
+        return await real_to_thread(func, *args, **kwargs)
+
+    monkeypatch.setattr(pii_guardrail, "PII_OFFLOAD_THRESHOLD_CHARS", 64)
+    monkeypatch.setattr(pii_guardrail.asyncio, "to_thread", _spy_to_thread)
+    guard = _build_pii_guardrail_instance(default_enabled=True)
+    data: dict = {
+        "messages": [{"role": "user", "content": "x" * 80 + " 联系 13912345678"}],
+        "metadata": {},
+    }
+    await guard.async_pre_call_hook(None, None, data, "completion")
+    assert calls
+    assert "13912345678" not in data["messages"][0]["content"]
@@ -0,0 +1,162 @@
+"""Prompt Cache 亲和选路：亲和键、一致性哈希、有界负载与 Router 接管。"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from bootstrap.config import settings
+from domains.gateway.domain.route.prompt_cache_affinity import (
+    AFFINITY_METADATA_KEY,
+    pick_affinity_deployment,
+    prompt_cache_affinity_key,
+    rendezvous_order,
+    session_id_from_headers,
+)
+from domains.gateway.domain.route.route_routing_strategy import cache_affinity_model_names
+from domains.gateway.infrastructure.litellm.router_singleton import _apply_route_strategies
+
+SYSTEM = "You are a meticulous assistant. " * 64
+
+
+def _dep(dep_id: str, model_name: str = "gw/route", strategy: str | None = None) -> dict[str, Any]:
+    return {
+        "model_name": model_name,
+        "litellm_params": {"model": f"openai/{dep_id}", "api_key": "sk-test"},
+        "model_info": {"id": dep_id, "gateway_routing_strategy": strategy},
+    }
+
+
+def _turns(first_user: str, extra: int) -> dict[str, Any]:
+    messages: list[dict[str, Any]] = [
+        {"role": "system", "content": SYSTEM},
+        {"role": "user", "content": first_user},
+    ]
+    for i in range(extra):
+        messages.append({"role": "assistant", "content": f"answer {i}"})
+        messages.append({"role": "user", "content": f"follow-up {i}"})
+    return {"messages": messages, "tools": [{"type": "function", "function": {"name": "f"}}]}
+
+
+def test_key_is_stable_across_turns_and_differs_per_conversation() -> None:
+    first = prompt_cache_affinity_key(_turns("plan a trip", 0))
+    later = prompt_cache_affinity_key(_turns("plan a trip", 3))
+    other = prompt_cache_affinity_key(_turns("write a poem", 0))
+
+    assert first is not None
+    assert first == later
+    assert first != other
+
+
+def test_short_prefix_has_no_key_but_session_header_wins() -> None:
+    short = {"messages": [{"role": "user", "content": "hi"}]}
+
+    assert prompt_cache_affinity_key(short) is None
+    assert prompt_cache_affinity_key(short, session_id="abc") == prompt_cache_affinity_key(
+        _turns("x", 0), session_id="abc"
+    )
+    assert session_id_from_headers({"X-Session-Id": " s1 "}) == "s1"
+    assert session_id_from_headers({"x-gateway-session-id": "g", "x-session-id": "s"}) == "g"
+    assert session_id_from_headers({}) is None
+
+
+def test_rendezvous_moves_only_keys_of_removed_deployment() -> None:
+    keys = [f"k{i}" for i in range(300)]
+    before = {k: rendezvous_order(k, ["a", "b", "c"])[0] for k in keys}
+    after = {k: rendezvous_order(k, ["a", "b"])[0] for k in keys}
+
+    moved = [k for k in keys if before[k] != after[k]]
+    assert moved
+    assert all(before[k] == "c" for k in moved)
+
+
+def test_bounded_load_spills_to_next_in_hash_order() -> None:
+    deployments = [_dep("a"), _dep("b"), _dep("c")]
+    key = "p:hot"
+    preferred, second = rendezvous_order(key, ["a", "b", "c"])[:2]
+
+    picked, is_preferred = pick_affinity_deployment(key, deployments, {})  # type: ignore[misc]
+    assert (picked["model_info"]["id"], is_preferred) == (preferred, True)
+
+    picked, is_preferred = pick_affinity_deployment(  # type: ignore[misc]
+        key, deployments, {preferred: 10}
+    )
+    assert (picked["model_info"]["id"], is_preferred) == (second, False)
+
+
+def test_affinity_only_for_weighted_random_model_names() -> None:
+    strategies = {
+        "gw/shuffle": "simple-shuffle",
+        "gw/weighted": "weighted-pick",
+        "gw/cheap": "cost-based-routing",
+        "gw/busy": "least-busy",
+        "gw/fast": "ewma-latency",
+    }
+    names = [*strategies, "direct"]
+
+    assert cache_affinity_model_names(names, strategies, default_strategy="simple-shuffle") == {
+        "gw/shuffle",
+        "gw/weighted",
+        "direct",
+    }
+    # 旧版 LiteLLM 顶层多数票为非随机策略时，未分组的 model_name 同样不接管
+    assert not cache_affinity_model_names(names, strategies, default_strategy="least-busy")
+
+
+def test_affinity_disabled_by_default() -> None:
+    assert type(settings).model_fields["gateway_prompt_cache_affinity_enabled"].default is False
+
+
+@pytest.mark.asyncio
+async def test_router_pins_affinity_requests_and_spreads_hot_key(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from litellm.router import Router
+
+    monkeypatch.setattr(settings, "gateway_prompt_cache_affinity_enabled", True)
+
+    model_list = [_dep("a"), _dep("b"), _dep("c")]
+    router = Router(model_list=model_list)
+    _apply_route_strategies(router, model_list)
+
+    async def _pick(key: str | None) -> str:
+        meta = {AFFINITY_METADATA_KEY: key} if key else {}
+        dep = await router.async_get_available_deployment(
+            model="gw/route", request_kwargs={"metadata": meta}
+        )
+        return dep["model_info"]["id"]
+
+    pinned = {await _pick("p:conversation-1") for _ in range(3)}
+    assert len(pinned) == 1
+
+    # 同一热点键持续压入：有界负载让其余 deployment 分担
+    spread = {await _pick("p:hot") for _ in range(30)}
+    assert len(spread) > 1
+
+
+@pytest.mark.asyncio
+async def test_affinity_leaves_routes_with_explicit_strategy_alone(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from litellm.router import Router
+
+    from domains.gateway.infrastructure.litellm import gateway_routing_strategy
+
+    monkeypatch.setattr(settings, "gateway_prompt_cache_affinity_enabled", True)
+    model_list = [_dep(i, "gw/busy", "least-busy") for i in ("a", "b", "c")]
+    router = Router(model_list=model_list)
+    _apply_route_strategies(router, model_list)
+    picked: list[Any] = []
+    monkeypatch.setattr(
+        gateway_routing_strategy,
+        "pick_affinity_deployment",
+        lambda *a, **_kw: picked.append(a),
+    )
+
+    dep = await router.async_get_available_deployment(
+        model="gw/busy", request_kwargs={"metadata": {AFFINITY_METADATA_KEY: "p:k"}}
+    )
+
+    assert dep["model_info"]["id"] in {"a", "b", "c"}
+    assert picked == []
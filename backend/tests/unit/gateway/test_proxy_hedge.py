@@ -0,0 +1,236 @@
+"""对冲请求：策略解析、竞速胜负、团队额度与回调结算恰好一次。"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+import uuid
+
+import pytest
+
+from domains.gateway.application.proxy import proxy_hedge
+from domains.gateway.application.proxy.proxy_hedge import (
+    HEDGE_ATTEMPT_METADATA_KEY,
+    clear_hedge_state_for_tests,
+    run_hedged_router_call,
+    should_settle_hedge_attempt,
+)
+from domains.gateway.domain.route.route_hedge_policy import (
+    HedgePolicy,
+    hedge_delay_ms,
+    hedge_policy_from_retry_policy,
+)
+
+GROUP = "gw/team/route"
+
+
+@pytest.fixture(autouse=True)
+def _clear_state() -> None:
+    clear_hedge_state_for_tests()
+    yield
+    clear_hedge_state_for_tests()
+
+
+class _FakeRouter:
+    """按 deployment id 返回不同延迟；``model=GROUP`` 时选中 ``d1``。"""
+
+    def __init__(self, delays: dict[str, float], *, fail: set[str] | None = None) -> None:
+        self.delays = delays
+        self.fail = fail or set()
+        self.calls: list[str] = []
+        self.cancelled: list[str] = []
+
+    def get_model_list(self, model_name: str) -> list[dict[str, Any]]:
+        assert model_name == GROUP
+        return [{"model_info": {"id": dep_id}} for dep_id in self.delays]
+
+    async def acompletion(self, **kwargs: Any) -> Any:
+        dep_id = "d1" if kwargs["model"] == GROUP else kwargs["model"]
+        kwargs["metadata"]["model_info"] = {"id": dep_id}
+        self.calls.append(dep_id)
+        try:
+            await asyncio.sleep(self.delays[dep_id])
+        except asyncio.CancelledError:
+            self.cancelled.append(dep_id)
+            raise
+        if dep_id in self.fail:
+            raise RuntimeError(f"{dep_id} failed")
+        return {"deployment": dep_id}
+
+
+def _policy(**overrides: Any) -> HedgePolicy:
+    values: dict[str, Any] = {"min_delay_ms": 10, "max_delay_ms": 10, "max_hedge_ratio": 1.0}
+    values.update(overrides)
+    return HedgePolicy(**values)
+
+
+async def _call(router: _FakeRouter, *, team_id: uuid.UUID | None = None, **policy: Any):
+    return await run_hedged_router_call(
+        router=router,
+        kwargs={"model": GROUP, "metadata": {"gateway_request_id": "r1"}},
+        policy=_policy(**policy),
+        team_id=team_id or uuid.uuid4(),
+        stream=False,
+    )
+
+
+def test_policy_parsing_defaults_and_clamps() -> None:
+    assert hedge_policy_from_retry_policy(None) is None
+    assert hedge_policy_from_retry_policy({"num_retries": 2}) is None
+    assert hedge_policy_from_retry_policy({"hedge": {"enabled": False}}) is None
+    assert hedge_policy_from_retry_policy({"hedge": True}) == HedgePolicy()
+
+    parsed = hedge_policy_from_retry_policy(
+        {"hedge": {"delay_percentile": "90", "min_delay_ms": 500, "max_delay_ms": 100}}
+    )
+    assert parsed is not None
+    assert parsed.delay_percentile == 90
+    assert (parsed.min_delay_ms, parsed.max_delay_ms) == (100, 500)
+    assert hedge_delay_ms(parsed, None) == 500
+    assert hedge_delay_ms(parsed, 20) == 100
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged() -> None:
+    router = _FakeRouter({"d1": 0, "d2": 0})
+
+    result = await _call(router)
+
+    assert result.hedged is False
+    assert router.calls == ["d1"]
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_loses_to_hedge_on_other_deployment() -> None:
+    router = _FakeRouter({"d1": 1.0, "d2": 0})
+
+    result = await _call(router)
+
+    assert result.hedged is True
+    assert result.response == {"deployment": "d2"}
+    assert router.calls == ["d1", "d2"]
+    assert router.cancelled == ["d1"]
+    assert result.metadata["model_info"] == {"id": "d2"}
+
+
+@pytest.mark.asyncio
+async def test_loser_callback_is_not_settled() -> None:
+    router = _FakeRouter({"d1": 1.0, "d2": 0})
+    kwargs: dict[str, Any] = {"model": GROUP, "metadata": {}}
+
+    result = await run_hedged_router_call(
+        router=router, kwargs=kwargs, policy=_policy(), team_id=uuid.uuid4(), stream=False
+    )
+
+    winner_id = result.metadata[HEDGE_ATTEMPT_METADATA_KEY]
+    loser_id = kwargs["metadata"][HEDGE_ATTEMPT_METADATA_KEY]
+    assert winner_id != loser_id
+    assert should_settle_hedge_attempt(winner_id, success=True) is True
+    assert should_settle_hedge_attempt(loser_id, success=True) is False
+    assert should_settle_hedge_attempt(loser_id, success=False) is False
+
+
+@pytest.mark.asyncio
+async def test_all_attempts_fail_settles_only_last_failure_and_raises_primary_error() -> None:
+    router = _FakeRouter({"d1": 0.03, "d2": 0.06}, fail={"d1", "d2"})
+    kwargs: dict[str, Any] = {"model": GROUP, "metadata": {}}
+
+    with pytest.raises(RuntimeError, match="d1 failed"):
+        await run_hedged_router_call(
+            router=router, kwargs=kwargs, policy=_policy(), team_id=uuid.uuid4(), stream=False
+        )
+
+    primary_id = kwargs["metadata"][HEDGE_ATTEMPT_METADATA_KEY]
+    assert should_settle_hedge_attempt(primary_id, success=False) is True
+
+
+def test_mid_race_failure_is_skipped_while_other_attempt_in_flight() -> None:
+    primary_id, hedge_id = "a", "b"
+    race = proxy_hedge._HedgeRace()
+    proxy_hedge._register_attempt(race, primary_id)
+    proxy_hedge._register_attempt(race, hedge_id)
+
+    assert should_settle_hedge_attempt(primary_id, success=False) is False
+    assert should_settle_hedge_attempt(hedge_id, success=False) is True
+
+
+@pytest.mark.asyncio
+async def test_winner_stream_failing_mid_way_is_settled() -> None:
+    class _BrokenStreamRouter(_FakeRouter):
+        async def acompletion(self, **kwargs: Any) -> Any:
+            dep_id = "d1" if kwargs["model"] == GROUP else kwargs["model"]
+            kwargs["metadata"]["model_info"] = {"id": dep_id}
+            delay = self.delays[dep_id]
+
+            async def _chunks() -> Any:
+                await asyncio.sleep(delay)
+                yield f"{dep_id}-1"
+                raise RuntimeError(f"{dep_id} stream broke")
+
+            return _chunks()
+
+    router = _BrokenStreamRouter({"d1": 1.0, "d2": 0})
+    kwargs: dict[str, Any] = {"model": GROUP, "metadata": {}}
+
+    result = await run_hedged_router_call(
+        router=router, kwargs=kwargs, policy=_policy(), team_id=uuid.uuid4(), stream=True
+    )
+    with pytest.raises(RuntimeError, match="d2 stream broke"):
+        async for _chunk in result.response:
+            pass
+
+    winner_id = result.metadata[HEDGE_ATTEMPT_METADATA_KEY]
+    loser_id = kwargs["metadata"][HEDGE_ATTEMPT_METADATA_KEY]
+    assert should_settle_hedge_attempt(loser_id, success=False) is False
+    # 胜者失败须落库并释放预扣，且只结算一次
+    assert should_settle_hedge_attempt(winner_id, success=False) is True
+    assert should_settle_hedge_attempt(winner_id, success=True) is False
+
+
+@pytest.mark.asyncio
+async def test_team_hedge_ratio_caps_hedges() -> None:
+    router = _FakeRouter({"d1": 0.05, "d2": 0})
+    team_id = uuid.uuid4()
+
+    results = [await _call(router, team_id=team_id, max_hedge_ratio=0.0) for _ in range(3)]
+
+    assert [r.hedged for r in results] == [True, False, False]
+
+
+@pytest.mark.asyncio
+async def test_single_deployment_group_never_hedges() -> None:
+    router = _FakeRouter({"d1": 0.05})
+
+    result = await _call(router)
+
+    assert result.hedged is False
+    assert router.calls == ["d1"]
+
+
+@pytest.mark.asyncio
+async def test_stream_winner_is_decided_by_first_chunk() -> None:
+    class _StreamRouter(_FakeRouter):
+        async def acompletion(self, **kwargs: Any) -> Any:
+            dep_id = "d1" if kwargs["model"] == GROUP else kwargs["model"]
+            kwargs["metadata"]["model_info"] = {"id": dep_id}
+            self.calls.append(dep_id)
+            delay = self.delays[dep_id]
+
+            async def _chunks() -> Any:
+                await asyncio.sleep(delay)
+                yield f"{dep_id}-1"
+                yield f"{dep_id}-2"
+
+            return _chunks()
+
+    router = _StreamRouter({"d1": 1.0, "d2": 0})
+
+    result = await run_hedged_router_call(
+        router=router,
+        kwargs={"model": GROUP, "metadata": {}},
+        policy=_policy(),
+        team_id=uuid.uuid4(),
+        stream=True,
+    )
+
+    assert [chunk async for chunk in result.response] == ["d2-1", "d2-2"]
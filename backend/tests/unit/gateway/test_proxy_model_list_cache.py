@@ -0,0 +1,220 @@
+"""``proxy_model_list_cache``：GET /v1/models 预编码缓存、版本号失效与 ETag。"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+import uuid
+
+import orjson
+import pytest
+
+import domains.gateway.application.vkey.proxy_model_list_cache as cache_mod
+from domains.gateway.application.vkey.proxy_model_list_cache import (
+    clear_model_list_cache_for_tests,
+    etag_matches,
+    invalidate_model_list_cache_for_tenant,
+    model_list_cache_key,
+    scope_tenant_ids,
+)
+import domains.gateway.application.vkey.virtual_key_proxy_model_list as listing_mod
+from domains.gateway.application.vkey.virtual_key_proxy_model_list import (
+    get_openai_proxy_model_list_response,
+)
+from domains.gateway.domain.types import GatewayCapability, VirtualKeyPrincipal
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache() -> None:
+    clear_model_list_cache_for_tests()
+    yield
+    clear_model_list_cache_for_tests()
+
+
+@pytest.fixture
+def versions(monkeypatch: pytest.MonkeyPatch) -> dict[uuid.UUID, str]:
+    current: dict[uuid.UUID, str] = {}
+
+    async def _fetch(tenant_id: uuid.UUID) -> str:
+        return current.get(tenant_id, "0")
+
+    monkeypatch.setattr(cache_mod, "fetch_tenant_version", _fetch)
+    return current
+
+
+def _vkey(*, bound: uuid.UUID, grants: tuple[uuid.UUID, ...]) -> VirtualKeyPrincipal:
+    return VirtualKeyPrincipal(
+        vkey_id=uuid.uuid4(),
+        vkey_name="k",
+        team_id=bound,
+        user_id=uuid.uuid4(),
+        allowed_models=(),
+        allowed_capabilities=(GatewayCapability.CHAT,),
+        rpm_limit=None,
+        tpm_limit=None,
+        store_full_messages=False,
+        guardrail_enabled=False,
+        is_system=False,
+        granted_team_ids=grants,
+    )
+
+
+async def _get(team_id: uuid.UUID, *, vkey: VirtualKeyPrincipal | None = None, allowed=None):
+    return await get_openai_proxy_model_list_response(
+        MagicMock(),
+        team_id=team_id,
+        user_id=None,
+        vkey=vkey,
+        api_key_grant_id=None,
+        allowed=allowed,
+    )
+
+
+@pytest.mark.asyncio
+async def test_second_call_served_from_cache_without_listing(
+    monkeypatch: pytest.MonkeyPatch, versions: dict[uuid.UUID, str]
+) -> None:
+    listed = AsyncMock(return_value=[{"id": "m1", "object": "model"}])
+    monkeypatch.setattr(listing_mod, "list_openai_proxy_models", listed)
+    team_id = uuid.uuid4()
+
+    first = await _get(team_id)
+    second = await _get(team_id)
+
+    assert listed.await_count == 1
+    assert second is first
+    assert orjson.loads(first.body) == {"object": "list", "data": [{"id": "m1", "object": "model"}]}
+    assert first.etag.startswith('"') and first.etag.endswith('"')
+
+
+@pytest.mark.asyncio
+async def test_allowed_set_is_part_of_cache_key(
+    monkeypatch: pytest.MonkeyPatch, versions: dict[uuid.UUID, str]
+) -> None:
+    listed = AsyncMock(side_effect=[[{"id": "a"}], [{"id": "b"}]])
+    monkeypatch.setattr(listing_mod, "list_openai_proxy_models", listed)
+    team_id = uuid.uuid4()
+
+    only_a = await _get(team_id, allowed={"a"})
+    only_b = await _get(team_id, allowed={"b"})
+
+    assert listed.await_count == 2
+    assert only_a.etag != only_b.etag
+
+
+@pytest.mark.asyncio
+async def test_tenant_version_bump_invalidates_entry(
+    monkeypatch: pytest.MonkeyPatch, versions: dict[uuid.UUID, str]
+) -> None:
+    listed = AsyncMock(side_effect=[[{"id": "old"}], [{"id": "new"}]])
+    monkeypatch.setattr(listing_mod, "list_openai_proxy_models", listed)
+    team_id = uuid.uuid4()
+
+    before = await _get(team_id)
+    versions[team_id] = "1"  # 其他 worker 的写路径 INCR 了版本号
+    after = await _get(team_id)
+
+    assert listed.await_count == 2
+    assert before.etag != after.etag
+
+
+@pytest.mark.asyncio
+async def test_multi_grant_entry_invalidated_by_any_grant_tenant(
+    monkeypatch: pytest.MonkeyPatch, versions: dict[uuid.UUID, str]
+) -> None:
+    listed = AsyncMock(return_value=[])
+    monkeypatch.setattr(listing_mod, "list_openai_proxy_models", listed)
+    bound, grant = uuid.uuid4(), uuid.uuid4()
+    vkey = _vkey(bound=bound, grants=(bound, grant))
+
+    assert scope_tenant_ids(bound, vkey) == (bound, grant)
+    await _get(bound, vkey=vkey)
+    invalidate_model_list_cache_for_tenant(grant)
+    await _get(bound, vkey=vkey)
+    await _get(bound, vkey=vkey)
+
+    assert listed.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_ttl_expiry_rebuilds(
+    monkeypatch: pytest.MonkeyPatch, versions: dict[uuid.UUID, str]
+) -> None:
+    listed = AsyncMock(return_value=[])
+    monkeypatch.setattr(listing_mod, "list_openai_proxy_models", listed)
+    now = [100.0]
+    monkeypatch.setattr(cache_mod.time, "monotonic", lambda: now[0])
+    team_id = uuid.uuid4()
+
+    await _get(team_id)
+    now[0] += cache_mod._TTL_SEC + 1
+    await _get(team_id)
+
+    assert listed.await_count == 2
+
+
+def test_cache_key_distinguishes_principals() -> None:
+    team_id = uuid.uuid4()
+    base = model_list_cache_key(
+        team_id=team_id, user_id=None, vkey=None, api_key_grant_id=None, allowed=None
+    )
+    grant = model_list_cache_key(
+        team_id=team_id, user_id=None, vkey=None, api_key_grant_id=uuid.uuid4(), allowed=None
+    )
+    empty_allowed = model_list_cache_key(
+        team_id=team_id, user_id=None, vkey=None, api_key_grant_id=None, allowed=set()
+    )
+
+    assert len({base, grant, empty_allowed}) == 3
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"x", "abc"', True),
+        ("*", True),
+        ('"other"', False),
+    ],
+)
+def test_etag_matches(header: str | None, expected: bool) -> None:
+    assert etag_matches(header, '"abc"') is expected
+
+
+@pytest.mark.asyncio
+async def test_models_route_returns_304_on_matching_if_none_match(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from fastapi import FastAPI
+    import httpx
+
+    from domains.gateway.application.vkey.proxy_model_list_cache import encode_model_list
+    from domains.gateway.presentation.deps import VkeyOrApikeyPrincipal, bearer_vkey_or_apikey_auth
+    import domains.gateway.presentation.routers.openai_compat_router as router_mod
+    from libs.db.database import get_db
+
+    entry = encode_model_list([{"id": "m1"}])
+    monkeypatch.setattr(
+        router_mod, "get_openai_proxy_model_list_response", AsyncMock(return_value=entry)
+    )
+    app = FastAPI()
+    app.include_router(router_mod.router)
+    app.dependency_overrides[bearer_vkey_or_apikey_auth] = lambda: VkeyOrApikeyPrincipal(
+        via="apikey", user_id=None, team_id=uuid.uuid4()
+    )
+    app.dependency_overrides[get_db] = lambda: MagicMock()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        full = await client.get("/v1/models")
+        revalidated = await client.get(
+            "/v1/models", headers={"If-None-Match": full.headers["etag"]}
+        )
+
+    assert full.status_code == 200
+    assert full.content == entry.body
+    assert full.headers["etag"] == entry.etag
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+    assert revalidated.headers["etag"] == entry.etag
@@ -0,0 +1,107 @@
+"""响应后结算 journal payload 编解码：经 JSON 往返后 settle_usage 所需上下文不变。"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+import json
+import uuid
+
+from domains.gateway.application.proxy.proxy_context import (
+    EntitlementReservationState,
+    PlatformBudgetPreflightState,
+    ProxyContext,
+)
+from domains.gateway.application.proxy.proxy_settlement_journal import (
+    decode_settle_usage_context,
+    encode_settle_usage_payload,
+)
+from domains.gateway.domain.proxy.proxy_policy import BudgetReservation
+from domains.gateway.domain.quota.period_reset_anchor import PeriodResetAnchor
+from domains.gateway.domain.quota.quota_plan import PlanQuotaSpec, QuotaPlanReservation
+from domains.gateway.domain.types import GatewayCapability, VirtualKeyPrincipal
+
+
+def _ctx() -> ProxyContext:
+    team_id, user_id, vkey_id, plan_id = (uuid.uuid4() for _ in range(4))
+    anchor = PeriodResetAnchor(timezone="Asia/Shanghai", time_minutes=480, day_of_month=5)
+    spec = PlanQuotaSpec(
+        quota_id=uuid.uuid4(),
+        label="5h",
+        window_seconds=18000,
+        limit_usd=Decimal("12.50"),
+        limit_images=4,
+    )
+    return ProxyContext(
+        team_id=team_id,
+        user_id=user_id,
+        vkey=VirtualKeyPrincipal(
+            vkey_id=vkey_id,
+            vkey_name="k",
+            team_id=team_id,
+            user_id=user_id,
+            allowed_models=("gpt-4o",),
+            allowed_capabilities=(GatewayCapability.CHAT,),
+            rpm_limit=10,
+            tpm_limit=None,
+            store_full_messages=True,
+            guardrail_enabled=True,
+            is_system=False,
+        ),
+        capability=GatewayCapability.IMAGE,
+        request_id="req-1",
+        store_full_messages=True,
+        guardrail_enabled=True,
+        budget_model="gpt-image-1",
+        platform_budget_preflight=PlatformBudgetPreflightState(
+            anchor_pins={("tenant", team_id, "monthly", None, None, None): anchor},
+            reservations=[
+                BudgetReservation(
+                    target_kind="tenant",
+                    target_id=str(team_id),
+                    period="monthly",
+                    budget_model_name=None,
+                    reserved_requests=1,
+                    reserved_tokens=300,
+                    reserved_images=2,
+                    period_reset_anchor=anchor,
+                )
+            ],
+        ),
+        entitlement_state=EntitlementReservationState(
+            plan_id=plan_id,
+            plan_label="pro",
+            specs=[spec],
+            reservations=[
+                QuotaPlanReservation(
+                    plan_id=plan_id, spec=spec, minute_unix=29_000_000, reserved_images=2
+                )
+            ],
+        ),
+    )
+
+
+def test_settle_usage_context_survives_json_round_trip() -> None:
+    ctx = _ctx()
+
+    payload = encode_settle_usage_payload(
+        ctx,
+        tokens=1200,
+        cost=Decimal("0.0421"),
+        requests=1,
+        image_count=3,
+        request_id="req-1",
+        with_entitlement=True,
+    )
+    restored = decode_settle_usage_context(json.loads(json.dumps(payload)))
+
+    assert (restored.team_id, restored.user_id, restored.budget_model) == (
+        ctx.team_id,
+        ctx.user_id,
+        ctx.budget_model,
+    )
+    assert restored.capability is GatewayCapability.IMAGE
+    assert restored.vkey is not None and ctx.vkey is not None
+    assert restored.vkey.vkey_id == ctx.vkey.vkey_id
+    assert restored.platform_budget_preflight == ctx.platform_budget_preflight
+    assert restored.entitlement_state == ctx.entitlement_state
+    assert (payload["cost"], payload["image_count"]) == ("0.0421", 3)
@@ -0,0 +1,187 @@
+"""过期请求明细分区归档：Parquet 分片导出、回读校验后才删除分区、归档月份只读列表。"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+import uuid
+
+import pytest
+
+from domains.gateway.domain.usage.usage_axis import UsageAxis
+from domains.gateway.infrastructure.jobs.request_log_archive import (
+    RequestLogArchiveError,
+    RequestLogPartitionArchiver,
+)
+from domains.gateway.infrastructure.jobs.sql_jobs_repository import RequestLogPartition
+from domains.gateway.infrastructure.repositories.archived_request_log_repository import (
+    ArchivedRequestLogRepository,
+)
+from domains.gateway.infrastructure.repositories.request_log_archive_format import (
+    archive_manifest_key,
+    load_archive_manifest,
+    request_log_columns,
+)
+from libs.storage.archive_store import LocalArchiveStore
+
+TEAM = uuid.uuid4()
+OTHER_TEAM = uuid.uuid4()
+PARTITION = RequestLogPartition(
+    schema_name="public",
+    partition_name="gateway_request_logs_y2026m01",
+    year=2026,
+    month=1,
+)
+
+
+def _row(index: int, *, tenant_id: uuid.UUID = TEAM, status: str = "success") -> dict[str, Any]:
+    row: dict[str, Any] = dict.fromkeys(c.name for c in request_log_columns())
+    row.update(
+        id=uuid.uuid4(),
+        created_at=datetime(2026, 1, 1, tzinfo=UTC) + timedelta(hours=index),
+        tenant_id=tenant_id,
+        capability="chat",
+        status=status,
+        real_model="gpt-4o",
+        input_tokens=10 * index,
+        output_tokens=index,
+        cached_tokens=0,
+        cache_creation_tokens=0,
+        cost_usd=Decimal("0.001250"),
+        revenue_usd=Decimal("0"),
+        image_count=0,
+        latency_ms=100 + index,
+        cache_hit=False,
+        fallback_chain=["a", "b"],
+        pricing_snapshot={"unit": "token", "price": "0.5"},
+        metadata_extra={"index": index},
+    )
+    return row
+
+
+class _FakeResult:
+    def __init__(self, rows: list[dict[str, Any]], size: int) -> None:
+        self._rows, self._size = rows, size
+
+    def mappings(self) -> _FakeResult:
+        return self
+
+    async def partitions(self) -> Any:
+        for i in range(0, len(self._rows), self._size):
+            yield self._rows[i : i + self._size]
+
+
+class _FakeSession:
+    def __init__(self, rows: list[dict[str, Any]]) -> None:
+        self.rows = rows
+        self.commits = 0
+
+    async def stream(self, stmt: Any) -> _FakeResult:
+        assert "ORDER BY" in str(stmt)
+        return _FakeResult(self.rows, stmt.get_execution_options()["yield_per"])
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def rollback(self) -> None:
+        pass
+
+
+class _FakeSqlJobs:
+    def __init__(self, count: int) -> None:
+        self.count = count
+        self.calls: list[str] = []
+
+    async def list_expired_request_log_partitions(self, _days: int) -> list[RequestLogPartition]:
+        return [PARTITION]
+
+    async def lock_partition_for_archive(self, _partition: RequestLogPartition) -> None:
+        self.calls.append("lock")
+
+    async def count_partition_rows(self, _partition: RequestLogPartition) -> int:
+        return self.count
+
+    async def detach_and_drop_partition(self, _partition: RequestLogPartition) -> None:
+        self.calls.append("drop")
+
+
+def _archiver(
+    rows: list[dict[str, Any]], store: LocalArchiveStore, *, count: int | None = None
+) -> tuple[RequestLogPartitionArchiver, _FakeSqlJobs]:
+    archiver = RequestLogPartitionArchiver(
+        _FakeSession(rows),  # type: ignore[arg-type]
+        store,
+        rows_per_file=3,
+        fetch_size=2,
+        zstd_level=3,
+    )
+    sql = _FakeSqlJobs(len(rows) if count is None else count)
+    archiver._sql = sql  # type: ignore[assignment]
+    return archiver, sql
+
+
+@pytest.mark.asyncio
+async def test_archive_writes_verified_parts_then_drops(tmp_path: Path) -> None:
+    store = LocalArchiveStore(tmp_path)
+    rows = [_row(i) for i in range(7)]
+    archiver, sql = _archiver(rows, store)
+
+    result = await archiver.archive_and_drop(PARTITION)
+
+    assert (result.rows, result.files, result.reused) == (7, 3, False)
+    assert sql.calls == ["lock", "drop"]
+    manifest = await load_archive_manifest(store, 2026, 1)
+    assert manifest is not None
+    assert [f.rows for f in manifest.files] == [3, 3, 1]
+    assert manifest.min_created_at == rows[0]["created_at"]
+    assert manifest.max_created_at == rows[-1]["created_at"]
+
+    # 中断于 DROP 前的重跑：manifest 行数一致则复用，只校验不重新导出
+    again, again_sql = _archiver([], store, count=7)
+    assert (await again.archive_and_drop(PARTITION)).reused is True
+    assert again_sql.calls == ["lock", "drop"]
+
+
+@pytest.mark.asyncio
+async def test_row_count_mismatch_keeps_partition(tmp_path: Path) -> None:
+    store = LocalArchiveStore(tmp_path)
+    archiver, sql = _archiver([_row(i) for i in range(4)], store, count=5)
+
+    with pytest.raises(RequestLogArchiveError):
+        await archiver.archive_and_drop(PARTITION)
+
+    assert sql.calls == ["lock"]
+    assert await store.get_bytes(archive_manifest_key(2026, 1)) is None
+
+
+@pytest.mark.asyncio
+async def test_archived_month_listing_filters_and_pages_newest_first(tmp_path: Path) -> None:
+    store = LocalArchiveStore(tmp_path)
+    rows = [_row(i, status="error" if i == 5 else "success") for i in range(7)]
+    rows.append(_row(7, tenant_id=OTHER_TEAM))
+    archiver, _ = _archiver(rows, store)
+    await archiver.archive_and_drop(PARTITION)
+
+    repo = ArchivedRequestLogRepository(object(), store)  # type: ignore[arg-type]
+    axis = UsageAxis.workspace(TEAM)
+
+    first = await repo.list_month_by_axis(axis, 2026, 1, page=1, page_size=4)
+    assert first is not None and first.has_next
+    assert [r.latency_ms for r in first.items] == [106, 105, 104, 103]
+    assert first.items[0].id == rows[6]["id"]
+    assert first.items[0].cost_usd == Decimal("0.001250")
+    assert first.items[0].fallback_chain == ["a", "b"]
+    assert first.items[0].pricing_snapshot == {"unit": "token", "price": "0.5"}
+    # 与线上列表一致：大 JSONB 不返回
+    assert "metadata_extra" not in first.items[0].__dict__
+
+    second = await repo.list_month_by_axis(axis, 2026, 1, page=2, page_size=4)
+    assert second is not None and not second.has_next
+    assert [r.latency_ms for r in second.items] == [102, 101, 100]
+
+    errors = await repo.list_month_by_axis(axis, 2026, 1, status="error")
+    assert errors is not None and [r.latency_ms for r in errors.items] == [105]
+
+    assert await repo.list_month_by_axis(axis, 2025, 12) is None
@@ -0,0 +1,96 @@
+"""Router 冷启动快照：加密往返、按快照初始化与版本对账。"""
+
+from __future__ import annotations
+
+import time
+from typing import Any
+from unittest.mock import AsyncMock
+
+import litellm
+import pytest
+
+from domains.gateway.infrastructure.litellm import router_reload_notifier
+import domains.gateway.infrastructure.litellm.router_singleton as router_singleton
+from domains.gateway.infrastructure.litellm.router_snapshot import (
+    RouterSnapshot,
+    decode_router_snapshot,
+    encode_router_snapshot,
+)
+
+_MODEL_NAME = "gw/s/snapshot-model"
+
+
+def _router_kwargs() -> dict[str, Any]:
+    return {
+        "model_list": [
+            {
+                "model_name": _MODEL_NAME,
+                "litellm_params": {
+                    "model": "gpt-4o-mini",
+                    "api_key": "sk-plain-secret",
+                    "custom_llm_provider": "openai",
+                    "weight": 1,
+                },
+                "model_info": {"id": "dep-1", "gateway_model_id": "m-1"},
+            }
+        ],
+        "routing_strategy": "simple-shuffle",
+        "num_retries": 2,
+        "redis_url": "redis://user:pw@cache:6379/0",
+        "set_verbose": False,
+    }
+
+
+@pytest.fixture(autouse=True)
+def _reset_router() -> None:
+    router_singleton.reset_router()
+    litellm.callbacks = []
+    yield
+    router_singleton.reset_router()
+    litellm.callbacks = []
+
+
+def test_snapshot_round_trip_is_encrypted_and_drops_environment_keys() -> None:
+    token = encode_router_snapshot(_router_kwargs(), version=7)
+
+    assert "sk-plain-secret" not in token
+    snapshot = decode_router_snapshot(token)
+    assert snapshot is not None
+    assert snapshot.version == 7
+    assert "redis_url" not in snapshot.router_kwargs
+    assert snapshot.router_kwargs["model_list"][0]["litellm_params"]["api_key"] == (
+        "sk-plain-secret"
+    )
+    assert decode_router_snapshot(token[:-4] + "AAAA") is None
+
+
+@pytest.mark.asyncio
+async def test_get_router_uses_fresh_snapshot_without_db(monkeypatch) -> None:
+    snapshot = RouterSnapshot(version=3, built_at=time.time(), router_kwargs=_router_kwargs())
+    monkeypatch.setattr(router_singleton, "load_router_snapshot", AsyncMock(return_value=snapshot))
+    monkeypatch.setattr(router_reload_notifier, "current_router_version", AsyncMock(return_value=3))
+    build = AsyncMock(side_effect=AssertionError("must not hit DB"))
+    monkeypatch.setattr(router_singleton, "_build_router_kwargs", build)
+    reconcile = AsyncMock()
+    monkeypatch.setattr(router_singleton, "_reconcile_router_with_db", reconcile)
+
+    router = await router_singleton.get_router(object())  # type: ignore[arg-type]
+
+    assert router_singleton.router_deployment_model_names(router) == frozenset({_MODEL_NAME})
+    build.assert_not_awaited()
+    reconcile.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshot_schedules_background_reconcile(monkeypatch) -> None:
+    snapshot = RouterSnapshot(version=3, built_at=time.time(), router_kwargs=_router_kwargs())
+    monkeypatch.setattr(router_singleton, "load_router_snapshot", AsyncMock(return_value=snapshot))
+    monkeypatch.setattr(router_reload_notifier, "current_router_version", AsyncMock(return_value=4))
+    reconcile = AsyncMock()
+    monkeypatch.setattr(router_singleton, "_reconcile_router_with_db", reconcile)
+
+    await router_singleton.get_router(object())  # type: ignore[arg-type]
+    for task in list(router_singleton._reconcile_tasks):
+        await task
+
+    reconcile.assert_awaited_once()
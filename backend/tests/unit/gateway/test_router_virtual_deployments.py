@@ -9,7 +9,6 @@ from domains.gateway.application.route.route_owner_slug_maps import RouteOwnerSl
 from domains.gateway.domain.route.router_model_name import encode_router_model_name
 from domains.gateway.infrastructure.litellm.router_singleton import (
     _models_to_deployments,
-    _resolve_strategy,
     _routes_to_fallbacks,
     _routes_to_virtual_deployments,
 )
@@ -168,14 +167,26 @@ def test_invalid_deployment_weight_defaults_to_one(monkeypatch) -> None:
     assert out[0]["model_info"]["weight"] == 1
 
 
-def test_weighted_pick_strategy_maps_to_litellm_simple_shuffle() -> None:
-    weighted = _mk_route(virtual_model="weighted", primary_models=["a"])
-    weighted.strategy = "weighted-pick"
-    simple = _mk_route(virtual_model="simple", primary_models=["b"])
-    simple.strategy = "simple-shuffle"
+def test_route_strategy_is_stamped_on_virtual_deployments(monkeypatch) -> None:
+    monkeypatch.setattr(
+        "domains.gateway.infrastructure.litellm.router_singleton._build_litellm_params",
+        _stub_build_litellm_params,
+    )
+    team = uuid.uuid4()
+    cred = uuid.uuid4()
+    model = _mk_model(
+        name="a", real_model="gpt-4o", provider="openai", cred_id=cred, tenant_id=team
+    )
+    route = _mk_route(virtual_model="fast", primary_models=["a"], tenant_id=team)
+    route.strategy = "ewma-latency"
+
+    virtuals = _routes_to_virtual_deployments(
+        [route], [model], {cred: _mk_cred(id_=cred)}, reserved_model_names=frozenset({"a"})
+    )
+    base = _models_to_deployments([model], {cred: _mk_cred(id_=cred)})
 
-    assert _resolve_strategy([weighted]) == "simple-shuffle"
-    assert _resolve_strategy([weighted, simple]) == "simple-shuffle"
+    assert virtuals[0]["model_info"]["gateway_routing_strategy"] == "ewma-latency"
+    assert base[0]["model_info"]["gateway_routing_strategy"] is None
 
 
 def test_virtual_route_skipped_when_shadowed_by_model_name(monkeypatch) -> None:
@@ -1,4 +1,4 @@
-"""CoalescingFlusher 合并 / 刷写 / 失败并回单测。"""
+"""CoalescingFlusher 合并 / 刷写 / 失败并回 / 重试上限单测。"""
 
 from __future__ import annotations
 
@@ -74,6 +74,57 @@ async def test_flush_failure_merges_back_for_retry() -> None:
             await flusher._flusher
 
 
+@pytest.mark.asyncio
+async def test_failing_key_is_isolated_backed_off_and_given_up(monkeypatch) -> None:
+    from libs.concurrency import coalescing_flusher
+
+    now = [1000.0]
+    monkeypatch.setattr(coalescing_flusher.time, "monotonic", lambda: now[0])
+    flushed: list[list[tuple[str, int]]] = []
+    given_up: list[tuple[str, int]] = []
+
+    async def flush(entries: list[tuple[str, int]]) -> None:
+        if any(key == "bad" for key, _ in entries):
+            raise ValueError("constraint violation")
+        flushed.append(entries)
+
+    async def give_up(key: str, value: int) -> None:
+        given_up.append((key, value))
+
+    flusher: CoalescingFlusher[str, int] = CoalescingFlusher(
+        name="t",
+        merge=_add_merge,
+        flush=flush,
+        interval_seconds=lambda: 3600.0,
+        max_pending=lambda: 1000,
+        max_attempts=3,
+        retry_backoff_seconds=1.0,
+        on_give_up=give_up,
+    )
+    flusher._pending = {"bad": 1, "good": 2}
+
+    await flusher._flush()  # 批量失败 → 逐键重刷，好键照常落库
+    assert flushed == [[("good", 2)]]
+    assert flusher._pending == {"bad": 1}
+
+    flusher._pending["good"] = 3
+    await flusher._flush()  # 退避期内坏键不回源
+    assert flushed[-1] == [("good", 3)]
+    assert flusher._pending == {"bad": 1}
+
+    now[0] += 1.0
+    await flusher._flush()  # 第 2 次失败，退避翻倍
+    now[0] += 1.0
+    await flusher._flush()
+    assert flusher._pending == {"bad": 1}
+
+    now[0] += 1.0
+    await flusher._flush()  # 第 3 次失败 → 放弃
+    assert given_up == [("bad", 1)]
+    assert flusher._pending == {}
+    assert flusher._failures == {}
+
+
 @pytest.mark.asyncio
 async def test_register_task_receives_lazy_started_flusher() -> None:
     registered: list[asyncio.Task[None]] = []
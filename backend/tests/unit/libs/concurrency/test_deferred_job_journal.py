@@ -0,0 +1,114 @@
+"""DeferredJobJournal 追加 / 压缩 / 孤儿接管与执行器重放单测。"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from libs.concurrency import DeferredDbTaskRunner, DeferredJobJournal
+
+
+def _runner(journal: DeferredJobJournal) -> DeferredDbTaskRunner:
+    return DeferredDbTaskRunner(
+        name="t",
+        max_workers=lambda: 2,
+        max_queue=lambda: 100,
+        submit_block_timeout_seconds=lambda: 0.5,
+        journal=lambda: journal,
+    )
+
+
+def _write_crashed_segment(directory: Path, lines: list[str]) -> Path:
+    """模拟崩溃进程遗留的 segment（属主已退出，无人持锁）。"""
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / "settle-999999-deadbeef.wal"
+    path.write_text("".join(line + "\n" for line in lines), encoding="utf-8")
+    return path
+
+
+def test_completed_jobs_are_compacted_on_segment_roll(tmp_path: Path) -> None:
+    journal = DeferredJobJournal(directory=tmp_path, name="settle", segment_max_bytes=1)
+
+    first = journal.append("k", {"n": 1})
+    second = journal.append("k", {"n": 2})  # 超过上限 → 滚动，第一段仍有未完成任务
+    assert len(list(tmp_path.glob("*.wal"))) == 2
+
+    journal.complete(first)
+    assert len(list(tmp_path.glob("*.wal"))) == 1
+    assert journal.pending_count() == 1
+
+    journal.complete(second)
+    journal.close()
+    assert list(tmp_path.glob("*.wal")) == []
+
+
+def test_live_owner_segment_is_not_claimed(tmp_path: Path) -> None:
+    owner = DeferredJobJournal(directory=tmp_path, name="settle")
+    owner.append("k", {"n": 1})
+
+    other = DeferredJobJournal(directory=tmp_path, name="settle")
+    assert other.claim_orphans() == []
+    owner.close()
+    assert len(list(tmp_path.glob("*.wal"))) == 1  # 未完成任务保留给下次启动
+
+
+@pytest.mark.asyncio
+async def test_runner_replays_pending_jobs_of_crashed_process(tmp_path: Path) -> None:
+    orphan = _write_crashed_segment(
+        tmp_path,
+        [
+            json.dumps({"op": "add", "id": "a", "kind": "settle", "payload": {"n": 1}}),
+            json.dumps({"op": "add", "id": "b", "kind": "settle", "payload": {"n": 2}}),
+            json.dumps({"op": "done", "id": "a"}),
+            '{"op": "add", "id": "c", "kind": "se',  # 崩溃时写了一半的尾行
+        ],
+    )
+    journal = DeferredJobJournal(directory=tmp_path, name="settle")
+    runner = _runner(journal)
+    replayed: list[dict] = []
+
+    async def _handler(payload: dict) -> None:
+        replayed.append(payload)
+
+    runner.register_replay_handler("settle", _handler)
+
+    assert await runner.replay_journal() == 1
+    await runner.shutdown()
+
+    assert replayed == [{"n": 2}]
+    assert not orphan.exists()
+    assert list(tmp_path.glob("*.wal")) == []
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job_stays_pending_for_next_start(tmp_path: Path) -> None:
+    journal = DeferredJobJournal(directory=tmp_path, name="settle")
+    runner = DeferredDbTaskRunner(
+        name="t",
+        max_workers=lambda: 1,
+        max_queue=lambda: 10,
+        submit_block_timeout_seconds=lambda: 0.5,
+        shutdown_drain_timeout_seconds=0.05,
+        journal=lambda: journal,
+    )
+    started = asyncio.Event()
+
+    async def _hang() -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    async def _ok() -> None:
+        return None
+
+    await runner.submit(_ok, journal_kind="settle", journal_payload={"n": 1})
+    await runner.submit(_hang, journal_kind="settle", journal_payload={"n": 2})
+    await asyncio.wait_for(started.wait(), timeout=1.0)
+    await runner.shutdown()  # 排空超时 → 强杀在途任务
+
+    successor = DeferredJobJournal(directory=tmp_path, name="settle")
+    (segment,) = successor.claim_orphans()
+    assert [r.payload for r in segment.records] == [{"n": 2}]
+    successor.discard(segment)
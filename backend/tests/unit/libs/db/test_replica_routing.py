@@ -0,0 +1,68 @@
+"""只读副本路由：显式延迟容忍度、读己之写固定主库、延迟超限回退主库。"""
+
+from __future__ import annotations
+
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, select, update
+
+import libs.db.database as database
+from libs.db.database import _ReplicaRoutingSession, replica_reads
+
+_table = Table("t_replica_routing", MetaData(), Column("id", Integer, primary_key=True))
+_PRIMARY = object()
+_REPLICA = object()
+
+
+@pytest.fixture
+def session(monkeypatch: pytest.MonkeyPatch) -> _ReplicaRoutingSession:
+    monkeypatch.setattr(database, "_replica_engine", SimpleNamespace(sync_engine=_REPLICA))
+    monkeypatch.setattr(database, "_replica_lag", 1.0)
+    monkeypatch.setattr(database, "_replica_lag_checked_at", time.monotonic())
+    return _ReplicaRoutingSession(bind=_PRIMARY)  # type: ignore[arg-type]
+
+
+def test_declared_select_routes_to_replica(session: _ReplicaRoutingSession) -> None:
+    stmt = select(_table)
+
+    assert session.get_bind(clause=stmt) is _PRIMARY
+    with replica_reads(5.0):
+        assert session.get_bind(clause=stmt) is _REPLICA
+        assert session.get_bind(clause=stmt.with_for_update()) is _PRIMARY
+    with replica_reads(0):
+        assert session.get_bind(clause=stmt) is _PRIMARY
+
+
+def test_write_pins_session_to_primary(session: _ReplicaRoutingSession) -> None:
+    with replica_reads(5.0):
+        assert session.get_bind(clause=update(_table).values(id=1)) is _PRIMARY
+        assert session.get_bind(clause=select(_table)) is _PRIMARY
+
+    other = _ReplicaRoutingSession(bind=_PRIMARY)  # type: ignore[arg-type]
+    other.info[database._SESSION_HAS_WRITES_KEY] = True
+    database._mark_session_has_writes(
+        SimpleNamespace(new=[object()], dirty=[], deleted=[], info=other.info),  # type: ignore[arg-type]
+        None,
+        None,
+    )
+    with replica_reads(5.0):
+        assert other.get_bind(clause=select(_table)) is _PRIMARY
+
+
+def test_lag_over_tolerance_or_unknown_falls_back_to_primary(
+    session: _ReplicaRoutingSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    stmt = select(_table)
+    with replica_reads(0.5):
+        assert session.get_bind(clause=stmt) is _PRIMARY
+
+    monkeypatch.setattr(database, "_replica_lag", None)
+    with replica_reads(5.0):
+        assert session.get_bind(clause=stmt) is _PRIMARY
+
+    monkeypatch.setattr(database, "_replica_lag", 0.0)
+    monkeypatch.setattr(database, "_replica_lag_checked_at", time.monotonic() - 3600)
+    with replica_reads(5.0):
+        assert session.get_bind(clause=stmt) is _PRIMARY
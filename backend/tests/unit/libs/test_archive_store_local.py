@@ -0,0 +1,27 @@
+"""LocalArchiveStore 单元测试。"""
+
+from pathlib import Path
+
+import pytest
+
+from libs.storage.archive_store import LocalArchiveStore
+
+
+@pytest.mark.unit
+class TestLocalArchiveStore:
+    @pytest.mark.asyncio
+    async def test_put_get_round_trip_and_overwrite(self, tmp_path: Path):
+        store = LocalArchiveStore(tmp_path)
+        await store.put_bytes("logs/y2026m01/part-00000.parquet", b"v1")
+        await store.put_bytes("logs/y2026m01/part-00000.parquet", b"v2")
+
+        assert await store.get_bytes("logs/y2026m01/part-00000.parquet") == b"v2"
+        assert await store.get_bytes("logs/y2026m01/manifest.json") is None
+        # 临时文件不残留
+        assert [p.name for p in (tmp_path / "logs/y2026m01").iterdir()] == ["part-00000.parquet"]
+
+    @pytest.mark.asyncio
+    async def test_key_traversal_rejected(self, tmp_path: Path):
+        store = LocalArchiveStore(tmp_path / "archive")
+        with pytest.raises(ValueError):
+            await store.put_bytes("../outside.bin", b"x")
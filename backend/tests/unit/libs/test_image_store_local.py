@@ -1,9 +1,12 @@
 """LocalImageStore 单元测试。"""
 
+import base64
+import hashlib
 from pathlib import Path
 
 import pytest
 
+from libs.storage.content_addressing import iter_b64decode
 from libs.storage.local_image_store import LocalImageStore
 
 
@@ -28,3 +31,26 @@ class TestLocalImageStore:
         store = LocalImageStore(tmp_path)
         url = await store.persist_image_data("https://cdn.example.com/a.png")
         assert url == "https://cdn.example.com/a.png"
+
+    @pytest.mark.asyncio
+    async def test_identical_content_is_stored_once(self, tmp_path: Path):
+        store = LocalImageStore(tmp_path, serve_prefix="/img")
+        payload = b"same-bytes" * 1000
+
+        first = await store.save_bytes(payload, ext="png")
+        second = await store.persist_image_data(base64.b64encode(payload).decode())
+
+        digest = hashlib.sha256(payload).hexdigest()
+        assert first == second == f"/img/{digest}.png"
+        assert [p.name for p in tmp_path.iterdir()] == [f"{digest}.png"]
+        assert store.get_local_path(f"{digest}.png").read_bytes() == payload
+
+    def test_base64_decodes_incrementally(self):
+        payload = bytes(range(256)) * 10
+        encoded = base64.encodebytes(payload).decode()  # 含换行
+
+        chunks = list(iter_b64decode(encoded, chunk_chars=64))
+
+        assert len(chunks) > 1
+        assert all(len(c) <= 48 for c in chunks)
+        assert b"".join(chunks) == payload
@@ -1,66 +1,160 @@
 """S3ImageStore 单元测试。"""
 
+import base64
+import hashlib
 from unittest.mock import AsyncMock, MagicMock, patch
 
+from botocore.exceptions import ClientError
 import pytest
 
-from libs.storage.s3_image_store import S3ImageStore
+from libs.storage import s3_client_pool, s3_image_store
+from libs.storage.s3_image_store import S3ImageStore, clear_known_s3_objects_for_tests
+
+
+class _FakeS3Client:
+    """内存版 S3 client：记录对象与分片上传调用。"""
+
+    def __init__(self) -> None:
+        self.objects: dict[str, bytes] = {}
+        self.uploads: dict[str, list[bytes]] = {}
+        self.head_object = AsyncMock(side_effect=self._head_object)
+        self.put_object = AsyncMock(side_effect=self._put_object)
+        self.upload_part = AsyncMock(side_effect=self._upload_part)
+        self.abort_multipart_upload = AsyncMock()
+
+    async def _head_object(self, *, Bucket: str, Key: str) -> dict:
+        if Key not in self.objects:
+            raise ClientError({"Error": {"Code": "404"}}, "HeadObject")
+        return {"ContentLength": len(self.objects[Key])}
+
+    async def _put_object(self, *, Bucket: str, Key: str, Body: bytes, **_: str) -> dict:
+        self.objects[Key] = Body
+        return {}
+
+    async def create_multipart_upload(self, *, Bucket: str, Key: str, **_: str) -> dict:
+        self.uploads["u1"] = []
+        return {"UploadId": "u1"}
+
+    async def _upload_part(self, *, UploadId: str, PartNumber: int, Body: bytes, **_: str) -> dict:
+        self.uploads[UploadId].append(Body)
+        return {"ETag": f"etag-{PartNumber}"}
+
+    async def complete_multipart_upload(
+        self, *, Key: str, UploadId: str, MultipartUpload: dict, **_: str
+    ) -> dict:
+        assert [p["PartNumber"] for p in MultipartUpload["Parts"]] == list(
+            range(1, len(self.uploads[UploadId]) + 1)
+        )
+        self.objects[Key] = b"".join(self.uploads.pop(UploadId))
+        return {}
+
+
+def _store() -> S3ImageStore:
+    return S3ImageStore(
+        bucket="my-bucket",
+        region="auto",
+        endpoint_url="https://example.r2.cloudflarestorage.com",
+        access_key="ak",
+        secret_key="sk",
+        public_base_url="https://cdn.example.com",
+    )
+
+
+@pytest.fixture(autouse=True)
+def _clear_known_objects():
+    clear_known_s3_objects_for_tests()
+    yield
+    clear_known_s3_objects_for_tests()
 
 
 @pytest.mark.unit
 class TestS3ImageStore:
     @pytest.mark.asyncio
     async def test_save_bytes_uploads_and_returns_public_url(self):
-        store = S3ImageStore(
-            bucket="my-bucket",
-            region="auto",
-            endpoint_url="https://example.r2.cloudflarestorage.com",
-            access_key="ak",
-            secret_key="sk",
-            public_base_url="https://cdn.example.com",
-        )
-
-        mock_client = AsyncMock()
-        mock_client.put_object = AsyncMock()
-        mock_cm = MagicMock()
-        mock_cm.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_cm.__aexit__ = AsyncMock(return_value=None)
-
-        mock_session = MagicMock()
-        mock_session.client.return_value = mock_cm
+        store = _store()
+        client = _FakeS3Client()
 
-        with patch.object(store, "_session", mock_session):
+        with patch.object(s3_image_store, "get_s3_client", AsyncMock(return_value=client)):
             url = await store.save_bytes(b"img", ext="png", content_type="image/png")
 
-        assert url.startswith("https://cdn.example.com/images/")
-        assert url.endswith(".png")
-        mock_client.put_object.assert_awaited_once()
-        call_kwargs = mock_client.put_object.await_args.kwargs
+        digest = hashlib.sha256(b"img").hexdigest()
+        assert url == f"https://cdn.example.com/images/{digest}.png"
+        client.put_object.assert_awaited_once()
+        call_kwargs = client.put_object.await_args.kwargs
         assert call_kwargs["Bucket"] == "my-bucket"
-        assert call_kwargs["Key"].startswith("images/")
+        assert call_kwargs["Key"] == f"images/{digest}.png"
         assert call_kwargs["ContentType"] == "image/png"
 
     @pytest.mark.asyncio
-    async def test_test_connection_head_bucket_only(self):
-        store = S3ImageStore(
-            bucket="my-bucket",
-            region="auto",
-            endpoint_url="https://example.r2.cloudflarestorage.com",
-            access_key="ak",
-            secret_key="sk",
-            public_base_url="https://cdn.example.com",
+    async def test_duplicate_content_skips_upload(self):
+        client = _FakeS3Client()
+
+        with patch.object(s3_image_store, "get_s3_client", AsyncMock(return_value=client)):
+            first = await _store().save_bytes(b"same", ext="png")
+            # 进程内索引命中，不再 HEAD
+            second = await _store().persist_image_data(base64.b64encode(b"same").decode())
+            clear_known_s3_objects_for_tests()
+            # 索引失效后由 HEAD 判定已存在
+            third = await _store().save_bytes(b"same", ext="png")
+
+        assert first == second == third
+        client.put_object.assert_awaited_once()
+        assert client.head_object.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_forbidden_head_still_uploads(self):
+        # 仅写权限的凭据：缺失 key 的 HEAD 返回 403 而非 404
+        client = _FakeS3Client()
+        client.head_object = AsyncMock(
+            side_effect=ClientError({"Error": {"Code": "403"}}, "HeadObject")
         )
 
-        mock_client = AsyncMock()
-        mock_client.head_bucket = AsyncMock()
-        mock_cm = MagicMock()
-        mock_cm.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_cm.__aexit__ = AsyncMock(return_value=None)
+        with patch.object(s3_image_store, "get_s3_client", AsyncMock(return_value=client)):
+            url = await _store().save_bytes(b"img", ext="png")
+
+        key = f"images/{hashlib.sha256(b'img').hexdigest()}.png"
+        assert url.endswith(key)
+        assert client.objects[key] == b"img"
 
-        mock_session = MagicMock()
-        mock_session.client.return_value = mock_cm
+    @pytest.mark.asyncio
+    async def test_large_base64_payload_streams_multipart(self, monkeypatch):
+        monkeypatch.setattr(s3_image_store, "MULTIPART_THRESHOLD", 10)
+        monkeypatch.setattr(s3_image_store, "MULTIPART_PART_SIZE", 8)
+        payload = bytes(range(30))
+        client = _FakeS3Client()
+
+        with patch.object(s3_image_store, "get_s3_client", AsyncMock(return_value=client)):
+            url = await _store().persist_image_data(base64.b64encode(payload).decode(), ext="mp4")
+
+        key = f"images/{hashlib.sha256(payload).hexdigest()}.mp4"
+        assert url.endswith(key)
+        assert client.objects[key] == payload
+        assert client.upload_part.await_count == 4
+        assert client.upload_part.await_args.kwargs["Body"] == payload[24:]
+        client.put_object.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_multipart_upload_is_aborted(self, monkeypatch):
+        monkeypatch.setattr(s3_image_store, "MULTIPART_THRESHOLD", 10)
+        monkeypatch.setattr(s3_image_store, "MULTIPART_PART_SIZE", 8)
+        client = _FakeS3Client()
+        client.upload_part = AsyncMock(side_effect=OSError("boom"))
 
-        with patch.object(store, "_session", mock_session):
+        with (
+            patch.object(s3_image_store, "get_s3_client", AsyncMock(return_value=client)),
+            pytest.raises(OSError),
+        ):
+            await _store().save_bytes(bytes(30), ext="png")
+
+        client.abort_multipart_upload.assert_awaited_once()
+        assert client.objects == {}
+
+    @pytest.mark.asyncio
+    async def test_test_connection_head_bucket_only(self):
+        store = _store()
+        mock_client = AsyncMock()
+
+        with patch.object(s3_image_store, "get_s3_client", AsyncMock(return_value=mock_client)):
             await store.test_connection(verify_public=False)
 
         mock_client.head_bucket.assert_awaited_once_with(Bucket="my-bucket")
@@ -68,25 +162,8 @@ class TestS3ImageStore:
 
     @pytest.mark.asyncio
     async def test_test_connection_probes_public_url(self):
-        store = S3ImageStore(
-            bucket="my-bucket",
-            region="auto",
-            endpoint_url="https://example.r2.cloudflarestorage.com",
-            access_key="ak",
-            secret_key="sk",
-            public_base_url="https://cdn.example.com",
-        )
-
+        store = _store()
         mock_client = AsyncMock()
-        mock_client.head_bucket = AsyncMock()
-        mock_client.put_object = AsyncMock()
-        mock_client.delete_object = AsyncMock()
-        mock_cm = MagicMock()
-        mock_cm.__aenter__ = AsyncMock(return_value=mock_client)
-        mock_cm.__aexit__ = AsyncMock(return_value=None)
-
-        mock_session = MagicMock()
-        mock_session.client.return_value = mock_cm
 
         mock_http = AsyncMock()
         mock_http.__aenter__ = AsyncMock(return_value=mock_http)
@@ -94,7 +171,7 @@ class TestS3ImageStore:
         mock_http.head = AsyncMock(return_value=MagicMock(status_code=200))
 
         with (
-            patch.object(store, "_session", mock_session),
+            patch.object(s3_image_store, "get_s3_client", AsyncMock(return_value=mock_client)),
             patch("httpx.AsyncClient", return_value=mock_http),
         ):
             await store.test_connection(verify_public=True)
@@ -102,3 +179,35 @@ class TestS3ImageStore:
         mock_client.put_object.assert_awaited_once()
         mock_client.delete_object.assert_awaited_once()
         mock_http.head.assert_awaited_once()
+
+
+@pytest.mark.unit
+class TestS3ClientPool:
+    @pytest.mark.asyncio
+    async def test_same_credentials_share_one_client_until_closed(self, monkeypatch):
+        entered: list[MagicMock] = []
+        exited = AsyncMock(return_value=None)
+
+        def _client(*_args, **_kwargs):
+            cm = MagicMock()
+            client = MagicMock()
+            entered.append(client)
+            cm.__aenter__ = AsyncMock(return_value=client)
+            cm.__aexit__ = exited
+            return cm
+
+        session = MagicMock()
+        session.client.side_effect = _client
+        monkeypatch.setattr(s3_client_pool, "_session", session)
+        monkeypatch.setattr(s3_client_pool, "_clients", {})
+
+        kwargs = {"region": "auto", "endpoint_url": "https://e", "access_key": "ak"}
+        a = await s3_client_pool.get_s3_client(**kwargs, secret_key="sk")
+        b = await s3_client_pool.get_s3_client(**kwargs, secret_key="sk")
+        c = await s3_client_pool.get_s3_client(**kwargs, secret_key="other")
+        await s3_client_pool.close_s3_clients()
+
+        assert a is b
+        assert c is not a
+        assert len(entered) == 2
+        assert exited.await_count == 2
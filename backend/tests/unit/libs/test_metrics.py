@@ -0,0 +1,134 @@
+"""MetricsCollector 单元测试：标签序列、固定桶直方图、多 worker 合并与 Prometheus 导出"""
+
+import json
+
+import pytest
+
+from libs.observability.metrics import MetricsCollector, merge_snapshots, render_prometheus_text
+from libs.observability.metrics_store import (
+    collect_peer_snapshots,
+    publish_snapshot,
+    render_aggregated_metrics,
+)
+
+
+@pytest.mark.unit
+def test_counters_keep_separate_label_series() -> None:
+    collector = MetricsCollector()
+    collector.increment("cache_requests_total", tags={"cache": "team", "result": "hit"})
+    collector.increment("cache_requests_total", tags={"cache": "team", "result": "hit"})
+    collector.increment("cache_requests_total", tags={"cache": "team", "result": "miss"})
+
+    assert collector.get_counter("cache_requests_total", {"cache": "team", "result": "hit"}) == 2
+    assert collector.get_counter("cache_requests_total") == 3
+
+
+@pytest.mark.unit
+def test_histogram_memory_is_bounded_by_buckets() -> None:
+    collector = MetricsCollector(default_buckets=(10.0, 100.0, 1000.0))
+    for i in range(10_000):
+        collector.record_timer("latency_ms", float(i % 500))
+
+    snap = collector.snapshot()
+    [[_labels, data]] = snap["histograms"]["latency_ms"]
+    assert len(data["counts"]) == 4
+    assert data["count"] == 10_000
+
+    stats = collector.get_histogram_stats("latency_ms")
+    assert stats is not None
+    assert stats["min"] == 0
+    assert stats["max"] == 499
+    assert 100 <= stats["p95"] <= 499
+
+
+@pytest.mark.unit
+def test_render_prometheus_cumulative_buckets_and_labels() -> None:
+    collector = MetricsCollector(default_buckets=(5.0, 50.0))
+    collector.describe("stage_ms", "stage latency")
+    collector.record_timer("stage_ms", 3, {"stage": "guard"})
+    collector.record_timer("stage_ms", 30, {"stage": "guard"})
+    collector.record_timer("stage_ms", 300, {"stage": "guard"})
+    collector.set_gauge("queue_depth", 4, {"runner": "proxy"})
+
+    text = collector.render_prometheus()
+
+    assert "# HELP stage_ms stage latency" in text
+    assert "# TYPE stage_ms histogram" in text
+    assert 'stage_ms_bucket{stage="guard",le="5"} 1' in text
+    assert 'stage_ms_bucket{stage="guard",le="50"} 2' in text
+    assert 'stage_ms_bucket{stage="guard",le="+Inf"} 3' in text
+    assert 'stage_ms_count{stage="guard"} 3' in text
+    assert 'queue_depth{runner="proxy"} 4' in text
+
+
+@pytest.mark.unit
+def test_merge_snapshots_sums_workers() -> None:
+    a, b = MetricsCollector(default_buckets=(10.0,)), MetricsCollector(default_buckets=(10.0,))
+    a.increment("requests_total", tags={"route": "chat"})
+    b.increment("requests_total", 2, tags={"route": "chat"})
+    a.record_timer("db_ms", 1)
+    b.record_timer("db_ms", 20)
+
+    merged = merge_snapshots([json.loads(json.dumps(a.snapshot())), b.snapshot()])
+    text = render_prometheus_text(merged)
+
+    assert 'requests_total{route="chat"} 3' in text
+    assert 'db_ms_bucket{le="10"} 1' in text
+    assert "db_ms_count 2" in text
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def set(self, key: str, value: str, ex: int | None = None) -> None:
+        self.data[key] = value
+
+    async def scan_iter(self, match: str, count: int = 100):
+        prefix = match.rstrip("*")
+        for key in list(self.data):
+            if key.startswith(prefix):
+                yield key
+
+    async def mget(self, keys: list[str]) -> list[str | None]:
+        return [self.data.get(k) for k in keys]
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_peer_snapshots_exclude_own_worker(monkeypatch: pytest.MonkeyPatch) -> None:
+    from libs.observability import metrics_store
+
+    redis = _FakeRedis()
+    own = MetricsCollector()
+    own.increment("jobs_total", 5)
+    await publish_snapshot(redis, own, ttl_seconds=30)
+
+    monkeypatch.setattr(
+        metrics_store, "worker_id", lambda: f"{metrics_store.socket.gethostname()}:peer"
+    )
+    peer = MetricsCollector()
+    peer.increment("jobs_total", 7)
+    await publish_snapshot(redis, peer, ttl_seconds=30)
+
+    peers = await collect_peer_snapshots(redis)
+    assert len(peers) == 1  # 本进程（peer 身份）以实时数据为准，不重复计入
+
+
+@pytest.mark.unit
+@pytest.mark.asyncio
+async def test_render_aggregated_metrics_falls_back_without_redis(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    import libs.db.redis as redis_module
+
+    async def _boom() -> None:
+        raise RuntimeError("redis down")
+
+    monkeypatch.setattr(redis_module, "get_redis_client", _boom)
+    collector = MetricsCollector()
+    collector.increment("jobs_total", 2)
+
+    text = await render_aggregated_metrics(collector)
+
+    assert "jobs_total 2" in text
@@ -0,0 +1,172 @@
+"""libs.middleware.rate_limit 单测（GCRA + 本地批量配额 + fail-open）"""
+
+from __future__ import annotations
+
+import math
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from libs.middleware.rate_limit import LocalGcraLimiter, RateLimitMiddleware, RateLimitWindow
+
+
+class _FakeGcraScript:
+    """按 ``_GCRA_LUA`` 语义在 Python 中模拟的脚本（时钟由测试控制，单位 ms）。"""
+
+    def __init__(self, store: dict[str, float], clock: list[float]) -> None:
+        self.store = store
+        self.clock = clock
+        self.calls = 0
+
+    async def __call__(self, *, keys: list[str], args: list[int]) -> list[int]:
+        self.calls += 1
+        now = self.clock[0]
+        cost = args[0]
+        windows = [(args[1 + 2 * i], args[2 + 2 * i]) for i in range(len(keys))]
+        tats = [max(self.store.get(k, now), now) for k in keys]
+        granted = cost
+        for tat, (period, limit) in zip(tats, windows, strict=True):
+            emission = period / limit
+            granted = min(granted, math.floor((now - (tat - period)) / emission + 1e-9))
+        granted = max(granted, 0)
+        out = [granted]
+        for i, (key, (period, limit)) in enumerate(zip(keys, windows, strict=True)):
+            emission = period / limit
+            tat = tats[i]
+            if granted > 0:
+                tat += granted * emission
+                self.store[key] = tat
+            out.append(max(0, math.floor((now - (tat - period)) / emission + 1e-9)))
+            out.append(math.ceil(tat - now))
+            out.append(max(0, math.ceil(tat - period + emission - now)))
+        return out
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.store: dict[str, float] = {}
+        self.clock = [0.0]
+        self.script = _FakeGcraScript(self.store, self.clock)
+
+    def register_script(self, _source: str) -> _FakeGcraScript:
+        return self.script
+
+
+def _build_app(**kwargs) -> RateLimitMiddleware:
+    async def ok(_request):
+        return PlainTextResponse("ok")
+
+    inner = Starlette(routes=[Route("/ping", ok), Route("/health", ok)])
+    return RateLimitMiddleware(inner, **kwargs)
+
+
+async def _get(app, path: str = "/ping") -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path)
+
+
+def test_local_gcra_allows_burst_then_rejects() -> None:
+    limiter = LocalGcraLimiter((RateLimitWindow(limit=3, period_seconds=60),))
+    decisions = [limiter.acquire("k", now=100.0) for _ in range(4)]
+
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert decisions[2].windows[0].remaining == 0
+    assert decisions[3].binding().retry_after_seconds == pytest.approx(20.0)
+    # 一个发射间隔后恢复 1 个配额
+    assert limiter.acquire("k", now=120.0).allowed is True
+
+
+def test_local_gcra_bounds_key_count() -> None:
+    limiter = LocalGcraLimiter((RateLimitWindow(limit=5, period_seconds=60),), max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.acquire(key, now=0.0)
+
+    assert list(limiter._tats) == ["b", "c"]
+
+
+@pytest.mark.asyncio
+async def test_middleware_sets_ratelimit_headers_and_batches_redis_calls() -> None:
+    redis = _FakeRedis()
+
+    async def factory():
+        return redis
+
+    app = _build_app(requests_per_minute=100, requests_per_hour=1000, redis_client_factory=factory)
+    responses = [await _get(app) for _ in range(10)]
+
+    assert all(r.status_code == 200 for r in responses)
+    # 默认 lease_size = 100 // 20 = 5：10 个请求只打 2 次 Redis
+    assert redis.script.calls == 2
+    headers = responses[0].headers
+    assert headers["RateLimit-Limit"] == "100"
+    assert headers["RateLimit-Remaining"] == "99"
+    assert headers["RateLimit-Policy"] == "100;w=60, 1000;w=3600"
+    assert "Retry-After" not in headers
+
+
+@pytest.mark.asyncio
+async def test_middleware_rejects_when_shared_quota_exhausted() -> None:
+    redis = _FakeRedis()
+
+    async def factory():
+        return redis
+
+    # 两个 worker 共享 Redis：各自本地均未超限，但全局配额已用尽
+    worker_a = _build_app(requests_per_minute=2, redis_client_factory=factory)
+    worker_b = _build_app(requests_per_minute=2, redis_client_factory=factory)
+    assert (await _get(worker_a)).status_code == 200
+    assert (await _get(worker_b)).status_code == 200
+
+    rejected = await _get(worker_a)
+    assert rejected.status_code == 429
+    assert rejected.json() == {"detail": "Rate limit exceeded", "retry_after": 30}
+    assert rejected.headers["Retry-After"] == "30"
+    assert rejected.headers["RateLimit-Remaining"] == "0"
+
+
+@pytest.mark.asyncio
+async def test_local_prefilter_rejects_without_redis_call() -> None:
+    redis = _FakeRedis()
+
+    async def factory():
+        return redis
+
+    app = _build_app(requests_per_minute=1, redis_client_factory=factory)
+    assert (await _get(app)).status_code == 200
+    calls = redis.script.calls
+
+    assert (await _get(app)).status_code == 429
+    assert redis.script.calls == calls
+
+
+@pytest.mark.asyncio
+async def test_middleware_fails_open_when_redis_down() -> None:
+    attempts = 0
+
+    async def factory():
+        nonlocal attempts
+        attempts += 1
+        raise ConnectionError("redis down")
+
+    app = _build_app(requests_per_minute=60, redis_client_factory=factory)
+    responses = [await _get(app) for _ in range(3)]
+
+    assert [r.status_code for r in responses] == [200, 200, 200]
+    # 首次失败后进入冷却期，后续请求不再尝试 Redis
+    assert attempts == 1
+
+
+@pytest.mark.asyncio
+async def test_exempt_paths_skip_limiting() -> None:
+    async def factory():
+        raise AssertionError("should not be called")
+
+    app = _build_app(redis_client_factory=factory, exempt_paths=("/health",))
+    response = await _get(app, "/health")
+
+    assert response.status_code == 200
+    assert "RateLimit-Limit" not in response.headers
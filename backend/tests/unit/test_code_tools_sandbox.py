@@ -7,10 +7,17 @@
 import sys
 import tempfile
 
+from langgraph.graph import END, START, StateGraph
 import pytest
 
+from domains.agent.domain.types import AgentEvent, EventType, ToolCall
+from domains.agent.infrastructure.engine.langgraph_agent import LangGraphAgentEngine
 from domains.agent.infrastructure.sandbox.factory import ExecutorFactory
 from domains.agent.infrastructure.tools.code_tools import RunPythonTool, RunShellTool
+from domains.agent.infrastructure.tools.progress import (
+    set_tool_progress_reporter,
+    tool_progress_var,
+)
 from domains.agent.infrastructure.tools.registry import ConfiguredToolRegistry
 from libs.config.execution_config import (
     ExecutionConfig,
@@ -255,3 +262,62 @@ class TestMemoryLimitParsing:
 
         assert _parse_memory_limit("256") == 256
         assert _parse_memory_limit("512") == 512
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="使用 POSIX shell 语法")
+class TestToolProgressStreaming:
+    """测试沙箱输出经进度回调推送到 Agent 事件流"""
+
+    @pytest.mark.asyncio
+    async def test_shell_tool_reports_output_chunks(self):
+        """工具从上下文取得进度回调并转发输出分块"""
+        RunShellTool.execution_config = ExecutionConfig(
+            sandbox=SandboxConfig(mode=SandboxMode.LOCAL, timeout_seconds=30),
+            shell=ShellConfig(work_dir=tempfile.gettempdir()),
+        )
+        chunks: list[tuple[str, str]] = []
+        token = set_tool_progress_reporter(lambda stream, text: chunks.append((stream, text)))
+        try:
+            result = await RunShellTool().execute(command="echo out; echo err >&2")
+        finally:
+            tool_progress_var.reset(token)
+
+        assert result.success is True
+        assert ("stdout", "out\n") in chunks
+        assert ("stderr", "err\n") in chunks
+
+    @pytest.mark.asyncio
+    async def test_engine_reporter_emits_tool_progress_events(self):
+        """引擎的进度回调经 LangGraph custom 流模式产出 tool_progress 事件"""
+        tool_call = ToolCall(id="call-1", name="run_shell", arguments={})
+
+        async def node(_state: dict) -> dict:
+            report = LangGraphAgentEngine._progress_reporter(tool_call)
+            assert report is not None
+            report("stdout", "chunk")
+            return {"value": 1}
+
+        graph = StateGraph(dict)
+        graph.add_node("tools", node)
+        graph.add_edge(START, "tools")
+        graph.add_edge("tools", END)
+
+        events = [
+            AgentEvent.tool_progress(**chunk)
+            async for mode, chunk in graph.compile().astream(
+                {"value": 0}, stream_mode=["updates", "custom"]
+            )
+            if mode == "custom"
+        ]
+
+        assert [e.type for e in events] == [EventType.TOOL_PROGRESS]
+        assert events[0].data == {
+            "tool_call_id": "call-1",
+            "tool_name": "run_shell",
+            "stream": "stdout",
+            "content": "chunk",
+        }
+
+    def test_reporter_is_none_outside_graph(self):
+        tool_call = ToolCall(id="call-1", name="run_shell", arguments={})
+        assert LangGraphAgentEngine._progress_reporter(tool_call) is None
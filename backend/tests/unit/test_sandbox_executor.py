@@ -5,7 +5,9 @@
 """
 # pylint: disable=protected-access  # 测试代码需要访问私有方法
 
+import asyncio
 import sys
+import time
 
 import pytest
 
@@ -13,6 +15,7 @@ from domains.agent.infrastructure.sandbox.executor import (
     DockerExecutor,
     ExecutionResult,
     LocalExecutor,
+    OutputBuffer,
     PersistentDockerExecutor,
     SandboxConfig,
 )
@@ -146,6 +149,132 @@ class TestLocalExecutor:
         assert "ValueError" in result.stderr or "ValueError" in result.stdout
 
 
+class TestOutputBuffer:
+    """测试头尾截断的有界输出缓冲"""
+
+    def test_small_output_is_kept_verbatim(self):
+        buffer = OutputBuffer(max_chars=10)
+        buffer.append("abc")
+        buffer.append("def")
+        assert buffer.getvalue() == "abcdef"
+        assert buffer.dropped == 0
+
+    def test_keeps_head_and_tail(self):
+        buffer = OutputBuffer(max_chars=6)
+        for chunk in ("ab", "cd", "ef", "gh", "ij"):
+            buffer.append(chunk)
+        assert buffer.dropped == 4
+        assert buffer.getvalue().startswith("abc\n")
+        assert buffer.getvalue().endswith("\nhij")
+        assert "4" in buffer.getvalue()
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="使用 POSIX shell 语法")
+class TestStreamingExecution:
+    """测试流式输出、截断与取消"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_arrive_before_process_exits(self):
+        """输出分块在进程结束前到达"""
+        arrivals: list[tuple[str, str, float]] = []
+        start = time.monotonic()
+
+        result = await LocalExecutor().execute_shell(
+            "echo first; sleep 0.5; echo second >&2",
+            on_output=lambda stream, text: arrivals.append((stream, text, time.monotonic())),
+        )
+
+        assert result.success is True
+        assert result.stdout == "first"
+        assert result.stderr == "second"
+        assert arrivals[0][:2] == ("stdout", "first\n")
+        assert arrivals[0][2] - start < 0.4
+        assert ("stderr", "second\n") in [a[:2] for a in arrivals]
+
+    @pytest.mark.asyncio
+    async def test_python_output_is_unbuffered(self):
+        """Python 输出不经块缓冲，print 后立即送达"""
+        arrivals: list[float] = []
+        start = time.monotonic()
+
+        await LocalExecutor().execute_python(
+            "import time\nprint('tick')\ntime.sleep(0.5)",
+            on_output=lambda _stream, _text: arrivals.append(time.monotonic()),
+        )
+
+        assert arrivals
+        assert arrivals[0] - start < 0.4
+
+    @pytest.mark.asyncio
+    async def test_large_output_is_truncated(self):
+        """超长输出只保留头尾，实时转发同样有上限"""
+        streamed: list[str] = []
+        config = SandboxConfig(max_output_chars=1000)
+
+        result = await LocalExecutor().execute_shell(
+            "seq 1 20000",
+            config=config,
+            on_output=lambda _stream, text: streamed.append(text),
+        )
+
+        assert result.success is True
+        assert result.stdout.startswith("1\n2\n3\n")
+        assert result.stdout.endswith("19999\n20000")
+        assert "已截断" in result.stdout
+        assert len(result.stdout) < 1100
+        assert sum(len(t) for t in streamed) < 1100
+
+    @pytest.mark.asyncio
+    async def test_timeout_keeps_partial_output(self):
+        """超时时保留已收到的输出"""
+        result = await LocalExecutor().execute_shell(
+            "echo partial; sleep 10", config=SandboxConfig(timeout_seconds=1)
+        )
+
+        assert result.success is False
+        assert "timed out" in (result.error or "")
+        assert result.stdout == "partial"
+
+    @pytest.mark.asyncio
+    async def test_cancellation_kills_process(self, tmp_path):
+        """任务取消时终止整组子进程"""
+        marker = tmp_path / "done"
+        task = asyncio.create_task(
+            LocalExecutor(work_dir=str(tmp_path)).execute_shell(f"sleep 1 && touch {marker}")
+        )
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(1.2)
+        assert not marker.exists()
+
+    @pytest.mark.asyncio
+    async def test_docker_cancellation_removes_container(self, monkeypatch):
+        """Docker 执行被取消时移除容器"""
+        executor = DockerExecutor()
+        calls: list[list[str]] = []
+
+        async def fake_stream(cmd, *, abort, **_kwargs):
+            await abort()
+            raise asyncio.CancelledError
+
+        def fake_run(cmd, **_kwargs):
+            calls.append(cmd)
+
+        monkeypatch.setattr(
+            "domains.agent.infrastructure.sandbox.executor.stream_subprocess", fake_stream
+        )
+        monkeypatch.setattr("subprocess.run", fake_run)
+
+        with pytest.raises(asyncio.CancelledError):
+            await executor.execute_shell("sleep 100")
+
+        assert calls[0][:3] == ["docker", "rm", "-f"]
+        assert calls[0][3].startswith("sandbox-")
+
+
 class TestDockerExecutor:
     """测试 Docker 执行器"""
 
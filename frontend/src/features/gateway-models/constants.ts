@@ -111,6 +111,7 @@ export const ROUTING_STRATEGIES = [
   'usage-based-routing-v2',
   'latency-based-routing',
   'cost-based-routing',
+  'ewma-latency',
 ] as const
 
 export type RoutingStrategy = (typeof ROUTING_STRATEGIES)[number]
@@ -123,6 +124,7 @@ export const ROUTING_STRATEGY_LABELS: Record<RoutingStrategy, string> = {
   'usage-based-routing-v2': '按用量路由',
   'latency-based-routing': '按延迟路由',
   'cost-based-routing': '按成本路由',
+  'ewma-latency': '按实时延迟与错误率',
 }
 
 /** 历史路由数据可能仍存旧枚举值，仅用于展示 */